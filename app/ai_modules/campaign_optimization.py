@@ -28,6 +28,7 @@ except ImportError:
     HAS_SKLEARN = False
 
 from app.utils.helpers import generate_id
+from app.utils.metrics import hourly_metrics_by_day
 from app.platform_connectors.facebook_connector import FacebookConnector
 from app.platform_connectors.instagram_connector import InstagramConnector
 from app.platform_connectors.tiktok_connector import TikTokConnector
@@ -446,6 +447,10 @@ class CampaignOptimizationAI:
         # Extract audience insights
         audience_insights = analytics.get('audience_insights', {})
         
+        # Get hourly breakdown for schedule optimization
+        hourly_analytics = self.facebook_connector.get_campaign_hourly_analytics(campaign_id, start_date, end_date)
+        hourly_metrics = hourly_analytics.get('hourly_metrics', []) if 'error' not in hourly_analytics else []
+        
         return {
             'total_impressions': total_impressions,
             'total_clicks': total_clicks,
@@ -458,6 +463,7 @@ class CampaignOptimizationAI:
             'cpa': cpa,
             'roas': roas,
             'daily_metrics': daily_metrics,
+            'hourly_metrics': hourly_metrics,
             'ad_set_metrics': ad_set_metrics,
             'ad_metrics': ad_metrics,
             'audience_insights': audience_insights
@@ -814,12 +820,24 @@ class CampaignOptimizationAI:
         Returns:
             Dict: Optimized campaign schedule
         """
-        # Extract daily metrics
+        # Extract daily metrics, keyed by date
         daily_metrics = performance.get('daily_metrics', {})
         
+        if isinstance(daily_metrics, list):
+            daily_metrics = {metrics['date'][:10]: metrics for metrics in daily_metrics}
+        
         if not daily_metrics:
             return {'error': 'No daily metrics available'}
         
+        # Attach hourly metrics to their day
+        hourly_by_day = hourly_metrics_by_day(performance.get('hourly_metrics', []))
+        
+        if hourly_by_day:
+            daily_metrics = {
+                date_str: dict(metrics, hourly_metrics=hourly_by_day.get(date_str, metrics.get('hourly_metrics', {})))
+                for date_str, metrics in daily_metrics.items()
+            }
+        
         # Calculate performance metrics for each day of the week
         day_of_week_performance = {
             'Monday': {'impressions': 0, 'clicks': 0, 'conversions': 0, 'spend': 0, 'count': 0},
@@ -1,10 +1,19 @@
 """
 AdGenius AI Backend - Analytics API
 """
-from flask import Blueprint, request, jsonify, current_app
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
-from app.services.analytics_service_simple import AnalyticsService
+from app.models.user import User
+from app.services.analytics_cache import get_analytics_cache
+from app.services.analytics_export import AnalyticsExporter
+from app.services.analytics_service import AnalyticsService
+from app.utils.calendar_buckets import GRANULARITIES
+from app.utils.rate_limiter import get_rate_limiter
+from app.utils.resilience import breaker_metrics
 
 # Create blueprint
 analytics_bp = Blueprint('analytics', __name__, url_prefix='/analytics')
@@ -12,6 +21,27 @@ analytics_bp = Blueprint('analytics', __name__, url_prefix='/analytics')
 # Create analytics service
 analytics_service = AnalyticsService()
 
+def admin_required(view):
+    """
+    Restrict a view to admin users; apply it below @jwt_required()
+    
+    Args:
+        view (Callable): View function
+    
+    Returns:
+        Callable: View function answering 403 for other users
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        user = User.objects(id=get_jwt_identity()).only('role').first()
+        
+        if not user or user.role != 'admin':
+            return jsonify({"error": "Admin access required"}), 403
+        
+        return view(*args, **kwargs)
+    
+    return wrapper
+
 @analytics_bp.route('/dashboard', methods=['GET'])
 @jwt_required()
 def get_dashboard():
@@ -28,13 +58,17 @@ def get_dashboard():
     start_date = request.args.get('start_date')
     end_date = request.args.get('end_date')
     platform = request.args.get('platform')
+    sections = request.args.get('sections')  # comma-separated; defaults to the user's widgets
+    compare = request.args.get('compare', 'false').lower() == 'true'  # compare with the previous period
     
     # Get dashboard data
     dashboard_data = analytics_service.get_dashboard_data(
         user_id=user_id,
         start_date=start_date,
         end_date=end_date,
-        platform=platform
+        platform=platform,
+        sections=sections,
+        compare=compare
     )
     
     return jsonify(dashboard_data), 200
@@ -47,7 +81,7 @@ def get_campaign_analytics(campaign_id):
     
     Args:
         campaign_id (str): Campaign ID
-        
+    
     Returns:
         Response: JSON response
     """
@@ -84,7 +118,7 @@ def get_platform_analytics(platform):
     
     Args:
         platform (str): Platform name (facebook, instagram, tiktok, shopee)
-        
+    
     Returns:
         Response: JSON response
     """
@@ -128,12 +162,14 @@ def get_audience_insights():
     # Get query parameters
     platform = request.args.get('platform')
     campaign_id = request.args.get('campaign_id')
+    top_n = request.args.get('top_n', type=int)
     
     # Get audience insights
     insights = analytics_service.get_audience_insights(
         user_id=user_id,
         platform=platform,
-        campaign_id=campaign_id
+        campaign_id=campaign_id,
+        top_n=top_n
     )
     
     return jsonify(insights), 200
@@ -155,7 +191,11 @@ def get_performance_metrics():
     end_date = request.args.get('end_date')
     platform = request.args.get('platform')
     campaign_id = request.args.get('campaign_id')
-    group_by = request.args.get('group_by', 'day')  # day, week, month
+    group_by = request.args.get('group_by', 'day')  # day, week, month, quarter, year
+    compare = request.args.get('compare', 'false').lower() == 'true'  # compare with the previous period
+    
+    if group_by not in GRANULARITIES:
+        return jsonify({"error": f"group_by must be one of {', '.join(GRANULARITIES)}"}), 400
     
     # Get performance metrics
     metrics = analytics_service.get_performance_metrics(
@@ -164,11 +204,70 @@ def get_performance_metrics():
         end_date=end_date,
         platform=platform,
         campaign_id=campaign_id,
-        group_by=group_by
+        group_by=group_by,
+        compare=compare
     )
     
     return jsonify(metrics), 200
 
+@analytics_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_analytics():
+    """
+    Stream analytics rows as NDJSON or CSV
+    
+    Accepts the same filters as /performance plus format (ndjson, csv).
+    The body is gzipped when the client sends Accept-Encoding: gzip.
+    
+    Returns:
+        Response: Streaming response
+    """
+    # Get user ID from JWT
+    user_id = get_jwt_identity()
+    
+    # Get query parameters
+    start_date = request.args.get('start_date')
+    end_date = request.args.get('end_date')
+    platform = request.args.get('platform')
+    campaign_id = request.args.get('campaign_id')
+    group_by = request.args.get('group_by', 'day')  # day, week, month, quarter, year
+    export_format = request.args.get('format', 'ndjson')  # ndjson, csv
+    
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({"error": "Format must be ndjson or csv"}), 400
+    
+    if group_by not in GRANULARITIES:
+        return jsonify({"error": f"group_by must be one of {', '.join(GRANULARITIES)}"}), 400
+    
+    # Set default date range if not provided (last 30 days)
+    try:
+        end_date_obj = datetime.fromisoformat(end_date) if end_date else datetime.utcnow()
+        start_date_obj = datetime.fromisoformat(start_date) if start_date else end_date_obj - timedelta(days=30)
+    except ValueError:
+        return jsonify({"error": "Dates must be in ISO format"}), 400
+    
+    exporter = AnalyticsExporter(
+        user_id=user_id,
+        start_date=start_date_obj,
+        end_date=end_date_obj,
+        platform=platform,
+        campaign_id=campaign_id,
+        group_by=group_by
+    )
+    compress = 'gzip' in request.headers.get('Accept-Encoding', '')
+    
+    response = Response(
+        stream_with_context(exporter.stream(export_format, compress)),
+        mimetype='text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename=analytics.{export_format}'
+    
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Vary'] = 'Accept-Encoding'
+    
+    return response
+
 @analytics_bp.route('/roi', methods=['GET'])
 @jwt_required()
 def get_roi_analysis():
@@ -222,3 +321,30 @@ def get_recommendations():
     )
     
     return jsonify(recommendations), 200
+
+@analytics_bp.route('/cache/stats', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_cache_stats():
+    """
+    Get process-wide analytics cache hit/miss metrics (admins only)
+    
+    Returns:
+        Response: JSON response
+    """
+    return jsonify(get_analytics_cache().stats()), 200
+
+@analytics_bp.route('/connectors/stats', methods=['GET'])
+@jwt_required()
+@admin_required
+def get_connector_stats():
+    """
+    Get process-wide connector circuit breaker states and rate limit metrics (admins only)
+    
+    Returns:
+        Response: JSON response
+    """
+    return jsonify({
+        'circuit_breakers': breaker_metrics(),
+        'rate_limits': get_rate_limiter().stats()
+    }), 200
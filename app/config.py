@@ -50,8 +50,57 @@ class Config:
     # OpenAI API settings
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
     
+    # Analytics fetch settings (per-platform limits use e.g. TIKTOK_FETCH_CONCURRENCY)
+    ANALYTICS_FETCH_CONCURRENCY = int(os.getenv('ANALYTICS_FETCH_CONCURRENCY', 4))
+    ANALYTICS_FETCH_DEADLINE = float(os.getenv('ANALYTICS_FETCH_DEADLINE', 20))
+    
+    # Platform connector HTTP pools (per-platform overrides use e.g. TIKTOK_HTTP_MAX_CONNECTIONS)
+    CONNECTOR_HTTP_MAX_CONNECTIONS = int(os.getenv('CONNECTOR_HTTP_MAX_CONNECTIONS', 10))
+    CONNECTOR_HTTP_CONNECT_TIMEOUT = float(os.getenv('CONNECTOR_HTTP_CONNECT_TIMEOUT', 3.05))
+    CONNECTOR_HTTP_READ_TIMEOUT = float(os.getenv('CONNECTOR_HTTP_READ_TIMEOUT', 30))
+    
+    # Connector call budgets in calls per second (per-platform overrides use e.g. TIKTOK_RATE_LIMIT)
+    CONNECTOR_RATE_LIMIT = float(os.getenv('CONNECTOR_RATE_LIMIT', 5))
+    CONNECTOR_RATE_BURST = float(os.getenv('CONNECTOR_RATE_BURST', 10))
+    CONNECTOR_RATE_MAX_WAIT = float(os.getenv('CONNECTOR_RATE_MAX_WAIT', 60))
+    
+    # Connector retries of idempotent reads and per-endpoint circuit breakers (overrides use e.g. TIKTOK_RETRY_ATTEMPTS)
+    CONNECTOR_RETRY_ATTEMPTS = int(os.getenv('CONNECTOR_RETRY_ATTEMPTS', 3))
+    CONNECTOR_RETRY_BASE_DELAY = float(os.getenv('CONNECTOR_RETRY_BASE_DELAY', 0.5))
+    CONNECTOR_RETRY_MAX_DELAY = float(os.getenv('CONNECTOR_RETRY_MAX_DELAY', 8))
+    CONNECTOR_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CONNECTOR_CIRCUIT_FAILURE_THRESHOLD', 5))
+    CONNECTOR_CIRCUIT_RESET_TIMEOUT = float(os.getenv('CONNECTOR_CIRCUIT_RESET_TIMEOUT', 30))
+    
+    # TikTok report requests run concurrently per campaign analytics fetch
+    TIKTOK_REPORT_CONCURRENCY = int(os.getenv('TIKTOK_REPORT_CONCURRENCY', 5))
+    
+    # Connector runtime for analytics fetches: 'sync', or 'async' to fan calls out on an event loop (needs aiohttp)
+    CONNECTOR_RUNTIME = os.getenv('CONNECTOR_RUNTIME', 'sync')
+    
+    # Dashboard sections: 'facet' computes them in one aggregation, 'split' runs one aggregation per section
+    DASHBOARD_SECTION_MODE = os.getenv('DASHBOARD_SECTION_MODE', 'facet')
+    
+    # Dashboard units computed concurrently per request
+    DASHBOARD_SECTION_CONCURRENCY = int(os.getenv('DASHBOARD_SECTION_CONCURRENCY', 4))
+    
+    # Days of raw hourly analytics kept before compaction into daily rows
+    ANALYTICS_HOURLY_RETENTION_DAYS = int(os.getenv('ANALYTICS_HOURLY_RETENTION_DAYS', 14))
+    
+    # Seconds a write may take to reach rollups and the prefix-sum index before consistency checks count it
+    ANALYTICS_CONSISTENCY_SETTLE_SECONDS = float(os.getenv('ANALYTICS_CONSISTENCY_SETTLE_SECONDS', 300))
+    
     # Redis settings
     REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    ANALYTICS_CACHE_TTL = int(os.getenv('ANALYTICS_CACHE_TTL', 300))
+    
+    # Shorter TTL when Redis is unreachable and each worker caches on its own
+    ANALYTICS_LOCAL_CACHE_TTL = int(os.getenv('ANALYTICS_LOCAL_CACHE_TTL', 30))
+    
+    # Analytics metrics storage backend (documents or timeseries)
+    ANALYTICS_METRICS_BACKEND = os.getenv('ANALYTICS_METRICS_BACKEND', 'documents')
+    
+    # Analytics snapshot settings
+    ANALYTICS_SNAPSHOT_DIR = os.getenv('ANALYTICS_SNAPSHOT_DIR', 'data/analytics_snapshots')
     
     # Logging settings
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -1,8 +1,14 @@
 """
 AdGenius AI Backend - Analytics Model
 """
+import logging
 from datetime import datetime
 from mongoengine import Document, StringField, FloatField, IntField, DateTimeField, DictField, ListField
+from pymongo.errors import DuplicateKeyError
+
+from app.utils.metrics import derive_row
+
+logger = logging.getLogger(__name__)
 
 class CampaignAnalytics(Document):
     """Campaign analytics model for storing performance data"""
@@ -10,6 +16,7 @@ class CampaignAnalytics(Document):
     # Reference Information
     campaign_id = StringField(required=True)
     user_id = StringField(required=True)
+    platform = StringField()  # facebook, instagram, tiktok, shopee
     
     # Time Period
     date = DateTimeField(required=True)
@@ -56,31 +63,65 @@ class CampaignAnalytics(Document):
     meta = {
         'collection': 'campaign_analytics',
         'indexes': [
-            'campaign_id',
-            'user_id',
+            ('user_id', 'date'),
             'date',
-            ('campaign_id', 'date')
+            'updated_at',
+            # Last, so a build failing on existing duplicates leaves the others in place
+            {
+                'fields': ['campaign_id', 'date', 'period_type'],
+                'unique': True
+            }
         ]
     }
     
+    # Large sub-documents that reads skip unless a caller asks for them
+    HEAVY_FIELDS = ('platform_metrics', 'demographic_data', 'device_data', 'top_ads', 'top_keywords')
+    
+    @classmethod
+    def ensure_indexes(cls):
+        """Override index creation so duplicates left by older writes do not break the first query"""
+        try:
+            super(CampaignAnalytics, cls).ensure_indexes()
+        except DuplicateKeyError:
+            logger.warning(
+                'Duplicate campaign analytics block the unique (campaign_id, date, period_type) index; '
+                'run AnalyticsService.dedupe_campaign_analytics to remove them and build it'
+            )
+    
+    @classmethod
+    def _from_son(cls, son, *args, **kwargs):
+        """Override loading to remember heavy fields left out by a projection"""
+        document = super(CampaignAnalytics, cls)._from_son(son, *args, **kwargs)
+        document._unloaded_fields = {field for field in cls.HEAVY_FIELDS if field not in son}
+        
+        return document
+    
+    def load_field(self, field_name):
+        """Get a field, fetching it from the database on first access if a projection skipped it"""
+        unloaded = getattr(self, '_unloaded_fields', None)
+        
+        if unloaded and field_name in unloaded:
+            unloaded.discard(field_name)
+            self.reload(field_name)
+        
+        return getattr(self, field_name)
+    
+    def calculate_metrics(self):
+        """Calculate derived metrics from the summed metrics"""
+        metrics = derive_row(self.impressions, self.clicks, self.conversions, self.spent, self.revenue)
+        self.ctr = metrics['ctr']
+        self.cpc = metrics['cpc']
+        self.cpm = metrics['cpm']
+        self.cpa = metrics['cost_per_conversion']
+        self.roas = metrics['roas']
+        self.conversion_rate = metrics['conversion_rate']
+    
     def save(self, *args, **kwargs):
         """Override save to update calculated metrics and timestamp"""
         self.updated_at = datetime.utcnow()
         
         # Calculate metrics
-        if self.impressions > 0:
-            self.ctr = (self.clicks / self.impressions) * 100
-            self.cpm = (self.spent / self.impressions) * 1000
-        
-        if self.clicks > 0:
-            self.cpc = self.spent / self.clicks
-            self.conversion_rate = (self.conversions / self.clicks) * 100
-        
-        if self.conversions > 0:
-            self.cpa = self.spent / self.conversions
-        
-        if self.spent > 0:
-            self.roas = self.revenue / self.spent
+        self.calculate_metrics()
         
         return super(CampaignAnalytics, self).save(*args, **kwargs)
     
@@ -89,6 +130,7 @@ class CampaignAnalytics(Document):
         return {
             'campaign_id': self.campaign_id,
             'user_id': self.user_id,
+            'platform': self.platform,
             'date': self.date.isoformat() if self.date else None,
             'period_type': self.period_type,
             'metrics': {
@@ -104,11 +146,11 @@ class CampaignAnalytics(Document):
                 'roas': round(self.roas, 2),
                 'conversion_rate': round(self.conversion_rate, 2)
             },
-            'platform_metrics': self.platform_metrics,
-            'demographic_data': self.demographic_data,
-            'device_data': self.device_data,
-            'top_ads': self.top_ads,
-            'top_keywords': self.top_keywords,
+            'platform_metrics': self.load_field('platform_metrics'),
+            'demographic_data': self.load_field('demographic_data'),
+            'device_data': self.load_field('device_data'),
+            'top_ads': self.load_field('top_ads'),
+            'top_keywords': self.load_field('top_keywords'),
             'ai_insights': {
                 'recommendations': self.ai_recommendations,
                 'optimization_score': self.optimization_score
@@ -116,3 +158,85 @@ class CampaignAnalytics(Document):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
+
+class AnalyticsRollup(Document):
+    """Pre-aggregated campaign analytics per calendar bucket"""
+    
+    # Rollup Key
+    user_id = StringField(required=True)
+    campaign_id = StringField(required=True)
+    platform = StringField()
+    period_type = StringField(
+        required=True,
+        choices=['daily', 'weekly', 'monthly']
+    )
+    bucket_start = DateTimeField(required=True)
+    
+    # Summed Metrics
+    impressions = IntField(default=0)
+    clicks = IntField(default=0)
+    conversions = IntField(default=0)
+    spent = FloatField(default=0.0)
+    revenue = FloatField(default=0.0)
+    
+    # Timestamps
+    updated_at = DateTimeField(default=datetime.utcnow)
+    
+    meta = {
+        'collection': 'analytics_rollups',
+        'indexes': [
+            {
+                'fields': ['user_id', 'campaign_id', 'platform', 'period_type', 'bucket_start'],
+                'unique': True
+            },
+            ('user_id', 'period_type', 'bucket_start')
+        ]
+    }
+    
+    def to_dict(self):
+        """Convert model to dictionary"""
+        return {
+            'user_id': self.user_id,
+            'campaign_id': self.campaign_id,
+            'platform': self.platform,
+            'period_type': self.period_type,
+            'bucket_start': self.bucket_start.isoformat() if self.bucket_start else None,
+            'metrics': {
+                'impressions': self.impressions,
+                'clicks': self.clicks,
+                'conversions': self.conversions,
+                'spent': self.spent,
+                'revenue': self.revenue
+            },
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class AnalyticsPrefixIndex(Document):
+    """Cumulative daily campaign metrics for one campaign-year"""
+    
+    # Index Key
+    user_id = StringField(required=True)
+    campaign_id = StringField(required=True)
+    platform = StringField()
+    year = IntField(required=True)
+    
+    # Running Totals (position N holds the sum from Jan 1 through day-of-year N + 1)
+    impressions = ListField(IntField())
+    clicks = ListField(IntField())
+    conversions = ListField(IntField())
+    spent = ListField(FloatField())
+    revenue = ListField(FloatField())
+    
+    # Timestamps
+    updated_at = DateTimeField(default=datetime.utcnow)
+    
+    meta = {
+        'collection': 'analytics_prefix_index',
+        'indexes': [
+            {
+                'fields': ['campaign_id', 'year'],
+                'unique': True
+            },
+            ('user_id', 'year')
+        ]
+    }
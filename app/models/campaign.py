@@ -12,6 +12,7 @@ from mongoengine import (
 )
 
 from app.models.user import User
+from app.utils.metrics import derive_row
 
 class Targeting(EmbeddedDocument):
     """Targeting model"""
@@ -87,35 +88,14 @@ class Performance(EmbeddedDocument):
     
     def calculate_metrics(self):
         """Calculate performance metrics"""
-        # Calculate CTR
-        if self.impressions > 0:
-            self.ctr = (self.clicks / self.impressions) * 100
-        else:
-            self.ctr = 0
+        # ROAS is left untouched since no revenue is tracked here
+        metrics = derive_row(self.impressions, self.clicks, self.conversions, self.spend, 0.0)
         
-        # Calculate CPC
-        if self.clicks > 0:
-            self.cpc = self.spend / self.clicks
-        else:
-            self.cpc = 0
-        
-        # Calculate CPM
-        if self.impressions > 0:
-            self.cpm = (self.spend / self.impressions) * 1000
-        else:
-            self.cpm = 0
-        
-        # Calculate conversion rate
-        if self.clicks > 0:
-            self.conversion_rate = (self.conversions / self.clicks) * 100
-        else:
-            self.conversion_rate = 0
-        
-        # Calculate cost per conversion
-        if self.conversions > 0:
-            self.cost_per_conversion = self.spend / self.conversions
-        else:
-            self.cost_per_conversion = 0
+        self.ctr = metrics['ctr']
+        self.cpc = metrics['cpc']
+        self.cpm = metrics['cpm']
+        self.conversion_rate = metrics['conversion_rate']
+        self.cost_per_conversion = metrics['cost_per_conversion']
         
         # Update last updated timestamp
         self.last_updated = datetime.utcnow()
@@ -4,8 +4,10 @@ AdGenius AI Backend - Facebook API Connector
 import os
 import json
 import logging
+import re
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Union
+from urllib.parse import urlparse
 
 try:
     from facebook_business.api import FacebookAdsApi
@@ -24,9 +26,98 @@ except ImportError:
 
 from app.models.campaign import Campaign
 from app.utils.helpers import generate_id
+from app.utils.rate_limiter import get_rate_limiter
+from app.utils.resilience import RetryPolicy, call_with_retry, get_circuit_breaker
 
 logger = logging.getLogger(__name__)
 
+def ad_account_from_path(path) -> Optional[str]:
+    """
+    Get the ad account a Graph API call is made against
+    
+    Args:
+        path (Union[str, Sequence[str]]): Graph API path segments or URL
+        
+    Returns:
+        Optional[str]: Ad account ID (e.g. 'act_123'), or None for app-level calls
+    """
+    segments = path.split('/') if isinstance(path, str) else path
+    
+    for segment in segments or []:
+        if str(segment).startswith('act_'):
+            return str(segment)
+    
+    return None
+
+def graph_endpoint(path) -> str:
+    """
+    Get the endpoint of a Graph API call, without object IDs
+    
+    Args:
+        path (Union[str, Sequence[str]]): Graph API path segments or URL
+        
+    Returns:
+        str: Endpoint (e.g. '/{id}/insights')
+    """
+    segments = urlparse(path).path.split('/') if isinstance(path, str) else path
+    names = []
+    
+    for segment in map(str, segments or []):
+        if not segment or re.fullmatch(r'v\d+\.\d+', segment):
+            continue
+        
+        names.append('{id}' if segment.startswith('act_') or segment.replace('_', '').isdigit() else segment)
+    
+    return '/' + '/'.join(names)
+
+if HAS_FACEBOOK_SDK:
+    class RateLimitedFacebookAdsApi(FacebookAdsApi):
+        """Facebook Ads API client with rate limits, retries and per-endpoint circuit breakers"""
+        
+        def call(self, method, path, *args, **kwargs):
+            """
+            Make a Graph API call within the app and ad account's rate limit
+            
+            GET calls are retried with jittered exponential backoff on 429s
+            and 5xx responses.
+            
+            Args:
+                method (str): HTTP method
+                path (Union[str, Sequence[str]]): Graph API path segments or URL
+                
+            Returns:
+                FacebookResponse: Response
+            """
+            rate_limiter = get_rate_limiter()
+            app_id = getattr(self._session, 'app_id', None)
+            account_id = ad_account_from_path(path)
+            
+            def send():
+                if not rate_limiter.acquire('facebook', app_id, account_id):
+                    return None, RuntimeError('Timed out waiting for Facebook API rate limit budget')
+                
+                try:
+                    response = FacebookAdsApi.call(self, method, path, *args, **kwargs)
+                except FacebookRequestError as e:
+                    rate_limiter.observe('facebook', app_id, account_id, e.http_headers(), e.http_status())
+                    return e.http_status(), e
+                
+                rate_limiter.observe('facebook', app_id, account_id, response.headers(), response.status())
+                
+                return response.status(), response
+            
+            result = call_with_retry(
+                send,
+                get_circuit_breaker('facebook', graph_endpoint(path)),
+                RetryPolicy.for_platform('facebook'),
+                idempotent=method == 'GET'
+            )
+            
+            if isinstance(result, Exception):
+                raise result
+            
+            return result
+
 class FacebookConnector:
     """Facebook API connector"""
     
@@ -45,7 +136,7 @@ class FacebookConnector:
             access_token (str): Access token
         """
         try:
-            FacebookAdsApi.init(self.app_id, self.app_secret, access_token, api_version=self.api_version)
+            RateLimitedFacebookAdsApi.init(self.app_id, self.app_secret, access_token, api_version=self.api_version)
             self.initialized = True
         except Exception as e:
             logger.error(f"Failed to initialize Facebook Ads API: {str(e)}")
@@ -595,6 +686,81 @@ class FacebookConnector:
             logger.error(f"Error getting campaign analytics: {str(e)}")
             return {'error': f"Error getting campaign analytics: {str(e)}"}
     
+    def get_campaign_hourly_analytics(self, campaign_id: str, start_date: datetime, end_date: datetime) -> Dict:
+        """
+        Get campaign analytics broken down by hour of day
+        
+        Args:
+            campaign_id (str): Campaign ID
+            start_date (datetime): Start date
+            end_date (datetime): End date
+        
+        Returns:
+            Dict: Hourly metrics, one entry per day and hour in the advertiser time zone
+        """
+        try:
+            # Get campaign
+            fb_campaign = FBCampaign(campaign_id)
+            
+            # Get insights
+            insights = fb_campaign.get_insights(
+                fields=[
+                    'impressions',
+                    'clicks',
+                    'spend',
+                    'actions',
+                    'conversion_values'
+                ],
+                params={
+                    'time_range': {
+                        'since': start_date.strftime('%Y-%m-%d'),
+                        'until': end_date.strftime('%Y-%m-%d')
+                    },
+                    'time_increment': 1,
+                    'breakdowns': ['hourly_stats_aggregated_by_advertiser_time_zone']
+                }
+            )
+            
+            hourly_metrics = []
+            
+            for insight in insights:
+                # Hour ranges look like "13:00:00 - 13:59:59"
+                date = datetime.strptime(insight.get('date_start'), '%Y-%m-%d')
+                hour = int(insight.get('hourly_stats_aggregated_by_advertiser_time_zone', '0')[:2])
+                
+                # Get conversions and revenue
+                conversions = 0
+                revenue = 0.0
+                
+                if 'actions' in insight:
+                    for action in insight['actions']:
+                        if action['action_type'] in ['purchase', 'offsite_conversion.fb_pixel_purchase']:
+                            conversions += int(action.get('value', 0))
+                
+                if 'conversion_values' in insight:
+                    for value in insight['conversion_values']:
+                        if value['action_type'] in ['purchase', 'offsite_conversion.fb_pixel_purchase']:
+                            revenue += float(value.get('value', 0))
+                
+                hourly_metrics.append({
+                    'date': date.replace(hour=hour).isoformat(),
+                    'impressions': int(insight.get('impressions', 0)),
+                    'clicks': int(insight.get('clicks', 0)),
+                    'conversions': conversions,
+                    'spend': float(insight.get('spend', 0)),
+                    'revenue': revenue
+                })
+            
+            return {
+                'hourly_metrics': hourly_metrics
+            }
+        except FacebookRequestError as e:
+            logger.error(f"Facebook API error: {str(e)}")
+            return {'error': f"Facebook API error: {e.api_error_message()}"}
+        except Exception as e:
+            logger.error(f"Error getting hourly campaign analytics: {str(e)}")
+            return {'error': f"Error getting hourly campaign analytics: {str(e)}"}
+    
     def _map_objective(self, objective: str) -> str:
         """
         Map campaign objective
@@ -8,7 +8,6 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Union
 
 try:
-    from facebook_business.api import FacebookAdsApi
     from facebook_business.adobjects.adaccount import AdAccount
     from facebook_business.adobjects.campaign import Campaign as FBCampaign
     from facebook_business.adobjects.adset import AdSet
@@ -19,6 +18,7 @@ try:
     from facebook_business.adobjects.iguser import IGUser
     from facebook_business.adobjects.igmedia import IGMedia
     from facebook_business.exceptions import FacebookRequestError
+    from app.platform_connectors.facebook_connector import RateLimitedFacebookAdsApi
     HAS_FACEBOOK_SDK = True
 except ImportError:
     HAS_FACEBOOK_SDK = False
@@ -47,7 +47,7 @@ class InstagramConnector:
             access_token (str): Access token
         """
         try:
-            FacebookAdsApi.init(self.app_id, self.app_secret, access_token, api_version=self.api_version)
+            RateLimitedFacebookAdsApi.init(self.app_id, self.app_secret, access_token, api_version=self.api_version)
             self.initialized = True
         except Exception as e:
             logger.error(f"Failed to initialize Instagram API: {str(e)}")
@@ -608,6 +608,81 @@ class InstagramConnector:
             logger.error(f"Error getting campaign analytics: {str(e)}")
             return {'error': f"Error getting campaign analytics: {str(e)}"}
     
+    def get_campaign_hourly_analytics(self, campaign_id: str, start_date: datetime, end_date: datetime) -> Dict:
+        """
+        Get campaign analytics broken down by hour of day
+        
+        Args:
+            campaign_id (str): Campaign ID
+            start_date (datetime): Start date
+            end_date (datetime): End date
+        
+        Returns:
+            Dict: Hourly metrics, one entry per day and hour in the advertiser time zone
+        """
+        try:
+            # Get campaign
+            fb_campaign = FBCampaign(campaign_id)
+            
+            # Get insights
+            insights = fb_campaign.get_insights(
+                fields=[
+                    'impressions',
+                    'clicks',
+                    'spend',
+                    'actions',
+                    'conversion_values'
+                ],
+                params={
+                    'time_range': {
+                        'since': start_date.strftime('%Y-%m-%d'),
+                        'until': end_date.strftime('%Y-%m-%d')
+                    },
+                    'time_increment': 1,
+                    'breakdowns': ['hourly_stats_aggregated_by_advertiser_time_zone']
+                }
+            )
+            
+            hourly_metrics = []
+            
+            for insight in insights:
+                # Hour ranges look like "13:00:00 - 13:59:59"
+                date = datetime.strptime(insight.get('date_start'), '%Y-%m-%d')
+                hour = int(insight.get('hourly_stats_aggregated_by_advertiser_time_zone', '0')[:2])
+                
+                # Get conversions and revenue
+                conversions = 0
+                revenue = 0.0
+                
+                if 'actions' in insight:
+                    for action in insight['actions']:
+                        if action['action_type'] in ['purchase', 'offsite_conversion.fb_pixel_purchase']:
+                            conversions += int(action.get('value', 0))
+                
+                if 'conversion_values' in insight:
+                    for value in insight['conversion_values']:
+                        if value['action_type'] in ['purchase', 'offsite_conversion.fb_pixel_purchase']:
+                            revenue += float(value.get('value', 0))
+                
+                hourly_metrics.append({
+                    'date': date.replace(hour=hour).isoformat(),
+                    'impressions': int(insight.get('impressions', 0)),
+                    'clicks': int(insight.get('clicks', 0)),
+                    'conversions': conversions,
+                    'spend': float(insight.get('spend', 0)),
+                    'revenue': revenue
+                })
+            
+            return {
+                'hourly_metrics': hourly_metrics
+            }
+        except FacebookRequestError as e:
+            logger.error(f"Instagram API error: {str(e)}")
+            return {'error': f"Instagram API error: {e.api_error_message()}"}
+        except Exception as e:
+            logger.error(f"Error getting hourly campaign analytics: {str(e)}")
+            return {'error': f"Error getting hourly campaign analytics: {str(e)}"}
+    
     def _map_objective(self, objective: str) -> str:
         """
         Map campaign objective
@@ -0,0 +1,257 @@
+"""
+AdGenius AI Backend - Shopee Async API Connector
+"""
+import asyncio
+import functools
+import logging
+from datetime import datetime
+from typing import Dict, Hashable, Optional, Tuple
+
+from app.platform_connectors.shopee_connector import ShopeeConnector
+from app.utils.async_http import HAS_AIOHTTP, client_session, gather_bounded, query_items, run_sync
+from app.utils.concurrency import run_bounded
+from app.utils.resilience import CircuitOpenError, call_with_retry_async, get_circuit_breaker
+
+logger = logging.getLogger(__name__)
+
+class AsyncShopeeConnector(ShopeeConnector):
+    """Shopee API connector that issues independent calls concurrently on an event loop"""
+    
+    async def _make_request_async(self, session, method: str, endpoint: str, params: Dict = None, data: Dict = None) -> Dict:
+        """
+        Make API request to Shopee on the event loop
+        
+        Args:
+            session (aiohttp.ClientSession): Async session
+            method (str): HTTP method
+            endpoint (str): API endpoint
+            params (Dict, optional): Query parameters
+            data (Dict, optional): Request body
+            
+        Returns:
+            Dict: API response
+        """
+        if not self.initialized:
+            return {'error': 'Shopee API not initialized'}
+        
+        if method not in ('GET', 'POST'):
+            return {'error': f"Unsupported HTTP method: {method}"}
+        
+        # Build URL
+        url = f"{self.api_base_url}{endpoint}"
+        
+        async def send():
+            # Wait for budget before signing, so the timestamp stays fresh
+            if not await self.rate_limiter.acquire_async('shopee', self.partner_id, self.shop_id):
+                return None, {'error': 'Timed out waiting for Shopee API rate limit budget'}
+            
+            # Add common parameters
+            signed_params = query_items(self._signed_params(endpoint, params))
+            
+            # POST also sends a JSON body
+            if method == 'GET':
+                request = session.request(method, url, params=signed_params)
+            else:
+                request = session.request(method, url, params=signed_params, json=data)
+            
+            async with request as response:
+                await self.rate_limiter.observe_async('shopee', self.partner_id, self.shop_id, response.headers, response.status)
+                return response.status, self._parse_response(response.status, await response.json(content_type=None))
+        
+        try:
+            return await call_with_retry_async(
+                send,
+                get_circuit_breaker('shopee', endpoint),
+                self.retry_policy,
+                idempotent=method == 'GET'
+            )
+        except CircuitOpenError as e:
+            logger.warning(f"Shopee API unavailable: {str(e)}")
+            return {'error': f"Shopee API unavailable: {str(e)}"}
+        except Exception as e:
+            logger.error(f"Error making Shopee API request: {str(e)}")
+            return {'error': f"Error making Shopee API request: {str(e)}"}
+    
+    async def _get_product_details_async(self, session, product_id: str) -> Dict:
+        """
+        Get product details on the event loop
+        
+        Args:
+            session (aiohttp.ClientSession): Async session
+            product_id (str): Product ID
+        
+        Returns:
+            Dict: Product details
+        """
+        response = await self._make_request_async(
+            session, 'GET', '/product/get_item_base_info', params={'item_id_list': [product_id]}
+        )
+        
+        if 'error' in response:
+            return response
+        
+        # Get first product
+        if not response.get('item_list'):
+            return {'error': 'Product not found'}
+        
+        product = response.get('item_list')[0]
+        
+        # The category lookup needs the product's category
+        category_response = await self._make_request_async(
+            session, 'GET', '/product/get_category', params={'category_id': product.get('category_id')}
+        )
+        
+        return self._format_product_details(product, category_response)
+    
+    async def _get_product_performance_async(self, session, product_id: str, start_date: datetime,
+                                             end_date: datetime, orders_response: Dict) -> Dict:
+        """
+        Get product performance on the event loop
+        
+        Args:
+            session (aiohttp.ClientSession): Async session
+            product_id (str): Product ID
+            start_date (datetime): Start date
+            end_date (datetime): End date
+            orders_response (Dict): Order list response of the date range
+        
+        Returns:
+            Dict: Product performance
+        """
+        response, product_details = await asyncio.gather(
+            self._make_request_async(session, 'GET', '/product/get_item_promotion', params={
+                'item_id': product_id,
+                'start_time': int(start_date.timestamp()),
+                'end_time': int(end_date.timestamp())
+            }),
+            self._get_product_details_async(session, product_id)
+        )
+        
+        return self._format_product_performance(product_id, response, product_details, orders_response)
+    
+    async def get_campaign_analytics_async(self, start_date: datetime, end_date: datetime, session=None) -> Dict:
+        """
+        Get campaign analytics, requesting independent data at once
+        
+        The order list of the date range is the same for the shop and every
+        product, so it is requested once and shared.
+        
+        Args:
+            start_date (datetime): Start date
+            end_date (datetime): End date
+            session (aiohttp.ClientSession, optional): Async session. Defaults to a new session.
+        
+        Returns:
+            Dict: Campaign analytics
+        """
+        if session is None:
+            async with client_session('shopee') as session:
+                return await self.get_campaign_analytics_async(start_date, end_date, session)
+        
+        try:
+            response, shop_info, orders_response, products_response = await asyncio.gather(
+                self._make_request_async(session, 'GET', '/shop/get_shop_performance', params={
+                    'start_time': int(start_date.timestamp()),
+                    'end_time': int(end_date.timestamp())
+                }),
+                self._make_request_async(session, 'GET', '/shop/get_shop_info'),
+                self._make_request_async(session, 'GET', '/order/get_order_list',
+                                         params=self._orders_params(start_date, end_date)),
+                self._make_request_async(session, 'GET', '/product/get_item_list', params={
+                    'offset': 0,
+                    'page_size': 100,
+                    'item_status': 'NORMAL'
+                })
+            )
+            
+            shop_performance = self._format_shop_performance(response, shop_info, orders_response)
+            
+            if 'error' in shop_performance:
+                return shop_performance
+            
+            products = self._format_products(products_response)
+            
+            if isinstance(products, dict) and 'error' in products:
+                return products
+            
+            performances = await asyncio.gather(*(
+                self._get_product_performance_async(session, product.get('id'), start_date, end_date, orders_response)
+                for product in products[:10]  # Limit to 10 products
+            ), return_exceptions=True)
+            
+            product_performance = [
+                performance for performance in performances
+                if isinstance(performance, dict) and 'error' not in performance
+            ]
+            
+            return self._format_campaign_analytics(shop_performance, product_performance)
+        except Exception as e:
+            logger.error(f"Error getting campaign analytics: {str(e)}")
+            return {'error': f"Error getting campaign analytics: {str(e)}"}
+    
+    def get_campaign_analytics(self, start_date: datetime, end_date: datetime) -> Dict:
+        """
+        Get campaign analytics
+        
+        Runs the async fetch to completion; without aiohttp the calls are
+        made one by one.
+        
+        Args:
+            start_date (datetime): Start date
+            end_date (datetime): End date
+        
+        Returns:
+            Dict: Campaign analytics
+        """
+        if not HAS_AIOHTTP:
+            return super().get_campaign_analytics(start_date, end_date)
+        
+        return run_sync(self.get_campaign_analytics_async(start_date, end_date))
+    
+    async def get_campaigns_analytics_async(self, arguments: Dict[Hashable, Dict], max_concurrency: int,
+                                            timeout: Optional[float] = None,
+                                            session=None) -> Tuple[Dict[Hashable, Dict], Dict[Hashable, str]]:
+        """
+        Get analytics of many campaigns on one event loop and one session
+        
+        Args:
+            arguments (Dict[Hashable, Dict]): get_campaign_analytics keyword arguments by key
+            max_concurrency (int): Maximum campaigns fetched at once
+            timeout (Optional[float], optional): Overall deadline in seconds. Defaults to None.
+            session (aiohttp.ClientSession, optional): Async session. Defaults to a new session.
+        
+        Returns:
+            Tuple[Dict[Hashable, Dict], Dict[Hashable, str]]: Campaign analytics and errors, both by key
+        """
+        if session is None:
+            async with client_session('shopee') as session:
+                return await self.get_campaigns_analytics_async(arguments, max_concurrency, timeout, session)
+        
+        return await gather_bounded({
+            key: functools.partial(self.get_campaign_analytics_async, session=session, **kwargs)
+            for key, kwargs in arguments.items()
+        }, max_concurrency, timeout)
+    
+    def get_campaigns_analytics(self, arguments: Dict[Hashable, Dict], max_concurrency: int,
+                                timeout: Optional[float] = None) -> Tuple[Dict[Hashable, Dict], Dict[Hashable, str]]:
+        """
+        Get analytics of many campaigns
+        
+        Runs every fetch on a single event loop sharing one session; without
+        aiohttp the sync fetches run on a bounded thread pool instead.
+        
+        Args:
+            arguments (Dict[Hashable, Dict]): get_campaign_analytics keyword arguments by key
+            max_concurrency (int): Maximum campaigns fetched at once
+            timeout (Optional[float], optional): Overall deadline in seconds. Defaults to None.
+        
+        Returns:
+            Tuple[Dict[Hashable, Dict], Dict[Hashable, str]]: Campaign analytics and errors, both by key
+        """
+        if not HAS_AIOHTTP:
+            return run_bounded({
+                key: functools.partial(ShopeeConnector.get_campaign_analytics, self, **kwargs)
+                for key, kwargs in arguments.items()
+            }, max_concurrency, timeout)
+        
+        return run_sync(self.get_campaigns_analytics_async(arguments, max_concurrency, timeout))
@@ -11,10 +11,11 @@ import base64
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Union
 
-import requests
-
 from app.models.campaign import Campaign
 from app.utils.helpers import generate_id
+from app.utils.http_session import get_session, get_timeout
+from app.utils.rate_limiter import get_rate_limiter
+from app.utils.resilience import CircuitOpenError, RetryPolicy, call_with_retry, get_circuit_breaker
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +28,14 @@ class ShopeeConnector:
         self.partner_key = os.getenv('SHOPEE_PARTNER_KEY')
         self.api_base_url = os.getenv('SHOPEE_API_BASE_URL', 'https://partner.shopeemobile.com/api/v2')
         self.initialized = False
+        
+        # Keep-alive connections shared by every connector instance
+        self.session = get_session('shopee')
+        self.timeout = get_timeout('shopee')
+        
+        # Call budget per partner and shop, shared across workers
+        self.rate_limiter = get_rate_limiter()
+        self.retry_policy = RetryPolicy.for_platform('shopee')
     
     def initialize(self, access_token: str, shop_id: str):
         """
@@ -44,28 +53,18 @@ class ShopeeConnector:
             logger.error(f"Failed to initialize Shopee API: {str(e)}")
             self.initialized = False
     
-    def _make_request(self, method: str, endpoint: str, params: Dict = None, data: Dict = None) -> Dict:
+    def _signed_params(self, endpoint: str, params: Dict = None) -> Dict:
         """
-        Make API request to Shopee
+        Add common and signature parameters to a request
         
         Args:
-            method (str): HTTP method
             endpoint (str): API endpoint
             params (Dict, optional): Query parameters
-            data (Dict, optional): Request body
             
         Returns:
-            Dict: API response
+            Dict: Copy of the query parameters with partner, shop, timestamp and signature
         """
-        if not self.initialized:
-            return {'error': 'Shopee API not initialized'}
-        
-        # Build URL
-        url = f"{self.api_base_url}{endpoint}"
-        
-        # Add common parameters
-        if params is None:
-            params = {}
+        params = dict(params or {})
         
         params['partner_id'] = self.partner_id
         params['timestamp'] = int(time.time())
@@ -82,25 +81,83 @@ class ShopeeConnector:
         
         params['sign'] = signature
         
-        try:
+        return params
+    
+    def _parse_response(self, status_code: int, response_data: Dict) -> Dict:
+        """
+        Normalize an API response
+        
+        Args:
+            status_code (int): HTTP status code
+            response_data (Dict): Decoded response body
+            
+        Returns:
+            Dict: Response data, or an error
+        """
+        # Check for errors
+        if status_code != 200 or response_data.get('error') is not None:
+            error_message = response_data.get('message', 'Unknown error')
+            logger.error(f"Shopee API error: {error_message}")
+            return {'error': f"Shopee API error: {error_message}"}
+        
+        return response_data.get('response', {})
+    
+    def _make_request(self, method: str, endpoint: str, params: Dict = None, data: Dict = None) -> Dict:
+        """
+        Make API request to Shopee
+        
+        GET requests are retried with jittered exponential backoff on
+        timeouts, 429s and 5xx responses; every request goes through the
+        endpoint's circuit breaker.
+        
+        Args:
+            method (str): HTTP method
+            endpoint (str): API endpoint
+            params (Dict, optional): Query parameters
+            data (Dict, optional): Request body
+            
+        Returns:
+            Dict: API response
+        """
+        if not self.initialized:
+            return {'error': 'Shopee API not initialized'}
+        
+        if method not in ('GET', 'POST'):
+            return {'error': f"Unsupported HTTP method: {method}"}
+        
+        # Build URL
+        url = f"{self.api_base_url}{endpoint}"
+        
+        def send():
+            # Wait for budget before signing, so the timestamp stays fresh
+            if not self.rate_limiter.acquire('shopee', self.partner_id, self.shop_id):
+                return None, {'error': 'Timed out waiting for Shopee API rate limit budget'}
+            
+            # Add common parameters
+            signed_params = self._signed_params(endpoint, params)
+            
             # Make request
             if method == 'GET':
-                response = requests.get(url, params=params)
-            elif method == 'POST':
-                response = requests.post(url, json=data, params=params)
+                response = self.session.get(url, params=signed_params, timeout=self.timeout)
             else:
-                return {'error': f"Unsupported HTTP method: {method}"}
+                response = self.session.post(url, json=data, params=signed_params, timeout=self.timeout)
             
-            # Parse response
-            response_data = response.json()
+            # Adapt the budget to the usage the API reports
+            self.rate_limiter.observe('shopee', self.partner_id, self.shop_id, response.headers, response.status_code)
             
-            # Check for errors
-            if response.status_code != 200 or response_data.get('error') is not None:
-                error_message = response_data.get('message', 'Unknown error')
-                logger.error(f"Shopee API error: {error_message}")
-                return {'error': f"Shopee API error: {error_message}"}
-            
-            return response_data.get('response', {})
+            # Parse response
+            return response.status_code, self._parse_response(response.status_code, response.json())
+        
+        try:
+            return call_with_retry(
+                send,
+                get_circuit_breaker('shopee', endpoint),
+                self.retry_policy,
+                idempotent=method == 'GET'
+            )
+        except CircuitOpenError as e:
+            logger.warning(f"Shopee API unavailable: {str(e)}")
+            return {'error': f"Shopee API unavailable: {str(e)}"}
         except Exception as e:
             logger.error(f"Error making Shopee API request: {str(e)}")
             return {'error': f"Error making Shopee API request: {str(e)}"}
@@ -145,28 +202,40 @@ class ShopeeConnector:
             
             response = self._make_request('GET', '/product/get_item_list', params=data)
             
-            if 'error' in response:
-                return response
-            
-            # Format products
-            result = []
-            
-            for item in response.get('item', []):
-                result.append({
-                    'id': item.get('item_id'),
-                    'name': item.get('item_name'),
-                    'category_id': item.get('category_id'),
-                    'price': item.get('price'),
-                    'stock': item.get('stock'),
-                    'sales': item.get('sold'),
-                    'image': item.get('image')
-                })
-            
-            return result
+            return self._format_products(response)
         except Exception as e:
             logger.error(f"Error getting products: {str(e)}")
             return {'error': f"Error getting products: {str(e)}"}
     
+    def _format_products(self, response: Dict) -> List[Dict]:
+        """
+        Format an item list response
+        
+        Args:
+            response (Dict): Item list response
+            
+        Returns:
+            List[Dict]: Products, or the response error
+        """
+        if 'error' in response:
+            return response
+        
+        # Format products
+        result = []
+        
+        for item in response.get('item', []):
+            result.append({
+                'id': item.get('item_id'),
+                'name': item.get('item_name'),
+                'category_id': item.get('category_id'),
+                'price': item.get('price'),
+                'stock': item.get('stock'),
+                'sales': item.get('sold'),
+                'image': item.get('image')
+            })
+        
+        return result
+    
     def get_product_details(self, product_id: str) -> Dict:
         """
         Get product details
@@ -197,31 +266,44 @@ class ShopeeConnector:
             # Get product categories
             category_response = self._make_request('GET', '/product/get_category', params={'category_id': product.get('category_id')})
             
-            category_name = ''
-            
-            if 'error' not in category_response and category_response.get('category_list'):
-                category = category_response.get('category_list')[0]
-                category_name = category.get('category_name', '')
-            
-            # Format product
-            return {
-                'id': product.get('item_id'),
-                'name': product.get('item_name'),
-                'description': product.get('description'),
-                'category_id': product.get('category_id'),
-                'category_name': category_name,
-                'price': product.get('price'),
-                'stock': product.get('stock'),
-                'sales': product.get('sold'),
-                'images': product.get('image', {}).get('image_url_list', []),
-                'attributes': product.get('attribute_list', []),
-                'rating': product.get('rating_star', 0),
-                'rating_count': product.get('rating_count', 0)
-            }
+            return self._format_product_details(product, category_response)
         except Exception as e:
             logger.error(f"Error getting product details: {str(e)}")
             return {'error': f"Error getting product details: {str(e)}"}
     
+    def _format_product_details(self, product: Dict, category_response: Dict) -> Dict:
+        """
+        Format a product and its category
+        
+        Args:
+            product (Dict): Item base info
+            category_response (Dict): Category response
+            
+        Returns:
+            Dict: Product details
+        """
+        category_name = ''
+        
+        if 'error' not in category_response and category_response.get('category_list'):
+            category = category_response.get('category_list')[0]
+            category_name = category.get('category_name', '')
+        
+        # Format product
+        return {
+            'id': product.get('item_id'),
+            'name': product.get('item_name'),
+            'description': product.get('description'),
+            'category_id': product.get('category_id'),
+            'category_name': category_name,
+            'price': product.get('price'),
+            'stock': product.get('stock'),
+            'sales': product.get('sold'),
+            'images': product.get('image', {}).get('image_url_list', []),
+            'attributes': product.get('attribute_list', []),
+            'rating': product.get('rating_star', 0),
+            'rating_count': product.get('rating_count', 0)
+        }
+    
     def get_product_categories(self) -> List[Dict]:
         """
         Get product categories
@@ -251,6 +333,24 @@ class ShopeeConnector:
             logger.error(f"Error getting product categories: {str(e)}")
             return {'error': f"Error getting product categories: {str(e)}"}
     
+    def _orders_params(self, start_date: datetime, end_date: datetime) -> Dict:
+        """
+        Build the order list query of a date range
+        
+        Args:
+            start_date (datetime): Start date
+            end_date (datetime): End date
+            
+        Returns:
+            Dict: Query parameters
+        """
+        return {
+            'time_range_field': 'create_time',
+            'time_from': int(start_date.timestamp()),
+            'time_to': int(end_date.timestamp()),
+            'page_size': 100
+        }
+    
     def get_product_performance(self, product_id: str, start_date: datetime, end_date: datetime) -> Dict:
         """
         Get product performance
@@ -264,10 +364,6 @@ class ShopeeConnector:
             Dict: Product performance
         """
         try:
-            # Format dates
-            start_date_str = start_date.strftime('%Y-%m-%d')
-            end_date_str = end_date.strftime('%Y-%m-%d')
-            
             # Get product performance
             data = {
                 'item_id': product_id,
@@ -287,52 +383,67 @@ class ShopeeConnector:
                 return product_details
             
             # Get product orders
-            orders_data = {
-                'time_range_field': 'create_time',
-                'time_from': int(start_date.timestamp()),
-                'time_to': int(end_date.timestamp()),
-                'page_size': 100
-            }
-            
-            orders_response = self._make_request('GET', '/order/get_order_list', params=orders_data)
-            
-            # Calculate metrics
-            total_views = 0
-            total_sales = 0
-            total_revenue = 0.0
-            
-            # Process promotion data
-            for promotion in response.get('item_promotion_list', []):
-                total_views += promotion.get('view_count', 0)
-                total_sales += promotion.get('sold_count', 0)
-                total_revenue += promotion.get('sold_count', 0) * product_details.get('price', 0)
-            
-            # Process orders
-            if 'error' not in orders_response:
-                for order in orders_response.get('order_list', []):
-                    for item in order.get('item_list', []):
-                        if item.get('item_id') == product_id:
-                            total_sales += item.get('model_quantity_purchased', 0)
-                            total_revenue += item.get('model_quantity_purchased', 0) * item.get('model_original_price', 0)
-            
-            # Calculate conversion rate
-            conversion_rate = (total_sales / total_views * 100) if total_views > 0 else 0
+            orders_response = self._make_request('GET', '/order/get_order_list', params=self._orders_params(start_date, end_date))
             
-            return {
-                'product_id': product_id,
-                'product_name': product_details.get('name'),
-                'total_views': total_views,
-                'total_sales': total_sales,
-                'total_revenue': total_revenue,
-                'conversion_rate': conversion_rate,
-                'average_price': product_details.get('price', 0),
-                'rating': product_details.get('rating', 0),
-                'rating_count': product_details.get('rating_count', 0)
-            }
+            return self._format_product_performance(product_id, response, product_details, orders_response)
         except Exception as e:
             logger.error(f"Error getting product performance: {str(e)}")
             return {'error': f"Error getting product performance: {str(e)}"}
     
+    def _format_product_performance(self, product_id: str, response: Dict, product_details: Dict,
+                                    orders_response: Dict) -> Dict:
+        """
+        Combine promotion, product and order responses into product performance
+        
+        Args:
+            product_id (str): Product ID
+            response (Dict): Item promotion response
+            product_details (Dict): Product details
+            orders_response (Dict): Order list response
+            
+        Returns:
+            Dict: Product performance
+        """
+        if 'error' in response:
+            return response
+        
+        if 'error' in product_details:
+            return product_details
+        
+        # Calculate metrics
+        total_views = 0
+        total_sales = 0
+        total_revenue = 0.0
+        
+        # Process promotion data
+        for promotion in response.get('item_promotion_list', []):
+            total_views += promotion.get('view_count', 0)
+            total_sales += promotion.get('sold_count', 0)
+            total_revenue += promotion.get('sold_count', 0) * product_details.get('price', 0)
+        
+        # Process orders
+        if 'error' not in orders_response:
+            for order in orders_response.get('order_list', []):
+                for item in order.get('item_list', []):
+                    if item.get('item_id') == product_id:
+                        total_sales += item.get('model_quantity_purchased', 0)
+                        total_revenue += item.get('model_quantity_purchased', 0) * item.get('model_original_price', 0)
+        
+        # Calculate conversion rate
+        conversion_rate = (total_sales / total_views * 100) if total_views > 0 else 0
+        
+        return {
+            'product_id': product_id,
+            'product_name': product_details.get('name'),
+            'total_views': total_views,
+            'total_sales': total_sales,
+            'total_revenue': total_revenue,
+            'conversion_rate': conversion_rate,
+            'average_price': product_details.get('price', 0),
+            'rating': product_details.get('rating', 0),
+            'rating_count': product_details.get('rating_count', 0)
+        }
+    
     def get_shop_performance(self, start_date: datetime, end_date: datetime) -> Dict:
         """
         Get shop performance
@@ -345,10 +456,6 @@ class ShopeeConnector:
             Dict: Shop performance
         """
         try:
-            # Format dates
-            start_date_str = start_date.strftime('%Y-%m-%d')
-            end_date_str = end_date.strftime('%Y-%m-%d')
-            
             # Get shop performance
             data = {
                 'start_time': int(start_date.timestamp()),
@@ -367,44 +474,57 @@ class ShopeeConnector:
                 return shop_info
             
             # Get orders
-            orders_data = {
-                'time_range_field': 'create_time',
-                'time_from': int(start_date.timestamp()),
-                'time_to': int(end_date.timestamp()),
-                'page_size': 100
-            }
-            
-            orders_response = self._make_request('GET', '/order/get_order_list', params=orders_data)
-            
-            # Calculate metrics
-            total_views = response.get('shop_views', 0)
-            total_orders = 0
-            total_revenue = 0.0
+            orders_response = self._make_request('GET', '/order/get_order_list', params=self._orders_params(start_date, end_date))
             
-            # Process orders
-            if 'error' not in orders_response:
-                for order in orders_response.get('order_list', []):
-                    total_orders += 1
-                    total_revenue += order.get('total_amount', 0)
-            
-            # Calculate conversion rate
-            conversion_rate = (total_orders / total_views * 100) if total_views > 0 else 0
-            
-            return {
-                'shop_id': self.shop_id,
-                'shop_name': shop_info.get('shop_name'),
-                'total_views': total_views,
-                'total_orders': total_orders,
-                'total_revenue': total_revenue,
-                'conversion_rate': conversion_rate,
-                'average_order_value': (total_revenue / total_orders) if total_orders > 0 else 0,
-                'rating': shop_info.get('rating_star', 0),
-                'rating_count': shop_info.get('rating_count', 0)
-            }
+            return self._format_shop_performance(response, shop_info, orders_response)
         except Exception as e:
             logger.error(f"Error getting shop performance: {str(e)}")
             return {'error': f"Error getting shop performance: {str(e)}"}
     
+    def _format_shop_performance(self, response: Dict, shop_info: Dict, orders_response: Dict) -> Dict:
+        """
+        Combine shop performance, shop info and order responses into shop performance
+        
+        Args:
+            response (Dict): Shop performance response
+            shop_info (Dict): Shop info response
+            orders_response (Dict): Order list response
+            
+        Returns:
+            Dict: Shop performance
+        """
+        if 'error' in response:
+            return response
+        
+        if 'error' in shop_info:
+            return shop_info
+        
+        # Calculate metrics
+        total_views = response.get('shop_views', 0)
+        total_orders = 0
+        total_revenue = 0.0
+        
+        # Process orders
+        if 'error' not in orders_response:
+            for order in orders_response.get('order_list', []):
+                total_orders += 1
+                total_revenue += order.get('total_amount', 0)
+        
+        # Calculate conversion rate
+        conversion_rate = (total_orders / total_views * 100) if total_views > 0 else 0
+        
+        return {
+            'shop_id': self.shop_id,
+            'shop_name': shop_info.get('shop_name'),
+            'total_views': total_views,
+            'total_orders': total_orders,
+            'total_revenue': total_revenue,
+            'conversion_rate': conversion_rate,
+            'average_order_value': (total_revenue / total_orders) if total_orders > 0 else 0,
+            'rating': shop_info.get('rating_star', 0),
+            'rating_count': shop_info.get('rating_count', 0)
+        }
+    
     def create_discount(self, product_id: str, discount_percentage: float, start_date: datetime, end_date: datetime) -> Dict:
         """
         Create discount
@@ -880,33 +1000,46 @@ class ShopeeConnector:
                 if isinstance(performance, dict) and 'error' not in performance:
                     product_performance.append(performance)
             
-            # Calculate metrics
-            total_views = shop_performance.get('total_views', 0)
-            total_orders = shop_performance.get('total_orders', 0)
-            total_revenue = shop_performance.get('total_revenue', 0)
-            
-            # Calculate conversion rate
-            conversion_rate = (total_orders / total_views * 100) if total_views > 0 else 0
-            
-            # Generate recommendations
-            recommendations = self._generate_recommendations(
-                shop_performance=shop_performance,
-                product_performance=product_performance
-            )
-            
-            return {
-                'total_views': total_views,
-                'total_orders': total_orders,
-                'total_revenue': total_revenue,
-                'conversion_rate': conversion_rate,
-                'average_order_value': shop_performance.get('average_order_value', 0),
-                'product_performance': product_performance,
-                'recommendations': recommendations
-            }
+            return self._format_campaign_analytics(shop_performance, product_performance)
         except Exception as e:
             logger.error(f"Error getting campaign analytics: {str(e)}")
             return {'error': f"Error getting campaign analytics: {str(e)}"}
     
+    def _format_campaign_analytics(self, shop_performance: Dict, product_performance: List[Dict]) -> Dict:
+        """
+        Combine shop and product performance into campaign analytics
+        
+        Args:
+            shop_performance (Dict): Shop performance
+            product_performance (List[Dict]): Performance of the top products
+            
+        Returns:
+            Dict: Campaign analytics
+        """
+        # Calculate metrics
+        total_views = shop_performance.get('total_views', 0)
+        total_orders = shop_performance.get('total_orders', 0)
+        total_revenue = shop_performance.get('total_revenue', 0)
+        
+        # Calculate conversion rate
+        conversion_rate = (total_orders / total_views * 100) if total_views > 0 else 0
+        
+        # Generate recommendations
+        recommendations = self._generate_recommendations(
+            shop_performance=shop_performance,
+            product_performance=product_performance
+        )
+        
+        return {
+            'total_views': total_views,
+            'total_orders': total_orders,
+            'total_revenue': total_revenue,
+            'conversion_rate': conversion_rate,
+            'average_order_value': shop_performance.get('average_order_value', 0),
+            'product_performance': product_performance,
+            'recommendations': recommendations
+        }
+    
     def _generate_recommendations(self, shop_performance: Dict, product_performance: List[Dict]) -> List[Dict]:
         """
         Generate recommendations
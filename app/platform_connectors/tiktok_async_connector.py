@@ -0,0 +1,175 @@
+"""
+AdGenius AI Backend - TikTok Async API Connector
+"""
+import asyncio
+import functools
+import logging
+from datetime import datetime
+from typing import Dict, Hashable, Optional, Tuple
+
+from app.platform_connectors.tiktok_connector import TikTokConnector
+from app.utils.async_http import HAS_AIOHTTP, client_session, gather_bounded, query_items, run_sync
+from app.utils.concurrency import run_bounded
+from app.utils.resilience import CircuitOpenError, call_with_retry_async, get_circuit_breaker
+
+logger = logging.getLogger(__name__)
+
+class AsyncTikTokConnector(TikTokConnector):
+    """TikTok API connector that issues independent report calls concurrently on an event loop"""
+    
+    async def _make_request_async(self, session, method: str, endpoint: str, params: Dict = None, data: Dict = None) -> Dict:
+        """
+        Make API request to TikTok on the event loop
+        
+        Args:
+            session (aiohttp.ClientSession): Async session
+            method (str): HTTP method
+            endpoint (str): API endpoint
+            params (Dict, optional): Query parameters
+            data (Dict, optional): Request body
+            
+        Returns:
+            Dict: API response
+        """
+        if not self.initialized:
+            return {'error': 'TikTok API not initialized'}
+        
+        if method not in ('GET', 'POST', 'PUT', 'DELETE'):
+            return {'error': f"Unsupported HTTP method: {method}"}
+        
+        # Build URL
+        url = f"{self.api_base_url}{endpoint}"
+        account_id = self._rate_limit_account(params, data)
+        
+        async def send():
+            # Wait for budget before signing, so the timestamp stays fresh
+            if not await self.rate_limiter.acquire_async('tiktok', self.app_id, account_id):
+                return None, {'error': 'Timed out waiting for TikTok API rate limit budget'}
+            
+            # Build headers
+            headers = self._signed_headers(data)
+            
+            # GET sends query parameters, every other method a JSON body
+            if method == 'GET':
+                request = session.request(method, url, params=query_items(params), headers=headers)
+            else:
+                request = session.request(method, url, json=data, headers=headers)
+            
+            async with request as response:
+                await self.rate_limiter.observe_async('tiktok', self.app_id, account_id, response.headers, response.status)
+                return response.status, self._parse_response(response.status, await response.json(content_type=None))
+        
+        try:
+            return await call_with_retry_async(
+                send,
+                get_circuit_breaker('tiktok', endpoint),
+                self.retry_policy,
+                idempotent=self._is_idempotent(method, endpoint)
+            )
+        except CircuitOpenError as e:
+            logger.warning(f"TikTok API unavailable: {str(e)}")
+            return {'error': f"TikTok API unavailable: {str(e)}"}
+        except Exception as e:
+            logger.error(f"Error making TikTok API request: {str(e)}")
+            return {'error': f"Error making TikTok API request: {str(e)}"}
+    
+    async def get_campaign_analytics_async(self, advertiser_id: str, campaign_id: str, start_date: datetime,
+                                           end_date: datetime, session=None) -> Dict:
+        """
+        Get campaign analytics, requesting every report at once
+        
+        Args:
+            advertiser_id (str): Advertiser ID
+            campaign_id (str): Campaign ID
+            start_date (datetime): Start date
+            end_date (datetime): End date
+            session (aiohttp.ClientSession, optional): Async session. Defaults to a new session.
+        
+        Returns:
+            Dict: Campaign analytics
+        """
+        if session is None:
+            async with client_session('tiktok') as session:
+                return await self.get_campaign_analytics_async(advertiser_id, campaign_id, start_date, end_date, session)
+        
+        try:
+            report_requests = self._campaign_report_requests(advertiser_id, campaign_id, start_date, end_date)
+            
+            responses = await asyncio.gather(*(
+                self._make_request_async(session, 'POST', endpoint, data=data)
+                for endpoint, data in report_requests.values()
+            ))
+            
+            return self._format_campaign_analytics(dict(zip(report_requests, responses)))
+        except Exception as e:
+            logger.error(f"Error getting campaign analytics: {str(e)}")
+            return {'error': f"Error getting campaign analytics: {str(e)}"}
+    
+    def get_campaign_analytics(self, advertiser_id: str, campaign_id: str, start_date: datetime, end_date: datetime) -> Dict:
+        """
+        Get campaign analytics
+        
+        Runs the async fetch to completion; without aiohttp the reports are
+        requested one by one.
+        
+        Args:
+            advertiser_id (str): Advertiser ID
+            campaign_id (str): Campaign ID
+            start_date (datetime): Start date
+            end_date (datetime): End date
+        
+        Returns:
+            Dict: Campaign analytics
+        """
+        if not HAS_AIOHTTP:
+            return super().get_campaign_analytics(advertiser_id, campaign_id, start_date, end_date)
+        
+        return run_sync(self.get_campaign_analytics_async(advertiser_id, campaign_id, start_date, end_date))
+    
+    async def get_campaigns_analytics_async(self, arguments: Dict[Hashable, Dict], max_concurrency: int,
+                                            timeout: Optional[float] = None,
+                                            session=None) -> Tuple[Dict[Hashable, Dict], Dict[Hashable, str]]:
+        """
+        Get analytics of many campaigns on one event loop and one session
+        
+        Args:
+            arguments (Dict[Hashable, Dict]): get_campaign_analytics keyword arguments by key
+            max_concurrency (int): Maximum campaigns fetched at once
+            timeout (Optional[float], optional): Overall deadline in seconds. Defaults to None.
+            session (aiohttp.ClientSession, optional): Async session. Defaults to a new session.
+        
+        Returns:
+            Tuple[Dict[Hashable, Dict], Dict[Hashable, str]]: Campaign analytics and errors, both by key
+        """
+        if session is None:
+            async with client_session('tiktok') as session:
+                return await self.get_campaigns_analytics_async(arguments, max_concurrency, timeout, session)
+        
+        return await gather_bounded({
+            key: functools.partial(self.get_campaign_analytics_async, session=session, **kwargs)
+            for key, kwargs in arguments.items()
+        }, max_concurrency, timeout)
+    
+    def get_campaigns_analytics(self, arguments: Dict[Hashable, Dict], max_concurrency: int,
+                                timeout: Optional[float] = None) -> Tuple[Dict[Hashable, Dict], Dict[Hashable, str]]:
+        """
+        Get analytics of many campaigns
+        
+        Runs every fetch on a single event loop sharing one session; without
+        aiohttp the sync fetches run on a bounded thread pool instead.
+        
+        Args:
+            arguments (Dict[Hashable, Dict]): get_campaign_analytics keyword arguments by key
+            max_concurrency (int): Maximum campaigns fetched at once
+            timeout (Optional[float], optional): Overall deadline in seconds. Defaults to None.
+        
+        Returns:
+            Tuple[Dict[Hashable, Dict], Dict[Hashable, str]]: Campaign analytics and errors, both by key
+        """
+        if not HAS_AIOHTTP:
+            return run_bounded({
+                key: functools.partial(TikTokConnector.get_campaign_analytics, self, **kwargs)
+                for key, kwargs in arguments.items()
+            }, max_concurrency, timeout)
+        
+        return run_sync(self.get_campaigns_analytics_async(arguments, max_concurrency, timeout))
@@ -8,13 +8,16 @@ import time
 import hmac
 import hashlib
 import base64
+import functools
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union
-
-import requests
+from typing import Dict, List, Optional, Tuple, Union
 
 from app.models.campaign import Campaign
+from app.utils.concurrency import run_bounded
 from app.utils.helpers import generate_id
+from app.utils.http_session import get_session, get_timeout
+from app.utils.rate_limiter import get_rate_limiter
+from app.utils.resilience import CircuitOpenError, RetryPolicy, call_with_retry, get_circuit_breaker
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +30,17 @@ class TikTokConnector:
         self.app_secret = os.getenv('TIKTOK_APP_SECRET')
         self.api_base_url = os.getenv('TIKTOK_API_BASE_URL', 'https://business-api.tiktok.com/open_api/v1.3')
         self.initialized = False
+        
+        # Keep-alive connections shared by every connector instance
+        self.session = get_session('tiktok')
+        self.timeout = get_timeout('tiktok')
+        
+        # Call budget per app and advertiser, shared across workers
+        self.rate_limiter = get_rate_limiter()
+        self.retry_policy = RetryPolicy.for_platform('tiktok')
+        
+        # Report requests in flight at once per campaign analytics fetch
+        self.report_concurrency = int(os.getenv('TIKTOK_REPORT_CONCURRENCY', 5))
     
     def initialize(self, access_token: str):
         """
@@ -42,26 +56,16 @@ class TikTokConnector:
             logger.error(f"Failed to initialize TikTok API: {str(e)}")
             self.initialized = False
     
-    def _make_request(self, method: str, endpoint: str, params: Dict = None, data: Dict = None) -> Dict:
+    def _signed_headers(self, data: Dict = None) -> Dict:
         """
-        Make API request to TikTok
+        Build signed request headers
         
         Args:
-            method (str): HTTP method
-            endpoint (str): API endpoint
-            params (Dict, optional): Query parameters
             data (Dict, optional): Request body
             
         Returns:
-            Dict: API response
+            Dict: Headers with access token, timestamp and signature
         """
-        if not self.initialized:
-            return {'error': 'TikTok API not initialized'}
-        
-        # Build URL
-        url = f"{self.api_base_url}{endpoint}"
-        
-        # Build headers
         headers = {
             'Access-Token': self.access_token,
             'Content-Type': 'application/json'
@@ -81,29 +85,114 @@ class TikTokConnector:
         
         headers['Signature'] = signature
         
-        try:
+        return headers
+    
+    def _rate_limit_account(self, params: Dict = None, data: Dict = None) -> Optional[str]:
+        """
+        Get the advertiser a request counts against
+        
+        Args:
+            params (Dict, optional): Query parameters
+            data (Dict, optional): Request body
+            
+        Returns:
+            Optional[str]: Advertiser ID, or None for app-level requests
+        """
+        return (params or {}).get('advertiser_id') or (data or {}).get('advertiser_id')
+    
+    def _parse_response(self, status_code: int, response_data: Dict) -> Dict:
+        """
+        Normalize an API response
+        
+        Args:
+            status_code (int): HTTP status code
+            response_data (Dict): Decoded response body
+            
+        Returns:
+            Dict: Response data, or an error
+        """
+        # Check for errors
+        if status_code != 200 or response_data.get('code') != 0:
+            error_message = response_data.get('message', 'Unknown error')
+            logger.error(f"TikTok API error: {error_message}")
+            return {'error': f"TikTok API error: {error_message}"}
+        
+        return response_data.get('data', {})
+    
+    def _is_idempotent(self, method: str, endpoint: str) -> bool:
+        """
+        Check whether a request only reads and may be retried
+        
+        Args:
+            method (str): HTTP method
+            endpoint (str): API endpoint
+            
+        Returns:
+            bool: True for GET requests and read endpoints such as /report/integrated/get/
+        """
+        return method == 'GET' or endpoint.endswith('/get/')
+    
+    def _make_request(self, method: str, endpoint: str, params: Dict = None, data: Dict = None) -> Dict:
+        """
+        Make API request to TikTok
+        
+        Reads are retried with jittered exponential backoff on timeouts, 429s
+        and 5xx responses; every request goes through the endpoint's circuit
+        breaker.
+        
+        Args:
+            method (str): HTTP method
+            endpoint (str): API endpoint
+            params (Dict, optional): Query parameters
+            data (Dict, optional): Request body
+            
+        Returns:
+            Dict: API response
+        """
+        if not self.initialized:
+            return {'error': 'TikTok API not initialized'}
+        
+        if method not in ('GET', 'POST', 'PUT', 'DELETE'):
+            return {'error': f"Unsupported HTTP method: {method}"}
+        
+        # Build URL
+        url = f"{self.api_base_url}{endpoint}"
+        account_id = self._rate_limit_account(params, data)
+        
+        def send():
+            # Wait for budget before signing, so the timestamp stays fresh
+            if not self.rate_limiter.acquire('tiktok', self.app_id, account_id):
+                return None, {'error': 'Timed out waiting for TikTok API rate limit budget'}
+            
+            # Build headers
+            headers = self._signed_headers(data)
+            
             # Make request
             if method == 'GET':
-                response = requests.get(url, params=params, headers=headers)
+                response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
             elif method == 'POST':
-                response = requests.post(url, json=data, headers=headers)
+                response = self.session.post(url, json=data, headers=headers, timeout=self.timeout)
             elif method == 'PUT':
-                response = requests.put(url, json=data, headers=headers)
-            elif method == 'DELETE':
-                response = requests.delete(url, json=data, headers=headers)
+                response = self.session.put(url, json=data, headers=headers, timeout=self.timeout)
             else:
-                return {'error': f"Unsupported HTTP method: {method}"}
-            
-            # Parse response
-            response_data = response.json()
+                response = self.session.delete(url, json=data, headers=headers, timeout=self.timeout)
             
-            # Check for errors
-            if response.status_code != 200 or response_data.get('code') != 0:
-                error_message = response_data.get('message', 'Unknown error')
-                logger.error(f"TikTok API error: {error_message}")
-                return {'error': f"TikTok API error: {error_message}"}
+            # Adapt the budget to the usage the API reports
+            self.rate_limiter.observe('tiktok', self.app_id, account_id, response.headers, response.status_code)
             
-            return response_data.get('data', {})
+            # Parse response
+            return response.status_code, self._parse_response(response.status_code, response.json())
+        
+        try:
+            return call_with_retry(
+                send,
+                get_circuit_breaker('tiktok', endpoint),
+                self.retry_policy,
+                idempotent=self._is_idempotent(method, endpoint)
+            )
+        except CircuitOpenError as e:
+            logger.warning(f"TikTok API unavailable: {str(e)}")
+            return {'error': f"TikTok API unavailable: {str(e)}"}
         except Exception as e:
             logger.error(f"Error making TikTok API request: {str(e)}")
             return {'error': f"Error making TikTok API request: {str(e)}"}
@@ -584,12 +673,42 @@ class TikTokConnector:
             Dict: Campaign analytics
         """
         try:
-            # Format dates
-            start_date_str = start_date.strftime('%Y-%m-%d')
-            end_date_str = end_date.strftime('%Y-%m-%d')
+            report_requests = self._campaign_report_requests(advertiser_id, campaign_id, start_date, end_date)
             
-            # Get campaign insights
-            data = {
+            # The reports are independent, so request them all at once
+            tasks = {
+                report: functools.partial(self._make_request, 'POST', endpoint, data=data)
+                for report, (endpoint, data) in report_requests.items()
+            }
+            responses, errors = run_bounded(tasks, max_workers=self.report_concurrency)
+            
+            for report, error in errors.items():
+                responses[report] = {'error': error}
+            
+            return self._format_campaign_analytics(responses)
+        except Exception as e:
+            logger.error(f"Error getting campaign analytics: {str(e)}")
+            return {'error': f"Error getting campaign analytics: {str(e)}"}
+    
+    def _campaign_report_requests(self, advertiser_id: str, campaign_id: str, start_date: datetime, end_date: datetime) -> Dict[str, Tuple[str, Dict]]:
+        """
+        Build the report requests behind campaign analytics
+        
+        Args:
+            advertiser_id (str): Advertiser ID
+            campaign_id (str): Campaign ID
+            start_date (datetime): Start date
+            end_date (datetime): End date
+            
+        Returns:
+            Dict[str, Tuple[str, Dict]]: Endpoint and request body by report, campaign totals first
+        """
+        # Format dates
+        start_date_str = start_date.strftime('%Y-%m-%d')
+        end_date_str = end_date.strftime('%Y-%m-%d')
+        
+        return {
+            'campaign': ('/report/integrated/get/', {
                 'advertiser_id': advertiser_id,
                 'campaign_ids': [campaign_id],
                 'start_date': start_date_str,
@@ -618,21 +737,8 @@ class TikTokConnector:
                 ],
                 'data_level': 'AUCTION_CAMPAIGN',
                 'report_type': 'BASIC'
-            }
-            
-            response = self._make_request('POST', '/report/integrated/get/', data=data)
-            
-            if 'error' in response:
-                return response
-            
-            # Process insights
-            if not response.get('list'):
-                return {'error': 'No campaign data found'}
-            
-            campaign_data = response.get('list')[0]
-            
-            # Get daily breakdown
-            daily_data = {
+            }),
+            'daily': ('/report/integrated/get/', {
                 'advertiser_id': advertiser_id,
                 'campaign_ids': [campaign_id],
                 'start_date': start_date_str,
@@ -655,32 +761,8 @@ class TikTokConnector:
                 'data_level': 'AUCTION_CAMPAIGN',
                 'report_type': 'BASIC',
                 'dimensions': ['stat_time_day']
-            }
-            
-            daily_response = self._make_request('POST', '/report/integrated/get/', data=daily_data)
-            
-            daily_metrics = []
-            
-            if 'error' not in daily_response:
-                for day_data in daily_response.get('list', []):
-                    # Parse date
-                    date = datetime.strptime(day_data.get('stat_time_day'), '%Y-%m-%d')
-                    
-                    daily_metrics.append({
-                        'date': date.isoformat(),
-                        'impressions': int(day_data.get('impressions', 0)),
-                        'clicks': int(day_data.get('clicks', 0)),
-                        'conversions': int(day_data.get('conversion', 0)),
-                        'spend': float(day_data.get('cost', 0)) / 100,  # Convert from cents
-                        'ctr': float(day_data.get('ctr', 0)) * 100,
-                        'cpc': float(day_data.get('cpc', 0)) / 100,  # Convert from cents
-                        'cpm': float(day_data.get('cpm', 0)) / 100,  # Convert from cents
-                        'reach': int(day_data.get('reach', 0)),
-                        'frequency': float(day_data.get('frequency', 0))
-                    })
-            
-            # Get ad group insights
-            ad_group_data = {
+            }),
+            'ad_groups': ('/report/integrated/get/', {
                 'advertiser_id': advertiser_id,
                 'campaign_ids': [campaign_id],
                 'start_date': start_date_str,
@@ -700,30 +782,8 @@ class TikTokConnector:
                 ],
                 'data_level': 'AUCTION_ADGROUP',
                 'report_type': 'BASIC'
-            }
-            
-            ad_group_response = self._make_request('POST', '/report/integrated/get/', data=ad_group_data)
-            
-            ad_group_insights = []
-            
-            if 'error' not in ad_group_response:
-                for ad_group in ad_group_response.get('list', []):
-                    ad_group_insights.append({
-                        'id': ad_group.get('adgroup_id'),
-                        'name': ad_group.get('adgroup_name'),
-                        'impressions': int(ad_group.get('impressions', 0)),
-                        'clicks': int(ad_group.get('clicks', 0)),
-                        'conversions': int(ad_group.get('conversion', 0)),
-                        'spend': float(ad_group.get('cost', 0)) / 100,  # Convert from cents
-                        'ctr': float(ad_group.get('ctr', 0)) * 100,
-                        'cpc': float(ad_group.get('cpc', 0)) / 100,  # Convert from cents
-                        'cpm': float(ad_group.get('cpm', 0)) / 100,  # Convert from cents
-                        'conversion_rate': float(ad_group.get('conversion_rate', 0)) * 100,
-                        'cost_per_conversion': float(ad_group.get('cost_per_conversion', 0)) / 100  # Convert from cents
-                    })
-            
-            # Get ad insights
-            ad_data = {
+            }),
+            'ads': ('/report/integrated/get/', {
                 'advertiser_id': advertiser_id,
                 'campaign_ids': [campaign_id],
                 'start_date': start_date_str,
@@ -750,37 +810,8 @@ class TikTokConnector:
                 ],
                 'data_level': 'AUCTION_AD',
                 'report_type': 'BASIC'
-            }
-            
-            ad_response = self._make_request('POST', '/report/integrated/get/', data=ad_data)
-            
-            creative_performance = []
-            
-            if 'error' not in ad_response:
-                for ad in ad_response.get('list', []):
-                    creative_performance.append({
-                        'creative_id': ad.get('ad_id'),
-                        'name': ad.get('ad_name'),
-                        'impressions': int(ad.get('impressions', 0)),
-                        'clicks': int(ad.get('clicks', 0)),
-                        'conversions': int(ad.get('conversion', 0)),
-                        'spend': float(ad.get('cost', 0)) / 100,  # Convert from cents
-                        'ctr': float(ad.get('ctr', 0)) * 100,
-                        'cpc': float(ad.get('cpc', 0)) / 100,  # Convert from cents
-                        'cpm': float(ad.get('cpm', 0)) / 100,  # Convert from cents
-                        'conversion_rate': float(ad.get('conversion_rate', 0)) * 100,
-                        'cost_per_conversion': float(ad.get('cost_per_conversion', 0)) / 100,  # Convert from cents
-                        'video_play_actions': int(ad.get('video_play_actions', 0)),
-                        'video_watched_2s': int(ad.get('video_watched_2s', 0)),
-                        'video_watched_6s': int(ad.get('video_watched_6s', 0)),
-                        'video_views_p25': int(ad.get('video_views_p25', 0)),
-                        'video_views_p50': int(ad.get('video_views_p50', 0)),
-                        'video_views_p75': int(ad.get('video_views_p75', 0)),
-                        'video_views_p100': int(ad.get('video_views_p100', 0))
-                    })
-            
-            # Get audience insights
-            audience_data = {
+            }),
+            'audience': ('/report/audience/get/', {
                 'advertiser_id': advertiser_id,
                 'campaign_ids': [campaign_id],
                 'start_date': start_date_str,
@@ -796,81 +827,165 @@ class TikTokConnector:
                 'data_level': 'AUCTION_CAMPAIGN',
                 'report_type': 'AUDIENCE',
                 'dimensions': ['gender', 'age']
-            }
-            
-            audience_response = self._make_request('POST', '/report/audience/get/', data=audience_data)
-            
-            audience_insights = {
-                'age_gender': {},
-                'locations': {},
-                'interests': {},
-                'behaviors': {}
-            }
-            
-            if 'error' not in audience_response:
-                for audience in audience_response.get('list', []):
-                    gender = audience.get('gender', 'unknown')
-                    age = audience.get('age', 'unknown')
-                    key = f"{age} - {gender}"
-                    
-                    audience_insights['age_gender'][key] = {
-                        'impressions': int(audience.get('impressions', 0)),
-                        'clicks': int(audience.get('clicks', 0)),
-                        'conversions': int(audience.get('conversion', 0)),
-                        'spend': float(audience.get('cost', 0)) / 100  # Convert from cents
-                    }
-            
-            # Calculate metrics
-            total_impressions = int(campaign_data.get('impressions', 0))
-            total_clicks = int(campaign_data.get('clicks', 0))
-            total_conversions = int(campaign_data.get('conversion', 0))
-            total_spend = float(campaign_data.get('cost', 0)) / 100  # Convert from cents
-            
-            average_ctr = float(campaign_data.get('ctr', 0)) * 100
-            average_cpc = float(campaign_data.get('cpc', 0)) / 100  # Convert from cents
-            average_cpm = float(campaign_data.get('cpm', 0)) / 100  # Convert from cents
-            average_conversion_rate = float(campaign_data.get('conversion_rate', 0)) * 100
-            average_cost_per_conversion = float(campaign_data.get('cost_per_conversion', 0)) / 100  # Convert from cents
-            
-            # Generate recommendations
-            recommendations = self._generate_recommendations(
-                total_impressions=total_impressions,
-                total_clicks=total_clicks,
-                total_conversions=total_conversions,
-                total_spend=total_spend,
-                average_ctr=average_ctr,
-                average_cpc=average_cpc,
-                average_conversion_rate=average_conversion_rate,
-                creative_performance=creative_performance
-            )
+            })
+        }
+    
+    def _format_campaign_analytics(self, responses: Dict[str, Dict]) -> Dict:
+        """
+        Normalize campaign report responses into campaign analytics
+        
+        Args:
+            responses (Dict[str, Dict]): Report responses by report name
             
-            return {
-                'total_impressions': total_impressions,
-                'total_clicks': total_clicks,
-                'total_conversions': total_conversions,
-                'total_spend': total_spend,
-                'average_ctr': average_ctr,
-                'average_cpc': average_cpc,
-                'average_cpm': average_cpm,
-                'average_conversion_rate': average_conversion_rate,
-                'average_cost_per_conversion': average_cost_per_conversion,
-                'daily_metrics': daily_metrics,
-                'audience_insights': audience_insights,
-                'creative_performance': creative_performance,
-                'recommendations': recommendations,
-                'video_metrics': {
-                    'video_play_actions': int(campaign_data.get('video_play_actions', 0)),
-                    'video_watched_2s': int(campaign_data.get('video_watched_2s', 0)),
-                    'video_watched_6s': int(campaign_data.get('video_watched_6s', 0)),
-                    'video_views_p25': int(campaign_data.get('video_views_p25', 0)),
-                    'video_views_p50': int(campaign_data.get('video_views_p50', 0)),
-                    'video_views_p75': int(campaign_data.get('video_views_p75', 0)),
-                    'video_views_p100': int(campaign_data.get('video_views_p100', 0))
+        Returns:
+            Dict: Campaign analytics
+        """
+        response = responses.get('campaign', {})
+        
+        if 'error' in response:
+            return response
+        
+        # Process insights
+        if not response.get('list'):
+            return {'error': 'No campaign data found'}
+        
+        campaign_data = response.get('list')[0]
+        
+        daily_response = responses.get('daily', {})
+        daily_metrics = []
+        
+        if 'error' not in daily_response:
+            for day_data in daily_response.get('list', []):
+                # Parse date
+                date = datetime.strptime(day_data.get('stat_time_day'), '%Y-%m-%d')
+                
+                daily_metrics.append({
+                    'date': date.isoformat(),
+                    'impressions': int(day_data.get('impressions', 0)),
+                    'clicks': int(day_data.get('clicks', 0)),
+                    'conversions': int(day_data.get('conversion', 0)),
+                    'spend': float(day_data.get('cost', 0)) / 100,  # Convert from cents
+                    'ctr': float(day_data.get('ctr', 0)) * 100,
+                    'cpc': float(day_data.get('cpc', 0)) / 100,  # Convert from cents
+                    'cpm': float(day_data.get('cpm', 0)) / 100,  # Convert from cents
+                    'reach': int(day_data.get('reach', 0)),
+                    'frequency': float(day_data.get('frequency', 0))
+                })
+        
+        ad_group_response = responses.get('ad_groups', {})
+        ad_group_insights = []
+        
+        if 'error' not in ad_group_response:
+            for ad_group in ad_group_response.get('list', []):
+                ad_group_insights.append({
+                    'id': ad_group.get('adgroup_id'),
+                    'name': ad_group.get('adgroup_name'),
+                    'impressions': int(ad_group.get('impressions', 0)),
+                    'clicks': int(ad_group.get('clicks', 0)),
+                    'conversions': int(ad_group.get('conversion', 0)),
+                    'spend': float(ad_group.get('cost', 0)) / 100,  # Convert from cents
+                    'ctr': float(ad_group.get('ctr', 0)) * 100,
+                    'cpc': float(ad_group.get('cpc', 0)) / 100,  # Convert from cents
+                    'cpm': float(ad_group.get('cpm', 0)) / 100,  # Convert from cents
+                    'conversion_rate': float(ad_group.get('conversion_rate', 0)) * 100,
+                    'cost_per_conversion': float(ad_group.get('cost_per_conversion', 0)) / 100  # Convert from cents
+                })
+        
+        ad_response = responses.get('ads', {})
+        creative_performance = []
+        
+        if 'error' not in ad_response:
+            for ad in ad_response.get('list', []):
+                creative_performance.append({
+                    'creative_id': ad.get('ad_id'),
+                    'name': ad.get('ad_name'),
+                    'impressions': int(ad.get('impressions', 0)),
+                    'clicks': int(ad.get('clicks', 0)),
+                    'conversions': int(ad.get('conversion', 0)),
+                    'spend': float(ad.get('cost', 0)) / 100,  # Convert from cents
+                    'ctr': float(ad.get('ctr', 0)) * 100,
+                    'cpc': float(ad.get('cpc', 0)) / 100,  # Convert from cents
+                    'cpm': float(ad.get('cpm', 0)) / 100,  # Convert from cents
+                    'conversion_rate': float(ad.get('conversion_rate', 0)) * 100,
+                    'cost_per_conversion': float(ad.get('cost_per_conversion', 0)) / 100,  # Convert from cents
+                    'video_play_actions': int(ad.get('video_play_actions', 0)),
+                    'video_watched_2s': int(ad.get('video_watched_2s', 0)),
+                    'video_watched_6s': int(ad.get('video_watched_6s', 0)),
+                    'video_views_p25': int(ad.get('video_views_p25', 0)),
+                    'video_views_p50': int(ad.get('video_views_p50', 0)),
+                    'video_views_p75': int(ad.get('video_views_p75', 0)),
+                    'video_views_p100': int(ad.get('video_views_p100', 0))
+                })
+        
+        audience_response = responses.get('audience', {})
+        audience_insights = {
+            'age_gender': {},
+            'locations': {},
+            'interests': {},
+            'behaviors': {}
+        }
+        
+        if 'error' not in audience_response:
+            for audience in audience_response.get('list', []):
+                gender = audience.get('gender', 'unknown')
+                age = audience.get('age', 'unknown')
+                key = f"{age} - {gender}"
+                
+                audience_insights['age_gender'][key] = {
+                    'impressions': int(audience.get('impressions', 0)),
+                    'clicks': int(audience.get('clicks', 0)),
+                    'conversions': int(audience.get('conversion', 0)),
+                    'spend': float(audience.get('cost', 0)) / 100  # Convert from cents
                 }
+        
+        # Calculate metrics
+        total_impressions = int(campaign_data.get('impressions', 0))
+        total_clicks = int(campaign_data.get('clicks', 0))
+        total_conversions = int(campaign_data.get('conversion', 0))
+        total_spend = float(campaign_data.get('cost', 0)) / 100  # Convert from cents
+        
+        average_ctr = float(campaign_data.get('ctr', 0)) * 100
+        average_cpc = float(campaign_data.get('cpc', 0)) / 100  # Convert from cents
+        average_cpm = float(campaign_data.get('cpm', 0)) / 100  # Convert from cents
+        average_conversion_rate = float(campaign_data.get('conversion_rate', 0)) * 100
+        average_cost_per_conversion = float(campaign_data.get('cost_per_conversion', 0)) / 100  # Convert from cents
+        
+        # Generate recommendations
+        recommendations = self._generate_recommendations(
+            total_impressions=total_impressions,
+            total_clicks=total_clicks,
+            total_conversions=total_conversions,
+            total_spend=total_spend,
+            average_ctr=average_ctr,
+            average_cpc=average_cpc,
+            average_conversion_rate=average_conversion_rate,
+            creative_performance=creative_performance
+        )
+        
+        return {
+            'total_impressions': total_impressions,
+            'total_clicks': total_clicks,
+            'total_conversions': total_conversions,
+            'total_spend': total_spend,
+            'average_ctr': average_ctr,
+            'average_cpc': average_cpc,
+            'average_cpm': average_cpm,
+            'average_conversion_rate': average_conversion_rate,
+            'average_cost_per_conversion': average_cost_per_conversion,
+            'daily_metrics': daily_metrics,
+            'audience_insights': audience_insights,
+            'creative_performance': creative_performance,
+            'recommendations': recommendations,
+            'video_metrics': {
+                'video_play_actions': int(campaign_data.get('video_play_actions', 0)),
+                'video_watched_2s': int(campaign_data.get('video_watched_2s', 0)),
+                'video_watched_6s': int(campaign_data.get('video_watched_6s', 0)),
+                'video_views_p25': int(campaign_data.get('video_views_p25', 0)),
+                'video_views_p50': int(campaign_data.get('video_views_p50', 0)),
+                'video_views_p75': int(campaign_data.get('video_views_p75', 0)),
+                'video_views_p100': int(campaign_data.get('video_views_p100', 0))
             }
-        except Exception as e:
-            logger.error(f"Error getting campaign analytics: {str(e)}")
-            return {'error': f"Error getting campaign analytics: {str(e)}"}
+        }
     
     def _map_objective(self, objective: str) -> str:
         """
@@ -1103,7 +1218,7 @@ class TikTokConnector:
         """
         try:
             # Download image
-            response = requests.get(image_url)
+            response = self.session.get(image_url, timeout=self.timeout)
             
             if response.status_code != 200:
                 return {'error': f"Failed to download image: {response.status_code}"}
@@ -1119,6 +1234,10 @@ class TikTokConnector:
             # Build URL
             url = f"{self.api_base_url}/file/image/ad/upload/"
             
+            # Wait for the advertiser's budget
+            if not self.rate_limiter.acquire('tiktok', self.app_id, advertiser_id):
+                return {'error': 'Timed out waiting for TikTok API rate limit budget'}
+            
             # Build headers
             headers = {
                 'Access-Token': self.access_token
@@ -1139,13 +1258,16 @@ class TikTokConnector:
             headers['Signature'] = signature
             
             # Make request
-            response = requests.post(
+            response = self.session.post(
                 url,
                 files=files,
                 data={'advertiser_id': advertiser_id},
-                headers=headers
+                headers=headers,
+                timeout=self.timeout
             )
             
+            self.rate_limiter.observe('tiktok', self.app_id, advertiser_id, response.headers, response.status_code)
+            
             # Parse response
             response_data = response.json()
             
@@ -1174,7 +1296,7 @@ class TikTokConnector:
         """
         try:
             # Download video
-            response = requests.get(video_url)
+            response = self.session.get(video_url, timeout=self.timeout)
             
             if response.status_code != 200:
                 return {'error': f"Failed to download video: {response.status_code}"}
@@ -1190,6 +1312,10 @@ class TikTokConnector:
             # Build URL
             url = f"{self.api_base_url}/file/video/ad/upload/"
             
+            # Wait for the advertiser's budget
+            if not self.rate_limiter.acquire('tiktok', self.app_id, advertiser_id):
+                return {'error': 'Timed out waiting for TikTok API rate limit budget'}
+            
             # Build headers
             headers = {
                 'Access-Token': self.access_token
@@ -1210,13 +1336,16 @@ class TikTokConnector:
             headers['Signature'] = signature
             
             # Make request
-            response = requests.post(
+            response = self.session.post(
                 url,
                 files=files,
                 data={'advertiser_id': advertiser_id},
-                headers=headers
+                headers=headers,
+                timeout=self.timeout
             )
             
+            self.rate_limiter.observe('tiktok', self.app_id, advertiser_id, response.headers, response.status_code)
+            
             # Parse response
             response_data = response.json()
             
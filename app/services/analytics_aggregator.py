@@ -0,0 +1,222 @@
+"""
+AdGenius AI Backend - Single-pass Analytics Aggregator
+"""
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+
+from app.models.analytics import CampaignAnalytics
+from app.services.campaign_lookup import CampaignIdentityMap, get_identity_map
+from app.utils.metrics import apply_derived_metrics, summarize
+
+class AnalyticsAggregator:
+    """Folds campaign analytics into every breakdown while reading them once"""
+    
+    def __init__(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None):
+        """
+        Initialize analytics aggregator
+        
+        Args:
+            start_date (Optional[datetime], optional): Start of the daily series. Defaults to None.
+            end_date (Optional[datetime], optional): End of the daily series. Defaults to None.
+        """
+        self.start_date = start_date
+        self.end_date = end_date
+        self.count = 0
+        
+        # Accumulators hold [impressions, clicks, conversions, spend, revenue]
+        self.totals = [0, 0, 0, 0.0, 0.0]
+        self.daily = {}
+        self.platforms = {}
+        self.campaigns = {}
+        self.recommendations = []
+    
+    def add(self, analytics: CampaignAnalytics):
+        """
+        Add one analytics document to every accumulator
+        
+        Args:
+            analytics (CampaignAnalytics): Campaign analytics
+        """
+        values = (
+            analytics.impressions or 0,
+            analytics.clicks or 0,
+            analytics.conversions or 0,
+            analytics.spent or 0.0,
+            analytics.revenue or 0.0
+        )
+        day = analytics.date.toordinal() if analytics.date else None
+        
+        for accumulator in (
+            self.totals,
+            _accumulator(self.daily, day),
+            _accumulator(self.platforms, analytics.platform),
+            _accumulator(self.campaigns, analytics.campaign_id)
+        ):
+            accumulator[0] += values[0]
+            accumulator[1] += values[1]
+            accumulator[2] += values[2]
+            accumulator[3] += values[3]
+            accumulator[4] += values[4]
+        
+        for description in analytics.ai_recommendations or []:
+            self.recommendations.append({
+                'campaign_id': analytics.campaign_id,
+                'description': description,
+                'date': analytics.date.date().isoformat() if analytics.date else None
+            })
+        
+        self.count += 1
+    
+    def consume(self, analytics_list: Iterable[CampaignAnalytics]) -> 'AnalyticsAggregator':
+        """
+        Add every analytics document from an iterable, reading it once
+        
+        Args:
+            analytics_list (Iterable[CampaignAnalytics]): Analytics documents or cursor
+        
+        Returns:
+            AnalyticsAggregator: The aggregator
+        """
+        for analytics in analytics_list:
+            self.add(analytics)
+        
+        return self
+    
+    def summary(self) -> Dict:
+        """
+        Get totals and averages
+        
+        Returns:
+            Dict: Summary metrics
+        """
+        return summarize(_metrics(self.totals))
+    
+    def daily_metrics(self) -> List[Dict]:
+        """
+        Get daily metrics, with empty days in the range filled in
+        
+        Returns:
+            List[Dict]: Daily metrics
+        """
+        # Days are accumulated by ordinal and formatted once per day
+        if self.start_date and self.end_date:
+            days = range(self.start_date.toordinal(), self.end_date.toordinal() + 1)
+        else:
+            days = sorted(day for day in self.daily if day is not None)
+        
+        empty = [0, 0, 0, 0.0, 0.0]
+        daily_metrics = [
+            dict({'date': date.fromordinal(day).isoformat()}, **_metrics(self.daily.get(day, empty)))
+            for day in days
+        ]
+        
+        return apply_derived_metrics(daily_metrics)
+    
+    def platform_breakdown(self) -> Dict:
+        """
+        Get platform breakdown
+        
+        Returns:
+            Dict: Metrics by platform
+        """
+        platform_breakdown = {
+            platform: _metrics(accumulator)
+            for platform, accumulator in self.platforms.items()
+        }
+        apply_derived_metrics(list(platform_breakdown.values()))
+        
+        return platform_breakdown
+    
+    def campaign_breakdown(self, campaign_names: Optional[Dict[str, str]] = None,
+                           identity_map: Optional[CampaignIdentityMap] = None) -> List[Dict]:
+        """
+        Get campaign breakdown
+        
+        Args:
+            campaign_names (Optional[Dict[str, str]], optional): Campaign names by ID.
+                Looked up through the identity map when not provided. Defaults to None.
+            identity_map (Optional[CampaignIdentityMap], optional): Campaign identity map.
+                Defaults to the request's map.
+        
+        Returns:
+            List[Dict]: Metrics by campaign
+        """
+        if campaign_names is None:
+            campaign_names = self.campaign_names(identity_map)
+        
+        campaign_breakdown = [
+            dict(
+                {'campaign_id': campaign_id, 'campaign_name': campaign_names.get(campaign_id)},
+                **_metrics(accumulator)
+            )
+            for campaign_id, accumulator in self.campaigns.items()
+        ]
+        
+        return apply_derived_metrics(campaign_breakdown)
+    
+    def campaign_names(self, identity_map: Optional[CampaignIdentityMap] = None) -> Dict[str, str]:
+        """
+        Look up the names of every aggregated campaign with at most one query
+        
+        Args:
+            identity_map (Optional[CampaignIdentityMap], optional): Campaign identity map.
+                Defaults to the request's map.
+        
+        Returns:
+            Dict[str, str]: Campaign names by ID
+        """
+        return (identity_map or get_identity_map()).names(self.campaigns)
+    
+    def finalize(self, campaign_names: Optional[Dict[str, str]] = None) -> Dict:
+        """
+        Finalize every accumulator
+        
+        Args:
+            campaign_names (Optional[Dict[str, str]], optional): Campaign names by ID. Defaults to None.
+        
+        Returns:
+            Dict: Summary, daily metrics, breakdowns and recommendations
+        """
+        return {
+            'summary': self.summary(),
+            'daily_metrics': self.daily_metrics(),
+            'platform_breakdown': self.platform_breakdown(),
+            'campaign_breakdown': self.campaign_breakdown(campaign_names),
+            'recommendations': self.recommendations
+        }
+
+def _accumulator(accumulators: Dict, key) -> List:
+    """
+    Get or create the accumulator for a key
+    
+    Args:
+        accumulators (Dict): Accumulators by key
+        key: Key
+    
+    Returns:
+        List: Accumulator
+    """
+    accumulator = accumulators.get(key)
+    
+    if accumulator is None:
+        accumulator = accumulators[key] = [0, 0, 0, 0.0, 0.0]
+    
+    return accumulator
+
+def _metrics(accumulator: List) -> Dict:
+    """
+    Convert an accumulator into a metrics dictionary
+    
+    Args:
+        accumulator (List): Accumulator
+    
+    Returns:
+        Dict: Impressions, clicks, conversions, spend and revenue
+    """
+    return {
+        'impressions': accumulator[0],
+        'clicks': accumulator[1],
+        'conversions': accumulator[2],
+        'spend': accumulator[3],
+        'revenue': accumulator[4]
+    }
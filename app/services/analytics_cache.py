@@ -0,0 +1,342 @@
+"""
+AdGenius AI Backend - Analytics Result Cache
+"""
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+logger = logging.getLogger(__name__)
+
+class LocalCacheBackend:
+    """In-process cache backend used when Redis is unavailable"""
+    
+    def __init__(self):
+        """Initialize local cache backend"""
+        self.values = {}
+        self.generations = {}
+        self.lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Get a value unless it has expired"""
+        with self.lock:
+            entry = self.values.get(key)
+            
+            if entry is None:
+                return None
+            
+            if entry[0] < time.monotonic():
+                del self.values[key]
+                return None
+            
+            return entry[1]
+    
+    def set(self, key: str, value: str, ttl: int):
+        """Set a value with a time-to-live in seconds"""
+        with self.lock:
+            self.values[key] = (time.monotonic() + ttl, value)
+    
+    def generation(self, user_id: str) -> int:
+        """Get the cache generation of a user"""
+        return self.generations.get(user_id, 0)
+    
+    def bump(self, user_id: str) -> int:
+        """Start a new cache generation for a user, dropping their entries"""
+        with self.lock:
+            self.generations[user_id] = self.generations.get(user_id, 0) + 1
+            prefix = f'{user_id}:'
+            
+            for key in [key for key in self.values if key.startswith(prefix)]:
+                del self.values[key]
+            
+            return self.generations[user_id]
+
+class RedisCacheBackend:
+    """Redis cache backend shared by every worker"""
+    
+    def __init__(self, client, namespace: str = 'analytics'):
+        """Initialize Redis cache backend"""
+        self.client = client
+        self.namespace = namespace
+    
+    def get(self, key: str) -> Optional[str]:
+        """Get a value"""
+        value = self.client.get(f'{self.namespace}:{key}')
+        
+        return value.decode('utf-8') if isinstance(value, bytes) else value
+    
+    def set(self, key: str, value: str, ttl: int):
+        """Set a value with a time-to-live in seconds"""
+        self.client.set(f'{self.namespace}:{key}', value, ex=ttl)
+    
+    def generation(self, user_id: str) -> int:
+        """Get the cache generation of a user"""
+        return int(self.client.get(f'{self.namespace}:generation:{user_id}') or 0)
+    
+    def bump(self, user_id: str) -> int:
+        """Start a new cache generation for a user; old entries expire on their own"""
+        return int(self.client.incr(f'{self.namespace}:generation:{user_id}'))
+
+class AnalyticsCache:
+    """Caches analytics results per user, invalidated whenever that user's analytics change"""
+    
+    def __init__(self, redis_url: Optional[str] = None, ttl: int = 300, local_ttl: Optional[int] = None):
+        """
+        Initialize analytics cache
+        
+        Args:
+            redis_url (Optional[str], optional): Redis URL; the in-process backend is used
+                when it is missing or unreachable. Defaults to None.
+            ttl (int, optional): Time-to-live of cached results in seconds. Defaults to 300.
+            local_ttl (Optional[int], optional): Time-to-live on the in-process backend, where
+                invalidations only reach this worker. Defaults to ttl.
+        """
+        self.backend = self._connect(redis_url)
+        self.ttl = ttl
+        
+        if isinstance(self.backend, LocalCacheBackend):
+            if local_ttl is not None:
+                self.ttl = min(ttl, local_ttl)
+            
+            logger.warning(
+                f"Analytics cache is using the in-process backend; other workers may serve results "
+                f"up to {self.ttl}s stale after a write (set REDIS_URL to share invalidations)"
+            )
+        self.lock = threading.Lock()
+        self.counters = {}
+        
+        # Users whose invalidation failed; their results bypass the cache until it succeeds
+        self.pending_invalidations = set()
+    
+    def _connect(self, redis_url: Optional[str]):
+        """
+        Connect to Redis, falling back to the in-process backend
+        
+        Args:
+            redis_url (Optional[str]): Redis URL
+        
+        Returns:
+            Object: Cache backend
+        """
+        if HAS_REDIS and redis_url:
+            try:
+                client = redis.Redis.from_url(redis_url, socket_connect_timeout=0.5, socket_timeout=0.5)
+                client.ping()
+                return RedisCacheBackend(client)
+            except redis.RedisError:
+                pass
+        
+        return LocalCacheBackend()
+    
+    def key(self, name: str, user_id: str, params: Dict) -> Optional[str]:
+        """
+        Build the cache key of a result
+        
+        Args:
+            name (str): Result name (e.g. 'dashboard')
+            user_id (str): User ID
+            params (Dict): Query parameters (date range, platform, campaign, group_by, ...)
+        
+        Returns:
+            Optional[str]: Cache key, scoped to the user's current generation, or None when
+                the result must not be cached (backend error or pending invalidation)
+        """
+        if user_id in self.pending_invalidations and not self._bump(user_id):
+            return None
+        
+        try:
+            generation = self.backend.generation(user_id)
+        except Exception as e:
+            logger.warning(f"Analytics cache generation lookup failed: {str(e)}")
+            self._count(name, 'errors')
+            return None
+        
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        
+        return f'{user_id}:{generation}:{name}:{digest}'
+    
+    def get(self, name: str, key: str) -> Optional[Dict]:
+        """
+        Get a cached result
+        
+        Args:
+            name (str): Result name
+            key (str): Cache key
+        
+        Returns:
+            Optional[Dict]: Cached result, or None on a miss
+        """
+        try:
+            value = self.backend.get(key)
+        except Exception:
+            self._count(name, 'errors')
+            value = None
+        
+        self._count(name, 'misses' if value is None else 'hits')
+        
+        return json.loads(value) if value is not None else None
+    
+    def set(self, name: str, key: str, result: Dict):
+        """
+        Cache a result
+        
+        Args:
+            name (str): Result name
+            key (str): Cache key
+            result (Dict): Result
+        """
+        try:
+            self.backend.set(key, json.dumps(result, default=str), self.ttl)
+        except Exception:
+            self._count(name, 'errors')
+    
+    def invalidate(self, user_id: str):
+        """
+        Invalidate every cached result of a user
+        
+        When the backend fails, the user's results bypass the cache in this
+        process until a later attempt to start the new generation succeeds.
+        
+        Args:
+            user_id (str): User ID
+        """
+        self._bump(str(user_id))
+    
+    def _bump(self, user_id: str) -> bool:
+        """
+        Start a new cache generation for a user
+        
+        Args:
+            user_id (str): User ID
+        
+        Returns:
+            bool: Whether the backend accepted the new generation
+        """
+        try:
+            self.backend.bump(user_id)
+        except Exception as e:
+            logger.error(f"Analytics cache invalidation failed for user {user_id}: {str(e)}")
+            self._count('all', 'errors')
+            
+            with self.lock:
+                self.pending_invalidations.add(user_id)
+            
+            return False
+        
+        with self.lock:
+            self.pending_invalidations.discard(user_id)
+        
+        self._count('all', 'invalidations')
+        return True
+    
+    def stats(self) -> Dict:
+        """
+        Get cache hit/miss metrics
+        
+        Returns:
+            Dict: Backend, TTL, totals and per-result counters
+        """
+        with self.lock:
+            by_name = {name: dict(counters) for name, counters in self.counters.items()}
+        
+        totals = {
+            counter: sum(counters.get(counter, 0) for counters in by_name.values())
+            for counter in ('hits', 'misses', 'errors', 'invalidations')
+        }
+        lookups = totals['hits'] + totals['misses']
+        totals['hit_rate'] = (totals['hits'] / lookups) if lookups > 0 else 0.0
+        
+        return {
+            'backend': 'redis' if isinstance(self.backend, RedisCacheBackend) else 'local',
+            'ttl': self.ttl,
+            'pending_invalidations': len(self.pending_invalidations),
+            'totals': totals,
+            'by_result': by_name
+        }
+    
+    def _count(self, name: str, counter: str):
+        """
+        Increment a counter
+        
+        Args:
+            name (str): Result name
+            counter (str): Counter name
+        """
+        with self.lock:
+            counters = self.counters.setdefault(name, {})
+            counters[counter] = counters.get(counter, 0) + 1
+
+_analytics_cache = None
+_analytics_cache_lock = threading.Lock()
+
+def get_analytics_cache() -> AnalyticsCache:
+    """
+    Get the process-wide analytics cache
+    
+    Returns:
+        AnalyticsCache: Analytics cache configured from REDIS_URL, ANALYTICS_CACHE_TTL and ANALYTICS_LOCAL_CACHE_TTL
+    """
+    global _analytics_cache
+    
+    with _analytics_cache_lock:
+        if _analytics_cache is None:
+            _analytics_cache = AnalyticsCache(
+                redis_url=os.getenv('REDIS_URL'),
+                ttl=int(os.getenv('ANALYTICS_CACHE_TTL', 300)),
+                local_ttl=int(os.getenv('ANALYTICS_LOCAL_CACHE_TTL', 30))
+            )
+        
+        return _analytics_cache
+
+def cached_result(name: str) -> Callable:
+    """
+    Cache an AnalyticsService method's result by its arguments
+    
+    The decorated method must take user_id; error results are not cached.
+    
+    Args:
+        name (str): Result name used in keys and metrics
+    
+    Returns:
+        Callable: Decorator
+    """
+    def decorator(method: Callable) -> Callable:
+        signature = inspect.signature(method)
+        
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = dict(bound.arguments)
+            params.pop('self')
+            user_id = str(params.pop('user_id'))
+            
+            key = self.cache.key(name, user_id, params)
+            
+            if key is None:
+                return method(self, *args, **kwargs)
+            
+            result = self.cache.get(name, key)
+            
+            if result is None:
+                result = method(self, *args, **kwargs)
+                
+                if 'error' not in result:
+                    self.cache.set(name, key, result)
+            
+            return result
+        
+        return wrapper
+    
+    return decorator
@@ -0,0 +1,183 @@
+"""
+AdGenius AI Backend - Hourly Analytics Compaction
+"""
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from pymongo import UpdateOne
+
+from app.models.analytics import CampaignAnalytics
+from app.services.analytics_cache import get_analytics_cache
+from app.services.analytics_prefix_index import PrefixSumIndex
+from app.services.analytics_rollup import ROLLUP_METRICS, AnalyticsRollupService
+from app.services.analytics_store import get_metrics_store
+from app.utils.metrics import derive_row
+
+# Raw hours removed per delete command, keeping each command well under the BSON size limit
+DELETE_BATCH_SIZE = 5000
+
+def _batches(items: List, size: Optional[int] = None) -> Iterator[List]:
+    """
+    Split a list into consecutive batches
+    
+    Args:
+        items (List): Items
+        size (Optional[int], optional): Maximum batch size. Defaults to DELETE_BATCH_SIZE.
+    
+    Returns:
+        Iterator[List]: Batches in order
+    """
+    size = size or DELETE_BATCH_SIZE
+    
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+class HourlyCompactor:
+    """Folds hourly analytics older than the retention window into daily rows"""
+    
+    def __init__(self, retention_days: Optional[int] = None, rollup_service: Optional[AnalyticsRollupService] = None,
+                 prefix_index: Optional[PrefixSumIndex] = None, metrics_store=None):
+        """
+        Initialize hourly compactor
+        
+        Args:
+            retention_days (Optional[int], optional): Days of raw hourly rows to keep.
+                Defaults to ANALYTICS_HOURLY_RETENTION_DAYS.
+            rollup_service (Optional[AnalyticsRollupService], optional): Rollup service. Defaults to a new one.
+            prefix_index (Optional[PrefixSumIndex], optional): Prefix-sum index. Defaults to a new one.
+            metrics_store (optional): Metrics store. Defaults to the configured backend.
+        """
+        if retention_days is None:
+            retention_days = int(os.getenv('ANALYTICS_HOURLY_RETENTION_DAYS', 14))
+        
+        self.retention_days = retention_days
+        self.rollup_service = rollup_service or AnalyticsRollupService()
+        self.prefix_index = prefix_index or PrefixSumIndex()
+        self.metrics_store = metrics_store or get_metrics_store()
+    
+    def cutoff(self, now: Optional[datetime] = None) -> datetime:
+        """
+        Get the first hour kept raw
+        
+        Args:
+            now (Optional[datetime], optional): Current time. Defaults to utcnow.
+        
+        Returns:
+            datetime: Start of the oldest retained day
+        """
+        now = now or datetime.utcnow()
+        
+        return datetime(now.year, now.month, now.day) - timedelta(days=self.retention_days)
+    
+    def compact(self, now: Optional[datetime] = None, user_id: Optional[str] = None) -> Dict:
+        """
+        Fold hourly rows before the cutoff into daily rows and drop the raw hours
+        
+        A day already stored as a daily row (from the daily connector reports)
+        is kept as is, so compaction only fills days that have no daily row.
+        That includes days an earlier run created: an hour before the cutoff
+        that is rewritten after its day was compacted is dropped without being
+        folded, so ANALYTICS_HOURLY_RETENTION_DAYS should outlast the window in
+        which platforms restate hourly figures. Only the hours that were folded
+        are deleted, in batches of DELETE_BATCH_SIZE; hours written while the
+        compaction runs stay for the next run.
+        
+        Args:
+            now (Optional[datetime], optional): Current time. Defaults to utcnow.
+            user_id (Optional[str], optional): Restrict to one user. Defaults to None.
+        
+        Returns:
+            Dict: Days created and hours removed
+        """
+        # Hours updated from here on are left for the next run
+        written_at = datetime.utcnow()
+        match = {'period_type': 'hourly', 'date': {'$lt': self.cutoff(now)}, 'updated_at': {'$lte': written_at}}
+        
+        if user_id:
+            match['user_id'] = str(user_id)
+        
+        group = {
+            '_id': {
+                'campaign_id': '$campaign_id',
+                'user_id': '$user_id',
+                'platform': '$platform',
+                'date': {'$dateTrunc': {'date': '$date', 'unit': 'day'}}
+            },
+            'ids': {'$push': '$_id'},
+            'hours': {'$push': '$date'}
+        }
+        group.update({metric: {'$sum': f'${metric}'} for metric in ROLLUP_METRICS})
+        
+        collection = CampaignAnalytics._get_collection()
+        days = []
+        operations = []
+        folded_ids = []
+        folded_hours = {}
+        
+        for row in collection.aggregate([{'$match': match}, {'$group': group}], allowDiskUse=True):
+            folded_ids.extend(row['ids'])
+            folded_hours.setdefault(row['_id']['campaign_id'], []).extend(row['hours'])
+            
+            document = dict(row['_id'], period_type='daily', created_at=written_at, updated_at=written_at)
+            document.update({metric: row.get(metric, 0) for metric in ROLLUP_METRICS})
+            
+            derived = derive_row(
+                document['impressions'], document['clicks'], document['conversions'],
+                document['spent'], document['revenue']
+            )
+            document.update({
+                'ctr': derived['ctr'],
+                'cpc': derived['cpc'],
+                'cpm': derived['cpm'],
+                'cpa': derived['cost_per_conversion'],
+                'roas': derived['roas'],
+                'conversion_rate': derived['conversion_rate']
+            })
+            
+            days.append(document)
+            operations.append(UpdateOne(
+                {'campaign_id': document['campaign_id'], 'date': document['date'], 'period_type': 'daily'},
+                {'$setOnInsert': document},
+                upsert=True
+            ))
+        
+        if not operations:
+            return {'days': 0, 'hours': 0}
+        
+        result = collection.bulk_write(operations, ordered=False)
+        created = [days[index] for index in result.upserted_ids]
+        
+        # Newly created days feed the rollups and prefix-sum index like ingested ones
+        changes = {}
+        
+        for document in created:
+            delta = {metric: document[metric] for metric in ROLLUP_METRICS}
+            delta['date'] = document['date']
+            changes.setdefault(document['campaign_id'], {
+                'user_id': document['user_id'],
+                'campaign_id': document['campaign_id'],
+                'platform': document['platform'],
+                'daily_deltas': []
+            })['daily_deltas'].append(delta)
+        
+        self.metrics_store.record_many(created)
+        self.rollup_service.record_many(list(changes.values()))
+        self.prefix_index.record_many(list(changes.values()))
+        
+        # Drop the raw hours only once their days are stored, skipping any rewritten since
+        hours = 0
+        
+        for batch in _batches(folded_ids):
+            hours += collection.delete_many({'_id': {'$in': batch}, 'updated_at': {'$lte': written_at}}).deleted_count
+        
+        for campaign_id, hour_list in folded_hours.items():
+            for batch in _batches(hour_list):
+                self.metrics_store.delete({'campaign_id': campaign_id, 'period_type': 'hourly', 'date': {'$in': batch}})
+        
+        cache = get_analytics_cache()
+        
+        for compacted_user_id in {document['user_id'] for document in days}:
+            cache.invalidate(compacted_user_id)
+        
+        return {'days': len(created), 'hours': hours}
@@ -0,0 +1,57 @@
+"""
+AdGenius AI Backend - Campaign Analytics Deduplication
+"""
+from typing import Dict
+
+from app.models.analytics import CampaignAnalytics
+from app.services.analytics_cache import get_analytics_cache
+
+# Duplicate documents removed per delete command
+DELETE_BATCH_SIZE = 5000
+
+def dedupe_campaign_analytics() -> Dict:
+    """
+    Remove duplicate campaign analytics and build the unique key index
+    
+    Writes made before the unique (campaign_id, date, period_type) index
+    existed could store the same period twice, which stops the index from
+    building. The most recently updated document of each period is kept.
+    
+    Returns:
+        Dict: Duplicated periods found and documents removed
+    """
+    collection = CampaignAnalytics._get_collection()
+    duplicates = collection.aggregate([
+        {'$sort': {'updated_at': -1, '_id': -1}},
+        {'$group': {
+            '_id': {'campaign_id': '$campaign_id', 'date': '$date', 'period_type': '$period_type'},
+            'user_id': {'$first': '$user_id'},
+            'ids': {'$push': '$_id'},
+            'count': {'$sum': 1}
+        }},
+        {'$match': {'count': {'$gt': 1}}}
+    ], allowDiskUse=True)
+    
+    periods = 0
+    stale_ids = []
+    user_ids = set()
+    
+    for row in duplicates:
+        periods += 1
+        stale_ids.extend(row['ids'][1:])
+        user_ids.add(row['user_id'])
+    
+    removed = 0
+    
+    for start in range(0, len(stale_ids), DELETE_BATCH_SIZE):
+        batch = stale_ids[start:start + DELETE_BATCH_SIZE]
+        removed += collection.delete_many({'_id': {'$in': batch}}).deleted_count
+    
+    CampaignAnalytics.ensure_indexes()
+    
+    cache = get_analytics_cache()
+    
+    for user_id in user_ids:
+        cache.invalidate(user_id)
+    
+    return {'periods': periods, 'removed': removed}
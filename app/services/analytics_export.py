@@ -0,0 +1,251 @@
+"""
+AdGenius AI Backend - Streaming Analytics Export
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, Optional
+
+from app.models.analytics import CampaignAnalytics
+from app.services.analytics_query import AnalyticsQuery
+from app.utils.metrics import derive_row
+
+# Columns written for every exported row
+EXPORT_COLUMNS = (
+    'period',
+    'campaign_id',
+    'platform',
+    'impressions',
+    'clicks',
+    'conversions',
+    'spend',
+    'revenue',
+    'ctr',
+    'cpc',
+    'cpm',
+    'conversion_rate',
+    'cost_per_conversion',
+    'roas'
+)
+
+# $dateTrunc units for grouped exports
+GROUP_BY_UNITS = {
+    'week': {'unit': 'week', 'startOfWeek': 'monday'},
+    'month': {'unit': 'month'},
+    'quarter': {'unit': 'quarter'},
+    'year': {'unit': 'year'}
+}
+
+# Rows fetched from MongoDB per round trip
+CURSOR_BATCH_SIZE = 1000
+
+# Approximate bytes buffered before a chunk is yielded
+CHUNK_SIZE = 64 * 1024
+
+class AnalyticsExporter:
+    """Streams analytics rows from a MongoDB cursor with bounded memory"""
+    
+    def __init__(self, user_id: str, start_date: datetime, end_date: datetime,
+                 platform: Optional[str] = None, campaign_id: Optional[str] = None, group_by: str = 'day'):
+        """
+        Initialize analytics exporter
+        
+        Args:
+            user_id (str): User ID
+            start_date (datetime): Start date
+            end_date (datetime): End date
+            platform (Optional[str], optional): Platform. Defaults to None.
+            campaign_id (Optional[str], optional): Campaign ID. Defaults to None.
+            group_by (str, optional): Group by (day, week, month, quarter, year). Defaults to 'day'.
+        """
+        self.query = AnalyticsQuery(
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            platform=platform,
+            campaign_ids=[campaign_id] if campaign_id else None
+        )
+        self.group_by = group_by
+    
+    def cursor(self):
+        """
+        Open the cursor of summed metrics
+        
+        Daily exports read the stored rows directly; weekly and monthly exports
+        group them per campaign on the server.
+        
+        Returns:
+            Cursor: PyMongo cursor of rows with _id, campaign_id, platform and summed metrics
+        """
+        collection = CampaignAnalytics._get_collection()
+        
+        if self.group_by not in GROUP_BY_UNITS:
+            return collection.find(
+                self.query.filter(),
+                {'date': 1, 'campaign_id': 1, 'platform': 1, 'impressions': 1,
+                 'clicks': 1, 'conversions': 1, 'spent': 1, 'revenue': 1}
+            ).sort([('date', 1)]).batch_size(CURSOR_BATCH_SIZE)
+        
+        return collection.aggregate([
+            {'$match': self.query.filter()},
+            {'$group': {
+                '_id': {
+                    'date': {'$dateTrunc': dict({'date': '$date'}, **GROUP_BY_UNITS[self.group_by])},
+                    'campaign_id': '$campaign_id',
+                    'platform': '$platform'
+                },
+                'impressions': {'$sum': '$impressions'},
+                'clicks': {'$sum': '$clicks'},
+                'conversions': {'$sum': '$conversions'},
+                'spent': {'$sum': '$spent'},
+                'revenue': {'$sum': '$revenue'}
+            }},
+            {'$project': {
+                'date': '$_id.date',
+                'campaign_id': '$_id.campaign_id',
+                'platform': '$_id.platform',
+                'impressions': 1,
+                'clicks': 1,
+                'conversions': 1,
+                'spent': 1,
+                'revenue': 1
+            }},
+            {'$sort': {'date': 1, 'campaign_id': 1}}
+        ], allowDiskUse=True, batchSize=CURSOR_BATCH_SIZE)
+    
+    def rows(self) -> Iterator[Dict]:
+        """
+        Yield export rows one at a time
+        
+        Returns:
+            Iterator[Dict]: Rows keyed by EXPORT_COLUMNS
+        """
+        for document in self.cursor():
+            yield to_export_row(document)
+    
+    def stream(self, export_format: str = 'ndjson', compress: bool = False) -> Iterator[bytes]:
+        """
+        Yield the encoded export in chunks
+        
+        Args:
+            export_format (str, optional): 'ndjson' or 'csv'. Defaults to 'ndjson'.
+            compress (bool, optional): Gzip the stream. Defaults to False.
+        
+        Returns:
+            Iterator[bytes]: Response body chunks
+        """
+        lines = csv_lines(self.rows()) if export_format == 'csv' else ndjson_lines(self.rows())
+        chunks = chunked(lines)
+        
+        return gzip_chunks(chunks) if compress else chunks
+
+def to_export_row(document: Dict) -> Dict:
+    """
+    Convert a stored or grouped document into an export row
+    
+    Args:
+        document (Dict): Document with date, campaign_id, platform and summed metrics
+    
+    Returns:
+        Dict: Export row
+    """
+    date = document.get('date')
+    row = {
+        'period': date.date().isoformat() if date else None,
+        'campaign_id': document.get('campaign_id'),
+        'platform': document.get('platform'),
+        'impressions': document.get('impressions', 0),
+        'clicks': document.get('clicks', 0),
+        'conversions': document.get('conversions', 0),
+        'spend': document.get('spent', 0.0),
+        'revenue': document.get('revenue', 0.0)
+    }
+    row.update(derive_row(row['impressions'], row['clicks'], row['conversions'], row['spend'], row['revenue']))
+    
+    return row
+
+def ndjson_lines(rows: Iterable[Dict]) -> Iterator[str]:
+    """
+    Encode rows as newline-delimited JSON
+    
+    Args:
+        rows (Iterable[Dict]): Rows
+    
+    Returns:
+        Iterator[str]: One line per row
+    """
+    for row in rows:
+        yield json.dumps(row, separators=(',', ':')) + '\n'
+
+def csv_lines(rows: Iterable[Dict]) -> Iterator[str]:
+    """
+    Encode rows as CSV with a header line
+    
+    Args:
+        rows (Iterable[Dict]): Rows
+    
+    Returns:
+        Iterator[str]: Header line, then one line per row
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    
+    for row in rows:
+        writer.writerow([row[column] for column in EXPORT_COLUMNS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    
+    # Header only, when there are no rows
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def chunked(lines: Iterable[str], size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Group encoded lines into chunks of roughly a fixed size
+    
+    Args:
+        lines (Iterable[str]): Lines
+        size (int, optional): Bytes per chunk. Defaults to CHUNK_SIZE.
+    
+    Returns:
+        Iterator[bytes]: Chunks
+    """
+    parts = []
+    length = 0
+    
+    for line in lines:
+        data = line.encode('utf-8')
+        parts.append(data)
+        length += len(data)
+        
+        if length >= size:
+            yield b''.join(parts)
+            parts = []
+            length = 0
+    
+    if parts:
+        yield b''.join(parts)
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Gzip a stream of chunks incrementally
+    
+    Args:
+        chunks (Iterable[bytes]): Uncompressed chunks
+    
+    Returns:
+        Iterator[bytes]: Gzip-compressed chunks
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        
+        if data:
+            yield data
+    
+    yield compressor.flush()
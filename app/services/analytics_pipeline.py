@@ -0,0 +1,339 @@
+"""
+AdGenius AI Backend - Analytics Aggregation Pipeline
+"""
+import functools
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from app.services.analytics_query import AnalyticsQuery
+from app.services.analytics_store import DocumentMetricsStore
+from app.services.campaign_lookup import CampaignIdentityMap, get_identity_map
+from app.utils.metrics import apply_derived_metrics, summarize
+
+# Stored field backing each summed dashboard metric
+SUMMED_FIELDS = {
+    'impressions': '$impressions',
+    'clicks': '$clicks',
+    'conversions': '$conversions',
+    'spend': '$spent',
+    'revenue': '$revenue'
+}
+
+# Dashboard sections, in response order
+DASHBOARD_SECTIONS = ('summary', 'daily_metrics', 'platform_breakdown', 'campaign_breakdown', 'recommendations')
+
+# $facet output backing each dashboard section
+SECTION_FACETS = {
+    'summary': 'totals',
+    'daily_metrics': 'daily',
+    'platform_breakdown': 'platforms',
+    'campaign_breakdown': 'campaigns',
+    'recommendations': 'recommendations'
+}
+
+def resolve_sections(requested: Optional[Union[str, Iterable[str]]] = None) -> List[str]:
+    """
+    Resolve requested dashboard sections
+    
+    Args:
+        requested (Optional[Union[str, Iterable[str]]], optional): Section names, as a list or a
+            comma-separated string. Defaults to every section.
+    
+    Returns:
+        List[str]: Known sections in response order, or every section when none is known
+    """
+    if isinstance(requested, str):
+        requested = requested.split(',')
+    
+    names = {name.strip() for name in requested or []}
+    sections = [section for section in DASHBOARD_SECTIONS if section in names]
+    
+    return sections or list(DASHBOARD_SECTIONS)
+
+class DashboardPipeline:
+    """Computes dashboard aggregates on the MongoDB server in one $facet round trip"""
+    
+    def __init__(self, user_id: str, start_date: datetime, end_date: datetime,
+                 campaign_ids: Optional[List[str]] = None, platform: Optional[str] = None,
+                 recommendations_limit: int = 20, include_totals: bool = True, store=None,
+                 sections: Optional[Iterable[str]] = None):
+        """
+        Initialize dashboard pipeline
+        
+        Args:
+            user_id (str): User ID
+            start_date (datetime): Start date
+            end_date (datetime): End date
+            campaign_ids (Optional[List[str]], optional): Campaign IDs to restrict to. Defaults to None.
+            platform (Optional[str], optional): Platform. Defaults to None.
+            recommendations_limit (int, optional): Maximum recommendations returned. Defaults to 20.
+            include_totals (bool, optional): Compute summary totals in the pipeline. Defaults to True.
+            store (optional): Metrics store the pipeline runs against. Defaults to the documents.
+            sections (Optional[Iterable[str]], optional): Dashboard sections to compute. Defaults to all.
+        """
+        self.user_id = str(user_id)
+        self.start_date = datetime.combine(start_date.date(), datetime.min.time())
+        self.end_date = end_date
+        self.campaign_ids = campaign_ids
+        self.platform = platform
+        self.recommendations_limit = recommendations_limit
+        self.include_totals = include_totals
+        self.store = store or DocumentMetricsStore()
+        self.sections = resolve_sections(sections)
+    
+    def facets(self) -> Dict[str, List[Dict]]:
+        """
+        Build the stages of every facet backing a requested section
+        
+        Returns:
+            Dict[str, List[Dict]]: Facet stages by facet name
+        """
+        sums = {name: {'$sum': field} for name, field in SUMMED_FIELDS.items()}
+        
+        stages = {
+            'totals': [{'$group': dict({'_id': None}, **sums)}],
+            'daily': [
+                {'$group': dict({'_id': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$date'}}}, **sums)},
+                {'$sort': {'_id': 1}}
+            ],
+            'platforms': [
+                {'$group': dict({'_id': '$platform'}, **sums)}
+            ],
+            'campaigns': [
+                {'$group': dict({'_id': '$campaign_id'}, **sums)}
+            ],
+            'recommendations': [
+                {'$unwind': '$ai_recommendations'},
+                {'$group': {
+                    '_id': '$ai_recommendations',
+                    'campaign_id': {'$first': '$campaign_id'},
+                    'date': {'$max': '$date'}
+                }},
+                {'$sort': {'date': -1}},
+                {'$limit': self.recommendations_limit}
+            ]
+        }
+        
+        return {
+            SECTION_FACETS[section]: stages[SECTION_FACETS[section]]
+            for section in self.sections
+            if section != 'summary' or self.include_totals
+        }
+    
+    def build(self) -> List[Dict]:
+        """
+        Build aggregation pipeline
+        
+        Returns:
+            List[Dict]: Aggregation pipeline stages
+        """
+        match = AnalyticsQuery(
+            user_id=self.user_id,
+            start_date=self.start_date,
+            end_date=self.end_date,
+            platform=self.platform,
+            campaign_ids=self.campaign_ids or None
+        ).filter()
+        
+        return [
+            {'$match': match},
+            {'$project': {
+                'campaign_id': 1,
+                'platform': 1,
+                'date': 1,
+                'impressions': 1,
+                'clicks': 1,
+                'conversions': 1,
+                'spent': 1,
+                'revenue': 1,
+                'ai_recommendations': 1
+            }},
+            {'$facet': self.facets()}
+        ]
+    
+    def aggregated_sections(self) -> List[str]:
+        """
+        Get the requested sections computed by the aggregation
+        
+        Returns:
+            List[str]: Sections in response order
+        """
+        facets = self.facets()
+        
+        return [section for section in self.sections if SECTION_FACETS[section] in facets]
+    
+    def run(self, identity_map: Optional[CampaignIdentityMap] = None) -> Dict:
+        """
+        Execute the pipeline and shape the result
+        
+        Every requested section is a facet of the same aggregation, so the
+        sections cost one round trip together; none is made when no section
+        needs the aggregation.
+        
+        Args:
+            identity_map (Optional[CampaignIdentityMap], optional): Campaign identity map
+                resolving names. Defaults to the request's map.
+        
+        Returns:
+            Dict: Requested sections computed by the aggregation
+        """
+        sections = self.aggregated_sections()
+        
+        if not sections:
+            return {}
+        
+        pipeline = self.build()
+        cursor = self.store.aggregate(pipeline[0]['$match'], pipeline[1:])
+        facets = next(iter(cursor), {})
+        
+        return self.to_dashboard(facets, self._campaign_names(facets, identity_map), sections)
+    
+    def run_section(self, section: str, identity_map: Optional[CampaignIdentityMap] = None) -> Any:
+        """
+        Compute one dashboard section with its own aggregation
+        
+        Runs the section's facet stages directly after the shared match and
+        projection, for callers that spread sections over threads.
+        
+        Args:
+            section (str): Dashboard section
+            identity_map (Optional[CampaignIdentityMap], optional): Campaign identity map
+                resolving names. Defaults to the request's map.
+        
+        Returns:
+            Any: Section value
+        """
+        facet = SECTION_FACETS[section]
+        pipeline = self.build()
+        stages = pipeline[1:-1] + self.facets()[facet]
+        facets = {facet: list(self.store.aggregate(pipeline[0]['$match'], stages))}
+        
+        return self.to_dashboard(facets, self._campaign_names(facets, identity_map), [section])[section]
+    
+    def section_tasks(self, identity_map: Optional[CampaignIdentityMap] = None) -> Dict[str, Callable[[], Any]]:
+        """
+        Build a lazily evaluated unit for every requested section computed by aggregation
+        
+        Each unit makes its own round trip; run() computes the same sections in one.
+        
+        Args:
+            identity_map (Optional[CampaignIdentityMap], optional): Campaign identity map
+                resolving names. Defaults to a new map, since tasks may run off the request thread.
+        
+        Returns:
+            Dict[str, Callable[[], Any]]: Zero-argument callables by section
+        """
+        identity_map = identity_map or CampaignIdentityMap()
+        
+        return {
+            section: functools.partial(self.run_section, section, identity_map)
+            for section in self.aggregated_sections()
+        }
+    
+    def _campaign_names(self, facets: Dict, identity_map: Optional[CampaignIdentityMap] = None) -> Dict[str, str]:
+        """
+        Resolve the names of the campaigns in the campaign facet with at most one query
+        
+        Args:
+            facets (Dict): Facet output
+            identity_map (Optional[CampaignIdentityMap], optional): Campaign identity map. Defaults to the request's map.
+        
+        Returns:
+            Dict[str, str]: Campaign names by ID
+        """
+        if not facets.get('campaigns'):
+            return {}
+        
+        return (identity_map or get_identity_map()).names(row['_id'] for row in facets['campaigns'])
+    
+    def to_dashboard(self, facets: Dict, campaign_names: Optional[Dict[str, str]] = None,
+                     sections: Optional[Iterable[str]] = None) -> Dict:
+        """
+        Convert facet output into the dashboard response shape
+        
+        Args:
+            facets (Dict): Output document of the $facet stage
+            campaign_names (Optional[Dict[str, str]], optional): Campaign names by ID. Defaults to None.
+            sections (Optional[Iterable[str]], optional): Sections to shape. Defaults to the requested sections.
+        
+        Returns:
+            Dict: Dashboard data
+        """
+        campaign_names = campaign_names or {}
+        sections = self.sections if sections is None else sections
+        dashboard = {}
+        
+        # Summary
+        if 'summary' in sections:
+            dashboard['summary'] = summarize(_summed((facets.get('totals') or [{}])[0]))
+        
+        # Daily metrics, with empty days filled in
+        if 'daily_metrics' in sections:
+            daily_rows = {row['_id']: row for row in facets.get('daily', [])}
+            daily_metrics = []
+            current_date = self.start_date.date()
+            
+            while current_date <= self.end_date.date():
+                date_str = current_date.isoformat()
+                metric = {'date': date_str}
+                metric.update(_summed(daily_rows.get(date_str, {})))
+                daily_metrics.append(metric)
+                current_date += timedelta(days=1)
+            
+            dashboard['daily_metrics'] = apply_derived_metrics(daily_metrics)
+        
+        # Platform breakdown
+        if 'platform_breakdown' in sections:
+            platform_breakdown = {
+                row['_id']: _summed(row)
+                for row in facets.get('platforms', [])
+            }
+            apply_derived_metrics(list(platform_breakdown.values()))
+            dashboard['platform_breakdown'] = platform_breakdown
+        
+        # Campaign breakdown
+        if 'campaign_breakdown' in sections:
+            campaign_breakdown = []
+            
+            for row in facets.get('campaigns', []):
+                metric = {
+                    'campaign_id': row['_id'],
+                    'campaign_name': campaign_names.get(row['_id'])
+                }
+                metric.update(_summed(row))
+                campaign_breakdown.append(metric)
+            
+            dashboard['campaign_breakdown'] = apply_derived_metrics(campaign_breakdown)
+        
+        # Recommendations
+        if 'recommendations' in sections:
+            dashboard['recommendations'] = [
+                {
+                    'campaign_id': row.get('campaign_id'),
+                    'description': row['_id'],
+                    'date': row['date'].isoformat() if row.get('date') else None
+                }
+                for row in facets.get('recommendations', [])
+            ]
+        
+        return dashboard
+
+def _summed(row: Dict) -> Dict:
+    """
+    Extract summed metrics from a $group output row
+    
+    Args:
+        row (Dict): Group output row
+    
+    Returns:
+        Dict: Impressions, clicks, conversions, spend and revenue
+    """
+    metric = {
+        'impressions': row.get('impressions', 0),
+        'clicks': row.get('clicks', 0),
+        'conversions': row.get('conversions', 0),
+        'spend': float(row.get('spend', 0.0)),
+        'revenue': float(row.get('revenue', 0.0))
+    }
+    
+    return metric
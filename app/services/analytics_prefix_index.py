@@ -0,0 +1,357 @@
+"""
+AdGenius AI Backend - Analytics Prefix-Sum Index
+"""
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import ReplaceOne, UpdateOne
+
+from app.models.analytics import AnalyticsPrefixIndex, CampaignAnalytics
+from app.services.analytics_rollup import ROLLUP_METRICS, metrics_match, settle_cutoff
+
+# Positions stored per campaign-year (one per possible day of year)
+DAYS_PER_YEAR = 366
+
+def day_index(date: datetime) -> int:
+    """
+    Get the array position of a date within its year
+    
+    Args:
+        date (datetime): Date
+    
+    Returns:
+        int: Zero-based day of year
+    """
+    return date.timetuple().tm_yday - 1
+
+class PrefixSumIndex:
+    """Answers date-range totals with one subtraction per campaign-year"""
+    
+    def record(self, user_id: str, campaign_id: str, platform: Optional[str],
+               daily_deltas: List[Dict]) -> int:
+        """
+        Shift running totals for changed daily metrics
+        
+        Args:
+            user_id (str): User ID
+            campaign_id (str): Campaign ID
+            platform (Optional[str]): Platform
+            daily_deltas (List[Dict]): Per-day metric changes, each with a 'date' and ROLLUP_METRICS keys
+        
+        Returns:
+            int: Number of campaign-years touched
+        """
+        return self.record_many([{
+            'user_id': user_id,
+            'campaign_id': campaign_id,
+            'platform': platform,
+            'daily_deltas': daily_deltas
+        }])
+    
+    def record_many(self, changes: List[Dict]) -> int:
+        """
+        Shift running totals for changed daily metrics of many campaigns in one bulk write
+        
+        Args:
+            changes (List[Dict]): Entries with user_id, campaign_id, platform and daily_deltas keys
+        
+        Returns:
+            int: Number of campaign-years touched
+        """
+        daily_by_year = {}
+        
+        for change in changes:
+            for delta in change['daily_deltas']:
+                key = (change['campaign_id'], delta['date'].year)
+                
+                if key not in daily_by_year:
+                    daily_by_year[key] = dict(
+                        {'user_id': change['user_id'], 'platform': change['platform']},
+                        **{metric: [0] * DAYS_PER_YEAR for metric in ROLLUP_METRICS}
+                    )
+                
+                for metric in ROLLUP_METRICS:
+                    daily_by_year[key][metric][day_index(delta['date'])] += delta.get(metric, 0)
+        
+        now = datetime.utcnow()
+        operations = []
+        
+        for (campaign_id, year), daily in daily_by_year.items():
+            # A change on day N moves every running total from N to the end of the year
+            increments = {}
+            
+            for metric in ROLLUP_METRICS:
+                for position, value in enumerate(accumulate(daily[metric])):
+                    if value:
+                        increments[f'{metric}.{position}'] = value
+            
+            if not increments:
+                continue
+            
+            key = {'campaign_id': campaign_id, 'year': year}
+            operations.append(UpdateOne(
+                key,
+                {'$setOnInsert': dict(
+                    {'user_id': daily['user_id']},
+                    **{metric: [0] * DAYS_PER_YEAR for metric in ROLLUP_METRICS}
+                )},
+                upsert=True
+            ))
+            operations.append(UpdateOne(
+                key,
+                {'$inc': increments, '$set': {'platform': daily['platform'], 'updated_at': now}}
+            ))
+        
+        if operations:
+            AnalyticsPrefixIndex._get_collection().bulk_write(operations, ordered=True)
+        
+        return len(operations) // 2
+    
+    def find_drift(self, user_id: Optional[str] = None, settle_seconds: Optional[float] = None,
+                   now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Compare the index with the daily campaign analytics documents
+        
+        Campaign-years holding a day or index update within the settle window
+        are skipped, since their increments may still be in flight.
+        
+        Args:
+            user_id (Optional[str], optional): Restrict the check to one user. Defaults to None.
+            settle_seconds (Optional[float], optional): Seconds a write may take to reach the index.
+                Defaults to ANALYTICS_CONSISTENCY_SETTLE_SECONDS.
+            now (Optional[datetime], optional): Current time. Defaults to utcnow.
+        
+        Returns:
+            List[Dict]: Corrections in record_many's change format, one per drifted campaign-year
+        """
+        match = {'period_type': 'daily'}
+        
+        if user_id:
+            match['user_id'] = user_id
+        
+        cutoff = settle_cutoff(settle_seconds, now)
+        projection = dict({'user_id': 1, 'campaign_id': 1, 'platform': 1, 'date': 1, 'updated_at': 1},
+                          **{metric: 1 for metric in ROLLUP_METRICS})
+        expected = {}
+        unsettled = set()
+        
+        for row in CampaignAnalytics._get_collection().find(match, projection):
+            key = (row['campaign_id'], row['date'].year)
+            
+            if key not in expected:
+                expected[key] = dict(
+                    {'user_id': row['user_id'], 'platform': row.get('platform')},
+                    **{metric: [0] * DAYS_PER_YEAR for metric in ROLLUP_METRICS}
+                )
+            
+            for metric in ROLLUP_METRICS:
+                expected[key][metric][day_index(row['date'])] += row.get(metric) or 0
+            
+            if row.get('updated_at') and row['updated_at'] >= cutoff:
+                unsettled.add(key)
+        
+        actual = {}
+        
+        for row in AnalyticsPrefixIndex._get_collection().find({'user_id': user_id} if user_id else {}):
+            key = (row['campaign_id'], row['year'])
+            
+            actual[key] = {'user_id': row['user_id'], 'platform': row.get('platform')}
+            
+            # Stored running totals back to per-day values
+            for metric in ROLLUP_METRICS:
+                totals = row.get(metric) or [0] * DAYS_PER_YEAR
+                actual[key][metric] = [total - (totals[position - 1] if position else 0)
+                                       for position, total in enumerate(totals)]
+            
+            if row.get('updated_at') and row['updated_at'] >= cutoff:
+                unsettled.add(key)
+        
+        drift = []
+        
+        for key in expected.keys() | actual.keys():
+            if key in unsettled:
+                continue
+            
+            campaign_id, year = key
+            wanted = expected.get(key, {})
+            stored = actual.get(key, {})
+            owner = wanted or stored
+            deltas = []
+            
+            for position in range(day_index(datetime(year, 12, 31)) + 1):
+                day_wanted = {metric: wanted[metric][position] for metric in ROLLUP_METRICS} if wanted else {}
+                day_stored = {metric: stored[metric][position] for metric in ROLLUP_METRICS} if stored else {}
+                
+                if not metrics_match(day_wanted, day_stored):
+                    delta = {
+                        metric: (day_wanted.get(metric) or 0) - (day_stored.get(metric) or 0)
+                        for metric in ROLLUP_METRICS
+                    }
+                    delta['date'] = datetime(year, 1, 1) + timedelta(days=position)
+                    deltas.append(delta)
+            
+            if deltas:
+                drift.append({
+                    'user_id': owner['user_id'],
+                    'campaign_id': campaign_id,
+                    'platform': owner.get('platform'),
+                    'daily_deltas': deltas
+                })
+        
+        return drift
+    
+    def repair(self, drift: List[Dict]) -> int:
+        """
+        Apply the corrections found by find_drift
+        
+        Corrections are increments, so they commute with writes that land meanwhile.
+        
+        Args:
+            drift (List[Dict]): Corrections from find_drift
+        
+        Returns:
+            int: Number of campaign-years repaired
+        """
+        return self.record_many(drift)
+    
+    def rebuild(self, user_id: Optional[str] = None):
+        """
+        Rebuild the index from the daily campaign analytics documents
+        
+        Replaces every campaign-year outright, so only run it while nothing
+        ingests for the user (e.g. after restoring or bulk-editing daily
+        documents); routine drift is fixed by find_drift and repair.
+        
+        Args:
+            user_id (Optional[str], optional): Restrict the rebuild to one user. Defaults to None.
+        """
+        match = {'period_type': 'daily'}
+        
+        if user_id:
+            match['user_id'] = user_id
+        
+        projection = dict({'user_id': 1, 'campaign_id': 1, 'platform': 1, 'date': 1},
+                          **{metric: 1 for metric in ROLLUP_METRICS})
+        indexes = {}
+        
+        for row in CampaignAnalytics._get_collection().find(match, projection):
+            key = (row['campaign_id'], row['date'].year)
+            
+            if key not in indexes:
+                indexes[key] = dict(
+                    {'user_id': row['user_id'], 'platform': row.get('platform')},
+                    **{metric: [0] * DAYS_PER_YEAR for metric in ROLLUP_METRICS}
+                )
+            
+            for metric in ROLLUP_METRICS:
+                indexes[key][metric][day_index(row['date'])] += row.get(metric, 0)
+        
+        now = datetime.utcnow()
+        operations = []
+        
+        for (campaign_id, year), index in indexes.items():
+            for metric in ROLLUP_METRICS:
+                index[metric] = list(accumulate(index[metric]))
+            
+            index.update({'campaign_id': campaign_id, 'year': year, 'updated_at': now})
+            operations.append(ReplaceOne({'campaign_id': campaign_id, 'year': year}, index, upsert=True))
+        
+        if operations:
+            AnalyticsPrefixIndex._get_collection().bulk_write(operations, ordered=False)
+    
+    def range_totals(self, user_id: str, start_date: datetime, end_date: datetime,
+                     campaign_ids: Optional[List[str]] = None, platform: Optional[str] = None) -> Dict:
+        """
+        Get summed metrics for an inclusive date range
+        
+        Each campaign-year contributes running_total[end] - running_total[start - 1],
+        computed on the database server.
+        
+        Args:
+            user_id (str): User ID
+            start_date (datetime): Start date
+            end_date (datetime): End date
+            campaign_ids (Optional[List[str]], optional): Campaign IDs to restrict to. Defaults to None.
+            platform (Optional[str], optional): Platform. Defaults to None.
+        
+        Returns:
+            Dict: Impressions, clicks, conversions, spend and revenue
+        """
+        return self.range_totals_many(user_id, [(start_date, end_date)], campaign_ids, platform)[0]
+    
+    def range_totals_many(self, user_id: str, windows: List[Tuple[datetime, datetime]],
+                          campaign_ids: Optional[List[str]] = None, platform: Optional[str] = None) -> List[Dict]:
+        """
+        Get summed metrics for several inclusive date ranges in one query
+        
+        Args:
+            user_id (str): User ID
+            windows (List[Tuple[datetime, datetime]]): Start and end date of each range
+            campaign_ids (Optional[List[str]], optional): Campaign IDs to restrict to. Defaults to None.
+            platform (Optional[str], optional): Platform. Defaults to None.
+        
+        Returns:
+            List[Dict]: Impressions, clicks, conversions, spend and revenue, per range
+        """
+        totals = [{metric: 0 for metric in ROLLUP_METRICS} for _ in windows]
+        windows = [
+            (position, start, end)
+            for position, (start, end) in enumerate(windows)
+            if start.date() <= end.date()
+        ]
+        
+        if windows:
+            match = {
+                'user_id': str(user_id),
+                'year': {
+                    '$gte': min(start.year for _, start, _ in windows),
+                    '$lte': max(end.year for _, _, end in windows)
+                }
+            }
+            
+            if campaign_ids:
+                match['campaign_id'] = {'$in': campaign_ids}
+            
+            if platform:
+                match['platform'] = platform
+            
+            group = {'_id': None}
+            
+            for position, start_date, end_date in windows:
+                in_range = {'$and': [{'$gte': ['$year', start_date.year]}, {'$lte': ['$year', end_date.year]}]}
+                end_position = {'$cond': [{'$eq': ['$year', end_date.year]}, day_index(end_date), DAYS_PER_YEAR - 1]}
+                before_position = {'$cond': [{'$eq': ['$year', start_date.year]}, day_index(start_date) - 1, -1]}
+                
+                for metric in ROLLUP_METRICS:
+                    group[f'{metric}_{position}'] = {'$sum': {'$cond': [in_range, {'$subtract': [
+                        {'$arrayElemAt': [f'${metric}', end_position]},
+                        {'$cond': [
+                            {'$gte': [before_position, 0]},
+                            {'$arrayElemAt': [f'${metric}', before_position]},
+                            0
+                        ]}
+                    ]}, 0]}}
+            
+            rows = AnalyticsPrefixIndex._get_collection().aggregate([
+                {'$match': match},
+                {'$group': group}
+            ])
+            
+            for row in rows:
+                for position, _, _ in windows:
+                    totals[position].update({
+                        metric: row.get(f'{metric}_{position}') or 0
+                        for metric in ROLLUP_METRICS
+                    })
+        
+        return [
+            {
+                'impressions': window_totals['impressions'],
+                'clicks': window_totals['clicks'],
+                'conversions': window_totals['conversions'],
+                'spend': float(window_totals['spent']),
+                'revenue': float(window_totals['revenue'])
+            }
+            for window_totals in totals
+        ]
@@ -0,0 +1,130 @@
+"""
+AdGenius AI Backend - Analytics Date-Range Query Layer
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from mongoengine.queryset import QuerySet
+
+from app.models.analytics import CampaignAnalytics
+
+# Fields every summary and breakdown is computed from
+SUMMARY_FIELDS = ('campaign_id', 'platform', 'date', 'impressions', 'clicks', 'conversions', 'spent', 'revenue')
+
+def is_requested(key: str, metrics: Optional[List[str]] = None) -> bool:
+    """
+    Check whether a result key was asked for by a metrics filter
+    
+    Args:
+        key (str): Result key (e.g. 'total_spend', 'average_ctr', 'daily_metrics')
+        metrics (Optional[List[str]], optional): Requested metrics; everything when empty. Defaults to None.
+    
+    Returns:
+        bool: True if the key should be computed
+    """
+    if not metrics:
+        return True
+    
+    if key in metrics:
+        return True
+    
+    prefix, _, name = key.partition('_')
+    
+    return prefix in ('total', 'average') and name in metrics
+
+class AnalyticsQuery:
+    """Builds date-range filters for campaign analytics that resolve to index range scans"""
+    
+    def __init__(self, user_id: Optional[str] = None, start_date: Optional[datetime] = None,
+                 end_date: Optional[datetime] = None, platform: Optional[str] = None,
+                 campaign_ids: Optional[List[str]] = None, period_type: str = 'daily'):
+        """
+        Initialize analytics query
+        
+        Args:
+            user_id (Optional[str], optional): User ID. Defaults to None.
+            start_date (Optional[datetime], optional): First day of the range. Defaults to None.
+            end_date (Optional[datetime], optional): Last day of the range (inclusive). Defaults to None.
+            platform (Optional[str], optional): Platform. Defaults to None.
+            campaign_ids (Optional[List[str]], optional): Campaign IDs to restrict to. Defaults to None.
+            period_type (str, optional): Period type of the stored rows. Defaults to 'daily'.
+        """
+        self.user_id = str(user_id) if user_id else None
+        self.start_date = start_date
+        self.end_date = end_date
+        self.platform = platform
+        self.campaign_ids = [str(campaign_id) for campaign_id in campaign_ids] if campaign_ids is not None else None
+        self.period_type = period_type
+    
+    def date_range(self) -> Dict:
+        """
+        Build the date condition
+        
+        Each stored row covers the day starting at its date, so a row overlaps
+        [start_date, end_date] when start_day <= date < end_day + 1 day.
+        
+        Returns:
+            Dict: Date condition, empty when the range is unbounded
+        """
+        condition = {}
+        
+        if self.start_date:
+            condition['$gte'] = datetime.combine(self.start_date.date(), datetime.min.time())
+        
+        if self.end_date:
+            condition['$lt'] = datetime.combine(self.end_date.date(), datetime.min.time()) + timedelta(days=1)
+        
+        return condition
+    
+    def filter(self) -> Dict:
+        """
+        Build the raw filter
+        
+        The equality fields lead so the (user_id, date) and (campaign_id, date)
+        compound indexes serve the date condition as a range scan.
+        
+        Returns:
+            Dict: MongoDB filter
+        """
+        query = {}
+        
+        if self.campaign_ids is not None:
+            query['campaign_id'] = (
+                self.campaign_ids[0] if len(self.campaign_ids) == 1 else {'$in': self.campaign_ids}
+            )
+        
+        if self.user_id:
+            query['user_id'] = self.user_id
+        
+        date_range = self.date_range()
+        
+        if date_range:
+            query['date'] = date_range
+        
+        if self.period_type:
+            query['period_type'] = self.period_type
+        
+        if self.platform:
+            query['platform'] = self.platform
+        
+        return query
+    
+    def find(self, *fields: str) -> QuerySet:
+        """
+        Find matching analytics in date order
+        
+        Heavy sub-documents are left out unless named; they stay reachable
+        through CampaignAnalytics.load_field.
+        
+        Args:
+            *fields (str): Fields to load. Loads every light field when omitted.
+        
+        Returns:
+            QuerySet: Campaign analytics
+        """
+        queryset = CampaignAnalytics.objects(__raw__=self.filter()).order_by('date')
+        
+        if fields:
+            return queryset.only(*fields)
+        
+        return queryset.exclude(*CampaignAnalytics.HEAVY_FIELDS)
@@ -0,0 +1,431 @@
+"""
+AdGenius AI Backend - Analytics Rollup Service
+"""
+import math
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from pymongo import UpdateOne
+
+from app.models.analytics import AnalyticsRollup, CampaignAnalytics
+from app.utils.calendar_buckets import GRANULARITIES, get_calendar_buckets, next_period_start, period_label, period_start
+from app.utils.metrics import apply_derived_metrics
+
+# Rollup granularities maintained on every write
+ROLLUP_PERIODS = ('daily', 'weekly', 'monthly')
+
+# Summed metrics stored on each rollup bucket
+ROLLUP_METRICS = ('impressions', 'clicks', 'conversions', 'spent', 'revenue')
+
+# Rollup period types mapped to calendar granularities
+PERIOD_GRANULARITIES = {
+    'daily': 'day',
+    'weekly': 'week',
+    'monthly': 'month'
+}
+
+# Request group_by values mapped to the rollup period type they are read from;
+# quarters and years are whole months, so they are summed from monthly rollups
+GROUP_BY_PERIODS = {
+    'day': 'daily',
+    'week': 'weekly',
+    'month': 'monthly',
+    'quarter': 'monthly',
+    'year': 'monthly'
+}
+
+def settle_cutoff(settle_seconds: Optional[float] = None, now: Optional[datetime] = None) -> datetime:
+    """
+    Get the oldest write time a consistency check still treats as in flight
+    
+    Args:
+        settle_seconds (Optional[float], optional): Seconds a write may take to reach the derived
+            indexes. Defaults to ANALYTICS_CONSISTENCY_SETTLE_SECONDS.
+        now (Optional[datetime], optional): Current time. Defaults to utcnow.
+    
+    Returns:
+        datetime: Documents updated at or after this time are skipped
+    """
+    if settle_seconds is None:
+        settle_seconds = float(os.getenv('ANALYTICS_CONSISTENCY_SETTLE_SECONDS', 300))
+    
+    return (now or datetime.utcnow()) - timedelta(seconds=settle_seconds)
+
+def metrics_match(expected: Dict, actual: Dict) -> bool:
+    """
+    Check whether two sets of summed metrics agree, allowing float rounding
+    
+    Args:
+        expected (Dict): Metrics by ROLLUP_METRICS name
+        actual (Dict): Metrics by ROLLUP_METRICS name
+    
+    Returns:
+        bool: True when every metric matches
+    """
+    return all(
+        math.isclose(expected.get(metric) or 0, actual.get(metric) or 0, rel_tol=1e-9, abs_tol=1e-6)
+        for metric in ROLLUP_METRICS
+    )
+
+def bucket_start(date: datetime, period_type: str) -> datetime:
+    """
+    Get the start of the bucket containing a date
+    
+    Args:
+        date (datetime): Date
+        period_type (str): Period type (daily, weekly, monthly)
+    
+    Returns:
+        datetime: Bucket start (weeks start on Monday)
+    """
+    return period_start(date, PERIOD_GRANULARITIES.get(period_type, 'day'))
+
+def next_bucket_start(start: datetime, period_type: str) -> datetime:
+    """
+    Get the start of the bucket following a bucket
+    
+    Args:
+        start (datetime): Bucket start
+        period_type (str): Period type (daily, weekly, monthly)
+    
+    Returns:
+        datetime: Next bucket start
+    """
+    return next_period_start(start, PERIOD_GRANULARITIES.get(period_type, 'day'))
+
+def bucket_label(start: datetime, period_type: str) -> str:
+    """
+    Get the display label of a bucket
+    
+    Args:
+        start (datetime): Bucket start
+        period_type (str): Period type (daily, weekly, monthly)
+    
+    Returns:
+        str: Bucket label
+    """
+    return period_label(start, PERIOD_GRANULARITIES.get(period_type, 'day'))
+
+class AnalyticsRollupService:
+    """Maintains and reads pre-aggregated analytics rollups"""
+    
+    def record(self, user_id: str, campaign_id: str, platform: Optional[str],
+               daily_deltas: List[Dict]) -> int:
+        """
+        Increment rollups for changed daily metrics
+        
+        Args:
+            user_id (str): User ID
+            campaign_id (str): Campaign ID
+            platform (Optional[str]): Platform
+            daily_deltas (List[Dict]): Per-day metric changes, each with a 'date' and ROLLUP_METRICS keys
+        
+        Returns:
+            int: Number of rollup buckets touched
+        """
+        return self.record_many([{
+            'user_id': user_id,
+            'campaign_id': campaign_id,
+            'platform': platform,
+            'daily_deltas': daily_deltas
+        }])
+    
+    def record_many(self, changes: List[Dict]) -> int:
+        """
+        Increment rollups for changed daily metrics of many campaigns in one bulk write
+        
+        Args:
+            changes (List[Dict]): Entries with user_id, campaign_id, platform and daily_deltas keys
+        
+        Returns:
+            int: Number of rollup buckets touched
+        """
+        increments = {}
+        
+        for change in changes:
+            for delta in change['daily_deltas']:
+                for period_type in ROLLUP_PERIODS:
+                    key = (
+                        change['user_id'],
+                        change['campaign_id'],
+                        change['platform'],
+                        period_type,
+                        bucket_start(delta['date'], period_type)
+                    )
+                    bucket = increments.setdefault(key, dict.fromkeys(ROLLUP_METRICS, 0))
+                    
+                    for metric in ROLLUP_METRICS:
+                        bucket[metric] += delta.get(metric, 0)
+        
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {
+                    'user_id': user_id,
+                    'campaign_id': campaign_id,
+                    'platform': platform,
+                    'period_type': period_type,
+                    'bucket_start': start
+                },
+                {'$inc': metrics, '$set': {'updated_at': now}},
+                upsert=True
+            )
+            for (user_id, campaign_id, platform, period_type, start), metrics in increments.items()
+            if any(metrics.values())
+        ]
+        
+        if operations:
+            AnalyticsRollup._get_collection().bulk_write(operations, ordered=False)
+        
+        return len(operations)
+    
+    def find_drift(self, user_id: Optional[str] = None, settle_seconds: Optional[float] = None,
+                   now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Compare rollups with the daily campaign analytics documents
+        
+        Writes keep rollups exact through record_many, so drift only comes from
+        increments that never landed (e.g. a process dying between the daily
+        write and the rollup write). Buckets holding a day updated within the
+        settle window are skipped, since their increments may still be in flight.
+        
+        Args:
+            user_id (Optional[str], optional): Restrict the check to one user. Defaults to None.
+            settle_seconds (Optional[float], optional): Seconds a write may take to reach the rollups.
+                Defaults to ANALYTICS_CONSISTENCY_SETTLE_SECONDS.
+            now (Optional[datetime], optional): Current time. Defaults to utcnow.
+        
+        Returns:
+            List[Dict]: Drifted buckets with user_id, campaign_id, platform, period_type,
+                bucket_start and the ROLLUP_METRICS corrections that fix them
+        """
+        match = {'period_type': 'daily'}
+        
+        if user_id:
+            match['user_id'] = user_id
+        
+        cutoff = settle_cutoff(settle_seconds, now)
+        projection = dict({'user_id': 1, 'campaign_id': 1, 'platform': 1, 'date': 1, 'updated_at': 1},
+                          **{metric: 1 for metric in ROLLUP_METRICS})
+        expected = {}
+        unsettled = set()
+        
+        for row in CampaignAnalytics._get_collection().find(match, projection):
+            for period_type in ROLLUP_PERIODS:
+                key = (row['user_id'], row['campaign_id'], row.get('platform'), period_type,
+                       bucket_start(row['date'], period_type))
+                bucket = expected.setdefault(key, dict.fromkeys(ROLLUP_METRICS, 0))
+                
+                for metric in ROLLUP_METRICS:
+                    bucket[metric] += row.get(metric) or 0
+                
+                if row.get('updated_at') and row['updated_at'] >= cutoff:
+                    unsettled.add(key)
+        
+        rollup_match = {'period_type': {'$in': list(ROLLUP_PERIODS)}}
+        
+        if user_id:
+            rollup_match['user_id'] = user_id
+        
+        actual = {}
+        
+        for row in AnalyticsRollup._get_collection().find(rollup_match):
+            key = (row['user_id'], row['campaign_id'], row.get('platform'), row['period_type'], row['bucket_start'])
+            actual[key] = row
+            
+            if row.get('updated_at') and row['updated_at'] >= cutoff:
+                unsettled.add(key)
+        
+        drift = []
+        
+        for key in expected.keys() | actual.keys():
+            wanted = expected.get(key, {})
+            stored = actual.get(key, {})
+            
+            if key in unsettled or metrics_match(wanted, stored):
+                continue
+            
+            entry = dict(zip(('user_id', 'campaign_id', 'platform', 'period_type', 'bucket_start'), key))
+            entry.update({metric: (wanted.get(metric) or 0) - (stored.get(metric) or 0) for metric in ROLLUP_METRICS})
+            drift.append(entry)
+        
+        return drift
+    
+    def repair(self, drift: List[Dict]) -> int:
+        """
+        Apply the corrections found by find_drift
+        
+        Corrections are increments, so they commute with writes that land meanwhile.
+        
+        Args:
+            drift (List[Dict]): Drifted buckets from find_drift
+        
+        Returns:
+            int: Number of rollup buckets repaired
+        """
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {key: entry[key] for key in ('user_id', 'campaign_id', 'platform', 'period_type', 'bucket_start')},
+                {'$inc': {metric: entry[metric] for metric in ROLLUP_METRICS}, '$set': {'updated_at': now}},
+                upsert=True
+            )
+            for entry in drift
+        ]
+        
+        if operations:
+            AnalyticsRollup._get_collection().bulk_write(operations, ordered=False)
+        
+        return len(operations)
+    
+    def rebuild(self, user_id: Optional[str] = None):
+        """
+        Rebuild rollups from the daily campaign analytics documents
+        
+        Replaces every bucket outright, so only run it while nothing ingests for
+        the user (e.g. after restoring or bulk-editing daily documents); routine
+        drift is fixed by find_drift and repair.
+        
+        Args:
+            user_id (Optional[str], optional): Restrict the rebuild to one user. Defaults to None.
+        """
+        match = {'period_type': 'daily'}
+        
+        if user_id:
+            match['user_id'] = user_id
+        
+        truncations = {
+            'daily': {'$dateTrunc': {'date': '$date', 'unit': 'day'}},
+            'weekly': {'$dateTrunc': {'date': '$date', 'unit': 'week', 'startOfWeek': 'monday'}},
+            'monthly': {'$dateTrunc': {'date': '$date', 'unit': 'month'}}
+        }
+        
+        for period_type, truncation in truncations.items():
+            group = {
+                '_id': {
+                    'user_id': '$user_id',
+                    'campaign_id': '$campaign_id',
+                    'platform': '$platform',
+                    'bucket_start': truncation
+                }
+            }
+            group.update({metric: {'$sum': f'${metric}'} for metric in ROLLUP_METRICS})
+            
+            CampaignAnalytics._get_collection().aggregate([
+                {'$match': match},
+                {'$group': group},
+                {'$project': dict(
+                    {
+                        '_id': 0,
+                        'user_id': '$_id.user_id',
+                        'campaign_id': '$_id.campaign_id',
+                        'platform': '$_id.platform',
+                        'period_type': {'$literal': period_type},
+                        'bucket_start': '$_id.bucket_start',
+                        'updated_at': '$$NOW'
+                    },
+                    **{metric: 1 for metric in ROLLUP_METRICS}
+                )},
+                {'$merge': {
+                    'into': AnalyticsRollup._get_collection_name(),
+                    'on': ['user_id', 'campaign_id', 'platform', 'period_type', 'bucket_start'],
+                    'whenMatched': 'replace',
+                    'whenNotMatched': 'insert'
+                }}
+            ], allowDiskUse=True)
+    
+    def get_period_metrics(self, user_id: str, group_by: str, start_date: datetime, end_date: datetime,
+                           platform: Optional[str] = None, campaign_id: Optional[str] = None) -> List[Dict]:
+        """
+        Get grouped metrics from rollups
+        
+        Periods fully inside the range are read from the matching rollup; partial
+        periods at either edge are completed from the daily rollups. Quarters and
+        years are summed from monthly rollups.
+        
+        Args:
+            user_id (str): User ID
+            group_by (str): Group by (day, week, month, quarter, year)
+            start_date (datetime): Start date
+            end_date (datetime): End date
+            platform (Optional[str], optional): Platform. Defaults to None.
+            campaign_id (Optional[str], optional): Campaign ID. Defaults to None.
+        
+        Returns:
+            List[Dict]: Grouped metrics, one entry per period in the range
+        
+        Raises:
+            ValueError: If group_by is not one of GRANULARITIES
+        """
+        if group_by not in GRANULARITIES:
+            raise ValueError(f"Unsupported group_by: {group_by}")
+        
+        period_type = GROUP_BY_PERIODS[group_by]
+        range_start = bucket_start(start_date, 'daily')
+        range_end = next_bucket_start(bucket_start(end_date, 'daily'), 'daily')
+        
+        # Whole rollup buckets covered by the range
+        full_start = bucket_start(range_start, period_type)
+        
+        if full_start < range_start:
+            full_start = next_bucket_start(full_start, period_type)
+        
+        full_end = bucket_start(range_end, period_type)
+        
+        if full_start < full_end:
+            clauses = [
+                {'period_type': period_type, 'bucket_start': {'$gte': full_start, '$lt': full_end}},
+                {'period_type': 'daily', 'bucket_start': {'$gte': range_start, '$lt': full_start}},
+                {'period_type': 'daily', 'bucket_start': {'$gte': full_end, '$lt': range_end}}
+            ]
+        else:
+            clauses = [{'period_type': 'daily', 'bucket_start': {'$gte': range_start, '$lt': range_end}}]
+        
+        match = {'user_id': user_id, '$or': clauses}
+        
+        if platform:
+            match['platform'] = platform
+        
+        if campaign_id:
+            match['campaign_id'] = campaign_id
+        
+        group = {'_id': '$bucket_start'}
+        group.update({metric: {'$sum': f'${metric}'} for metric in ROLLUP_METRICS})
+        
+        rows = list(AnalyticsRollup._get_collection().aggregate([
+            {'$match': match},
+            {'$group': group}
+        ]))
+        
+        # Initialize every period in the range
+        buckets = get_calendar_buckets(range_start, bucket_start(end_date, 'daily'), group_by)
+        grouped_metrics = [
+            {
+                'period': label,
+                'key': key,
+                'impressions': 0,
+                'clicks': 0,
+                'conversions': 0,
+                'spend': 0.0,
+                'revenue': 0.0
+            }
+            for label, key in zip(buckets.labels(), buckets.keys())
+        ]
+        
+        # Fold rollup rows (whole buckets and edge days) into their period
+        for row, index in zip(rows, buckets.assign(row['_id'] for row in rows)):
+            if index < 0:
+                continue
+            
+            bucket = grouped_metrics[index]
+            bucket['impressions'] += row.get('impressions', 0)
+            bucket['clicks'] += row.get('clicks', 0)
+            bucket['conversions'] += row.get('conversions', 0)
+            bucket['spend'] += row.get('spent', 0.0)
+            bucket['revenue'] += row.get('revenue', 0.0)
+        
+        # Calculate derived metrics for each period
+        apply_derived_metrics(grouped_metrics)
+        
+        return grouped_metrics
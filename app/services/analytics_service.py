@@ -1,21 +1,41 @@
 """
 AdGenius AI Backend - Analytics Service
 """
-import uuid
+import functools
+import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
+
+from pymongo import UpdateOne
 
 from app.models.user import User
 from app.models.campaign import Campaign
-from app.models.analytics import (
-    CampaignAnalytics, UserAnalytics, DailyMetric, 
-    AudienceInsight, CreativePerformance, Recommendation
-)
+from app.models.analytics import CampaignAnalytics
 from app.platform_connectors.facebook_connector import FacebookConnector
 from app.platform_connectors.instagram_connector import InstagramConnector
 from app.platform_connectors.tiktok_connector import TikTokConnector
 from app.platform_connectors.shopee_connector import ShopeeConnector
+from app.platform_connectors.shopee_async_connector import AsyncShopeeConnector
+from app.platform_connectors.tiktok_async_connector import AsyncTikTokConnector
 from app.ai_modules.campaign_optimization import CampaignOptimizationAI
+from app.services.analytics_aggregator import AnalyticsAggregator
+from app.services.analytics_cache import cached_result, get_analytics_cache
+from app.services.analytics_compaction import HourlyCompactor
+from app.services.analytics_dedupe import dedupe_campaign_analytics
+from app.services.analytics_pipeline import DashboardPipeline, resolve_sections
+from app.services.analytics_prefix_index import PrefixSumIndex
+from app.services.analytics_query import SUMMARY_FIELDS, AnalyticsQuery, is_requested
+from app.services.analytics_store import get_metrics_store
+from app.services.analytics_rollup import (
+    AnalyticsRollupService, ROLLUP_METRICS, bucket_start as rollup_bucket_start
+)
+from app.services.audience_insights import InsightMerger
+from app.services.campaign_lookup import LOOKUP_FIELDS, get_identity_map
+from app.utils.calendar_buckets import local_now, previous_period
+from app.utils.concurrency import run_bounded
+from app.utils.metrics import (
+    apply_roi_metrics, compare_summaries, derive_roi_row, hourly_metrics_by_day, summarize
+)
 
 class AnalyticsService:
     """Analytics service"""
@@ -24,21 +44,51 @@ class AnalyticsService:
         """Initialize analytics service"""
         self.facebook_connector = FacebookConnector()
         self.instagram_connector = InstagramConnector()
-        self.tiktok_connector = TikTokConnector()
-        self.shopee_connector = ShopeeConnector()
+        
+        # CONNECTOR_RUNTIME=async requests each fetch's independent calls at once
+        if os.getenv('CONNECTOR_RUNTIME', 'sync') == 'async':
+            self.tiktok_connector = AsyncTikTokConnector()
+            self.shopee_connector = AsyncShopeeConnector()
+        else:
+            self.tiktok_connector = TikTokConnector()
+            self.shopee_connector = ShopeeConnector()
+        
         self.optimization_ai = CampaignOptimizationAI()
+        self.rollup_service = AnalyticsRollupService()
+        self.prefix_index = PrefixSumIndex()
+        self.metrics_store = get_metrics_store()
+        self.cache = get_analytics_cache()
+        
+        # Platform fetch fan-out limits
+        self.fetch_concurrency = int(os.getenv('ANALYTICS_FETCH_CONCURRENCY', 4))
+        self.fetch_deadline = float(os.getenv('ANALYTICS_FETCH_DEADLINE', 20))
+        
+        # Dashboard breakdowns share one $facet aggregation unless split per section
+        self.dashboard_section_mode = os.getenv('DASHBOARD_SECTION_MODE', 'facet')
+        self.dashboard_concurrency = int(os.getenv('DASHBOARD_SECTION_CONCURRENCY', 4))
     
+    @cached_result('dashboard')
     def get_dashboard_data(self, user_id: str, start_date: Optional[str] = None, 
-                          end_date: Optional[str] = None, platform: Optional[str] = None) -> Dict:
+                          end_date: Optional[str] = None, platform: Optional[str] = None,
+                          sections: Optional[Union[str, List[str]]] = None, compare: bool = False) -> Dict:
         """
         Get analytics dashboard data
         
+        Only the requested sections are computed. Breakdowns are facets of one
+        aggregation, which runs beside the prefix-sum totals on a bounded thread
+        pool; DASHBOARD_SECTION_MODE=split gives each breakdown its own unit.
+        
         Args:
             user_id (str): User ID
             start_date (Optional[str], optional): Start date. Defaults to None.
             end_date (Optional[str], optional): End date. Defaults to None.
             platform (Optional[str], optional): Platform. Defaults to None.
-            
+            sections (Optional[Union[str, List[str]]], optional): Sections to compute (summary,
+                daily_metrics, platform_breakdown, campaign_breakdown, recommendations).
+                Defaults to the user's dashboard widgets, or every section.
+            compare (bool, optional): Compare summary totals with the window of the same length
+                just before. Defaults to False.
+        
         Returns:
             Dict: Dashboard data
         """
@@ -48,9 +98,9 @@ class AnalyticsService:
         if not user:
             return {'error': 'User not found'}
         
-        # Set default date range if not provided (last 30 days)
+        # Set default date range if not provided (last 30 days, in the user's time zone)
         if not end_date:
-            end_date_obj = datetime.utcnow()
+            end_date_obj = local_now(self._get_timezone(user))
         else:
             end_date_obj = datetime.fromisoformat(end_date)
         
@@ -65,76 +115,74 @@ class AnalyticsService:
         if platform:
             campaign_query['platform'] = platform
         
-        # Get campaigns
-        campaigns = Campaign.objects(**campaign_query)
+        # Get campaigns, shared with the breakdown name lookups
+        campaigns = list(Campaign.objects(**campaign_query).only(*LOOKUP_FIELDS))
+        identity_map = get_identity_map()
+        identity_map.add(campaigns)
         
         # Get campaign IDs
         campaign_ids = [str(campaign.id) for campaign in campaigns]
         
-        # Create query for analytics
-        analytics_query = {
-            'user': user,
-            'start_date__lte': end_date_obj,
-            'end_date__gte': start_date_obj if 'end_date' in CampaignAnalytics._fields else None
-        }
+        # Breakdowns are aggregated on the database server
+        pipeline = DashboardPipeline(
+            user_id=str(user.id),
+            start_date=start_date_obj,
+            end_date=end_date_obj,
+            campaign_ids=campaign_ids,
+            platform=platform,
+            include_totals=False,
+            store=self.metrics_store,
+            sections=resolve_sections(sections or user.settings.dashboard_widgets)
+        )
         
-        if campaign_ids:
-            analytics_query['campaign__in'] = campaign_ids
+        if self.dashboard_section_mode == 'split':
+            tasks = pipeline.section_tasks(identity_map)
+        elif pipeline.aggregated_sections():
+            tasks = {'breakdowns': lambda: pipeline.run(identity_map)}
+        else:
+            tasks = {}
         
-        if platform:
-            analytics_query['platform'] = platform
+        # Summary totals come from the prefix-sum index, with the previous window in the same query
+        windows = [(start_date_obj, end_date_obj)]
         
-        # Get analytics
-        analytics_list = CampaignAnalytics.objects(**analytics_query)
+        if compare:
+            windows.append(previous_period(start_date_obj, end_date_obj))
         
-        # Calculate totals
-        total_impressions = sum(analytics.total_impressions for analytics in analytics_list)
-        total_clicks = sum(analytics.total_clicks for analytics in analytics_list)
-        total_conversions = sum(analytics.total_conversions for analytics in analytics_list)
-        total_spend = sum(analytics.total_spend for analytics in analytics_list)
-        total_revenue = sum(analytics.total_revenue for analytics in analytics_list)
+        if compare or 'summary' in pipeline.sections:
+            tasks['totals'] = lambda: self.prefix_index.range_totals_many(
+                user_id=str(user.id),
+                windows=windows,
+                campaign_ids=campaign_ids,
+                platform=platform
+            )
         
-        # Calculate averages
-        average_ctr = (total_clicks / total_impressions * 100) if total_impressions > 0 else 0
-        average_cpc = (total_spend / total_clicks) if total_clicks > 0 else 0
-        average_cpm = (total_spend / total_impressions * 1000) if total_impressions > 0 else 0
-        average_conversion_rate = (total_conversions / total_clicks * 100) if total_clicks > 0 else 0
-        average_cost_per_conversion = (total_spend / total_conversions) if total_conversions > 0 else 0
-        roas = (total_revenue / total_spend) if total_spend > 0 else 0
+        results, errors = run_bounded(tasks, max_workers=self.dashboard_concurrency)
         
-        # Get daily metrics
-        daily_metrics = self._get_daily_metrics(analytics_list, start_date_obj, end_date_obj)
+        if errors:
+            return {'error': '; '.join(f'{section}: {error}' for section, error in sorted(errors.items()))}
         
-        # Get platform breakdown
-        platform_breakdown = self._get_platform_breakdown(analytics_list)
+        results.update(results.pop('breakdowns', {}))
         
-        # Get campaign breakdown
-        campaign_breakdown = self._get_campaign_breakdown(analytics_list)
+        if 'summary' in pipeline.sections:
+            results['summary'] = dict(
+                {
+                    'total_campaigns': len(campaign_ids),
+                    'active_campaigns': Campaign.objects(user=user, status='active').count()
+                },
+                **summarize(results['totals'][0])
+            )
         
-        # Get recommendations
-        recommendations = self._get_recommendations(analytics_list)
+        dashboard = {section: results[section] for section in pipeline.sections}
         
-        return {
-            'summary': {
-                'total_campaigns': len(campaign_ids),
-                'active_campaigns': Campaign.objects(user=user, status='active').count(),
-                'total_impressions': total_impressions,
-                'total_clicks': total_clicks,
-                'total_conversions': total_conversions,
-                'total_spend': total_spend,
-                'total_revenue': total_revenue,
-                'average_ctr': average_ctr,
-                'average_cpc': average_cpc,
-                'average_cpm': average_cpm,
-                'average_conversion_rate': average_conversion_rate,
-                'average_cost_per_conversion': average_cost_per_conversion,
-                'roas': roas
-            },
-            'daily_metrics': daily_metrics,
-            'platform_breakdown': platform_breakdown,
-            'campaign_breakdown': campaign_breakdown,
-            'recommendations': recommendations
-        }
+        if compare:
+            previous_start, previous_end = windows[1]
+            dashboard['comparison'] = dict(
+                compare_summaries(summarize(results['totals'][0]), summarize(results['totals'][1])),
+                previous_start_date=previous_start.isoformat(),
+                previous_end_date=previous_end.isoformat()
+            )
+        
+        return dashboard
     
     def get_campaign_analytics(self, user_id: str, campaign_id: str, 
                               start_date: Optional[str] = None, end_date: Optional[str] = None, 
@@ -148,7 +196,7 @@ class AnalyticsService:
             start_date (Optional[str], optional): Start date. Defaults to None.
             end_date (Optional[str], optional): End date. Defaults to None.
             metrics (Optional[List[str]], optional): Metrics to include. Defaults to None.
-            
+        
         Returns:
             Dict: Campaign analytics
         """
@@ -164,9 +212,9 @@ class AnalyticsService:
         if not campaign:
             return {'error': 'Campaign not found'}
         
-        # Set default date range if not provided (last 30 days)
+        # Set default date range if not provided (last 30 days, in the campaign's time zone)
         if not end_date:
-            end_date_obj = datetime.utcnow()
+            end_date_obj = local_now(self._get_timezone(user, campaign))
         else:
             end_date_obj = datetime.fromisoformat(end_date)
         
@@ -176,32 +224,34 @@ class AnalyticsService:
             start_date_obj = datetime.fromisoformat(start_date)
         
         # Find analytics
-        analytics = CampaignAnalytics.objects(
-            user=user,
-            campaign=campaign,
-            start_date__lte=end_date_obj,
-            end_date__gte=start_date_obj if 'end_date' in CampaignAnalytics._fields else None
-        ).first()
-        
-        if not analytics:
+        query = AnalyticsQuery(
+            user_id=str(user.id),
+            start_date=start_date_obj,
+            end_date=end_date_obj,
+            campaign_ids=[str(campaign.id)]
+        )
+        analytics_list = list(self.metrics_store.find(query, *SUMMARY_FIELDS, 'ai_recommendations'))
+        
+        if not analytics_list:
             # If no analytics found, fetch from platform
             connector = self._get_platform_connector(campaign.platform)
             
             if not connector:
                 return {'error': f'Platform {campaign.platform} is not supported'}
             
+            arguments = self._get_analytics_arguments(user, campaign, start_date_obj, end_date_obj)
+            
+            if arguments is None:
+                return {'error': f'No {campaign.platform} account connected'}
+            
             # Fetch analytics from platform
-            platform_analytics = connector.get_campaign_analytics(
-                campaign_id=campaign.platform_campaign_id,
-                start_date=start_date_obj,
-                end_date=end_date_obj
-            )
+            platform_analytics = connector.get_campaign_analytics(**arguments)
             
             if 'error' in platform_analytics:
                 return platform_analytics
             
-            # Create analytics object
-            analytics = self._create_campaign_analytics(
+            # Store daily analytics
+            analytics_list = self._create_campaign_analytics(
                 user=user,
                 campaign=campaign,
                 platform=campaign.platform,
@@ -209,24 +259,44 @@ class AnalyticsService:
                 end_date=end_date_obj,
                 data=platform_analytics
             )
+            
+            if not analytics_list:
+                return {'error': 'No analytics data found'}
         
-        # Filter metrics if provided
-        result = analytics.to_dict()
+        aggregator = AnalyticsAggregator(start_date_obj, end_date_obj).consume(analytics_list)
         
-        if metrics:
-            result = {k: v for k, v in result.items() if k in metrics or k in ['id', 'campaign_id', 'user_id']}
+        # Filter metrics if provided
+        result = {
+            'campaign_id': str(campaign.id),
+            'user_id': str(user.id),
+            'platform': campaign.platform,
+            'start_date': start_date_obj.isoformat(),
+            'end_date': end_date_obj.isoformat()
+        }
+        result.update({k: v for k, v in aggregator.summary().items() if is_requested(k, metrics)})
         
         # Add daily metrics
-        result['daily_metrics'] = analytics.get_daily_metrics()
+        if is_requested('daily_metrics', metrics):
+            result['daily_metrics'] = aggregator.daily_metrics()
+        
+        # Sub-documents stay on the campaign analytics documents, so the latest day is read from there
+        if is_requested('audience_insights', metrics) or is_requested('creative_performance', metrics):
+            latest = query.find('demographic_data', 'device_data', 'top_ads').order_by('-date').first()
         
-        # Add audience insights
-        result['audience_insights'] = analytics.get_audience_insights()
+        # Add audience insights from the latest day, fetched only when asked for
+        if is_requested('audience_insights', metrics):
+            result['audience_insights'] = {
+                'demographic_data': latest.demographic_data,
+                'device_data': latest.device_data
+            }
         
         # Add creative performance
-        result['creative_performance'] = analytics.get_creative_performance()
+        if is_requested('creative_performance', metrics):
+            result['creative_performance'] = latest.top_ads
         
         # Add recommendations
-        result['recommendations'] = analytics.get_recommendations()
+        if is_requested('recommendations', metrics):
+            result['recommendations'] = aggregator.recommendations
         
         return result
     
@@ -242,7 +312,7 @@ class AnalyticsService:
             start_date (Optional[str], optional): Start date. Defaults to None.
             end_date (Optional[str], optional): End date. Defaults to None.
             metrics (Optional[List[str]], optional): Metrics to include. Defaults to None.
-            
+        
         Returns:
             Dict: Platform analytics
         """
@@ -252,9 +322,9 @@ class AnalyticsService:
         if not user:
             return {'error': 'User not found'}
         
-        # Set default date range if not provided (last 30 days)
+        # Set default date range if not provided (last 30 days, in the user's time zone)
         if not end_date:
-            end_date_obj = datetime.utcnow()
+            end_date_obj = local_now(self._get_timezone(user))
         else:
             end_date_obj = datetime.fromisoformat(end_date)
         
@@ -264,14 +334,18 @@ class AnalyticsService:
             start_date_obj = datetime.fromisoformat(start_date)
         
         # Find analytics
-        analytics_list = CampaignAnalytics.objects(
-            user=user,
-            platform=platform,
-            start_date__lte=end_date_obj,
-            end_date__gte=start_date_obj if 'end_date' in CampaignAnalytics._fields else None
-        )
-        
-        if not analytics_list:
+        analytics_list = self.metrics_store.find(AnalyticsQuery(
+            user_id=str(user.id),
+            start_date=start_date_obj,
+            end_date=end_date_obj,
+            platform=platform
+        ), *SUMMARY_FIELDS)
+        
+        # Aggregate every breakdown in one pass over the cursor
+        aggregator = AnalyticsAggregator(start_date_obj, end_date_obj).consume(analytics_list)
+        fetch_errors = {}
+        
+        if not aggregator.count:
             # If no analytics found, fetch from platform
             connector = self._get_platform_connector(platform)
             
@@ -284,83 +358,81 @@ class AnalyticsService:
             if not campaigns:
                 return {'error': f'No campaigns found for platform {platform}'}
             
-            # Fetch analytics for each campaign
-            analytics_list = []
+            published = [campaign for campaign in campaigns if campaign.platform_campaign_id]
             
-            for campaign in campaigns:
-                if not campaign.platform_campaign_id:
-                    continue
+            # Shopee reports per shop, so one shop-level fetch is stored on the first campaign
+            if platform == 'shopee':
+                published = published[:1]
+            
+            arguments = {}
+            
+            for campaign in published:
+                arguments[campaign] = self._get_analytics_arguments(user, campaign, start_date_obj, end_date_obj)
                 
-                # Fetch analytics from platform
-                platform_analytics = connector.get_campaign_analytics(
-                    campaign_id=campaign.platform_campaign_id,
-                    start_date=start_date_obj,
-                    end_date=end_date_obj
+                if arguments[campaign] is None:
+                    return {'error': f'No {platform} account connected'}
+            
+            # Fetch analytics for every campaign concurrently, within the deadline
+            if hasattr(connector, 'get_campaigns_analytics'):
+                # The async runtime gathers every campaign on one event loop and session
+                responses, fetch_errors = connector.get_campaigns_analytics(
+                    arguments,
+                    max_concurrency=self._get_fetch_concurrency(platform),
+                    timeout=self.fetch_deadline
+                )
+            else:
+                responses, fetch_errors = run_bounded(
+                    {
+                        campaign: functools.partial(connector.get_campaign_analytics, **kwargs)
+                        for campaign, kwargs in arguments.items()
+                    },
+                    max_workers=self._get_fetch_concurrency(platform),
+                    timeout=self.fetch_deadline
                 )
+            
+            payloads = []
+            
+            for campaign in arguments:
+                platform_analytics = responses.get(campaign)
                 
-                if 'error' in platform_analytics:
+                if platform_analytics is None:
                     continue
                 
-                # Create analytics object
-                analytics = self._create_campaign_analytics(
-                    user=user,
-                    campaign=campaign,
-                    platform=platform,
-                    start_date=start_date_obj,
-                    end_date=end_date_obj,
-                    data=platform_analytics
-                )
+                if 'error' in platform_analytics:
+                    fetch_errors[campaign] = platform_analytics['error']
+                    continue
                 
-                analytics_list.append(analytics)
-        
-        # Calculate totals
-        total_impressions = sum(analytics.total_impressions for analytics in analytics_list)
-        total_clicks = sum(analytics.total_clicks for analytics in analytics_list)
-        total_conversions = sum(analytics.total_conversions for analytics in analytics_list)
-        total_spend = sum(analytics.total_spend for analytics in analytics_list)
-        total_revenue = sum(analytics.total_revenue for analytics in analytics_list)
-        
-        # Calculate averages
-        average_ctr = (total_clicks / total_impressions * 100) if total_impressions > 0 else 0
-        average_cpc = (total_spend / total_clicks) if total_clicks > 0 else 0
-        average_cpm = (total_spend / total_impressions * 1000) if total_impressions > 0 else 0
-        average_conversion_rate = (total_conversions / total_clicks * 100) if total_clicks > 0 else 0
-        average_cost_per_conversion = (total_spend / total_conversions) if total_conversions > 0 else 0
-        roas = (total_revenue / total_spend) if total_spend > 0 else 0
-        
-        # Get daily metrics
-        daily_metrics = self._get_daily_metrics(analytics_list, start_date_obj, end_date_obj)
-        
-        # Get campaign breakdown
-        campaign_breakdown = self._get_campaign_breakdown(analytics_list)
+                payloads.append((campaign, platform_analytics))
+            
+            # Store daily analytics for every campaign in one bulk write
+            aggregator.consume(self.ingest_campaign_analytics(user, platform, payloads))
         
         # Filter metrics if provided
         result = {
             'platform': platform,
             'start_date': start_date_obj.isoformat(),
-            'end_date': end_date_obj.isoformat(),
-            'total_impressions': total_impressions,
-            'total_clicks': total_clicks,
-            'total_conversions': total_conversions,
-            'total_spend': total_spend,
-            'total_revenue': total_revenue,
-            'average_ctr': average_ctr,
-            'average_cpc': average_cpc,
-            'average_cpm': average_cpm,
-            'average_conversion_rate': average_conversion_rate,
-            'average_cost_per_conversion': average_cost_per_conversion,
-            'roas': roas,
-            'daily_metrics': daily_metrics,
-            'campaign_breakdown': campaign_breakdown
+            'end_date': end_date_obj.isoformat()
         }
+        result.update({k: v for k, v in aggregator.summary().items() if is_requested(k, metrics)})
+        
+        if is_requested('daily_metrics', metrics):
+            result['daily_metrics'] = aggregator.daily_metrics()
+        
+        if is_requested('campaign_breakdown', metrics):
+            result['campaign_breakdown'] = aggregator.campaign_breakdown()
         
-        if metrics:
-            result = {k: v for k, v in result.items() if k in metrics or k in ['platform', 'start_date', 'end_date']}
+        # Flag campaigns that failed or missed the deadline
+        if fetch_errors:
+            result['partial'] = True
+            result['failed_campaigns'] = [
+                {'campaign_id': str(campaign.id), 'error': error}
+                for campaign, error in fetch_errors.items()
+            ]
         
         return result
     
     def get_audience_insights(self, user_id: str, platform: Optional[str] = None, 
-                             campaign_id: Optional[str] = None) -> Dict:
+                             campaign_id: Optional[str] = None, top_n: Optional[int] = None) -> Dict:
         """
         Get audience insights
         
@@ -368,7 +440,8 @@ class AnalyticsService:
             user_id (str): User ID
             platform (Optional[str], optional): Platform. Defaults to None.
             campaign_id (Optional[str], optional): Campaign ID. Defaults to None.
-            
+            top_n (Optional[int], optional): Entries kept per dimension. Defaults to None (keep all).
+        
         Returns:
             Dict: Audience insights
         """
@@ -379,10 +452,7 @@ class AnalyticsService:
             return {'error': 'User not found'}
         
         # Create query
-        query = {'user': user}
-        
-        if platform:
-            query['platform'] = platform
+        query = AnalyticsQuery(user_id=str(user.id), platform=platform)
         
         if campaign_id:
             campaign = Campaign.objects(id=campaign_id, user=user).first()
@@ -390,101 +460,29 @@ class AnalyticsService:
             if not campaign:
                 return {'error': 'Campaign not found'}
             
-            query['campaign'] = campaign
+            query.campaign_ids = [str(campaign.id)]
         
-        # Find analytics
-        analytics_list = CampaignAnalytics.objects(**query)
+        # Combine audience insights in one pass over the cursor
+        merger = InsightMerger()
         
-        if not analytics_list:
-            return {'error': 'No analytics data found'}
-        
-        # Combine audience insights
-        combined_insights = {
-            'age_gender': {},
-            'locations': {},
-            'interests': {},
-            'behaviors': {},
-            'devices': {},
-            'platforms': {},
-            'placements': {},
-            'time_of_day': {},
-            'day_of_week': {}
-        }
-        
-        for analytics in analytics_list:
-            if not analytics.audience_insights:
-                continue
-            
-            insights = analytics.get_audience_insights()
-            
-            # Combine age_gender
-            for age_gender, value in insights.get('age_gender', {}).items():
-                if age_gender in combined_insights['age_gender']:
-                    combined_insights['age_gender'][age_gender] += value
-                else:
-                    combined_insights['age_gender'][age_gender] = value
-            
-            # Combine locations
-            for location, value in insights.get('locations', {}).items():
-                if location in combined_insights['locations']:
-                    combined_insights['locations'][location] += value
-                else:
-                    combined_insights['locations'][location] = value
-            
-            # Combine interests
-            for interest, value in insights.get('interests', {}).items():
-                if interest in combined_insights['interests']:
-                    combined_insights['interests'][interest] += value
-                else:
-                    combined_insights['interests'][interest] = value
-            
-            # Combine behaviors
-            for behavior, value in insights.get('behaviors', {}).items():
-                if behavior in combined_insights['behaviors']:
-                    combined_insights['behaviors'][behavior] += value
-                else:
-                    combined_insights['behaviors'][behavior] = value
+        for analytics in query.find('demographic_data', 'device_data'):
+            insights = dict(analytics.demographic_data or {})
             
-            # Combine devices
-            for device, value in insights.get('devices', {}).items():
-                if device in combined_insights['devices']:
-                    combined_insights['devices'][device] += value
-                else:
-                    combined_insights['devices'][device] = value
+            if analytics.device_data:
+                insights['devices'] = analytics.device_data
             
-            # Combine platforms
-            for platform_name, value in insights.get('platforms', {}).items():
-                if platform_name in combined_insights['platforms']:
-                    combined_insights['platforms'][platform_name] += value
-                else:
-                    combined_insights['platforms'][platform_name] = value
-            
-            # Combine placements
-            for placement, value in insights.get('placements', {}).items():
-                if placement in combined_insights['placements']:
-                    combined_insights['placements'][placement] += value
-                else:
-                    combined_insights['placements'][placement] = value
-            
-            # Combine time_of_day
-            for time, value in insights.get('time_of_day', {}).items():
-                if time in combined_insights['time_of_day']:
-                    combined_insights['time_of_day'][time] += value
-                else:
-                    combined_insights['time_of_day'][time] = value
-            
-            # Combine day_of_week
-            for day, value in insights.get('day_of_week', {}).items():
-                if day in combined_insights['day_of_week']:
-                    combined_insights['day_of_week'][day] += value
-                else:
-                    combined_insights['day_of_week'][day] = value
-        
-        return combined_insights
+            merger.add(insights)
+        
+        if not merger.count:
+            return {'error': 'No analytics data found'}
+        
+        return merger.result(top_n)
     
+    @cached_result('performance')
     def get_performance_metrics(self, user_id: str, start_date: Optional[str] = None, 
                                end_date: Optional[str] = None, platform: Optional[str] = None, 
-                               campaign_id: Optional[str] = None, group_by: str = 'day') -> Dict:
+                               campaign_id: Optional[str] = None, group_by: str = 'day',
+                               compare: bool = False) -> Dict:
         """
         Get performance metrics
         
@@ -494,8 +492,9 @@ class AnalyticsService:
             end_date (Optional[str], optional): End date. Defaults to None.
             platform (Optional[str], optional): Platform. Defaults to None.
             campaign_id (Optional[str], optional): Campaign ID. Defaults to None.
-            group_by (str, optional): Group by (day, week, month). Defaults to 'day'.
-            
+            group_by (str, optional): Group by (day, week, month, quarter, year). Defaults to 'day'.
+            compare (bool, optional): Compare with the window of the same length just before. Defaults to False.
+        
         Returns:
             Dict: Performance metrics
         """
@@ -505,9 +504,19 @@ class AnalyticsService:
         if not user:
             return {'error': 'User not found'}
         
-        # Set default date range if not provided (last 30 days)
+        campaign = None
+        
+        if campaign_id:
+            campaign = Campaign.objects(id=campaign_id, user=user).first()
+            
+            if not campaign:
+                return {'error': 'Campaign not found'}
+        
+        timezone = self._get_timezone(user, campaign)
+        
+        # Set default date range if not provided (last 30 days, in that time zone)
         if not end_date:
-            end_date_obj = datetime.utcnow()
+            end_date_obj = local_now(timezone)
         else:
             end_date_obj = datetime.fromisoformat(end_date)
         
@@ -516,43 +525,78 @@ class AnalyticsService:
         else:
             start_date_obj = datetime.fromisoformat(start_date)
         
-        # Create query
-        query = {
-            'user': user,
-            'start_date__lte': end_date_obj,
-            'end_date__gte': start_date_obj if 'end_date' in CampaignAnalytics._fields else None
-        }
+        previous_start, previous_end = previous_period(start_date_obj, end_date_obj)
         
-        if platform:
-            query['platform'] = platform
+        # Create query, reaching back over the previous window when comparing
+        query = AnalyticsQuery(
+            user_id=str(user.id),
+            start_date=previous_start if compare else start_date_obj,
+            end_date=end_date_obj,
+            platform=platform
+        )
         
-        if campaign_id:
-            campaign = Campaign.objects(id=campaign_id, user=user).first()
-            
-            if not campaign:
-                return {'error': 'Campaign not found'}
+        if campaign:
+            query.campaign_ids = [str(campaign.id)]
+        
+        # Weekly, monthly, quarterly and yearly metrics come from pre-aggregated rollups
+        if group_by != 'day':
+            result = {
+                'metrics': self.rollup_service.get_period_metrics(
+                    user_id=str(user.id),
+                    group_by=group_by,
+                    start_date=start_date_obj,
+                    end_date=end_date_obj,
+                    platform=platform,
+                    campaign_id=campaign_id
+                ),
+                'timezone': timezone
+            }
+            
+            # Both windows' totals come from one prefix-sum index query
+            if compare:
+                current, previous = self.prefix_index.range_totals_many(
+                    user_id=str(user.id),
+                    windows=[(start_date_obj, end_date_obj), (previous_start, previous_end)],
+                    campaign_ids=query.campaign_ids,
+                    platform=platform
+                )
+                result['comparison'] = dict(
+                    compare_summaries(summarize(current), summarize(previous)),
+                    previous_start_date=previous_start.isoformat(),
+                    previous_end_date=previous_end.isoformat()
+                )
             
-            query['campaign'] = campaign
+            return result
         
-        # Find analytics
-        analytics_list = CampaignAnalytics.objects(**query)
+        # Find analytics, splitting the rows of both windows in one pass
+        aggregator = AnalyticsAggregator(start_date_obj, end_date_obj)
+        previous_aggregator = AnalyticsAggregator(previous_start, previous_end)
+        first_day = datetime(start_date_obj.year, start_date_obj.month, start_date_obj.day)
         
-        if not analytics_list:
+        for analytics in self.metrics_store.find(query, *SUMMARY_FIELDS):
+            if analytics.date >= first_day:
+                aggregator.add(analytics)
+            else:
+                previous_aggregator.add(analytics)
+        
+        if not aggregator.count:
             return {'error': 'No analytics data found'}
         
-        # Get daily metrics
-        daily_metrics = self._get_daily_metrics(analytics_list, start_date_obj, end_date_obj)
+        result = {
+            'metrics': aggregator.daily_metrics(),
+            'timezone': timezone
+        }
         
-        # Group metrics
-        if group_by == 'day':
-            grouped_metrics = daily_metrics
-        else:
-            grouped_metrics = self._group_metrics(daily_metrics, group_by)
+        if compare:
+            result['comparison'] = dict(
+                compare_summaries(aggregator.summary(), previous_aggregator.summary()),
+                previous_start_date=previous_start.isoformat(),
+                previous_end_date=previous_end.isoformat()
+            )
         
-        return {
-            'metrics': grouped_metrics
-        }
+        return result
     
+    @cached_result('roi')
     def get_roi_analysis(self, user_id: str, start_date: Optional[str] = None, 
                         end_date: Optional[str] = None, platform: Optional[str] = None, 
                         campaign_id: Optional[str] = None) -> Dict:
@@ -565,7 +609,7 @@ class AnalyticsService:
             end_date (Optional[str], optional): End date. Defaults to None.
             platform (Optional[str], optional): Platform. Defaults to None.
             campaign_id (Optional[str], optional): Campaign ID. Defaults to None.
-            
+        
         Returns:
             Dict: ROI analysis
         """
@@ -575,9 +619,20 @@ class AnalyticsService:
         if not user:
             return {'error': 'User not found'}
         
-        # Set default date range if not provided (last 30 days)
+        identity_map = get_identity_map()
+        campaign = None
+        
+        if campaign_id:
+            campaign = Campaign.objects(id=campaign_id, user=user).only(*LOOKUP_FIELDS, 'schedule').first()
+            
+            if not campaign:
+                return {'error': 'Campaign not found'}
+            
+            identity_map.add([campaign])
+        
+        # Set default date range if not provided (last 30 days, in the campaign's or user's time zone)
         if not end_date:
-            end_date_obj = datetime.utcnow()
+            end_date_obj = local_now(self._get_timezone(user, campaign))
         else:
             end_date_obj = datetime.fromisoformat(end_date)
         
@@ -587,120 +642,80 @@ class AnalyticsService:
             start_date_obj = datetime.fromisoformat(start_date)
         
         # Create query
-        query = {
-            'user': user,
-            'start_date__lte': end_date_obj,
-            'end_date__gte': start_date_obj if 'end_date' in CampaignAnalytics._fields else None
-        }
-        
-        if platform:
-            query['platform'] = platform
-        
-        if campaign_id:
-            campaign = Campaign.objects(id=campaign_id, user=user).first()
-            
-            if not campaign:
-                return {'error': 'Campaign not found'}
-            
-            query['campaign'] = campaign
+        query = AnalyticsQuery(
+            user_id=str(user.id),
+            start_date=start_date_obj,
+            end_date=end_date_obj,
+            platform=platform,
+            campaign_ids=[str(campaign.id)] if campaign else None
+        )
         
         # Find analytics
-        analytics_list = CampaignAnalytics.objects(**query)
+        aggregator = AnalyticsAggregator(start_date_obj, end_date_obj).consume(
+            self.metrics_store.find(query, *SUMMARY_FIELDS)
+        )
         
-        if not analytics_list:
+        if not aggregator.count:
             return {'error': 'No analytics data found'}
         
-        # Calculate ROI metrics
-        total_spend = sum(analytics.total_spend for analytics in analytics_list)
-        total_revenue = sum(analytics.total_revenue for analytics in analytics_list)
-        total_conversions = sum(analytics.total_conversions for analytics in analytics_list)
-        
-        # Calculate ROI
-        roi = ((total_revenue - total_spend) / total_spend * 100) if total_spend > 0 else 0
-        
-        # Calculate ROAS
-        roas = (total_revenue / total_spend) if total_spend > 0 else 0
+        # Calculate ROI metrics from the prefix-sum index
+        summary = summarize(self.prefix_index.range_totals(
+            user_id=str(user.id),
+            start_date=start_date_obj,
+            end_date=end_date_obj,
+            campaign_ids=[campaign_id] if campaign_id else None,
+            platform=platform
+        ))
+        total_spend = summary['total_spend']
+        total_revenue = summary['total_revenue']
         
-        # Calculate cost per conversion
-        cost_per_conversion = (total_spend / total_conversions) if total_conversions > 0 else 0
-        
-        # Get daily ROI metrics
-        daily_metrics = self._get_daily_metrics(analytics_list, start_date_obj, end_date_obj)
+        # Calculate ROI and ROAS
+        roi_metrics = derive_roi_row(total_spend, total_revenue)
         
         # Calculate daily ROI
-        daily_roi = []
-        
-        for metric in daily_metrics:
-            spend = metric.get('spend', 0)
-            revenue = metric.get('revenue', 0)
-            
-            daily_roi_value = ((revenue - spend) / spend * 100) if spend > 0 else 0
-            
-            daily_roi.append({
-                'date': metric.get('date'),
-                'roi': daily_roi_value,
-                'roas': (revenue / spend) if spend > 0 else 0,
-                'spend': spend,
-                'revenue': revenue
-            })
+        daily_roi = apply_roi_metrics([
+            {
+                'date': metric['date'],
+                'spend': metric['spend'],
+                'revenue': metric['revenue']
+            }
+            for metric in aggregator.daily_metrics()
+        ])
         
         # Get platform breakdown
-        platform_breakdown = {}
-        
-        for analytics in analytics_list:
-            platform_name = analytics.platform
-            
-            if platform_name not in platform_breakdown:
-                platform_breakdown[platform_name] = {
-                    'spend': 0,
-                    'revenue': 0,
-                    'roi': 0,
-                    'roas': 0
-                }
-            
-            platform_breakdown[platform_name]['spend'] += analytics.total_spend
-            platform_breakdown[platform_name]['revenue'] += analytics.total_revenue
+        platform_breakdown = {
+            platform_name: {'spend': data['spend'], 'revenue': data['revenue']}
+            for platform_name, data in aggregator.platform_breakdown().items()
+        }
         
         # Calculate ROI and ROAS for each platform
-        for platform_name, data in platform_breakdown.items():
-            spend = data['spend']
-            revenue = data['revenue']
-            
-            data['roi'] = ((revenue - spend) / spend * 100) if spend > 0 else 0
-            data['roas'] = (revenue / spend) if spend > 0 else 0
+        apply_roi_metrics(list(platform_breakdown.values()))
         
         # Get campaign breakdown
         campaign_breakdown = {}
         
-        for analytics in analytics_list:
-            campaign_name = analytics.campaign.name
+        for data in aggregator.campaign_breakdown(identity_map=identity_map):
+            campaign_name = data['campaign_name']
             
             if campaign_name not in campaign_breakdown:
                 campaign_breakdown[campaign_name] = {
                     'spend': 0,
-                    'revenue': 0,
-                    'roi': 0,
-                    'roas': 0
+                    'revenue': 0
                 }
             
-            campaign_breakdown[campaign_name]['spend'] += analytics.total_spend
-            campaign_breakdown[campaign_name]['revenue'] += analytics.total_revenue
+            campaign_breakdown[campaign_name]['spend'] += data['spend']
+            campaign_breakdown[campaign_name]['revenue'] += data['revenue']
         
         # Calculate ROI and ROAS for each campaign
-        for campaign_name, data in campaign_breakdown.items():
-            spend = data['spend']
-            revenue = data['revenue']
-            
-            data['roi'] = ((revenue - spend) / spend * 100) if spend > 0 else 0
-            data['roas'] = (revenue / spend) if spend > 0 else 0
+        apply_roi_metrics(list(campaign_breakdown.values()))
         
         return {
             'summary': {
                 'total_spend': total_spend,
                 'total_revenue': total_revenue,
-                'roi': roi,
-                'roas': roas,
-                'cost_per_conversion': cost_per_conversion
+                'roi': roi_metrics['roi'],
+                'roas': roi_metrics['roas'],
+                'cost_per_conversion': summary['average_cost_per_conversion']
             },
             'daily_roi': daily_roi,
             'platform_breakdown': platform_breakdown,
@@ -716,7 +731,7 @@ class AnalyticsService:
             user_id (str): User ID
             platform (Optional[str], optional): Platform. Defaults to None.
             campaign_id (Optional[str], optional): Campaign ID. Defaults to None.
-            
+        
         Returns:
             Dict: Recommendations
         """
@@ -727,10 +742,7 @@ class AnalyticsService:
             return {'error': 'User not found'}
         
         # Create query
-        query = {'user': user}
-        
-        if platform:
-            query['platform'] = platform
+        query = AnalyticsQuery(user_id=str(user.id), platform=platform)
         
         if campaign_id:
             campaign = Campaign.objects(id=campaign_id, user=user).first()
@@ -738,19 +750,18 @@ class AnalyticsService:
             if not campaign:
                 return {'error': 'Campaign not found'}
             
-            query['campaign'] = campaign
+            query.campaign_ids = [str(campaign.id)]
         
         # Find analytics
-        analytics_list = CampaignAnalytics.objects(**query)
+        aggregator = AnalyticsAggregator().consume(
+            self.metrics_store.find(query, 'campaign_id', 'date', 'ai_recommendations')
+        )
         
-        if not analytics_list:
+        if not aggregator.count:
             return {'error': 'No analytics data found'}
         
         # Get recommendations
-        recommendations = []
-        
-        for analytics in analytics_list:
-            recommendations.extend(analytics.get_recommendations())
+        recommendations = aggregator.recommendations
         
         # If no recommendations found, generate new ones
         if not recommendations and campaign_id:
@@ -767,335 +778,380 @@ class AnalyticsService:
             'recommendations': recommendations
         }
     
-    def _get_daily_metrics(self, analytics_list: List[CampaignAnalytics], 
-                          start_date: datetime, end_date: datetime) -> List[Dict]:
+    def ingest_campaign_analytics(self, user: User, platform: str,
+                                  payloads: List[Tuple[Campaign, Dict]]) -> List[CampaignAnalytics]:
         """
-        Get daily metrics from analytics list
+        Upsert daily campaign analytics for many campaigns in one bulk write
+        
+        Days are keyed on (campaign_id, date, period_type), so refetching a range
+        updates the stored days instead of duplicating them. Rollup and prefix-sum
+        deltas are taken from the stored days read just before the write; an ingest
+        overlapping it for the same campaign can leave them off until
+        check_analytics_indexes repairs the drift.
         
         Args:
-            analytics_list (List[CampaignAnalytics]): Analytics list
-            start_date (datetime): Start date
-            end_date (datetime): End date
+            user (User): User
+            platform (str): Platform
+            payloads (List[Tuple[Campaign, Dict]]): Campaigns with their connector analytics data
+        
+        Returns:
+            List[CampaignAnalytics]: Daily campaign analytics, one per day in payload order
+        """
+        user_id = str(user.id)
+        rows = {}
+        
+        # A payload may repeat a day; the last copy wins, keeping any period-level insights
+        for campaign, data in payloads:
+            daily_rows = data.get('daily_metrics', [])
+            
+            for index, daily_data in enumerate(daily_rows):
+                date = rollup_bucket_start(datetime.fromisoformat(daily_data['date']), 'daily')
+                key = (str(campaign.id), date)
+                insights = data if index == len(daily_rows) - 1 else rows.get(key, (None, None))[1]
+                rows[key] = (daily_data, insights)
+        
+        if not rows:
+            return []
+        
+        collection = CampaignAnalytics._get_collection()
+        
+        # Load the stored metrics with one query to compute rollup deltas
+        previous = {
+            (document['campaign_id'], document['date']): document
+            for document in collection.find(
+                {
+                    'campaign_id': {'$in': list({campaign_id for campaign_id, _ in rows})},
+                    'date': {'$in': list({date for _, date in rows})},
+                    'period_type': 'daily'
+                },
+                dict({'campaign_id': 1, 'date': 1}, **dict.fromkeys(ROLLUP_METRICS, 1))
+            )
+        }
+        
+        now = datetime.utcnow()
+        analytics_list = []
+        documents = []
+        operations = []
+        changes = {}
+        
+        for (campaign_id, date), (daily_data, data) in rows.items():
+            analytics = CampaignAnalytics(
+                campaign_id=campaign_id,
+                user_id=user_id,
+                platform=platform,
+                date=date,
+                period_type='daily',
+                impressions=int(daily_data.get('impressions', 0)),
+                clicks=int(daily_data.get('clicks', 0)),
+                conversions=int(daily_data.get('conversions', 0)),
+                spent=float(daily_data.get('spend', 0.0)),
+                revenue=float(daily_data.get('revenue', 0.0)),
+                updated_at=now
+            )
             
+            # Attach period-level insights to the most recent day
+            if data is not None:
+                audience_data = dict(data.get('audience_insights', {}))
+                analytics.device_data = audience_data.pop('devices', {})
+                analytics.demographic_data = audience_data
+                analytics.top_ads = data.get('creative_performance', [])[:10]
+                analytics.ai_recommendations = [
+                    recommendation['description']
+                    for recommendation in data.get('recommendations', [])
+                    if recommendation.get('description')
+                ]
+            
+            analytics.calculate_metrics()
+            analytics.validate()
+            analytics_list.append(analytics)
+            
+            # Other days keep the insights stored by earlier fetches
+            document = analytics.to_mongo().to_dict()
+            on_insert = {'created_at': document.pop('created_at')}
+            
+            if data is None:
+                for field in CampaignAnalytics.HEAVY_FIELDS + ('ai_recommendations',):
+                    on_insert[field] = document.pop(field)
+            
+            operations.append(UpdateOne(
+                {'campaign_id': campaign_id, 'date': date, 'period_type': 'daily'},
+                {'$set': document, '$setOnInsert': on_insert},
+                upsert=True
+            ))
+            documents.append(document)
+            
+            stored = previous.get((campaign_id, date), {})
+            delta = {
+                metric: getattr(analytics, metric) - (stored.get(metric) or 0)
+                for metric in ROLLUP_METRICS
+            }
+            delta['date'] = date
+            changes.setdefault(campaign_id, {
+                'user_id': user_id,
+                'campaign_id': campaign_id,
+                'platform': platform,
+                'daily_deltas': []
+            })['daily_deltas'].append(delta)
+        
+        collection.bulk_write(operations, ordered=False)
+        
+        # Keep the metrics store, period rollups and the prefix-sum index in step with the daily documents
+        self.metrics_store.record_many(documents)
+        self.rollup_service.record_many(list(changes.values()))
+        self.prefix_index.record_many(list(changes.values()))
+        
+        # Cached results for this user are now stale
+        self.cache.invalidate(user_id)
+        
+        return analytics_list
+    
+    def ingest_hourly_analytics(self, user: User, platform: str,
+                                payloads: List[Tuple[Campaign, Dict]]) -> int:
+        """
+        Upsert hourly campaign analytics for many campaigns in one bulk write
+        
+        Hourly rows sit beside the daily rows and do not feed rollups or the
+        prefix-sum index; HourlyCompactor folds them into days once they age out.
+        
+        Args:
+            user (User): User
+            platform (str): Platform
+            payloads (List[Tuple[Campaign, Dict]]): Campaigns with their connector hourly data
+        
         Returns:
-            List[Dict]: Daily metrics
+            int: Number of hours written
         """
-        # Create date range
-        date_range = []
-        current_date = start_date
-        
-        while current_date <= end_date:
-            date_range.append(current_date.date())
-            current_date += timedelta(days=1)
-        
-        # Initialize daily metrics
-        daily_metrics = {date.isoformat(): {
-            'date': date.isoformat(),
-            'impressions': 0,
-            'clicks': 0,
-            'conversions': 0,
-            'spend': 0.0,
-            'revenue': 0.0,
-            'ctr': 0.0,
-            'cpc': 0.0,
-            'cpm': 0.0,
-            'conversion_rate': 0.0,
-            'cost_per_conversion': 0.0,
-            'roas': 0.0
-        } for date in date_range}
-        
-        # Aggregate daily metrics
-        for analytics in analytics_list:
-            for metric in analytics.daily_metrics:
-                date_str = metric.date.date().isoformat()
+        user_id = str(user.id)
+        now = datetime.utcnow()
+        documents = []
+        operations = []
+        
+        for campaign, data in payloads:
+            for hourly_data in data.get('hourly_metrics', []):
+                date = datetime.fromisoformat(hourly_data['date']).replace(minute=0, second=0, microsecond=0)
+                analytics = CampaignAnalytics(
+                    campaign_id=str(campaign.id),
+                    user_id=user_id,
+                    platform=platform,
+                    date=date,
+                    period_type='hourly',
+                    impressions=int(hourly_data.get('impressions', 0)),
+                    clicks=int(hourly_data.get('clicks', 0)),
+                    conversions=int(hourly_data.get('conversions', 0)),
+                    spent=float(hourly_data.get('spend', 0.0)),
+                    revenue=float(hourly_data.get('revenue', 0.0)),
+                    updated_at=now
+                )
+                analytics.calculate_metrics()
+                analytics.validate()
                 
-                if date_str in daily_metrics:
-                    daily_metrics[date_str]['impressions'] += metric.impressions
-                    daily_metrics[date_str]['clicks'] += metric.clicks
-                    daily_metrics[date_str]['conversions'] += metric.conversions
-                    daily_metrics[date_str]['spend'] += metric.spend
-                    daily_metrics[date_str]['revenue'] += metric.revenue
-        
-        # Calculate derived metrics
-        for date_str, metric in daily_metrics.items():
-            impressions = metric['impressions']
-            clicks = metric['clicks']
-            conversions = metric['conversions']
-            spend = metric['spend']
-            revenue = metric['revenue']
-            
-            # Calculate CTR
-            if impressions > 0:
-                metric['ctr'] = (clicks / impressions) * 100
-            
-            # Calculate CPC
-            if clicks > 0:
-                metric['cpc'] = spend / clicks
-            
-            # Calculate CPM
-            if impressions > 0:
-                metric['cpm'] = (spend / impressions) * 1000
-            
-            # Calculate conversion rate
-            if clicks > 0:
-                metric['conversion_rate'] = (conversions / clicks) * 100
-            
-            # Calculate cost per conversion
-            if conversions > 0:
-                metric['cost_per_conversion'] = spend / conversions
-            
-            # Calculate ROAS
-            if spend > 0:
-                metric['roas'] = revenue / spend
+                document = analytics.to_mongo().to_dict()
+                on_insert = {'created_at': document.pop('created_at')}
+                
+                operations.append(UpdateOne(
+                    {'campaign_id': analytics.campaign_id, 'date': date, 'period_type': 'hourly'},
+                    {'$set': document, '$setOnInsert': on_insert},
+                    upsert=True
+                ))
+                documents.append(document)
+        
+        if not operations:
+            return 0
         
-        return list(daily_metrics.values())
+        CampaignAnalytics._get_collection().bulk_write(operations, ordered=False)
+        self.metrics_store.record_many(documents)
+        
+        # Cached results for this user are now stale
+        self.cache.invalidate(user_id)
+        
+        return len(operations)
     
-    def _group_metrics(self, daily_metrics: List[Dict], group_by: str) -> List[Dict]:
+    def sync_hourly_analytics(self, user_id: str, campaign_id: str,
+                              start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict:
         """
-        Group metrics by week or month
+        Fetch hourly campaign analytics from the platform and store them
         
         Args:
-            daily_metrics (List[Dict]): Daily metrics
-            group_by (str): Group by (week, month)
-            
+            user_id (str): User ID
+            campaign_id (str): Campaign ID
+            start_date (Optional[str], optional): Start date. Defaults to None.
+            end_date (Optional[str], optional): End date. Defaults to None.
+        
         Returns:
-            List[Dict]: Grouped metrics
+            Dict: Number of hours stored
         """
-        grouped_metrics = {}
+        # Find user
+        user = User.objects(id=user_id).first()
         
-        for metric in daily_metrics:
-            date = datetime.fromisoformat(metric['date'])
-            
-            if group_by == 'week':
-                # Group by week (Monday as first day)
-                week_start = date - timedelta(days=date.weekday())
-                group_key = week_start.date().isoformat()
-                group_label = f"Week of {week_start.strftime('%b %d, %Y')}"
-            else:  # month
-                # Group by month
-                group_key = date.strftime('%Y-%m')
-                group_label = date.strftime('%b %Y')
-            
-            if group_key not in grouped_metrics:
-                grouped_metrics[group_key] = {
-                    'period': group_label,
-                    'impressions': 0,
-                    'clicks': 0,
-                    'conversions': 0,
-                    'spend': 0.0,
-                    'revenue': 0.0,
-                    'ctr': 0.0,
-                    'cpc': 0.0,
-                    'cpm': 0.0,
-                    'conversion_rate': 0.0,
-                    'cost_per_conversion': 0.0,
-                    'roas': 0.0
-                }
-            
-            grouped_metrics[group_key]['impressions'] += metric['impressions']
-            grouped_metrics[group_key]['clicks'] += metric['clicks']
-            grouped_metrics[group_key]['conversions'] += metric['conversions']
-            grouped_metrics[group_key]['spend'] += metric['spend']
-            grouped_metrics[group_key]['revenue'] += metric['revenue']
-        
-        # Calculate derived metrics for each group
-        for group_key, group_data in grouped_metrics.items():
-            impressions = group_data['impressions']
-            clicks = group_data['clicks']
-            conversions = group_data['conversions']
-            spend = group_data['spend']
-            revenue = group_data['revenue']
-            
-            # Calculate CTR
-            if impressions > 0:
-                group_data['ctr'] = (clicks / impressions) * 100
-            
-            # Calculate CPC
-            if clicks > 0:
-                group_data['cpc'] = spend / clicks
-            
-            # Calculate CPM
-            if impressions > 0:
-                group_data['cpm'] = (spend / impressions) * 1000
-            
-            # Calculate conversion rate
-            if clicks > 0:
-                group_data['conversion_rate'] = (conversions / clicks) * 100
-            
-            # Calculate cost per conversion
-            if conversions > 0:
-                group_data['cost_per_conversion'] = spend / conversions
-            
-            # Calculate ROAS
-            if spend > 0:
-                group_data['roas'] = revenue / spend
+        if not user:
+            return {'error': 'User not found'}
+        
+        # Find campaign
+        campaign = Campaign.objects(id=campaign_id, user=user).first()
+        
+        if not campaign:
+            return {'error': 'Campaign not found'}
+        
+        # Set default date range if not provided (last 2 days, in the campaign's time zone)
+        if not end_date:
+            end_date_obj = local_now(self._get_timezone(user, campaign))
+        else:
+            end_date_obj = datetime.fromisoformat(end_date)
+        
+        if not start_date:
+            start_date_obj = end_date_obj - timedelta(days=2)
+        else:
+            start_date_obj = datetime.fromisoformat(start_date)
+        
+        connector = self._get_platform_connector(campaign.platform)
+        
+        if not connector or not hasattr(connector, 'get_campaign_hourly_analytics'):
+            return {'error': f'Hourly analytics are not supported for platform {campaign.platform}'}
         
-        return list(grouped_metrics.values())
+        # Fetch hourly analytics from platform
+        platform_analytics = connector.get_campaign_hourly_analytics(
+            campaign_id=campaign.platform_campaign_id,
+            start_date=start_date_obj,
+            end_date=end_date_obj
+        )
+        
+        if 'error' in platform_analytics:
+            return platform_analytics
+        
+        return {
+            'hours': self.ingest_hourly_analytics(user, campaign.platform, [(campaign, platform_analytics)])
+        }
     
-    def _get_platform_breakdown(self, analytics_list: List[CampaignAnalytics]) -> Dict:
+    def get_hourly_metrics(self, user_id: str, start_date: Optional[str] = None,
+                           end_date: Optional[str] = None, platform: Optional[str] = None,
+                           campaign_id: Optional[str] = None) -> Dict:
         """
-        Get platform breakdown from analytics list
+        Get stored hourly metrics grouped by day and hour of day
         
         Args:
-            analytics_list (List[CampaignAnalytics]): Analytics list
-            
+            user_id (str): User ID
+            start_date (Optional[str], optional): Start date. Defaults to None.
+            end_date (Optional[str], optional): End date. Defaults to None.
+            platform (Optional[str], optional): Platform. Defaults to None.
+            campaign_id (Optional[str], optional): Campaign ID. Defaults to None.
+        
         Returns:
-            Dict: Platform breakdown
+            Dict: Hourly metrics by ISO date, then by hour ('0' to '23')
         """
-        platform_breakdown = {}
+        # Find user
+        user = User.objects(id=user_id).first()
         
-        for analytics in analytics_list:
-            platform = analytics.platform
-            
-            if platform not in platform_breakdown:
-                platform_breakdown[platform] = {
-                    'impressions': 0,
-                    'clicks': 0,
-                    'conversions': 0,
-                    'spend': 0.0,
-                    'revenue': 0.0,
-                    'ctr': 0.0,
-                    'cpc': 0.0,
-                    'cpm': 0.0,
-                    'conversion_rate': 0.0,
-                    'cost_per_conversion': 0.0,
-                    'roas': 0.0
-                }
-            
-            platform_breakdown[platform]['impressions'] += analytics.total_impressions
-            platform_breakdown[platform]['clicks'] += analytics.total_clicks
-            platform_breakdown[platform]['conversions'] += analytics.total_conversions
-            platform_breakdown[platform]['spend'] += analytics.total_spend
-            platform_breakdown[platform]['revenue'] += analytics.total_revenue
-        
-        # Calculate derived metrics for each platform
-        for platform, data in platform_breakdown.items():
-            impressions = data['impressions']
-            clicks = data['clicks']
-            conversions = data['conversions']
-            spend = data['spend']
-            revenue = data['revenue']
-            
-            # Calculate CTR
-            if impressions > 0:
-                data['ctr'] = (clicks / impressions) * 100
-            
-            # Calculate CPC
-            if clicks > 0:
-                data['cpc'] = spend / clicks
-            
-            # Calculate CPM
-            if impressions > 0:
-                data['cpm'] = (spend / impressions) * 1000
-            
-            # Calculate conversion rate
-            if clicks > 0:
-                data['conversion_rate'] = (conversions / clicks) * 100
-            
-            # Calculate cost per conversion
-            if conversions > 0:
-                data['cost_per_conversion'] = spend / conversions
-            
-            # Calculate ROAS
-            if spend > 0:
-                data['roas'] = revenue / spend
+        if not user:
+            return {'error': 'User not found'}
+        
+        campaign = Campaign.objects(id=campaign_id, user=user).only('schedule').first() if campaign_id else None
+        
+        # Set default date range if not provided (the retained hourly window)
+        if not end_date:
+            end_date_obj = local_now(self._get_timezone(user, campaign))
+        else:
+            end_date_obj = datetime.fromisoformat(end_date)
+        
+        if not start_date:
+            start_date_obj = end_date_obj - timedelta(days=int(os.getenv('ANALYTICS_HOURLY_RETENTION_DAYS', 14)))
+        else:
+            start_date_obj = datetime.fromisoformat(start_date)
+        
+        query = AnalyticsQuery(
+            user_id=str(user.id),
+            start_date=start_date_obj,
+            end_date=end_date_obj,
+            platform=platform,
+            campaign_ids=[campaign_id] if campaign_id else None,
+            period_type='hourly'
+        )
         
-        return platform_breakdown
+        return {
+            'hourly_metrics': hourly_metrics_by_day([
+                {
+                    'date': analytics.date,
+                    'impressions': analytics.impressions or 0,
+                    'clicks': analytics.clicks or 0,
+                    'conversions': analytics.conversions or 0,
+                    'spend': analytics.spent or 0.0,
+                    'revenue': analytics.revenue or 0.0
+                }
+                for analytics in self.metrics_store.find(query, *SUMMARY_FIELDS)
+            ])
+        }
     
-    def _get_campaign_breakdown(self, analytics_list: List[CampaignAnalytics]) -> Dict:
+    def compact_hourly_analytics(self, retention_days: Optional[int] = None, user_id: Optional[str] = None) -> Dict:
         """
-        Get campaign breakdown from analytics list
+        Fold hourly analytics older than the retention window into daily rows
         
         Args:
-            analytics_list (List[CampaignAnalytics]): Analytics list
-            
+            retention_days (Optional[int], optional): Days of raw hourly rows to keep.
+                Defaults to ANALYTICS_HOURLY_RETENTION_DAYS.
+            user_id (Optional[str], optional): Restrict to one user. Defaults to None.
+        
         Returns:
-            Dict: Campaign breakdown
+            Dict: Days created and hours removed
         """
-        campaign_breakdown = {}
+        return HourlyCompactor(
+            retention_days=retention_days,
+            rollup_service=self.rollup_service,
+            prefix_index=self.prefix_index,
+            metrics_store=self.metrics_store
+        ).compact(user_id=user_id)
+    
+    def dedupe_campaign_analytics(self) -> Dict:
+        """
+        Remove duplicate campaign analytics, build the unique key index and repair the indexes built from them
         
-        for analytics in analytics_list:
-            campaign_id = str(analytics.campaign.id)
-            campaign_name = analytics.campaign.name
-            
-            if campaign_id not in campaign_breakdown:
-                campaign_breakdown[campaign_id] = {
-                    'campaign_id': campaign_id,
-                    'campaign_name': campaign_name,
-                    'impressions': 0,
-                    'clicks': 0,
-                    'conversions': 0,
-                    'spend': 0.0,
-                    'revenue': 0.0,
-                    'ctr': 0.0,
-                    'cpc': 0.0,
-                    'cpm': 0.0,
-                    'conversion_rate': 0.0,
-                    'cost_per_conversion': 0.0,
-                    'roas': 0.0
-                }
-            
-            campaign_breakdown[campaign_id]['impressions'] += analytics.total_impressions
-            campaign_breakdown[campaign_id]['clicks'] += analytics.total_clicks
-            campaign_breakdown[campaign_id]['conversions'] += analytics.total_conversions
-            campaign_breakdown[campaign_id]['spend'] += analytics.total_spend
-            campaign_breakdown[campaign_id]['revenue'] += analytics.total_revenue
-        
-        # Calculate derived metrics for each campaign
-        for campaign_id, data in campaign_breakdown.items():
-            impressions = data['impressions']
-            clicks = data['clicks']
-            conversions = data['conversions']
-            spend = data['spend']
-            revenue = data['revenue']
-            
-            # Calculate CTR
-            if impressions > 0:
-                data['ctr'] = (clicks / impressions) * 100
-            
-            # Calculate CPC
-            if clicks > 0:
-                data['cpc'] = spend / clicks
-            
-            # Calculate CPM
-            if impressions > 0:
-                data['cpm'] = (spend / impressions) * 1000
-            
-            # Calculate conversion rate
-            if clicks > 0:
-                data['conversion_rate'] = (conversions / clicks) * 100
-            
-            # Calculate cost per conversion
-            if conversions > 0:
-                data['cost_per_conversion'] = spend / conversions
-            
-            # Calculate ROAS
-            if spend > 0:
-                data['roas'] = revenue / spend
+        Run it once on databases written before the unique index existed;
+        until then the index is skipped with a warning.
         
-        return list(campaign_breakdown.values())
+        Returns:
+            Dict: Duplicated periods found, documents removed and the consistency check result
+        """
+        result = dedupe_campaign_analytics()
+        result['consistency'] = self.check_analytics_indexes(settle_seconds=0)
+        
+        return result
     
-    def _get_recommendations(self, analytics_list: List[CampaignAnalytics]) -> List[Dict]:
+    def check_analytics_indexes(self, user_id: Optional[str] = None, repair: bool = True,
+                                settle_seconds: Optional[float] = None) -> Dict:
         """
-        Get recommendations from analytics list
+        Compare the rollups and prefix-sum index with the daily analytics documents and repair any drift
+        
+        Run it periodically (e.g. nightly, beside compact_hourly_analytics).
+        Repairs are increments and skip days still being written, so it is safe
+        to run while ingestion continues.
         
         Args:
-            analytics_list (List[CampaignAnalytics]): Analytics list
-            
+            user_id (Optional[str], optional): Restrict to one user. Defaults to None.
+            repair (bool, optional): Apply the corrections. Defaults to True.
+            settle_seconds (Optional[float], optional): Skip days written this recently.
+                Defaults to ANALYTICS_CONSISTENCY_SETTLE_SECONDS.
+        
         Returns:
-            List[Dict]: Recommendations
+            Dict: Drifted rollup buckets and prefix-sum campaign-years found, and whether they were repaired
         """
-        recommendations = []
+        rollup_drift = self.rollup_service.find_drift(user_id=user_id, settle_seconds=settle_seconds)
+        prefix_drift = self.prefix_index.find_drift(user_id=user_id, settle_seconds=settle_seconds)
         
-        for analytics in analytics_list:
-            recommendations.extend(analytics.get_recommendations())
+        if repair:
+            self.rollup_service.repair(rollup_drift)
+            self.prefix_index.repair(prefix_drift)
+            
+            for drifted_user_id in {entry['user_id'] for entry in rollup_drift + prefix_drift}:
+                self.cache.invalidate(drifted_user_id)
         
-        return recommendations
+        return {
+            'rollup_buckets': len(rollup_drift),
+            'prefix_index_years': len(prefix_drift),
+            'repaired': repair
+        }
     
     def _create_campaign_analytics(self, user: User, campaign: Campaign, platform: str, 
-                                  start_date: datetime, end_date: datetime, data: Dict) -> CampaignAnalytics:
+                                  start_date: datetime, end_date: datetime, data: Dict) -> List[CampaignAnalytics]:
         """
-        Create campaign analytics object
+        Create or update daily campaign analytics from platform data
         
         Args:
             user (User): User
@@ -1104,108 +1160,78 @@ class AnalyticsService:
             start_date (datetime): Start date
             end_date (datetime): End date
             data (Dict): Analytics data
-            
+        
         Returns:
-            CampaignAnalytics: Campaign analytics
+            List[CampaignAnalytics]: Daily campaign analytics
         """
-        # Create analytics object
-        analytics = CampaignAnalytics(
-            user=user,
-            campaign=campaign,
-            platform=platform,
-            start_date=start_date,
-            end_date=end_date,
-            total_impressions=data.get('total_impressions', 0),
-            total_clicks=data.get('total_clicks', 0),
-            total_conversions=data.get('total_conversions', 0),
-            total_spend=data.get('total_spend', 0.0),
-            total_revenue=data.get('total_revenue', 0.0),
-            average_ctr=data.get('average_ctr', 0.0),
-            average_cpc=data.get('average_cpc', 0.0),
-            average_cpm=data.get('average_cpm', 0.0),
-            average_conversion_rate=data.get('average_conversion_rate', 0.0),
-            average_cost_per_conversion=data.get('average_cost_per_conversion', 0.0),
-            roas=data.get('roas', 0.0),
-            last_updated=datetime.utcnow()
-        )
+        return self.ingest_campaign_analytics(user, platform, [(campaign, data)])
+    
+    def _get_analytics_arguments(self, user: User, campaign: Campaign, start_date: datetime,
+                                 end_date: datetime) -> Optional[Dict]:
+        """
+        Build the connector get_campaign_analytics arguments for a campaign
         
-        # Add daily metrics
-        for daily_data in data.get('daily_metrics', []):
-            daily_metric = DailyMetric(
-                date=datetime.fromisoformat(daily_data['date']),
-                impressions=daily_data.get('impressions', 0),
-                clicks=daily_data.get('clicks', 0),
-                conversions=daily_data.get('conversions', 0),
-                spend=daily_data.get('spend', 0.0),
-                ctr=daily_data.get('ctr', 0.0),
-                cpc=daily_data.get('cpc', 0.0),
-                cpm=daily_data.get('cpm', 0.0),
-                conversion_rate=daily_data.get('conversion_rate', 0.0),
-                cost_per_conversion=daily_data.get('cost_per_conversion', 0.0),
-                roas=daily_data.get('roas', 0.0),
-                engagement=daily_data.get('engagement', 0),
-                reach=daily_data.get('reach', 0),
-                frequency=daily_data.get('frequency', 0.0),
-                video_views=daily_data.get('video_views', 0),
-                video_view_rate=daily_data.get('video_view_rate', 0.0),
-                add_to_cart=daily_data.get('add_to_cart', 0),
-                purchases=daily_data.get('purchases', 0),
-                revenue=daily_data.get('revenue', 0.0)
-            )
-            analytics.daily_metrics.append(daily_metric)
+        TikTok reports are requested per advertiser, taken from the user's TikTok
+        account; Shopee reports cover the whole shop, so they take no campaign.
+        
+        Args:
+            user (User): User
+            campaign (Campaign): Campaign
+            start_date (datetime): Start date
+            end_date (datetime): End date
         
-        # Add audience insights
-        if 'audience_insights' in data:
-            audience_data = data['audience_insights']
+        Returns:
+            Optional[Dict]: Keyword arguments, or None when the user has no account on the platform
+        """
+        arguments = {'start_date': start_date, 'end_date': end_date}
+        
+        if campaign.platform == 'shopee':
+            return arguments
+        
+        arguments['campaign_id'] = campaign.platform_campaign_id
+        
+        if campaign.platform == 'tiktok':
+            account = next((
+                account for account in user.platform_accounts
+                if account.platform == 'tiktok' and account.status == 'active'
+            ), None)
             
-            audience_insights = AudienceInsight(
-                age_gender=audience_data.get('age_gender', {}),
-                locations=audience_data.get('locations', {}),
-                interests=audience_data.get('interests', {}),
-                behaviors=audience_data.get('behaviors', {}),
-                devices=audience_data.get('devices', {}),
-                platforms=audience_data.get('platforms', {}),
-                placements=audience_data.get('placements', {}),
-                time_of_day=audience_data.get('time_of_day', {}),
-                day_of_week=audience_data.get('day_of_week', {})
-            )
-            analytics.audience_insights = audience_insights
+            if not account:
+                return None
+            
+            arguments['advertiser_id'] = account.account_id
         
-        # Add creative performance
-        for creative_data in data.get('creative_performance', []):
-            creative_performance = CreativePerformance(
-                creative_id=creative_data['creative_id'],
-                impressions=creative_data.get('impressions', 0),
-                clicks=creative_data.get('clicks', 0),
-                conversions=creative_data.get('conversions', 0),
-                spend=creative_data.get('spend', 0.0),
-                ctr=creative_data.get('ctr', 0.0),
-                cpc=creative_data.get('cpc', 0.0),
-                cpm=creative_data.get('cpm', 0.0),
-                conversion_rate=creative_data.get('conversion_rate', 0.0),
-                cost_per_conversion=creative_data.get('cost_per_conversion', 0.0),
-                engagement_rate=creative_data.get('engagement_rate', 0.0),
-                video_view_rate=creative_data.get('video_view_rate', 0.0)
-            )
-            analytics.creative_performance.append(creative_performance)
+        return arguments
+    
+    def _get_timezone(self, user: User, campaign: Optional[Campaign] = None) -> Optional[str]:
+        """
+        Get the time zone default date ranges end in
         
-        # Add recommendations
-        for recommendation_data in data.get('recommendations', []):
-            recommendation = Recommendation(
-                id=recommendation_data.get('id', str(uuid.uuid4())),
-                type=recommendation_data['type'],
-                priority=recommendation_data.get('priority', 'medium'),
-                description=recommendation_data['description'],
-                expected_impact=recommendation_data.get('expected_impact', ''),
-                status=recommendation_data.get('status', 'pending'),
-                created_at=datetime.utcnow()
-            )
-            analytics.recommendations.append(recommendation)
+        A campaign runs on its schedule's time zone, otherwise the user's.
         
-        # Save analytics
-        analytics.save()
+        Args:
+            user (User): User
+            campaign (Optional[Campaign], optional): Campaign. Defaults to None.
+        
+        Returns:
+            Optional[str]: Time zone name
+        """
+        if campaign and campaign.schedule and campaign.schedule.time_zone:
+            return campaign.schedule.time_zone
         
-        return analytics
+        return user.settings.timezone
+    
+    def _get_fetch_concurrency(self, platform: str) -> int:
+        """
+        Get the maximum concurrent campaign fetches for a platform
+        
+        Args:
+            platform (str): Platform name
+        
+        Returns:
+            int: Parallelism limit (e.g. TIKTOK_FETCH_CONCURRENCY, else ANALYTICS_FETCH_CONCURRENCY)
+        """
+        return int(os.getenv(f'{platform.upper()}_FETCH_CONCURRENCY', self.fetch_concurrency))
     
     def _get_platform_connector(self, platform: str):
         """
@@ -1213,7 +1239,7 @@ class AnalyticsService:
         
         Args:
             platform (str): Platform name
-            
+        
         Returns:
             Object: Platform connector
         """
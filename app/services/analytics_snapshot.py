@@ -0,0 +1,299 @@
+"""
+AdGenius AI Backend - Columnar Analytics Snapshots
+"""
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.models.analytics import CampaignAnalytics
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Model fields written to every snapshot file, with their Arrow column types.
+# user_id and platform are stored in the partition path instead.
+SNAPSHOT_FIELDS = (
+    ('id', 'string'),
+    ('campaign_id', 'string'),
+    ('date', 'timestamp'),
+    ('period_type', 'string'),
+    ('impressions', 'int64'),
+    ('clicks', 'int64'),
+    ('conversions', 'int64'),
+    ('spent', 'float64'),
+    ('revenue', 'float64'),
+    ('ctr', 'float64'),
+    ('cpc', 'float64'),
+    ('cpm', 'float64'),
+    ('cpa', 'float64'),
+    ('roas', 'float64'),
+    ('conversion_rate', 'float64'),
+    ('platform_metrics', 'json'),
+    ('demographic_data', 'json'),
+    ('device_data', 'json'),
+    ('top_ads', 'json'),
+    ('top_keywords', 'json'),
+    ('ai_recommendations', 'list<string>'),
+    ('optimization_score', 'float64'),
+    ('created_at', 'timestamp'),
+    ('updated_at', 'timestamp')
+)
+
+# Rows buffered across all partitions before they are flushed to files
+FLUSH_ROWS = 50000
+
+# Rows fetched from MongoDB per round trip
+CURSOR_BATCH_SIZE = 1000
+
+# File holding the updated_at watermark of the last export
+WATERMARK_FILE = '_watermark.json'
+
+def snapshot_schema():
+    """
+    Build the Arrow schema of snapshot files
+    
+    Returns:
+        pa.Schema: Snapshot schema
+    """
+    types = {
+        'string': pa.string(),
+        'json': pa.string(),
+        'int64': pa.int64(),
+        'float64': pa.float64(),
+        'timestamp': pa.timestamp('ms'),
+        'list<string>': pa.list_(pa.string())
+    }
+    
+    return pa.schema([(name, types[column_type]) for name, column_type in SNAPSHOT_FIELDS])
+
+def partition_key(document: Dict) -> Tuple[str, str, str]:
+    """
+    Get the partition of a stored analytics document
+    
+    Args:
+        document (Dict): Raw campaign analytics document
+    
+    Returns:
+        Tuple[str, str, str]: User ID, platform and month (YYYY-MM)
+    """
+    date = document.get('date')
+    
+    return (
+        str(document.get('user_id')),
+        document.get('platform') or 'unknown',
+        date.strftime('%Y-%m') if date else 'unknown'
+    )
+
+def partition_path(base_dir: str, key: Tuple[str, str, str]) -> str:
+    """
+    Get the Hive-style directory of a partition
+    
+    Args:
+        base_dir (str): Snapshot root directory
+        key (Tuple[str, str, str]): User ID, platform and month
+    
+    Returns:
+        str: Partition directory
+    """
+    user_id, platform, month = key
+    
+    return os.path.join(base_dir, f'user_id={user_id}', f'platform={platform}', f'month={month}')
+
+def to_snapshot_row(document: Dict) -> Dict:
+    """
+    Convert a stored analytics document into a snapshot row
+    
+    Args:
+        document (Dict): Raw campaign analytics document
+    
+    Returns:
+        Dict: Row keyed by SNAPSHOT_FIELDS, with dict fields encoded as JSON
+    """
+    row = {}
+    
+    for name, column_type in SNAPSHOT_FIELDS:
+        value = document.get('_id' if name == 'id' else name)
+        
+        if name == 'id':
+            value = str(value) if value is not None else None
+        elif column_type == 'json':
+            value = json.dumps(value, default=str, separators=(',', ':')) if value else None
+        elif column_type == 'list<string>':
+            value = list(value or [])
+        
+        row[name] = value
+    
+    return row
+
+class AnalyticsSnapshotExporter:
+    """Writes campaign analytics to partitioned Parquet files for offline analysis"""
+    
+    def __init__(self, base_dir: Optional[str] = None):
+        """
+        Initialize analytics snapshot exporter
+        
+        Args:
+            base_dir (Optional[str], optional): Snapshot root directory.
+                Defaults to ANALYTICS_SNAPSHOT_DIR.
+        """
+        self.base_dir = base_dir or os.getenv('ANALYTICS_SNAPSHOT_DIR', 'data/analytics_snapshots')
+    
+    def watermark(self) -> Optional[datetime]:
+        """
+        Get the updated_at watermark of the last export
+        
+        Returns:
+            Optional[datetime]: Watermark, or None before the first export
+        """
+        path = os.path.join(self.base_dir, WATERMARK_FILE)
+        
+        if not os.path.exists(path):
+            return None
+        
+        with open(path) as watermark_file:
+            return datetime.fromisoformat(json.load(watermark_file)['updated_at'])
+    
+    def save_watermark(self, watermark: datetime):
+        """
+        Persist the updated_at watermark, replacing the previous one atomically
+        
+        Args:
+            watermark (datetime): Latest updated_at written
+        """
+        os.makedirs(self.base_dir, exist_ok=True)
+        path = os.path.join(self.base_dir, WATERMARK_FILE)
+        
+        with open(path + '.tmp', 'w') as watermark_file:
+            json.dump({'updated_at': watermark.isoformat()}, watermark_file)
+        
+        os.replace(path + '.tmp', path)
+    
+    def cursor(self, since: Optional[datetime] = None, user_id: Optional[str] = None):
+        """
+        Open the cursor of documents to export
+        
+        Args:
+            since (Optional[datetime], optional): Only documents updated after this. Defaults to None.
+            user_id (Optional[str], optional): Restrict to one user. Defaults to None.
+        
+        Returns:
+            Cursor: PyMongo cursor of raw documents
+        """
+        match = {}
+        
+        if since:
+            match['updated_at'] = {'$gt': since}
+        
+        if user_id:
+            match['user_id'] = str(user_id)
+        
+        return CampaignAnalytics._get_collection().find(match).batch_size(CURSOR_BATCH_SIZE)
+    
+    def export(self, full: bool = False, user_id: Optional[str] = None) -> Dict:
+        """
+        Export documents updated since the watermark as new Parquet part files
+        
+        Upserted days are appended again with their new values; readers keep the
+        row with the latest updated_at for each id.
+        
+        Args:
+            full (bool, optional): Ignore the watermark and export everything. Defaults to False.
+            user_id (Optional[str], optional): Restrict to one user without advancing
+                the watermark. Defaults to None.
+        
+        Returns:
+            Dict: Rows and files written, and the new watermark
+        """
+        if not HAS_PYARROW:
+            return {'error': 'pyarrow is not installed'}
+        
+        since = None if full else self.watermark()
+        run_id = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+        buffers = {}
+        buffered = 0
+        files = []
+        rows = 0
+        watermark = since
+        
+        for document in self.cursor(since, user_id):
+            buffers.setdefault(partition_key(document), []).append(to_snapshot_row(document))
+            buffered += 1
+            rows += 1
+            
+            updated_at = document.get('updated_at')
+            
+            if updated_at and (watermark is None or updated_at > watermark):
+                watermark = updated_at
+            
+            if buffered >= FLUSH_ROWS:
+                files.extend(self._flush(buffers, run_id, len(files)))
+                buffers = {}
+                buffered = 0
+        
+        files.extend(self._flush(buffers, run_id, len(files)))
+        
+        # Only advance the watermark once every file is in place; single-user
+        # exports leave it alone so other users' changes are not skipped
+        if watermark and watermark != since and not user_id:
+            self.save_watermark(watermark)
+        
+        return {
+            'rows': rows,
+            'files': files,
+            'watermark': watermark.isoformat() if watermark else None
+        }
+    
+    def _flush(self, buffers: Dict[Tuple[str, str, str], List[Dict]], run_id: str, sequence: int) -> List[str]:
+        """
+        Write each buffered partition to a new part file
+        
+        Args:
+            buffers (Dict[Tuple[str, str, str], List[Dict]]): Snapshot rows by partition
+            run_id (str): Export run identifier used in file names
+            sequence (int): Number of files already written by this run
+        
+        Returns:
+            List[str]: Paths written
+        """
+        schema = snapshot_schema()
+        files = []
+        
+        for key, partition_rows in buffers.items():
+            directory = partition_path(self.base_dir, key)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f'part-{run_id}-{sequence + len(files):05d}.parquet')
+            
+            table = pa.Table.from_pylist(partition_rows, schema=schema)
+            pq.write_table(table, path + '.tmp', compression='zstd')
+            os.replace(path + '.tmp', path)
+            files.append(path)
+        
+        return files
+    
+    def read(self, columns: Optional[Iterable[str]] = None, filters: Optional[List] = None):
+        """
+        Read the snapshot as one memory-mapped Arrow table
+        
+        Args:
+            columns (Optional[Iterable[str]], optional): Columns to read. Defaults to all.
+            filters (Optional[List], optional): Parquet filters, e.g. [('platform', '=', 'tiktok')].
+                Defaults to None.
+        
+        Returns:
+            pa.Table: Snapshot rows, with user_id, platform and month partition columns
+        """
+        if not HAS_PYARROW:
+            raise ImportError('pyarrow is required to read analytics snapshots')
+        
+        return pq.read_table(
+            self.base_dir,
+            columns=list(columns) if columns else None,
+            filters=filters,
+            partitioning='hive',
+            memory_map=True
+        )
@@ -0,0 +1,290 @@
+"""
+AdGenius AI Backend - Analytics Metrics Storage Backends
+"""
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from pymongo.errors import CollectionInvalid
+
+from app.models.analytics import CampaignAnalytics
+from app.services.analytics_query import AnalyticsQuery
+
+# Time-series collection holding per-day and per-hour measurements
+TIMESERIES_COLLECTION = 'analytics_timeseries'
+
+# Fields stored under the time-series metaField
+META_FIELDS = ('user_id', 'campaign_id', 'platform', 'period_type')
+
+# Fields stored on each measurement
+MEASUREMENT_FIELDS = ('impressions', 'clicks', 'conversions', 'spent', 'revenue', 'ai_recommendations')
+
+# Reshapes measurements into the flat campaign analytics layout
+FLATTEN_STAGE = {'$project': dict(
+    {field: f'$meta.{field}' for field in META_FIELDS},
+    date=1,
+    **{field: 1 for field in MEASUREMENT_FIELDS}
+)}
+
+def to_timeseries_filter(query: Dict) -> Dict:
+    """
+    Translate a campaign analytics filter to the time-series layout
+    
+    Args:
+        query (Dict): Filter on flat campaign analytics fields
+    
+    Returns:
+        Dict: Filter with reference fields moved under meta, so buckets are pruned by metaField
+    """
+    return {
+        f'meta.{field}' if field in META_FIELDS else field: condition
+        for field, condition in query.items()
+    }
+
+def to_measurement(document: Dict) -> Dict:
+    """
+    Convert a flat campaign analytics document into a time-series measurement
+    
+    Args:
+        document (Dict): Campaign analytics document
+    
+    Returns:
+        Dict: Measurement with date, meta and metric fields
+    """
+    measurement = {
+        'date': document['date'],
+        'meta': {field: document.get(field) for field in META_FIELDS}
+    }
+    
+    for field in MEASUREMENT_FIELDS:
+        if document.get(field) is not None:
+            measurement[field] = document[field]
+    
+    return measurement
+
+class DocumentMetricsStore:
+    """Reads metrics from the campaign analytics documents themselves"""
+    
+    def aggregate(self, match: Dict, stages: List[Dict]) -> Iterable[Dict]:
+        """
+        Run an aggregation over matching campaign analytics
+        
+        Args:
+            match (Dict): Filter on campaign analytics fields
+            stages (List[Dict]): Stages following the match
+        
+        Returns:
+            Iterable[Dict]: Aggregation cursor
+        """
+        return CampaignAnalytics._get_collection().aggregate([{'$match': match}] + stages, allowDiskUse=True)
+    
+    def find(self, query: AnalyticsQuery, *fields: str) -> Iterable[CampaignAnalytics]:
+        """
+        Find matching campaign analytics in date order
+        
+        Args:
+            query (AnalyticsQuery): Analytics query
+            *fields (str): Fields to load
+        
+        Returns:
+            Iterable[CampaignAnalytics]: Campaign analytics
+        """
+        return query.find(*fields)
+    
+    def record_many(self, documents: List[Dict]) -> int:
+        """
+        Record written documents; they are already stored in place
+        
+        Args:
+            documents (List[Dict]): Campaign analytics documents
+        
+        Returns:
+            int: Number of measurements written
+        """
+        return 0
+    
+    def delete(self, match: Dict) -> int:
+        """
+        Delete measurements of removed documents; they are already removed in place
+        
+        Args:
+            match (Dict): Filter on campaign analytics fields
+        
+        Returns:
+            int: Number of measurements deleted
+        """
+        return 0
+
+class TimeSeriesMetricsStore:
+    """Keeps per-day and per-hour metrics in a MongoDB time-series collection"""
+    
+    def __init__(self, collection_name: str = TIMESERIES_COLLECTION, granularity: str = 'hours'):
+        """
+        Initialize time-series metrics store
+        
+        Args:
+            collection_name (str, optional): Collection name. Defaults to TIMESERIES_COLLECTION.
+            granularity (str, optional): Bucket granularity hint. Defaults to 'hours'.
+        """
+        self.collection_name = collection_name
+        self.granularity = granularity
+        self._collection = None
+    
+    def collection(self):
+        """
+        Get the time-series collection, creating it on first use
+        
+        Returns:
+            Collection: PyMongo collection
+        """
+        if self._collection is None:
+            self.ensure_collection()
+        
+        return self._collection
+    
+    def ensure_collection(self):
+        """Create the time-series collection and its secondary indexes if missing"""
+        db = CampaignAnalytics._get_db()
+        
+        try:
+            db.create_collection(self.collection_name, timeseries={
+                'timeField': 'date',
+                'metaField': 'meta',
+                'granularity': self.granularity
+            })
+        except CollectionInvalid:
+            pass
+        
+        collection = db[self.collection_name]
+        collection.create_index([('meta.user_id', 1), ('date', 1)])
+        collection.create_index([('meta.campaign_id', 1), ('date', 1)])
+        
+        self._collection = collection
+    
+    def record_many(self, documents: List[Dict]) -> int:
+        """
+        Replace the measurements of written campaign analytics
+        
+        Time-series collections cannot upsert, so the new measurements are
+        inserted stamped with written_at and only then are the older
+        measurements of each (campaign, period type) at the written dates
+        deleted. A date is never missing, but until the delete lands a reader
+        can see it twice; the later write wins when two writers overlap.
+        Recommendations left out of a document are carried over from the stored
+        measurement. Deletes filtered on the time field need MongoDB 7.0 or later.
+        
+        Args:
+            documents (List[Dict]): Campaign analytics documents
+        
+        Returns:
+            int: Number of measurements written
+        """
+        if not documents:
+            return 0
+        
+        dates = {}
+        
+        for document in documents:
+            key = (document['campaign_id'], document.get('period_type', 'daily'))
+            dates.setdefault(key, []).append(document['date'])
+        
+        collection = self.collection()
+        stored = {'$or': [
+            {'meta.campaign_id': campaign_id, 'meta.period_type': period_type, 'date': {'$in': day_list}}
+            for (campaign_id, period_type), day_list in dates.items()
+        ]}
+        recommendations = {
+            (row['meta']['campaign_id'], row['meta']['period_type'], row['date']): row['ai_recommendations']
+            for row in collection.find(
+                dict(stored, ai_recommendations={'$exists': True}),
+                {'meta': 1, 'date': 1, 'ai_recommendations': 1}
+            )
+        }
+        # Stored to the millisecond, so the stamp is truncated to compare exactly
+        now = datetime.utcnow()
+        written_at = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        measurements = []
+        
+        for document in documents:
+            measurement = to_measurement(document)
+            measurement['written_at'] = written_at
+            key = (document['campaign_id'], document.get('period_type', 'daily'), document['date'])
+            
+            if 'ai_recommendations' not in measurement and key in recommendations:
+                measurement['ai_recommendations'] = recommendations[key]
+            
+            measurements.append(measurement)
+        
+        # Write the replacements first, then drop whatever was stored before them
+        collection.insert_many(measurements, ordered=False)
+        collection.delete_many(dict(stored, written_at={'$not': {'$gte': written_at}}))
+        
+        return len(documents)
+    
+    def delete(self, match: Dict) -> int:
+        """
+        Delete matching measurements
+        
+        Args:
+            match (Dict): Filter on campaign analytics fields
+        
+        Returns:
+            int: Number of measurements deleted
+        """
+        return self.collection().delete_many(to_timeseries_filter(match)).deleted_count
+    
+    def aggregate(self, match: Dict, stages: List[Dict]) -> Iterable[Dict]:
+        """
+        Run an aggregation over matching measurements in the flat campaign analytics layout
+        
+        Args:
+            match (Dict): Filter on campaign analytics fields
+            stages (List[Dict]): Stages following the match
+        
+        Returns:
+            Iterable[Dict]: Aggregation cursor
+        """
+        return self.collection().aggregate(
+            [{'$match': to_timeseries_filter(match)}, FLATTEN_STAGE] + stages,
+            allowDiskUse=True
+        )
+    
+    def find(self, query: AnalyticsQuery, *fields: str) -> Iterator[CampaignAnalytics]:
+        """
+        Find matching measurements in date order as campaign analytics
+        
+        Only metric fields and recommendations are stored here; heavy
+        sub-documents stay on the campaign analytics documents.
+        
+        Args:
+            query (AnalyticsQuery): Analytics query
+            *fields (str): Fields to load. Loads every stored field when omitted.
+        
+        Returns:
+            Iterator[CampaignAnalytics]: Campaign analytics
+        """
+        stages = [{'$sort': {'date': 1}}]
+        
+        if fields:
+            stages.append({'$project': {field: 1 for field in fields}})
+        
+        for document in self.aggregate(query.filter(), stages):
+            yield CampaignAnalytics._from_son(document)
+
+def get_metrics_store(backend: Optional[str] = None):
+    """
+    Get the metrics storage backend
+    
+    Args:
+        backend (Optional[str], optional): 'documents' or 'timeseries'.
+            Defaults to ANALYTICS_METRICS_BACKEND.
+    
+    Returns:
+        DocumentMetricsStore or TimeSeriesMetricsStore: Metrics store
+    """
+    backend = backend or os.getenv('ANALYTICS_METRICS_BACKEND', 'documents')
+    
+    if backend == 'timeseries':
+        return TimeSeriesMetricsStore()
+    
+    return DocumentMetricsStore()
@@ -0,0 +1,226 @@
+"""
+AdGenius AI Backend - Audience Insight Merge Engine
+"""
+from collections import Counter
+from numbers import Number
+from typing import Dict, Iterable, Optional, Union
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Insight dimensions combined across analytics documents
+AUDIENCE_DIMENSIONS = (
+    'age_gender',
+    'locations',
+    'interests',
+    'behaviors',
+    'devices',
+    'platforms',
+    'placements',
+    'time_of_day',
+    'day_of_week'
+)
+
+# Dimensions with a small fixed set of slots, merged as dense vectors
+DENSE_DIMENSIONS = {
+    'time_of_day': tuple(str(hour) for hour in range(24)),
+    'day_of_week': ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+}
+
+# Position of each dense slot in its vector
+SLOT_POSITIONS = {
+    dimension: {slot: position for position, slot in enumerate(slots)}
+    for dimension, slots in DENSE_DIMENSIONS.items()
+}
+
+def _is_number(value) -> bool:
+    """
+    Check whether a value is a numeric leaf
+    
+    Args:
+        value: Value
+    
+    Returns:
+        bool: True for ints and floats (but not booleans)
+    """
+    return isinstance(value, Number) and not isinstance(value, bool)
+
+def merge_into(target: Counter, source: Dict) -> Counter:
+    """
+    Add the numeric leaves of a nested dictionary into a nested counter
+    
+    A number meeting a dictionary under the same key is kept as that
+    dictionary's 'count' leaf. Non-numeric leaves are ignored.
+    
+    Args:
+        target (Counter): Nested counter to add into
+        source (Dict): Nested insight dictionary
+    
+    Returns:
+        Counter: The target
+    """
+    for key, value in source.items():
+        current = target.get(key)
+        
+        if isinstance(value, dict):
+            if not isinstance(current, Counter):
+                target[key] = current = Counter({'count': current} if current else {})
+            
+            merge_into(current, value)
+        elif _is_number(value):
+            if isinstance(current, Counter):
+                current['count'] += value
+            else:
+                target[key] = (current or 0) + value
+    
+    return target
+
+def _rank(value) -> float:
+    """
+    Get the ranking score of an insight entry
+    
+    Args:
+        value: Scalar or nested counter
+    
+    Returns:
+        float: The value itself, else its impressions, else the sum of its numeric leaves
+    """
+    if not isinstance(value, Counter):
+        return value
+    
+    if _is_number(value.get('impressions')):
+        return value['impressions']
+    
+    return sum(leaf for leaf in value.values() if _is_number(leaf))
+
+def _to_dict(value):
+    """
+    Convert nested counters into plain dictionaries
+    
+    Args:
+        value: Scalar or nested counter
+    
+    Returns:
+        Scalar or nested dictionary
+    """
+    if isinstance(value, Counter):
+        return {key: _to_dict(leaf) for key, leaf in value.items()}
+    
+    return value
+
+def _to_number(value: float) -> Union[int, float]:
+    """
+    Convert a vector total back to an int when it is whole
+    
+    Args:
+        value (float): Total
+    
+    Returns:
+        Union[int, float]: Total
+    """
+    return int(value) if float(value).is_integer() else value
+
+class InsightMerger:
+    """Merges audience insights from many analytics documents in one pass"""
+    
+    def __init__(self, dimensions: Iterable[str] = AUDIENCE_DIMENSIONS):
+        """
+        Initialize insight merger
+        
+        Args:
+            dimensions (Iterable[str], optional): Dimensions to merge. Defaults to AUDIENCE_DIMENSIONS.
+        """
+        self.dimensions = tuple(dimensions)
+        self.count = 0
+        self.sparse = {dimension: Counter() for dimension in self.dimensions}
+        self.dense = {
+            dimension: np.zeros(len(DENSE_DIMENSIONS[dimension]))
+            for dimension in self.dimensions
+            if HAS_NUMPY and dimension in DENSE_DIMENSIONS
+        }
+    
+    def add(self, insights: Dict):
+        """
+        Add one insights dictionary
+        
+        Args:
+            insights (Dict): Insight dimensions, each a (possibly nested) dictionary
+        """
+        for dimension in self.dimensions:
+            values = insights.get(dimension)
+            
+            if not values:
+                continue
+            
+            if dimension in DENSE_DIMENSIONS:
+                # Normalize slot keys so 'Monday' and 'monday' land together
+                vector = self.dense.get(dimension)
+                rest = {}
+                
+                for key, value in values.items():
+                    slot = str(key).lower()
+                    
+                    if slot not in SLOT_POSITIONS[dimension]:
+                        rest[key] = value
+                    elif vector is not None and _is_number(value):
+                        vector[SLOT_POSITIONS[dimension][slot]] += value
+                    else:
+                        rest[slot] = value
+                
+                values = rest
+            
+            merge_into(self.sparse[dimension], values)
+        
+        self.count += 1
+    
+    def merge(self, insights_list: Iterable[Dict]) -> 'InsightMerger':
+        """
+        Add every insights dictionary from an iterable
+        
+        Args:
+            insights_list (Iterable[Dict]): Insight dictionaries
+        
+        Returns:
+            InsightMerger: The merger
+        """
+        for insights in insights_list:
+            self.add(insights)
+        
+        return self
+    
+    def result(self, top_n: Optional[Union[int, Dict[str, int]]] = None) -> Dict:
+        """
+        Get merged insights
+        
+        Args:
+            top_n (Optional[Union[int, Dict[str, int]]], optional): Entries kept per sparse dimension,
+                either one limit or limits by dimension. Defaults to None (keep all).
+        
+        Returns:
+            Dict: Merged insights, sparse dimensions ordered by rank when truncated
+        """
+        merged = {}
+        
+        for dimension in self.dimensions:
+            entries = self.sparse[dimension]
+            limit = top_n.get(dimension) if isinstance(top_n, dict) else top_n
+            
+            if dimension in self.dense and self.dense[dimension].any():
+                # Dense dimensions with data keep every slot, in slot order
+                values = {
+                    slot: _to_number(total)
+                    for slot, total in zip(DENSE_DIMENSIONS[dimension], self.dense[dimension].tolist())
+                }
+                values.update(_to_dict(entries))
+            elif limit:
+                ranked = sorted(entries.items(), key=lambda item: _rank(item[1]), reverse=True)[:limit]
+                values = {key: _to_dict(value) for key, value in ranked}
+            else:
+                values = _to_dict(entries)
+            
+            merged[dimension] = values
+        
+        return merged
@@ -0,0 +1,99 @@
+"""
+AdGenius AI Backend - Batched Campaign Lookups
+"""
+from typing import Dict, Iterable, Optional
+
+from flask import g, has_app_context
+
+from app.models.campaign import Campaign
+
+# Campaign fields loaded by batched lookups
+LOOKUP_FIELDS = ('id', 'name', 'platform', 'status', 'platform_campaign_id')
+
+class CampaignIdentityMap:
+    """Loads referenced campaigns with one $in query and keeps one instance per ID"""
+    
+    def __init__(self):
+        """Initialize campaign identity map"""
+        self.campaigns = {}
+        self.queries = 0
+    
+    def add(self, campaigns: Iterable[Campaign]):
+        """
+        Register campaigns that were already loaded
+        
+        Args:
+            campaigns (Iterable[Campaign]): Campaigns
+        """
+        for campaign in campaigns:
+            if self.campaigns.get(str(campaign.id)) is None:
+                self.campaigns[str(campaign.id)] = campaign
+    
+    def get_many(self, campaign_ids: Iterable[str]) -> Dict[str, Campaign]:
+        """
+        Get campaigns by ID, loading the ones not seen yet in a single query
+        
+        Args:
+            campaign_ids (Iterable[str]): Campaign IDs
+        
+        Returns:
+            Dict[str, Campaign]: Campaigns found, by ID
+        """
+        campaign_ids = {str(campaign_id) for campaign_id in campaign_ids if campaign_id}
+        missing = [campaign_id for campaign_id in campaign_ids if campaign_id not in self.campaigns]
+        
+        if missing:
+            self.queries += 1
+            
+            for campaign_id in missing:
+                self.campaigns[campaign_id] = None
+            
+            self.add(Campaign.objects(id__in=missing).only(*LOOKUP_FIELDS))
+        
+        return {
+            campaign_id: self.campaigns[campaign_id]
+            for campaign_id in campaign_ids
+            if self.campaigns[campaign_id] is not None
+        }
+    
+    def get(self, campaign_id: str) -> Optional[Campaign]:
+        """
+        Get one campaign by ID
+        
+        Args:
+            campaign_id (str): Campaign ID
+        
+        Returns:
+            Optional[Campaign]: Campaign, or None if it does not exist
+        """
+        return self.get_many([campaign_id]).get(str(campaign_id))
+    
+    def names(self, campaign_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        Get campaign names by ID
+        
+        Args:
+            campaign_ids (Iterable[str]): Campaign IDs
+        
+        Returns:
+            Dict[str, str]: Campaign names by ID
+        """
+        return {
+            campaign_id: campaign.name
+            for campaign_id, campaign in self.get_many(campaign_ids).items()
+        }
+
+def get_identity_map() -> CampaignIdentityMap:
+    """
+    Get the campaign identity map of the current request
+    
+    Returns:
+        CampaignIdentityMap: Map shared for the request, or a new one outside a Flask context
+    """
+    if not has_app_context():
+        return CampaignIdentityMap()
+    
+    if 'campaign_identity_map' not in g:
+        g.campaign_identity_map = CampaignIdentityMap()
+    
+    return g.campaign_identity_map
@@ -17,6 +17,7 @@ from app.platform_connectors.shopee_connector import ShopeeConnector
 from app.ai_modules.audience_targeting import AudienceTargetingAI
 from app.ai_modules.creative_generation import CreativeGenerationAI
 from app.ai_modules.campaign_optimization import CampaignOptimizationAI
+from app.services.analytics_cache import get_analytics_cache
 
 class CampaignService:
     """Campaign service"""
@@ -30,6 +31,7 @@ class CampaignService:
         self.targeting_ai = AudienceTargetingAI()
         self.creative_ai = CreativeGenerationAI()
         self.optimization_ai = CampaignOptimizationAI()
+        self.analytics_cache = get_analytics_cache()
     
     def get_campaigns(self, user_id: str, page: int = 1, per_page: int = 10, 
                      platform: Optional[str] = None, status: Optional[str] = None) -> Dict:
@@ -204,6 +206,7 @@ class CampaignService:
         
         # Save campaign
         campaign.save()
+        self._invalidate_analytics(user_id)
         
         return campaign.to_dict()
     
@@ -333,6 +336,7 @@ class CampaignService:
         
         # Save campaign
         campaign.save()
+        self._invalidate_analytics(user_id)
         
         return campaign.to_dict()
     
@@ -355,6 +359,7 @@ class CampaignService:
         
         # Delete campaign
         campaign.delete()
+        self._invalidate_analytics(user_id)
         
         return True
     
@@ -405,6 +410,7 @@ class CampaignService:
         campaign.status = 'active'
         campaign.updated_at = datetime.utcnow()
         campaign.save()
+        self._invalidate_analytics(user_id)
         
         return {
             'platform_id': result.get('platform_id'),
@@ -448,6 +454,7 @@ class CampaignService:
         campaign.status = 'paused'
         campaign.updated_at = datetime.utcnow()
         campaign.save()
+        self._invalidate_analytics(user_id)
         
         return True
     
@@ -488,6 +495,7 @@ class CampaignService:
         campaign.status = 'active'
         campaign.updated_at = datetime.utcnow()
         campaign.save()
+        self._invalidate_analytics(user_id)
         
         return True
     
@@ -534,6 +542,7 @@ class CampaignService:
         
         # Save campaign
         campaign.save()
+        self._invalidate_analytics(user_id)
         
         return {
             'recommendations': result.get('recommendations', [])
@@ -601,6 +610,18 @@ class CampaignService:
         
         return creative
     
+    def _invalidate_analytics(self, user_id: str):
+        """
+        Drop a user's cached analytics after a campaign change
+        
+        Dashboards count campaigns by status and show their names, so every
+        create, update, status change or delete starts a new cache generation.
+        
+        Args:
+            user_id (str): User ID
+        """
+        self.analytics_cache.invalidate(user_id)
+    
     def _get_platform_connector(self, platform: str):
         """
         Get platform connector
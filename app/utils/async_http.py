@@ -0,0 +1,128 @@
+"""
+AdGenius AI Backend - Async HTTP Sessions
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from app.utils.http_session import _setting, get_timeout
+
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+def client_session(platform: str) -> 'aiohttp.ClientSession':
+    """
+    Build an async session for a platform
+    
+    Uses the same connection cap and timeouts as the platform's pooled
+    requests session (e.g. TIKTOK_HTTP_MAX_CONNECTIONS). The session must
+    be created and closed on the event loop that uses it.
+    
+    Args:
+        platform (str): Platform name
+    
+    Returns:
+        aiohttp.ClientSession: Session
+    """
+    if not HAS_AIOHTTP:
+        raise RuntimeError('aiohttp is not installed')
+    
+    connect_timeout, read_timeout = get_timeout(platform)
+    
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit_per_host=int(_setting(platform, 'HTTP_MAX_CONNECTIONS', '10'))),
+        timeout=aiohttp.ClientTimeout(connect=connect_timeout, sock_read=read_timeout)
+    )
+
+def query_items(params: Optional[Dict] = None) -> List[Tuple[str, str]]:
+    """
+    Encode query parameters the way requests does
+    
+    List values become repeated keys and other values are sent as strings.
+    
+    Args:
+        params (Optional[Dict], optional): Query parameters
+    
+    Returns:
+        List[Tuple[str, str]]: Query items
+    """
+    items = []
+    
+    for key, value in (params or {}).items():
+        for item in (value if isinstance(value, (list, tuple)) else [value]):
+            if item is not None:
+                items.append((key, str(item)))
+    
+    return items
+
+def run_sync(awaitable: Awaitable) -> Any:
+    """
+    Run a coroutine to completion from synchronous code
+    
+    When the calling thread already runs an event loop, the coroutine runs
+    on a fresh loop in a worker thread instead.
+    
+    Args:
+        awaitable (Awaitable): Coroutine
+    
+    Returns:
+        Any: Coroutine result
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(awaitable)
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, awaitable).result()
+
+async def gather_bounded(tasks: Dict[Hashable, Callable[[], Awaitable]], max_concurrency: int,
+                         timeout: Optional[float] = None) -> Tuple[Dict[Hashable, Any], Dict[Hashable, str]]:
+    """
+    Run coroutines on the current event loop and collect whatever finishes before the deadline
+    
+    The async counterpart of run_bounded: at most max_concurrency coroutines
+    run at once, and those still running at the deadline are cancelled.
+    
+    Args:
+        tasks (Dict[Hashable, Callable[[], Awaitable]]): Zero-argument coroutine functions by key
+        max_concurrency (int): Maximum coroutines running at once
+        timeout (Optional[float], optional): Overall deadline in seconds. Defaults to None.
+    
+    Returns:
+        Tuple[Dict[Hashable, Any], Dict[Hashable, str]]: Results and errors, both by task key
+    """
+    results = {}
+    errors = {}
+    
+    if not tasks:
+        return results, errors
+    
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    
+    async def bounded(task):
+        async with semaphore:
+            return await task()
+    
+    futures = {asyncio.ensure_future(bounded(task)): key for key, task in tasks.items()}
+    done, not_done = await asyncio.wait(futures, timeout=timeout)
+    
+    for future in done:
+        key = futures[future]
+        
+        try:
+            results[key] = future.result()
+        except Exception as e:
+            errors[key] = str(e)
+    
+    for future in not_done:
+        future.cancel()
+        errors[futures[future]] = 'Deadline exceeded'
+    
+    if not_done:
+        await asyncio.gather(*not_done, return_exceptions=True)
+    
+    return results, errors
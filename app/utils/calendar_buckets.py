@@ -0,0 +1,275 @@
+"""
+AdGenius AI Backend - Calendar Bucketing Engine
+"""
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone as dt_timezone, tzinfo
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Supported bucket granularities, finest first
+GRANULARITIES = ('day', 'week', 'month', 'quarter', 'year')
+
+# Bucket boundary sets kept for reuse across requests
+BUCKET_CACHE_SIZE = 256
+
+def resolve_timezone(name: Optional[str] = None) -> tzinfo:
+    """
+    Resolve an IANA time zone name
+    
+    Args:
+        name (Optional[str], optional): Time zone name (e.g. 'Asia/Bangkok'). Defaults to UTC.
+    
+    Returns:
+        tzinfo: Time zone, or UTC when the name is empty or unknown
+    """
+    if not name:
+        return dt_timezone.utc
+    
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return dt_timezone.utc
+
+def local_now(timezone: Optional[str] = None) -> datetime:
+    """
+    Get the current wall-clock time in a time zone
+    
+    Args:
+        timezone (Optional[str], optional): Time zone name. Defaults to UTC.
+    
+    Returns:
+        datetime: Naive local time
+    """
+    return datetime.now(resolve_timezone(timezone)).replace(tzinfo=None)
+
+def period_start(date: datetime, granularity: str) -> datetime:
+    """
+    Get the start of the calendar period containing a date
+    
+    Args:
+        date (datetime): Calendar date
+        granularity (str): Granularity (day, week, month, quarter, year)
+    
+    Returns:
+        datetime: Period start (weeks are ISO weeks starting on Monday)
+    """
+    day = datetime(date.year, date.month, date.day)
+    
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    elif granularity == 'month':
+        return day.replace(day=1)
+    elif granularity == 'quarter':
+        return datetime(day.year, 3 * ((day.month - 1) // 3) + 1, 1)
+    elif granularity == 'year':
+        return datetime(day.year, 1, 1)
+    
+    return day
+
+def next_period_start(start: datetime, granularity: str) -> datetime:
+    """
+    Get the start of the period following a period
+    
+    Args:
+        start (datetime): Period start
+        granularity (str): Granularity (day, week, month, quarter, year)
+    
+    Returns:
+        datetime: Next period start
+    """
+    if granularity == 'week':
+        return start + timedelta(days=7)
+    elif granularity in ('month', 'quarter'):
+        months = start.month - 1 + (3 if granularity == 'quarter' else 1)
+        return datetime(start.year + months // 12, months % 12 + 1, 1)
+    elif granularity == 'year':
+        return datetime(start.year + 1, 1, 1)
+    
+    return start + timedelta(days=1)
+
+def period_label(start: datetime, granularity: str) -> str:
+    """
+    Get the display label of a period
+    
+    Args:
+        start (datetime): Period start
+        granularity (str): Granularity (day, week, month, quarter, year)
+    
+    Returns:
+        str: Period label
+    """
+    if granularity == 'week':
+        return f"Week of {start.strftime('%b %d, %Y')}"
+    elif granularity == 'month':
+        return start.strftime('%b %Y')
+    elif granularity == 'quarter':
+        return f'Q{(start.month - 1) // 3 + 1} {start.year}'
+    elif granularity == 'year':
+        return str(start.year)
+    
+    return start.date().isoformat()
+
+def period_key(start: datetime, granularity: str) -> str:
+    """
+    Get the sortable key of a period
+    
+    Args:
+        start (datetime): Period start
+        granularity (str): Granularity (day, week, month, quarter, year)
+    
+    Returns:
+        str: Period key (e.g. '2024-01-01', '2024-W01', '2024-01', '2024-Q1', '2024')
+    """
+    if granularity == 'week':
+        iso_year, iso_week, _ = start.isocalendar()
+        return f'{iso_year}-W{iso_week:02d}'
+    elif granularity == 'month':
+        return start.strftime('%Y-%m')
+    elif granularity == 'quarter':
+        return f'{start.year}-Q{(start.month - 1) // 3 + 1}'
+    elif granularity == 'year':
+        return str(start.year)
+    
+    return start.date().isoformat()
+
+def previous_period(start_date: datetime, end_date: datetime) -> Tuple[datetime, datetime]:
+    """
+    Get the window of the same length immediately before a date range
+    
+    Args:
+        start_date (datetime): First day of the range
+        end_date (datetime): Last day of the range (inclusive)
+    
+    Returns:
+        Tuple[datetime, datetime]: First and last day of the previous window
+    """
+    start = datetime(start_date.year, start_date.month, start_date.day)
+    days = max(1, (end_date.date() - start.date()).days + 1)
+    
+    return start - timedelta(days=days), start - timedelta(days=1)
+
+class CalendarBuckets:
+    """Precomputed calendar period boundaries that assign dates to buckets by binary search"""
+    
+    def __init__(self, start_date: datetime, end_date: datetime, granularity: str = 'day'):
+        """
+        Initialize calendar buckets
+        
+        Args:
+            start_date (datetime): First calendar day covered
+            end_date (datetime): Last calendar day covered (inclusive)
+            granularity (str, optional): Granularity (day, week, month, quarter, year). Defaults to 'day'.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f'Unsupported granularity: {granularity}')
+        
+        self.granularity = granularity
+        
+        stop = datetime(end_date.year, end_date.month, end_date.day) + timedelta(days=1)
+        starts = []
+        current = period_start(start_date, granularity)
+        
+        while current < stop:
+            starts.append(current)
+            current = next_period_start(current, granularity)
+        
+        self.starts = starts
+        
+        # Day ordinals of each bucket start, then of the end of the last bucket
+        self.day_edges = [start.toordinal() for start in starts] + [current.toordinal()]
+        
+        if HAS_NUMPY:
+            self.day_edges = np.asarray(self.day_edges, dtype=np.int64)
+    
+    def __len__(self) -> int:
+        """
+        Get the number of buckets
+        
+        Returns:
+            int: Number of buckets
+        """
+        return len(self.starts)
+    
+    def labels(self) -> List[str]:
+        """
+        Get the display label of every bucket
+        
+        Returns:
+            List[str]: Bucket labels
+        """
+        return [period_label(start, self.granularity) for start in self.starts]
+    
+    def keys(self) -> List[str]:
+        """
+        Get the sortable key of every bucket
+        
+        Returns:
+            List[str]: Bucket keys
+        """
+        return [period_key(start, self.granularity) for start in self.starts]
+    
+    def assign(self, dates: Iterable[datetime]) -> List[int]:
+        """
+        Assign calendar dates to buckets
+        
+        The dates are days as stored (already in the reporting calendar), so
+        only their day is compared.
+        
+        Args:
+            dates (Iterable[datetime]): Calendar dates
+        
+        Returns:
+            List[int]: Bucket index of each date, or -1 outside the buckets
+        """
+        return self._search(self.day_edges, [date.toordinal() for date in dates])
+    
+    def _search(self, edges, values: List[int]) -> List[int]:
+        """
+        Find the bucket of each value between sorted edges
+        
+        Args:
+            edges (Sequence[int]): Bucket starts followed by the end of the last bucket
+            values (List[int]): Values on the same scale as the edges
+        
+        Returns:
+            List[int]: Bucket index of each value, or -1 outside the buckets
+        """
+        if not values:
+            return []
+        
+        last = len(edges) - 1
+        
+        if HAS_NUMPY:
+            indexes = np.searchsorted(edges, np.asarray(values, dtype=np.int64), side='right') - 1
+            indexes[indexes >= last] = -1
+            return indexes.tolist()
+        
+        indexes = []
+        
+        for value in values:
+            index = bisect_right(edges, value) - 1
+            indexes.append(index if index < last else -1)
+        
+        return indexes
+
+@lru_cache(maxsize=BUCKET_CACHE_SIZE)
+def get_calendar_buckets(start_date: datetime, end_date: datetime, granularity: str = 'day') -> CalendarBuckets:
+    """
+    Get calendar buckets, reusing the boundaries computed for the same range
+    
+    Args:
+        start_date (datetime): First calendar day covered
+        end_date (datetime): Last calendar day covered (inclusive)
+        granularity (str, optional): Granularity (day, week, month, quarter, year). Defaults to 'day'.
+    
+    Returns:
+        CalendarBuckets: Shared calendar buckets; treat as read-only
+    """
+    return CalendarBuckets(start_date, end_date, granularity)
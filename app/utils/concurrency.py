@@ -0,0 +1,49 @@
+"""
+AdGenius AI Backend - Bounded Concurrency Utilities
+"""
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+def run_bounded(tasks: Dict[Hashable, Callable[[], Any]], max_workers: int,
+                timeout: Optional[float] = None) -> Tuple[Dict[Hashable, Any], Dict[Hashable, str]]:
+    """
+    Run tasks on a bounded thread pool and collect whatever finishes before the deadline
+    
+    Tasks still running at the deadline are abandoned: their results are
+    discarded and queued tasks are cancelled, so the caller returns on time.
+    
+    Args:
+        tasks (Dict[Hashable, Callable[[], Any]]): Zero-argument callables by key
+        max_workers (int): Maximum tasks running at once
+        timeout (Optional[float], optional): Overall deadline in seconds. Defaults to None.
+    
+    Returns:
+        Tuple[Dict[Hashable, Any], Dict[Hashable, str]]: Results and errors, both by task key
+    """
+    results = {}
+    errors = {}
+    
+    if not tasks:
+        return results, errors
+    
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks))))
+    
+    try:
+        futures = {executor.submit(task): key for key, task in tasks.items()}
+        done, not_done = wait(futures, timeout=timeout)
+        
+        for future in done:
+            key = futures[future]
+            
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                errors[key] = str(e)
+        
+        for future in not_done:
+            future.cancel()
+            errors[futures[future]] = 'Deadline exceeded'
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return results, errors
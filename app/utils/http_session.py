@@ -0,0 +1,101 @@
+"""
+AdGenius AI Backend - Pooled HTTP Sessions
+"""
+import os
+import threading
+from typing import Dict, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Hosts a connector keeps warm connection pools for
+DEFAULT_POOL_CONNECTIONS = 4
+
+# Sessions shared by every connector instance, by platform
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+def _setting(platform: str, name: str, default: str) -> str:
+    """
+    Read an HTTP setting for a platform
+    
+    Args:
+        platform (str): Platform name
+        name (str): Setting name (e.g. 'HTTP_READ_TIMEOUT')
+        default (str): Default value
+    
+    Returns:
+        str: Value of e.g. TIKTOK_HTTP_READ_TIMEOUT, else CONNECTOR_HTTP_READ_TIMEOUT, else the default
+    """
+    return os.getenv(f'{platform.upper()}_{name}', os.getenv(f'CONNECTOR_{name}', default))
+
+def get_timeout(platform: str) -> Tuple[float, float]:
+    """
+    Get the connect and read timeouts of a platform
+    
+    Args:
+        platform (str): Platform name
+    
+    Returns:
+        Tuple[float, float]: Connect and read timeouts in seconds
+    """
+    return (
+        float(_setting(platform, 'HTTP_CONNECT_TIMEOUT', '3.05')),
+        float(_setting(platform, 'HTTP_READ_TIMEOUT', '30'))
+    )
+
+def build_session(max_connections_per_host: int, pool_connections: int = DEFAULT_POOL_CONNECTIONS) -> requests.Session:
+    """
+    Build a session with keep-alive connection pools
+    
+    Args:
+        max_connections_per_host (int): Connections kept open per host; extra requests wait for one
+        pool_connections (int, optional): Hosts with a pool. Defaults to DEFAULT_POOL_CONNECTIONS.
+    
+    Returns:
+        requests.Session: Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=max_connections_per_host,
+        pool_block=True
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    
+    return session
+
+def get_session(platform: str) -> requests.Session:
+    """
+    Get the shared session of a platform, creating it on first use
+    
+    The session is shared across threads; its connection pools are
+    thread-safe and capped at the platform's connections per host
+    (e.g. TIKTOK_HTTP_MAX_CONNECTIONS, else CONNECTOR_HTTP_MAX_CONNECTIONS).
+    
+    Args:
+        platform (str): Platform name
+    
+    Returns:
+        requests.Session: Session
+    """
+    session = _sessions.get(platform)
+    
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(platform)
+            
+            if session is None:
+                session = build_session(int(_setting(platform, 'HTTP_MAX_CONNECTIONS', '10')))
+                _sessions[platform] = session
+    
+    return session
+
+def close_sessions():
+    """Close every shared session and its pooled connections"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        
+        _sessions.clear()
@@ -0,0 +1,241 @@
+"""
+AdGenius AI Backend - Performance Metrics Kernel
+"""
+from datetime import datetime
+from typing import Dict, List, Sequence
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# Summed metrics every derived metric is computed from
+BASE_METRICS = ('impressions', 'clicks', 'conversions', 'spend', 'revenue')
+
+# Derived metrics returned by the kernel
+DERIVED_METRICS = ('ctr', 'cpc', 'cpm', 'conversion_rate', 'cost_per_conversion', 'roas')
+
+def _safe_divide(numerator, denominator, scale: float = 1.0):
+    """
+    Divide column arrays, yielding 0 where the denominator is not positive
+    
+    Args:
+        numerator (np.ndarray): Numerator
+        denominator (np.ndarray): Denominator
+        scale (float, optional): Multiplier applied to the quotient. Defaults to 1.0.
+    
+    Returns:
+        np.ndarray: Quotient
+    """
+    result = np.zeros(len(denominator), dtype=float)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    
+    return result * scale if scale != 1.0 else result
+
+def derive_metrics(impressions: Sequence, clicks: Sequence, conversions: Sequence,
+                   spend: Sequence, revenue: Sequence) -> Dict[str, List[float]]:
+    """
+    Calculate derived metrics for columns of summed metrics in one pass
+    
+    Args:
+        impressions (Sequence): Impressions
+        clicks (Sequence): Clicks
+        conversions (Sequence): Conversions
+        spend (Sequence): Spend
+        revenue (Sequence): Revenue
+    
+    Returns:
+        Dict[str, List[float]]: Derived metric columns (ctr, cpc, cpm, conversion_rate, cost_per_conversion, roas)
+    """
+    if not HAS_NUMPY:
+        rows = [
+            derive_row(*values)
+            for values in zip(impressions, clicks, conversions, spend, revenue)
+        ]
+        return {metric: [row[metric] for row in rows] for metric in DERIVED_METRICS}
+    
+    impressions = np.asarray(impressions, dtype=float)
+    clicks = np.asarray(clicks, dtype=float)
+    conversions = np.asarray(conversions, dtype=float)
+    spend = np.asarray(spend, dtype=float)
+    revenue = np.asarray(revenue, dtype=float)
+    
+    columns = {
+        'ctr': _safe_divide(clicks, impressions, 100),
+        'cpc': _safe_divide(spend, clicks),
+        'cpm': _safe_divide(spend, impressions, 1000),
+        'conversion_rate': _safe_divide(conversions, clicks, 100),
+        'cost_per_conversion': _safe_divide(spend, conversions),
+        'roas': _safe_divide(revenue, spend)
+    }
+    
+    return {metric: column.tolist() for metric, column in columns.items()}
+
+def derive_row(impressions: float, clicks: float, conversions: float,
+               spend: float, revenue: float) -> Dict[str, float]:
+    """
+    Calculate derived metrics for a single row
+    
+    Args:
+        impressions (float): Impressions
+        clicks (float): Clicks
+        conversions (float): Conversions
+        spend (float): Spend
+        revenue (float): Revenue
+    
+    Returns:
+        Dict[str, float]: Derived metrics
+    """
+    return {
+        'ctr': (clicks / impressions * 100) if impressions > 0 else 0.0,
+        'cpc': (spend / clicks) if clicks > 0 else 0.0,
+        'cpm': (spend / impressions * 1000) if impressions > 0 else 0.0,
+        'conversion_rate': (conversions / clicks * 100) if clicks > 0 else 0.0,
+        'cost_per_conversion': (spend / conversions) if conversions > 0 else 0.0,
+        'roas': (revenue / spend) if spend > 0 else 0.0
+    }
+
+def apply_derived_metrics(rows: List[Dict]) -> List[Dict]:
+    """
+    Add derived metrics in place to rows holding summed metrics
+    
+    Args:
+        rows (List[Dict]): Rows with impressions, clicks, conversions, spend and revenue keys
+    
+    Returns:
+        List[Dict]: The same rows with derived metrics set
+    """
+    if len(rows) == 1:
+        rows[0].update(derive_row(*(rows[0].get(metric, 0) for metric in BASE_METRICS)))
+        return rows
+    
+    columns = derive_metrics(*([row.get(metric, 0) for row in rows] for metric in BASE_METRICS))
+    
+    for index, row in enumerate(rows):
+        for metric in DERIVED_METRICS:
+            row[metric] = columns[metric][index]
+    
+    return rows
+
+def summarize(totals: Dict) -> Dict:
+    """
+    Build the summary block (totals and averages) from summed metrics
+    
+    Args:
+        totals (Dict): Impressions, clicks, conversions, spend and revenue
+    
+    Returns:
+        Dict: Summary metrics
+    """
+    metrics = derive_row(*(totals.get(metric, 0) for metric in BASE_METRICS))
+    
+    return {
+        'total_impressions': totals.get('impressions', 0),
+        'total_clicks': totals.get('clicks', 0),
+        'total_conversions': totals.get('conversions', 0),
+        'total_spend': totals.get('spend', 0.0),
+        'total_revenue': totals.get('revenue', 0.0),
+        'average_ctr': metrics['ctr'],
+        'average_cpc': metrics['cpc'],
+        'average_cpm': metrics['cpm'],
+        'average_conversion_rate': metrics['conversion_rate'],
+        'average_cost_per_conversion': metrics['cost_per_conversion'],
+        'roas': metrics['roas']
+    }
+
+def derive_roi_row(spend: float, revenue: float) -> Dict[str, float]:
+    """
+    Calculate ROI and ROAS for a single row
+    
+    Args:
+        spend (float): Spend
+        revenue (float): Revenue
+    
+    Returns:
+        Dict[str, float]: ROI (percent) and ROAS
+    """
+    return {
+        'roi': ((revenue - spend) / spend * 100) if spend > 0 else 0.0,
+        'roas': (revenue / spend) if spend > 0 else 0.0
+    }
+
+def apply_roi_metrics(rows: List[Dict]) -> List[Dict]:
+    """
+    Add ROI and ROAS in place to rows holding spend and revenue
+    
+    Args:
+        rows (List[Dict]): Rows with spend and revenue keys
+    
+    Returns:
+        List[Dict]: The same rows with roi and roas set
+    """
+    if not HAS_NUMPY or len(rows) == 1:
+        for row in rows:
+            row.update(derive_roi_row(row.get('spend', 0), row.get('revenue', 0)))
+        return rows
+    
+    spend = np.asarray([row.get('spend', 0) for row in rows], dtype=float)
+    revenue = np.asarray([row.get('revenue', 0) for row in rows], dtype=float)
+    
+    roi = _safe_divide(revenue - spend, spend, 100).tolist()
+    roas = _safe_divide(revenue, spend).tolist()
+    
+    for index, row in enumerate(rows):
+        row['roi'] = roi[index]
+        row['roas'] = roas[index]
+    
+    return rows
+
+def hourly_metrics_by_day(hourly_rows: List[Dict]) -> Dict[str, Dict[str, Dict]]:
+    """
+    Group hourly rows by day and hour of day
+    
+    Args:
+        hourly_rows (List[Dict]): Rows with a 'date' (datetime or ISO string) at the start of their hour
+    
+    Returns:
+        Dict[str, Dict[str, Dict]]: Summed metrics by ISO date, then by hour ('0' to '23')
+    """
+    grouped = {}
+    
+    for row in hourly_rows:
+        date = row['date']
+        
+        if isinstance(date, str):
+            date = datetime.fromisoformat(date)
+        
+        hours = grouped.setdefault(date.date().isoformat(), {})
+        metrics = hours.setdefault(str(date.hour), dict.fromkeys(BASE_METRICS, 0))
+        
+        for metric in BASE_METRICS:
+            metrics[metric] += row.get(metric, 0)
+    
+    return grouped
+
+def compare_summaries(current: Dict, previous: Dict) -> Dict:
+    """
+    Compare two summary blocks metric by metric
+    
+    Args:
+        current (Dict): Summary of the current period
+        previous (Dict): Summary of the previous period
+    
+    Returns:
+        Dict: Both summaries with the absolute delta and percentage change of every metric
+            (the change is None when the previous value is 0)
+    """
+    delta = {}
+    change = {}
+    
+    for metric, value in current.items():
+        before = previous.get(metric, 0)
+        delta[metric] = value - before
+        change[metric] = (value - before) / abs(before) * 100 if before else None
+    
+    return {
+        'current': current,
+        'previous': previous,
+        'delta': delta,
+        'change': change
+    }
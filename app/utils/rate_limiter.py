@@ -0,0 +1,487 @@
+"""
+AdGenius AI Backend - Connector Rate Limiter
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from app.utils.http_session import _setting
+
+try:
+    import redis
+    HAS_REDIS = True
+except ImportError:
+    HAS_REDIS = False
+
+logger = logging.getLogger(__name__)
+
+# Usage (percent of the platform's quota) above which the refill rate is scaled down
+ADAPT_THRESHOLD = 75.0
+
+# Lowest fraction of the configured rate kept while usage is high
+MIN_RATE_FACTOR = 0.1
+
+# Seconds a reported usage level keeps scaling the rate without a fresher report
+ADAPT_WINDOW = 60
+
+# Seconds a bucket pauses after a 429 without a Retry-After header
+DEFAULT_RETRY_AFTER = 1.0
+
+# Refills a bucket, then takes tokens or returns the seconds until they are available.
+# KEYS: bucket hash, rate factor, pause marker. ARGV: rate per second, capacity, tokens.
+TAKE_SCRIPT = """
+local pause = redis.call('PTTL', KEYS[3])
+if pause > 0 then
+    return tostring(pause / 1000)
+end
+local rate = tonumber(ARGV[1]) * tonumber(redis.call('GET', KEYS[2]) or '1')
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local last = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - last) * rate)
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return tostring(wait)
+"""
+
+def parse_rate_limit_headers(headers: Optional[Mapping]) -> Tuple[Optional[float], float]:
+    """
+    Read quota usage from rate-limit response headers
+    
+    Understands Facebook's x-business-use-case-usage, x-app-usage and
+    x-ad-account-usage, plus the generic X-RateLimit-Limit/Remaining and
+    Retry-After headers.
+    
+    Args:
+        headers (Optional[Mapping]): Response headers
+    
+    Returns:
+        Tuple[Optional[float], float]: Highest usage in percent (None when no header
+            reports it) and seconds to pause before the next call
+    """
+    headers = {str(name).lower(): value for name, value in dict(headers or {}).items()}
+    usages = []
+    pause = 0.0
+    
+    def load(name):
+        try:
+            return json.loads(headers[name]) if isinstance(headers.get(name), str) else headers.get(name)
+        except ValueError:
+            return None
+    
+    business_usage = load('x-business-use-case-usage')
+    
+    if isinstance(business_usage, dict):
+        for entries in business_usage.values():
+            for entry in entries if isinstance(entries, list) else [entries]:
+                usages.extend(float(entry.get(field, 0)) for field in ('call_count', 'total_cputime', 'total_time'))
+                pause = max(pause, float(entry.get('estimated_time_to_regain_access', 0)) * 60)
+    
+    app_usage = load('x-app-usage')
+    
+    if isinstance(app_usage, dict):
+        usages.extend(float(app_usage.get(field, 0)) for field in ('call_count', 'total_cputime', 'total_time'))
+    
+    account_usage = load('x-ad-account-usage')
+    
+    if isinstance(account_usage, dict):
+        usages.append(float(account_usage.get('acc_id_util_pct', 0)))
+        
+        if usages[-1] >= 100:
+            pause = max(pause, float(account_usage.get('reset_time_duration', 0)))
+    
+    try:
+        limit = float(headers['x-ratelimit-limit'])
+        remaining = float(headers['x-ratelimit-remaining'])
+        
+        if limit > 0:
+            usages.append(100.0 * (1 - remaining / limit))
+    except (KeyError, TypeError, ValueError):
+        pass
+    
+    try:
+        pause = max(pause, float(headers['retry-after']))
+    except (KeyError, TypeError, ValueError):
+        pass
+    
+    return (max(usages) if usages else None), pause
+
+def rate_factor(usage: float) -> float:
+    """
+    Get the fraction of the configured rate to keep at a usage level
+    
+    Args:
+        usage (float): Quota usage in percent
+    
+    Returns:
+        float: 1 below ADAPT_THRESHOLD, falling linearly to MIN_RATE_FACTOR at 100%
+    """
+    if usage < ADAPT_THRESHOLD:
+        return 1.0
+    
+    return max(MIN_RATE_FACTOR, (100.0 - usage) / (100.0 - ADAPT_THRESHOLD))
+
+class LocalTokenBuckets:
+    """In-process token buckets used when Redis is unavailable"""
+    
+    def __init__(self):
+        """Initialize local token buckets"""
+        self.buckets = {}
+        self.factors = {}
+        self.pauses = {}
+        self.lock = threading.Lock()
+    
+    def take(self, key: str, rate: float, capacity: float, tokens: float = 1) -> float:
+        """Take tokens from a bucket, or get the seconds until they are available"""
+        with self.lock:
+            now = time.monotonic()
+            paused_until = self.pauses.get(key, 0.0)
+            
+            if paused_until > now:
+                return paused_until - now
+            
+            factor, expires = self.factors.get(key, (1.0, now))
+            rate = rate * (factor if expires > now else 1.0)
+            available, last = self.buckets.get(key, (capacity, now))
+            available = min(capacity, available + max(0.0, now - last) * rate)
+            
+            if available >= tokens:
+                self.buckets[key] = (available - tokens, now)
+                return 0.0
+            
+            self.buckets[key] = (available, now)
+            return (tokens - available) / rate
+    
+    def throttle(self, key: str, factor: float, pause: float = 0.0):
+        """Scale a bucket's rate for ADAPT_WINDOW seconds and optionally pause it"""
+        with self.lock:
+            now = time.monotonic()
+            self.factors[key] = (factor, now + ADAPT_WINDOW)
+            
+            if pause > 0:
+                self.pauses[key] = max(self.pauses.get(key, 0.0), now + pause)
+
+class RedisTokenBuckets:
+    """Redis token buckets shared by every worker"""
+    
+    def __init__(self, client, namespace: str = 'ratelimit'):
+        """Initialize Redis token buckets"""
+        self.client = client
+        self.namespace = namespace
+        self.script = client.register_script(TAKE_SCRIPT)
+    
+    def _keys(self, key: str) -> Tuple[str, str, str]:
+        """Get the bucket, rate factor and pause keys of a bucket, in one cluster slot"""
+        base = f'{self.namespace}:{{{key}}}'
+        
+        return f'{base}:bucket', f'{base}:factor', f'{base}:pause'
+    
+    def take(self, key: str, rate: float, capacity: float, tokens: float = 1) -> float:
+        """Take tokens from a bucket, or get the seconds until they are available"""
+        return float(self.script(keys=self._keys(key), args=[rate, capacity, tokens]))
+    
+    def throttle(self, key: str, factor: float, pause: float = 0.0):
+        """Scale a bucket's rate for ADAPT_WINDOW seconds and optionally pause it"""
+        _, factor_key, pause_key = self._keys(key)
+        pipeline = self.client.pipeline()
+        pipeline.set(factor_key, factor, ex=ADAPT_WINDOW)
+        
+        if pause > 0:
+            pipeline.set(pause_key, 1, px=int(pause * 1000))
+        
+        pipeline.execute()
+
+class RateLimiter:
+    """Token-bucket rate limits per platform, app and account, waited on before each connector call"""
+    
+    def __init__(self, redis_url: Optional[str] = None, max_wait: float = 60.0):
+        """
+        Initialize rate limiter
+        
+        Rates are configured per platform with e.g. TIKTOK_RATE_LIMIT (calls per
+        second) and TIKTOK_RATE_BURST, falling back to CONNECTOR_RATE_LIMIT and
+        CONNECTOR_RATE_BURST.
+        
+        Args:
+            redis_url (Optional[str], optional): Redis URL; in-process buckets are used
+                when it is missing or unreachable. Defaults to None.
+            max_wait (float, optional): Longest wait for budget in seconds. Defaults to 60.
+        """
+        self.max_wait = max_wait
+        self.local = LocalTokenBuckets()
+        self.backend = self._connect(redis_url)
+        self.lock = threading.Lock()
+        self.counters = {}
+    
+    def _connect(self, redis_url: Optional[str]):
+        """
+        Connect to Redis, falling back to in-process buckets
+        
+        Args:
+            redis_url (Optional[str]): Redis URL
+        
+        Returns:
+            Object: Token bucket backend
+        """
+        if HAS_REDIS and redis_url:
+            try:
+                client = redis.Redis.from_url(redis_url, socket_connect_timeout=0.5, socket_timeout=0.5)
+                client.ping()
+                return RedisTokenBuckets(client)
+            except redis.RedisError:
+                pass
+        
+        return self.local
+    
+    def limits(self, platform: str) -> Tuple[float, float]:
+        """
+        Get the configured rate and burst of a platform
+        
+        Args:
+            platform (str): Platform name
+        
+        Returns:
+            Tuple[float, float]: Calls per second and bucket capacity
+        """
+        rate = float(_setting(platform, 'RATE_LIMIT', '5'))
+        burst = float(_setting(platform, 'RATE_BURST', '10'))
+        
+        return rate, max(burst, 1.0)
+    
+    def bucket_key(self, platform: str, app_id: Optional[str], account_id: Optional[str]) -> str:
+        """
+        Get the bucket key of a platform, app and account
+        
+        Args:
+            platform (str): Platform name
+            app_id (Optional[str]): App ID
+            account_id (Optional[str]): Ad account, advertiser or shop ID
+        
+        Returns:
+            str: Bucket key
+        """
+        return f'{platform}:{app_id or "default"}:{account_id or "default"}'
+    
+    def try_acquire(self, platform: str, app_id: Optional[str], account_id: Optional[str], tokens: float = 1) -> float:
+        """
+        Take budget for a call without waiting
+        
+        Args:
+            platform (str): Platform name
+            app_id (Optional[str]): App ID
+            account_id (Optional[str]): Ad account, advertiser or shop ID
+            tokens (float, optional): Budget the call costs. Defaults to 1.
+        
+        Returns:
+            float: 0 when the budget was taken, else seconds until it is available
+        """
+        key = self.bucket_key(platform, app_id, account_id)
+        rate, burst = self.limits(platform)
+        
+        try:
+            return self.backend.take(key, rate, burst, tokens)
+        except Exception:
+            self._count(platform, 'errors')
+            return self.local.take(key, rate, burst, tokens)
+    
+    def acquire(self, platform: str, app_id: Optional[str], account_id: Optional[str], tokens: float = 1) -> bool:
+        """
+        Wait until a call has budget
+        
+        Args:
+            platform (str): Platform name
+            app_id (Optional[str]): App ID
+            account_id (Optional[str]): Ad account, advertiser or shop ID
+            tokens (float, optional): Budget the call costs. Defaults to 1.
+        
+        Returns:
+            bool: Whether the budget was taken within max_wait
+        """
+        deadline = time.monotonic() + self.max_wait
+        waited = False
+        
+        while True:
+            wait = self.try_acquire(platform, app_id, account_id, tokens)
+            
+            if wait <= 0:
+                self._count(platform, 'acquired')
+                
+                if waited:
+                    self._count(platform, 'waited')
+                
+                return True
+            
+            if time.monotonic() + wait > deadline:
+                self._count(platform, 'timeouts')
+                return False
+            
+            waited = True
+            time.sleep(wait)
+    
+    async def acquire_async(self, platform: str, app_id: Optional[str], account_id: Optional[str],
+                            tokens: float = 1) -> bool:
+        """
+        Wait on the event loop until a call has budget
+        
+        Redis round trips run on the loop's default executor, so waiting for
+        budget never blocks other coroutines.
+        
+        Args:
+            platform (str): Platform name
+            app_id (Optional[str]): App ID
+            account_id (Optional[str]): Ad account, advertiser or shop ID
+            tokens (float, optional): Budget the call costs. Defaults to 1.
+        
+        Returns:
+            bool: Whether the budget was taken within max_wait
+        """
+        deadline = time.monotonic() + self.max_wait
+        waited = False
+        
+        while True:
+            wait = await self._off_loop(self.try_acquire, platform, app_id, account_id, tokens)
+            
+            if wait <= 0:
+                self._count(platform, 'acquired')
+                
+                if waited:
+                    self._count(platform, 'waited')
+                
+                return True
+            
+            if time.monotonic() + wait > deadline:
+                self._count(platform, 'timeouts')
+                return False
+            
+            waited = True
+            await asyncio.sleep(wait)
+    
+    async def observe_async(self, platform: str, app_id: Optional[str], account_id: Optional[str],
+                            headers: Optional[Mapping] = None, status_code: Optional[int] = None):
+        """
+        Adapt a bucket to the usage a response reports, from the event loop
+        
+        Args:
+            platform (str): Platform name
+            app_id (Optional[str]): App ID
+            account_id (Optional[str]): Ad account, advertiser or shop ID
+            headers (Optional[Mapping], optional): Response headers. Defaults to None.
+            status_code (Optional[int], optional): HTTP status code. Defaults to None.
+        """
+        await self._off_loop(self.observe, platform, app_id, account_id, headers, status_code)
+    
+    async def _off_loop(self, function: Callable, *args) -> Any:
+        """
+        Call a bucket operation without blocking the event loop on Redis
+        
+        In-process buckets only take a lock, so they are called directly.
+        
+        Args:
+            function (Callable): Bucket operation
+            *args: Positional arguments
+        
+        Returns:
+            Any: Operation result
+        """
+        if self.backend is self.local:
+            return function(*args)
+        
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+    
+    def observe(self, platform: str, app_id: Optional[str], account_id: Optional[str],
+                headers: Optional[Mapping] = None, status_code: Optional[int] = None):
+        """
+        Adapt a bucket to the usage a response reports
+        
+        Args:
+            platform (str): Platform name
+            app_id (Optional[str]): App ID
+            account_id (Optional[str]): Ad account, advertiser or shop ID
+            headers (Optional[Mapping], optional): Response headers. Defaults to None.
+            status_code (Optional[int], optional): HTTP status code. Defaults to None.
+        """
+        try:
+            usage, pause = parse_rate_limit_headers(headers)
+        except Exception:
+            usage, pause = None, 0.0
+        
+        if status_code == 429:
+            pause = max(pause, DEFAULT_RETRY_AFTER)
+        
+        if usage is None and pause <= 0:
+            return
+        
+        factor = rate_factor(usage) if usage is not None else 1.0
+        key = self.bucket_key(platform, app_id, account_id)
+        
+        if factor < 1 or pause > 0:
+            self._count(platform, 'throttled')
+            logger.warning(f"Throttling {key}: usage {usage}%, pause {pause}s")
+        
+        try:
+            self.backend.throttle(key, factor, pause)
+        except Exception:
+            self._count(platform, 'errors')
+            self.local.throttle(key, factor, pause)
+    
+    def stats(self) -> Dict:
+        """
+        Get rate limiter metrics
+        
+        Returns:
+            Dict: Backend and per-platform counters
+        """
+        with self.lock:
+            by_platform = {platform: dict(counters) for platform, counters in self.counters.items()}
+        
+        return {
+            'backend': 'redis' if isinstance(self.backend, RedisTokenBuckets) else 'local',
+            'by_platform': by_platform
+        }
+    
+    def _count(self, platform: str, counter: str):
+        """
+        Increment a counter
+        
+        Args:
+            platform (str): Platform name
+            counter (str): Counter name
+        """
+        with self.lock:
+            counters = self.counters.setdefault(platform, {})
+            counters[counter] = counters.get(counter, 0) + 1
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Get the process-wide rate limiter
+    
+    Returns:
+        RateLimiter: Rate limiter configured from REDIS_URL and CONNECTOR_RATE_MAX_WAIT
+    """
+    global _rate_limiter
+    
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter(
+                redis_url=os.getenv('REDIS_URL'),
+                max_wait=float(os.getenv('CONNECTOR_RATE_MAX_WAIT', 60))
+            )
+        
+        return _rate_limiter
@@ -0,0 +1,306 @@
+"""
+AdGenius AI Backend - Connector Retries and Circuit Breakers
+"""
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.utils.http_session import _setting
+
+# Circuit breaker states
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit is open"""
+
+def is_transient_status(status_code: Optional[int]) -> bool:
+    """
+    Check whether a response status is worth retrying
+    
+    Args:
+        status_code (Optional[int]): HTTP status code
+    
+    Returns:
+        bool: True for 429 and 5xx responses
+    """
+    return status_code is not None and (status_code == 429 or status_code >= 500)
+
+class RetryPolicy:
+    """Retries with jittered exponential backoff"""
+    
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.5, max_delay: float = 8.0):
+        """
+        Initialize retry policy
+        
+        Args:
+            max_attempts (int, optional): Attempts per idempotent call, including the first. Defaults to 3.
+            base_delay (float, optional): Backoff before the first retry in seconds. Defaults to 0.5.
+            max_delay (float, optional): Longest backoff in seconds. Defaults to 8.
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+    
+    @classmethod
+    def for_platform(cls, platform: str) -> 'RetryPolicy':
+        """
+        Build the retry policy of a platform
+        
+        Reads e.g. TIKTOK_RETRY_ATTEMPTS, TIKTOK_RETRY_BASE_DELAY and
+        TIKTOK_RETRY_MAX_DELAY, falling back to the CONNECTOR_ settings.
+        
+        Args:
+            platform (str): Platform name
+        
+        Returns:
+            RetryPolicy: Retry policy
+        """
+        return cls(
+            max_attempts=int(_setting(platform, 'RETRY_ATTEMPTS', '3')),
+            base_delay=float(_setting(platform, 'RETRY_BASE_DELAY', '0.5')),
+            max_delay=float(_setting(platform, 'RETRY_MAX_DELAY', '8'))
+        )
+    
+    def delay(self, retry: int) -> float:
+        """
+        Get the backoff before a retry ("full jitter")
+        
+        Args:
+            retry (int): Retry number, starting at 1
+        
+        Returns:
+            float: Random delay between 0 and the capped exponential backoff
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (retry - 1)))
+
+class CircuitBreaker:
+    """Stops calling an endpoint after consecutive failures, probing it again after a cool-down"""
+    
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize circuit breaker
+        
+        Args:
+            name (str): Breaker name (e.g. 'tiktok:/report/integrated/get/')
+            failure_threshold (int, optional): Consecutive failures that open the circuit. Defaults to 5.
+            reset_timeout (float, optional): Seconds before an open circuit lets a probe through. Defaults to 30.
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.counters = {'successes': 0, 'failures': 0, 'rejected': 0, 'opened': 0}
+        self.lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        """
+        Check whether a call may go through
+        
+        An open circuit lets a single probe call through once reset_timeout
+        has passed; its outcome closes or re-opens the circuit.
+        
+        Returns:
+            bool: Whether to make the call
+        """
+        with self.lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self.probing = False
+            
+            if self.state == CLOSED or (self.state == HALF_OPEN and not self.probing):
+                self.probing = self.state == HALF_OPEN
+                return True
+            
+            self.counters['rejected'] += 1
+            return False
+    
+    def release(self):
+        """Let another probe through after an attempt that sent no request"""
+        with self.lock:
+            self.probing = False
+    
+    def record_success(self):
+        """Record a successful call, closing the circuit"""
+        with self.lock:
+            self.counters['successes'] += 1
+            self.failures = 0
+            self.state = CLOSED
+            self.probing = False
+    
+    def record_failure(self):
+        """Record a failed call, opening the circuit at the threshold or after a failed probe"""
+        with self.lock:
+            self.counters['failures'] += 1
+            self.failures += 1
+            self.probing = False
+            
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.counters['opened'] += 1
+    
+    def metrics(self) -> Dict:
+        """
+        Get breaker state and counters
+        
+        Returns:
+            Dict: State, consecutive failures and lifetime counters
+        """
+        with self.lock:
+            return dict(self.counters, state=self.state, consecutive_failures=self.failures)
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(platform: str, endpoint: str) -> CircuitBreaker:
+    """
+    Get the process-wide circuit breaker of an endpoint
+    
+    Thresholds use e.g. TIKTOK_CIRCUIT_FAILURE_THRESHOLD and
+    TIKTOK_CIRCUIT_RESET_TIMEOUT, falling back to the CONNECTOR_ settings.
+    
+    Args:
+        platform (str): Platform name
+        endpoint (str): API endpoint
+    
+    Returns:
+        CircuitBreaker: Circuit breaker
+    """
+    name = f'{platform}:{endpoint}'
+    breaker = _breakers.get(name)
+    
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    name,
+                    failure_threshold=int(_setting(platform, 'CIRCUIT_FAILURE_THRESHOLD', '5')),
+                    reset_timeout=float(_setting(platform, 'CIRCUIT_RESET_TIMEOUT', '30'))
+                )
+                _breakers[name] = breaker
+    
+    return breaker
+
+def breaker_metrics() -> Dict[str, Dict]:
+    """
+    Get the state of every circuit breaker
+    
+    Returns:
+        Dict[str, Dict]: Breaker metrics by name
+    """
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    
+    return {breaker.name: breaker.metrics() for breaker in breakers}
+
+def _record(breaker: CircuitBreaker, status_code: Optional[int]):
+    """
+    Record a call outcome; only server errors count as failures
+    
+    Args:
+        breaker (CircuitBreaker): Circuit breaker
+        status_code (Optional[int]): HTTP status code, or None when no call was made
+    """
+    if status_code is None:
+        breaker.release()
+        return
+    
+    if status_code >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+def call_with_retry(send: Callable[[], Tuple[Optional[int], Any]], breaker: CircuitBreaker,
+                    policy: RetryPolicy, idempotent: bool = True) -> Any:
+    """
+    Make a call through a circuit breaker, retrying transient failures
+    
+    Args:
+        send (Callable[[], Tuple[Optional[int], Any]]): Makes one attempt and returns the HTTP
+            status (None when no request was sent) with the result
+        breaker (CircuitBreaker): Circuit breaker of the endpoint
+        policy (RetryPolicy): Retry policy
+        idempotent (bool, optional): Whether the call may be repeated. Defaults to True.
+    
+    Returns:
+        Any: Result of the last attempt
+    
+    Raises:
+        CircuitOpenError: When the circuit is open
+        Exception: The last attempt's error when every attempt raised
+    """
+    attempts = policy.max_attempts if idempotent else 1
+    
+    for attempt in range(attempts):
+        if attempt:
+            time.sleep(policy.delay(attempt))
+        
+        if not breaker.allow():
+            raise CircuitOpenError(f'circuit {breaker.name} is open')
+        
+        try:
+            status_code, result = send()
+        except Exception:
+            breaker.record_failure()
+            
+            if attempt == attempts - 1:
+                raise
+            
+            continue
+        
+        _record(breaker, status_code)
+        
+        if not is_transient_status(status_code) or attempt == attempts - 1:
+            return result
+
+async def call_with_retry_async(send: Callable[[], Awaitable[Tuple[Optional[int], Any]]], breaker: CircuitBreaker,
+                                policy: RetryPolicy, idempotent: bool = True) -> Any:
+    """
+    Make a call through a circuit breaker on the event loop, retrying transient failures
+    
+    Args:
+        send (Callable[[], Awaitable[Tuple[Optional[int], Any]]]): Makes one attempt and returns the
+            HTTP status (None when no request was sent) with the result
+        breaker (CircuitBreaker): Circuit breaker of the endpoint
+        policy (RetryPolicy): Retry policy
+        idempotent (bool, optional): Whether the call may be repeated. Defaults to True.
+    
+    Returns:
+        Any: Result of the last attempt
+    
+    Raises:
+        CircuitOpenError: When the circuit is open
+        Exception: The last attempt's error when every attempt raised
+    """
+    attempts = policy.max_attempts if idempotent else 1
+    
+    for attempt in range(attempts):
+        if attempt:
+            await asyncio.sleep(policy.delay(attempt))
+        
+        if not breaker.allow():
+            raise CircuitOpenError(f'circuit {breaker.name} is open')
+        
+        try:
+            status_code, result = await send()
+        except Exception:
+            breaker.record_failure()
+            
+            if attempt == attempts - 1:
+                raise
+            
+            continue
+        
+        _record(breaker, status_code)
+        
+        if not is_transient_status(status_code) or attempt == attempts - 1:
+            return result
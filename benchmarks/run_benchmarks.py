@@ -0,0 +1,265 @@
+"""
+AdGenius AI Backend - AnalyticsService Benchmarks
+
+Usage:
+    python -m benchmarks.run_benchmarks --scale small --output results.json
+    python -m benchmarks.run_benchmarks --scale large --mongodb-uri mongodb://localhost:27017/adgenius_bench
+    python -m benchmarks.run_benchmarks --scale small --compare previous.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mongoengine import connect, disconnect
+
+from benchmarks.synthetic import SCALES, SyntheticAnalyticsGenerator
+
+try:
+    import mongomock
+    HAS_MONGOMOCK = True
+except ImportError:
+    HAS_MONGOMOCK = False
+
+def connect_database(mongodb_uri: Optional[str] = None) -> str:
+    """
+    Connect mongoengine to a local mongod or to mongomock
+    
+    Args:
+        mongodb_uri (Optional[str], optional): MongoDB URI. Uses mongomock when not provided.
+    
+    Returns:
+        str: Backend name
+    """
+    disconnect()
+    
+    if mongodb_uri:
+        connect(host=mongodb_uri)
+        return 'mongod'
+    
+    if not HAS_MONGOMOCK:
+        raise RuntimeError('mongomock is not installed; pass --mongodb-uri to use a local mongod')
+    
+    connect('adgenius_benchmark', host='mongodb://localhost', mongo_client_class=mongomock.MongoClient)
+    return 'mongomock'
+
+def measure(function: Callable, rounds: int, warmup: int = 1, setup: Optional[Callable] = None) -> Dict:
+    """
+    Time a function over several rounds
+    
+    Args:
+        function (Callable): Function to time
+        rounds (int): Timed rounds
+        warmup (int, optional): Untimed rounds run first. Defaults to 1.
+        setup (Optional[Callable], optional): Called untimed before every round. Defaults to None.
+    
+    Returns:
+        Dict: Timing statistics in seconds
+    """
+    timings = []
+    
+    for index in range(warmup + rounds):
+        if setup:
+            setup()
+        
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        
+        if isinstance(result, dict) and 'error' in result:
+            raise RuntimeError(result['error'])
+        
+        if index >= warmup:
+            timings.append(elapsed)
+    
+    return {
+        'rounds': rounds,
+        'min': min(timings),
+        'max': max(timings),
+        'mean': statistics.mean(timings),
+        'median': statistics.median(timings),
+        'stddev': statistics.stdev(timings) if len(timings) > 1 else 0.0
+    }
+
+def benchmark_targets(service, user_id: str, start_date: str, end_date: str) -> Dict[str, Callable]:
+    """
+    Build the analytics hot paths to time
+    
+    Args:
+        service (AnalyticsService): Analytics service
+        user_id (str): User ID
+        start_date (str): Start date
+        end_date (str): End date
+    
+    Returns:
+        Dict[str, Callable]: Benchmark functions by name
+    """
+    return {
+        'get_dashboard_data': lambda: service.get_dashboard_data(user_id, start_date, end_date),
+        'get_performance_metrics[day]': lambda: service.get_performance_metrics(
+            user_id, start_date, end_date, group_by='day'
+        ),
+        'get_performance_metrics[week]': lambda: service.get_performance_metrics(
+            user_id, start_date, end_date, group_by='week'
+        ),
+        'get_performance_metrics[month]': lambda: service.get_performance_metrics(
+            user_id, start_date, end_date, group_by='month'
+        ),
+        'get_roi_analysis': lambda: service.get_roi_analysis(user_id, start_date, end_date),
+        'get_audience_insights': lambda: service.get_audience_insights(user_id)
+    }
+
+def git_commit() -> Optional[str]:
+    """
+    Get the current git commit
+    
+    Returns:
+        Optional[str]: Commit hash, or None outside a git checkout
+    """
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(campaigns: int, days: int, users: int, seed: int, rounds: int, window: int,
+        mongodb_uri: Optional[str] = None, only: Optional[List[str]] = None) -> Dict:
+    """
+    Generate the data set and time every benchmark
+    
+    Args:
+        campaigns (int): Number of campaigns
+        days (int): Days of analytics per campaign
+        users (int): Number of users
+        seed (int): Random seed
+        rounds (int): Timed rounds per benchmark
+        window (int): Days queried, ending on the last generated day
+        mongodb_uri (Optional[str], optional): MongoDB URI. Uses mongomock when not provided.
+        only (Optional[List[str]], optional): Benchmark names to run. Defaults to all.
+    
+    Returns:
+        Dict: Run metadata and results
+    """
+    backend = connect_database(mongodb_uri)
+    
+    from app.services.analytics_service import AnalyticsService
+    
+    generator = SyntheticAnalyticsGenerator(campaigns=campaigns, days=days, users=users, seed=seed)
+    
+    # Start from an empty database so runs stay comparable
+    from app.models.analytics import AnalyticsPrefixIndex, AnalyticsRollup, CampaignAnalytics
+    from app.models.campaign import Campaign
+    from app.models.user import User
+    
+    for document_class in (User, Campaign, CampaignAnalytics, AnalyticsRollup, AnalyticsPrefixIndex):
+        document_class.drop_collection()
+        document_class.ensure_indexes()
+    
+    started = time.perf_counter()
+    generated = generator.load()
+    load_seconds = time.perf_counter() - started
+    
+    service = AnalyticsService()
+    user_id = generated['user_ids'][0]
+    end_date = generator.end_date
+    start_date = max(generator.start_date, end_date - timedelta(days=window - 1))
+    
+    results = {}
+    
+    for name, function in benchmark_targets(service, user_id, start_date.isoformat(), end_date.isoformat()).items():
+        if only and name not in only:
+            continue
+        
+        # Cached results would hide the work being measured
+        results[name] = measure(function, rounds, setup=lambda: service.cache.invalidate(user_id))
+    
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'backend': backend,
+            'campaigns': campaigns,
+            'days': days,
+            'users': users,
+            'seed': seed,
+            'window_days': window,
+            'analytics_documents': generated['analytics'],
+            'load_seconds': load_seconds
+        },
+        'results': results
+    }
+
+def compare(current: Dict, previous: Dict) -> Dict[str, float]:
+    """
+    Compare median timings with a previous run
+    
+    Args:
+        current (Dict): Current results
+        previous (Dict): Previous results
+    
+    Returns:
+        Dict[str, float]: Current median over previous median, by benchmark
+    """
+    return {
+        name: stats['median'] / previous['results'][name]['median']
+        for name, stats in current['results'].items()
+        if name in previous.get('results', {}) and previous['results'][name]['median'] > 0
+    }
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Run benchmarks from the command line
+    
+    Args:
+        argv (Optional[List[str]], optional): Arguments. Defaults to sys.argv.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark AnalyticsService hot paths')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small', help='Campaign count preset')
+    parser.add_argument('--campaigns', type=int, help='Campaign count, overriding --scale')
+    parser.add_argument('--days', type=int, default=365, help='Days of analytics per campaign')
+    parser.add_argument('--users', type=int, default=1, help='Number of users')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parser.add_argument('--rounds', type=int, default=5, help='Timed rounds per benchmark')
+    parser.add_argument('--window', type=int, default=90, help='Days queried by each benchmark')
+    parser.add_argument('--mongodb-uri', default=os.getenv('BENCHMARK_MONGODB_URI'),
+                        help='Local mongod URI; mongomock is used when omitted')
+    parser.add_argument('--only', action='append', help='Benchmark name to run (repeatable)')
+    parser.add_argument('--output', help='Write JSON results to this file')
+    parser.add_argument('--compare', help='Previous JSON results to compare medians against')
+    args = parser.parse_args(argv)
+    
+    report = run(
+        campaigns=args.campaigns or SCALES[args.scale],
+        days=args.days,
+        users=args.users,
+        seed=args.seed,
+        rounds=args.rounds,
+        window=args.window,
+        mongodb_uri=args.mongodb_uri,
+        only=args.only
+    )
+    
+    if args.compare:
+        with open(args.compare) as previous_file:
+            report['comparison'] = compare(report, json.load(previous_file))
+    
+    output = json.dumps(report, indent=2)
+    
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output + '\n')
+    
+    print(output)
+
+if __name__ == '__main__':
+    main()
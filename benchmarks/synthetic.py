@@ -0,0 +1,217 @@
+"""
+AdGenius AI Backend - Seeded Synthetic Analytics Data
+"""
+import math
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from bson import ObjectId
+
+from app.models.analytics import CampaignAnalytics
+from app.models.campaign import Campaign
+from app.models.user import User
+from app.services.analytics_prefix_index import PrefixSumIndex
+from app.services.analytics_rollup import ROLLUP_METRICS, AnalyticsRollupService
+from app.utils.metrics import derive_row
+
+# Benchmark scales, as number of campaigns
+SCALES = {
+    'small': 10,
+    'medium': 1000,
+    'large': 50000
+}
+
+PLATFORMS = ('facebook', 'instagram', 'tiktok', 'shopee')
+OBJECTIVES = ('awareness', 'consideration', 'conversion')
+AGE_GROUPS = ('18-24', '25-34', '35-44', '45-54', '55+')
+DEVICES = ('mobile', 'desktop', 'tablet')
+
+# Analytics documents written per insert_many call
+INSERT_BATCH_SIZE = 5000
+
+class SyntheticAnalyticsGenerator:
+    """Generates reproducible users, campaigns and daily campaign analytics"""
+    
+    def __init__(self, campaigns: int, days: int = 365, users: int = 1, seed: int = 42,
+                 end_date: Optional[datetime] = None):
+        """
+        Initialize synthetic analytics generator
+        
+        Args:
+            campaigns (int): Number of campaigns, spread over the users
+            days (int, optional): Days of analytics per campaign. Defaults to 365.
+            users (int, optional): Number of users. Defaults to 1.
+            seed (int, optional): Random seed. Defaults to 42.
+            end_date (Optional[datetime], optional): Last day of analytics. Defaults to 2024-12-31.
+        """
+        self.campaigns = campaigns
+        self.days = days
+        self.users = users
+        self.seed = seed
+        self.end_date = end_date or datetime(2024, 12, 31)
+        self.start_date = self.end_date - timedelta(days=days - 1)
+    
+    def user_documents(self) -> List[Dict]:
+        """
+        Build user documents
+        
+        Returns:
+            List[Dict]: Raw user documents
+        """
+        rng = random.Random(f'{self.seed}:users')
+        
+        return [
+            User(
+                id=ObjectId(rng.getrandbits(96).to_bytes(12, 'big')),
+                email=f'benchmark{index}@example.com',
+                password='benchmark',
+                name=f'Benchmark User {index}',
+                created_at=self.start_date,
+                updated_at=self.start_date
+            ).to_mongo().to_dict()
+            for index in range(self.users)
+        ]
+    
+    def campaign_documents(self, users: List[Dict]) -> List[Dict]:
+        """
+        Build campaign documents, assigned to users round-robin
+        
+        Args:
+            users (List[Dict]): Raw user documents
+        
+        Returns:
+            List[Dict]: Raw campaign documents
+        """
+        rng = random.Random(f'{self.seed}:campaigns')
+        documents = []
+        
+        for index in range(self.campaigns):
+            documents.append(Campaign(
+                id=ObjectId(rng.getrandbits(96).to_bytes(12, 'big')),
+                user=users[index % len(users)]['_id'],
+                name=f'Campaign {index}',
+                platform=PLATFORMS[index % len(PLATFORMS)],
+                platform_campaign_id=str(rng.randrange(10 ** 12)),
+                status='active' if rng.random() < 0.7 else 'paused',
+                objective=rng.choice(OBJECTIVES),
+                created_at=self.start_date,
+                updated_at=self.start_date
+            ).to_mongo().to_dict())
+        
+        return documents
+    
+    def analytics_documents(self, campaign: Dict) -> Iterator[Dict]:
+        """
+        Build the daily analytics of one campaign
+        
+        Metrics follow a weekly cycle with noise around a per-campaign scale;
+        the last day carries audience insights like an ingested fetch.
+        
+        Args:
+            campaign (Dict): Raw campaign document
+        
+        Returns:
+            Iterator[Dict]: Raw campaign analytics documents
+        """
+        rng = random.Random(f'{self.seed}:{campaign["_id"]}')
+        base_impressions = rng.lognormvariate(7, 1)
+        click_rate = rng.uniform(0.005, 0.05)
+        conversion_rate = rng.uniform(0.01, 0.1)
+        cpm = rng.uniform(20, 150)
+        order_value = rng.uniform(300, 2500)
+        
+        for offset in range(self.days):
+            date = self.start_date + timedelta(days=offset)
+            weekly = 1 + 0.25 * math.sin(2 * math.pi * date.weekday() / 7)
+            impressions = int(base_impressions * weekly * rng.uniform(0.6, 1.4))
+            clicks = int(impressions * click_rate * rng.uniform(0.8, 1.2))
+            conversions = int(clicks * conversion_rate * rng.uniform(0.5, 1.5))
+            spent = round(impressions / 1000 * cpm, 2)
+            revenue = round(conversions * order_value, 2)
+            derived = derive_row(impressions, clicks, conversions, spent, revenue)
+            
+            document = {
+                'campaign_id': str(campaign['_id']),
+                'user_id': str(campaign['user']),
+                'platform': campaign['platform'],
+                'date': date,
+                'period_type': 'daily',
+                'impressions': impressions,
+                'clicks': clicks,
+                'conversions': conversions,
+                'spent': spent,
+                'revenue': revenue,
+                'ctr': derived['ctr'],
+                'cpc': derived['cpc'],
+                'cpm': derived['cpm'],
+                'cpa': derived['cost_per_conversion'],
+                'roas': derived['roas'],
+                'conversion_rate': derived['conversion_rate'],
+                'created_at': date,
+                'updated_at': date
+            }
+            
+            if offset == self.days - 1:
+                document['demographic_data'] = {
+                    'age_gender': {age: rng.randrange(1000) for age in AGE_GROUPS},
+                    'time_of_day': {str(hour): rng.randrange(500) for hour in range(24)}
+                }
+                document['device_data'] = {device: rng.randrange(1000) for device in DEVICES}
+                document['ai_recommendations'] = [f'Recommendation {rng.randrange(20)}']
+            
+            yield document
+    
+    def load(self) -> Dict:
+        """
+        Write the synthetic data set and its rollups and prefix-sum index
+        
+        Returns:
+            Dict: IDs of the generated users and document counts
+        """
+        users = self.user_documents()
+        campaigns = self.campaign_documents(users)
+        
+        User._get_collection().insert_many(users)
+        Campaign._get_collection().insert_many(campaigns)
+        
+        rollup_service = AnalyticsRollupService()
+        prefix_index = PrefixSumIndex()
+        collection = CampaignAnalytics._get_collection()
+        batch = []
+        changes = []
+        analytics = 0
+        
+        for campaign in campaigns:
+            deltas = []
+            
+            for document in self.analytics_documents(campaign):
+                batch.append(document)
+                deltas.append(dict({metric: document[metric] for metric in ROLLUP_METRICS}, date=document['date']))
+            
+            changes.append({
+                'user_id': str(campaign['user']),
+                'campaign_id': str(campaign['_id']),
+                'platform': campaign['platform'],
+                'daily_deltas': deltas
+            })
+            
+            if len(batch) >= INSERT_BATCH_SIZE:
+                collection.insert_many(batch, ordered=False)
+                rollup_service.record_many(changes)
+                prefix_index.record_many(changes)
+                analytics += len(batch)
+                batch = []
+                changes = []
+        
+        if batch:
+            collection.insert_many(batch, ordered=False)
+            rollup_service.record_many(changes)
+            prefix_index.record_many(changes)
+            analytics += len(batch)
+        
+        return {
+            'user_ids': [str(user['_id']) for user in users],
+            'campaigns': len(campaigns),
+            'analytics': analytics
+        }
@@ -0,0 +1,58 @@
+"""
+Tests for the single-pass analytics aggregator
+"""
+
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.analytics_aggregator import AnalyticsAggregator
+
+def _analytics(campaign_id, platform, day, impressions, clicks, conversions, spent, revenue, recommendations=None):
+    return SimpleNamespace(
+        campaign_id=campaign_id,
+        platform=platform,
+        date=datetime(2024, 1, day),
+        impressions=impressions,
+        clicks=clicks,
+        conversions=conversions,
+        spent=spent,
+        revenue=revenue,
+        ai_recommendations=recommendations or []
+    )
+
+def test_finalize_builds_every_breakdown_in_one_pass():
+    rows = iter([
+        _analytics('c1', 'facebook', 1, 1000, 50, 5, 100.0, 400.0, ['Raise budget']),
+        _analytics('c2', 'tiktok', 1, 1000, 50, 5, 100.0, 100.0),
+        _analytics('c1', 'facebook', 3, 2000, 100, 10, 200.0, 500.0)
+    ])
+    
+    aggregator = AnalyticsAggregator(datetime(2024, 1, 1), datetime(2024, 1, 3)).consume(rows)
+    result = aggregator.finalize({'c1': 'Muay Thai Fitness', 'c2': 'Kickboxing'})
+    
+    assert aggregator.count == 3
+    assert result['summary']['total_impressions'] == 4000
+    assert result['summary']['total_spend'] == 400.0
+    assert result['summary']['roas'] == 2.5
+    assert [day['date'] for day in result['daily_metrics']] == ['2024-01-01', '2024-01-02', '2024-01-03']
+    assert result['daily_metrics'][0]['clicks'] == 100
+    assert result['daily_metrics'][1]['ctr'] == 0.0
+    assert result['platform_breakdown']['facebook']['cpc'] == 2.0
+    assert result['platform_breakdown']['tiktok']['roas'] == 1.0
+    
+    campaigns = {row['campaign_id']: row for row in result['campaign_breakdown']}
+    assert campaigns['c1']['campaign_name'] == 'Muay Thai Fitness'
+    assert campaigns['c1']['revenue'] == 900.0
+    assert result['recommendations'] == [{'campaign_id': 'c1', 'description': 'Raise budget', 'date': '2024-01-01'}]
+
+def test_empty_aggregator_returns_zeroes():
+    aggregator = AnalyticsAggregator(datetime(2024, 1, 1), datetime(2024, 1, 1)).consume([])
+    
+    assert aggregator.count == 0
+    assert aggregator.summary()['average_ctr'] == 0.0
+    assert len(aggregator.daily_metrics()) == 1
+    assert aggregator.campaign_breakdown() == []
@@ -0,0 +1,193 @@
+"""
+Tests for the analytics API
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask_jwt_extended import JWTManager, create_access_token
+
+from app.api import analytics as analytics_api
+
+@pytest.fixture
+def api():
+    mongomock = pytest.importorskip('mongomock')
+    from mongoengine import connect, disconnect
+    from mongoengine.connection import get_db
+    
+    from app.models.campaign import Campaign
+    from app.models.user import User
+    
+    disconnect()
+    connect('adgenius_ai_api_test', host='mongodb://localhost', mongo_client_class=mongomock.MongoClient)
+    get_db().client.drop_database('adgenius_ai_api_test')
+    
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'analytics-api-test-secret-key-32b'
+    JWTManager(app)
+    app.register_blueprint(analytics_api.analytics_bp)
+    
+    user = User(email='owner@example.com', password='secret', name='Owner').save()
+    campaign = Campaign(user=user, name='Launch', platform='tiktok', objective='conversion').save()
+    analytics_api.analytics_service.ingest_campaign_analytics(user, 'tiktok', [(campaign, {
+        'daily_metrics': [
+            {'date': f'2024-03-{day:02d}', 'impressions': 100 * day, 'clicks': day, 'conversions': 1, 'spend': 10.0}
+            for day in range(1, 11)
+        ],
+        'audience_insights': {
+            'age_gender': {
+                '25-34 - FEMALE': {'impressions': 60, 'clicks': 6},
+                '35-44 - MALE': {'impressions': 40, 'clicks': 2}
+            },
+            'devices': {'ios': {'impressions': 70}, 'android': {'impressions': 30}}
+        }
+    })])
+    
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+    
+    try:
+        yield app.test_client(), headers
+    finally:
+        disconnect()
+
+def test_dashboard_returns_only_requested_sections(api):
+    client, headers = api
+    
+    response = client.get('/analytics/dashboard?start_date=2024-03-06&end_date=2024-03-10&sections=summary', headers=headers)
+    
+    assert response.status_code == 200
+    assert list(response.json) == ['summary']
+    assert response.json['summary']['total_impressions'] == 4000
+    assert response.json['summary']['total_campaigns'] == 1
+
+def test_campaign_changes_refresh_cached_dashboards(api):
+    from app.models.user import User
+    from app.services.campaign_service import CampaignService
+    
+    client, headers = api
+    url = '/analytics/dashboard?start_date=2024-03-06&end_date=2024-03-10&sections=summary'
+    
+    assert client.get(url, headers=headers).json['summary']['total_campaigns'] == 1
+    
+    CampaignService().create_campaign(str(User.objects.first().id), 'Retarget', 'tiktok', 'conversion')
+    
+    assert client.get(url, headers=headers).json['summary']['total_campaigns'] == 2
+
+def test_dashboard_breakdowns_share_one_aggregation(api, monkeypatch):
+    client, headers = api
+    service = analytics_api.analytics_service
+    calls = []
+    aggregate = service.metrics_store.aggregate
+    
+    def counted(match, stages):
+        calls.append(stages)
+        return aggregate(match, stages)
+    
+    monkeypatch.setattr(service.metrics_store, 'aggregate', counted)
+    
+    window = 'start_date=2024-03-06&end_date=2024-03-10'
+    dashboard = client.get(f'/analytics/dashboard?{window}&sections=daily_metrics,platform_breakdown,campaign_breakdown',
+                           headers=headers).json
+    
+    assert len(calls) == 1
+    assert set(calls[0][-1]['$facet']) == {'daily', 'platforms', 'campaigns'}
+    assert [day['impressions'] for day in dashboard['daily_metrics']] == [600, 700, 800, 900, 1000]
+    assert dashboard['platform_breakdown']['tiktok']['impressions'] == 4000
+    assert dashboard['campaign_breakdown'][0]['campaign_name'] == 'Launch'
+
+def test_campaign_analytics_read_through_the_metrics_store(api, monkeypatch):
+    from app.models.campaign import Campaign
+    
+    client, headers = api
+    service = analytics_api.analytics_service
+    calls = []
+    find = service.metrics_store.find
+    
+    def counted(query, *fields):
+        calls.append(query.campaign_ids)
+        return find(query, *fields)
+    
+    monkeypatch.setattr(service.metrics_store, 'find', counted)
+    campaign_id = str(Campaign.objects.first().id)
+    
+    window = 'start_date=2024-03-06&end_date=2024-03-10'
+    analytics = client.get(f'/analytics/campaigns/{campaign_id}?{window}&metrics=impressions,audience_insights',
+                           headers=headers).json
+    
+    assert calls == [[campaign_id]]
+    assert analytics['total_impressions'] == 4000
+    assert analytics['audience_insights']['device_data'] == {'ios': {'impressions': 70}, 'android': {'impressions': 30}}
+
+def test_default_ranges_end_now_in_the_campaign_or_user_time_zone(api, monkeypatch):
+    from app.models.campaign import Campaign, Schedule
+    from app.services import analytics_service
+    
+    client, headers = api
+    campaign = Campaign.objects.first()
+    campaign.schedule = Schedule(start_date=campaign.created_at, time_zone='Asia/Tokyo')
+    campaign.save()
+    zones = []
+    monkeypatch.setattr(analytics_service, 'local_now', lambda timezone: zones.append(timezone) or datetime(2024, 3, 10))
+    
+    client.get(f'/analytics/campaigns/{campaign.id}', headers=headers)
+    client.get('/analytics/platforms/tiktok', headers=headers)
+    client.get(f'/analytics/roi?campaign_id={campaign.id}', headers=headers)
+    client.get('/analytics/roi', headers=headers)
+    
+    assert zones == ['Asia/Tokyo', 'UTC', 'Asia/Tokyo', 'UTC']
+
+def test_compare_reaches_dashboard_and_performance(api):
+    client, headers = api
+    window = 'start_date=2024-03-06&end_date=2024-03-10&compare=true'
+    
+    dashboard = client.get(f'/analytics/dashboard?{window}&sections=summary', headers=headers).json
+    daily = client.get(f'/analytics/performance?{window}', headers=headers).json
+    weekly = client.get(f'/analytics/performance?{window}&group_by=week', headers=headers).json
+    
+    for result in (dashboard, daily, weekly):
+        comparison = result['comparison']
+        
+        assert comparison['current']['total_impressions'] == 4000
+        assert comparison['previous']['total_impressions'] == 1500
+        assert comparison['delta']['total_impressions'] == 2500
+        assert comparison['previous_start_date'] == '2024-03-01T00:00:00'
+    
+    assert [row['date'] for row in daily['metrics']] == ['2024-03-06', '2024-03-07', '2024-03-08', '2024-03-09', '2024-03-10']
+    assert 'comparison' not in client.get('/analytics/performance?start_date=2024-03-06&end_date=2024-03-10', headers=headers).json
+
+def test_unknown_group_by_is_rejected(api):
+    client, headers = api
+    
+    assert client.get('/analytics/performance?group_by=fortnight', headers=headers).status_code == 400
+    assert client.get('/analytics/export?group_by=fortnight', headers=headers).status_code == 400
+
+def test_audience_keeps_top_entries(api):
+    client, headers = api
+    
+    insights = client.get('/analytics/audience?top_n=1', headers=headers).json
+    
+    assert insights['age_gender'] == {'25-34 - FEMALE': {'impressions': 60, 'clicks': 6}}
+    assert insights['devices'] == {'ios': {'impressions': 70}}
+    assert len(client.get('/analytics/audience', headers=headers).json['age_gender']) == 2
+
+def test_process_stats_are_admin_only(api):
+    from app.models.user import User
+    
+    client, headers = api
+    admin = User(email='admin@example.com', password='secret', name='Admin', role='admin').save()
+    
+    with client.application.app_context():
+        admin_headers = {'Authorization': f'Bearer {create_access_token(identity=str(admin.id))}'}
+    
+    for path in ('/analytics/cache/stats', '/analytics/connectors/stats'):
+        assert client.get(path, headers=headers).status_code == 403
+        assert client.get(path, headers=admin_headers).status_code == 200
+    
+    assert client.get('/analytics/cache/stats', headers=admin_headers).json['backend'] in ('local', 'redis')
@@ -0,0 +1,107 @@
+"""
+Tests for the analytics result cache
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.analytics_cache import AnalyticsCache, cached_result
+
+class _Service:
+    def __init__(self):
+        self.cache = AnalyticsCache(redis_url=None, ttl=60)
+        self.calls = 0
+    
+    @cached_result('dashboard')
+    def get_dashboard_data(self, user_id, start_date=None, end_date=None, platform=None):
+        self.calls += 1
+        
+        if platform == 'unknown':
+            return {'error': 'Platform not supported'}
+        
+        return {'summary': {'total_spend': 10.0 * self.calls}}
+
+class _FlakyBackend:
+    def __init__(self, backend):
+        self.backend = backend
+        self.down = False
+    
+    def __getattr__(self, name):
+        method = getattr(self.backend, name)
+        
+        def call(*args):
+            if self.down:
+                raise ConnectionError('redis is down')
+            
+            return method(*args)
+        
+        return call
+
+def test_results_are_cached_per_arguments():
+    service = _Service()
+    
+    first = service.get_dashboard_data('u1', '2024-01-01', '2024-01-31')
+    second = service.get_dashboard_data('u1', start_date='2024-01-01', end_date='2024-01-31')
+    other = service.get_dashboard_data('u1', '2024-01-01', '2024-01-31', platform='tiktok')
+    
+    assert first == second == {'summary': {'total_spend': 10.0}}
+    assert other == {'summary': {'total_spend': 20.0}}
+    assert service.calls == 2
+    
+    stats = service.cache.stats()
+    assert stats['backend'] == 'local'
+    assert stats['by_result']['dashboard'] == {'misses': 2, 'hits': 1}
+    assert round(stats['totals']['hit_rate'], 2) == 0.33
+
+def test_invalidation_is_scoped_to_the_user():
+    service = _Service()
+    service.get_dashboard_data('u1')
+    service.get_dashboard_data('u2')
+    
+    service.cache.invalidate('u1')
+    
+    assert service.get_dashboard_data('u1') == {'summary': {'total_spend': 30.0}}
+    assert service.get_dashboard_data('u2') == {'summary': {'total_spend': 20.0}}
+    assert service.cache.stats()['totals']['invalidations'] == 1
+
+def test_errors_are_not_cached():
+    service = _Service()
+    
+    service.get_dashboard_data('u1', platform='unknown')
+    service.get_dashboard_data('u1', platform='unknown')
+    
+    assert service.calls == 2
+
+def test_backend_outage_bypasses_the_cache():
+    service = _Service()
+    service.cache.backend = _FlakyBackend(service.cache.backend)
+    service.cache.backend.down = True
+    
+    assert service.get_dashboard_data('u1') == {'summary': {'total_spend': 10.0}}
+    assert service.get_dashboard_data('u1') == {'summary': {'total_spend': 20.0}}
+    assert service.cache.stats()['by_result']['dashboard'] == {'errors': 2}
+
+def test_failed_invalidation_skips_the_cache_until_it_succeeds():
+    service = _Service()
+    backend = _FlakyBackend(service.cache.backend)
+    service.cache.backend = backend
+    service.get_dashboard_data('u1')
+    
+    backend.down = True
+    service.cache.invalidate('u1')
+    backend.down = False
+    
+    # The stale entry is never served; the next lookup retries the invalidation
+    assert service.get_dashboard_data('u1') == {'summary': {'total_spend': 20.0}}
+    assert service.cache.stats()['pending_invalidations'] == 0
+    assert service.get_dashboard_data('u1') == {'summary': {'total_spend': 20.0}}
+    assert service.calls == 2
+
+def test_local_backend_shortens_the_ttl():
+    cache = AnalyticsCache(redis_url=None, ttl=300, local_ttl=30)
+    
+    assert cache.stats()['backend'] == 'local'
+    assert cache.ttl == 30
+    assert AnalyticsCache(redis_url=None, ttl=300).ttl == 300
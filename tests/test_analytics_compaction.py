@@ -0,0 +1,114 @@
+"""
+Tests for hourly analytics compaction
+"""
+
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.analytics import CampaignAnalytics
+from app.services import analytics_compaction
+from app.services.analytics_compaction import HourlyCompactor
+
+class _Result:
+    def __init__(self, upserted_ids=None, deleted_count=0):
+        self.upserted_ids = upserted_ids or {}
+        self.deleted_count = deleted_count
+
+class _Collection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+    
+    def aggregate(self, pipeline, **kwargs):
+        self.calls.append(('aggregate', pipeline))
+        return iter(self.rows)
+    
+    def bulk_write(self, operations, ordered=True):
+        self.calls.append(('bulk_write', operations))
+        # Only the first day had no daily row yet
+        return _Result(upserted_ids={0: 'new'})
+    
+    def delete_many(self, match):
+        self.calls.append(('delete_many', match))
+        return _Result(deleted_count=48)
+
+class _Recorder:
+    def __init__(self):
+        self.calls = []
+    
+    def record_many(self, items):
+        self.calls.append(('record_many', items))
+        return len(items)
+    
+    def delete(self, match):
+        self.calls.append(('delete', match))
+        return 0
+
+def test_cutoff_keeps_whole_retained_days():
+    compactor = HourlyCompactor(retention_days=7, rollup_service=_Recorder(), prefix_index=_Recorder(),
+                                metrics_store=_Recorder())
+    
+    assert compactor.cutoff(datetime(2024, 1, 15, 18, 30)) == datetime(2024, 1, 8)
+
+def test_compact_fills_missing_days_and_drops_hours(monkeypatch):
+    key = {'campaign_id': 'c1', 'user_id': 'u1', 'platform': 'facebook'}
+    collection = _Collection([
+        {'_id': dict(key, date=datetime(2024, 1, 1)), 'ids': ['h1', 'h2'],
+         'hours': [datetime(2024, 1, 1, 9), datetime(2024, 1, 1, 10)], 'impressions': 1000, 'clicks': 50,
+         'conversions': 5, 'spent': 100.0, 'revenue': 300.0},
+        {'_id': dict(key, date=datetime(2024, 1, 2)), 'ids': ['h3'], 'hours': [datetime(2024, 1, 2, 9)],
+         'impressions': 10, 'clicks': 1, 'conversions': 0, 'spent': 1.0, 'revenue': 0.0}
+    ])
+    monkeypatch.setattr(CampaignAnalytics, '_get_collection', classmethod(lambda cls: collection))
+    rollups, prefix_index, store = _Recorder(), _Recorder(), _Recorder()
+    
+    result = HourlyCompactor(retention_days=7, rollup_service=rollups, prefix_index=prefix_index,
+                             metrics_store=store).compact(now=datetime(2024, 1, 15), user_id='u1')
+    
+    assert result == {'days': 1, 'hours': 48}
+    
+    match = collection.calls[0][1][0]['$match']
+    written_at = match['updated_at']['$lte']
+    assert match == {
+        'period_type': 'hourly', 'date': {'$lt': datetime(2024, 1, 8)}, 'updated_at': {'$lte': written_at}, 'user_id': 'u1'
+    }
+    
+    operations = collection.calls[1][1]
+    assert len(operations) == 2
+    assert operations[0]._doc['$setOnInsert']['period_type'] == 'daily'
+    assert operations[0]._doc['$setOnInsert']['cpc'] == 2.0
+    assert operations[0]._upsert
+    
+    # Only the created day feeds rollups, and raw hours go after the days are stored
+    deltas = rollups.calls[0][1][0]['daily_deltas']
+    assert deltas == [{'impressions': 1000, 'clicks': 50, 'conversions': 5, 'spent': 100.0,
+                       'revenue': 300.0, 'date': datetime(2024, 1, 1)}]
+    assert prefix_index.calls == rollups.calls
+    # Only the folded hours go, so hours written during the run survive
+    assert collection.calls[-1] == ('delete_many', {'_id': {'$in': ['h1', 'h2', 'h3']}, 'updated_at': {'$lte': written_at}})
+    assert store.calls[-1] == ('delete', {
+        'campaign_id': 'c1', 'period_type': 'hourly',
+        'date': {'$in': [datetime(2024, 1, 1, 9), datetime(2024, 1, 1, 10), datetime(2024, 1, 2, 9)]}
+    })
+
+def test_compact_deletes_hours_in_batches(monkeypatch):
+    key = {'campaign_id': 'c1', 'user_id': 'u1', 'platform': 'facebook'}
+    hours = [datetime(2024, 1, 1, hour) for hour in range(5)]
+    collection = _Collection([
+        {'_id': dict(key, date=datetime(2024, 1, 1)), 'ids': [f'h{hour}' for hour in range(5)], 'hours': hours,
+         'impressions': 10, 'clicks': 1, 'conversions': 0, 'spent': 1.0, 'revenue': 0.0}
+    ])
+    monkeypatch.setattr(CampaignAnalytics, '_get_collection', classmethod(lambda cls: collection))
+    monkeypatch.setattr(analytics_compaction, 'DELETE_BATCH_SIZE', 2)
+    store = _Recorder()
+    
+    result = HourlyCompactor(retention_days=7, rollup_service=_Recorder(), prefix_index=_Recorder(),
+                             metrics_store=store).compact(now=datetime(2024, 1, 15))
+    
+    deletes = [call[1]['_id']['$in'] for call in collection.calls if call[0] == 'delete_many']
+    assert deletes == [['h0', 'h1'], ['h2', 'h3'], ['h4']]
+    assert result['hours'] == 48 * 3
+    assert [call[1]['date']['$in'] for call in store.calls if call[0] == 'delete'] == [hours[:2], hours[2:4], hours[4:]]
@@ -0,0 +1,59 @@
+"""
+Tests for campaign analytics deduplication
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.analytics import CampaignAnalytics
+from app.services.analytics_service import AnalyticsService
+
+UNIQUE_KEY = [('campaign_id', 1), ('date', 1), ('period_type', 1)]
+
+@pytest.fixture
+def collection():
+    mongomock = pytest.importorskip('mongomock')
+    from mongoengine import connect, disconnect
+    from mongoengine.connection import get_db
+    
+    disconnect()
+    connect('adgenius_ai_dedupe_test', host='mongodb://localhost', mongo_client_class=mongomock.MongoClient)
+    get_db().client.drop_database('adgenius_ai_dedupe_test')
+    
+    # Rows written before the unique index existed
+    collection = get_db()['campaign_analytics']
+    collection.insert_many([
+        {'campaign_id': 'c1', 'user_id': 'u1', 'platform': 'tiktok', 'period_type': 'daily',
+         'date': datetime(2024, 1, 1), 'impressions': impressions, 'updated_at': datetime(2024, 1, 2, hour)}
+        for hour, impressions in ((1, 100), (3, 300), (2, 200))
+    ] + [
+        {'campaign_id': 'c1', 'user_id': 'u1', 'platform': 'tiktok', 'period_type': 'daily',
+         'date': datetime(2024, 1, 2), 'impressions': 50, 'updated_at': datetime(2024, 1, 3)}
+    ])
+    
+    try:
+        yield collection
+    finally:
+        disconnect()
+
+def _has_unique_key(collection):
+    return any(
+        index.get('unique') and index['key'] == UNIQUE_KEY
+        for index in collection.index_information().values()
+    )
+
+def test_duplicates_skip_the_unique_index_without_failing(collection):
+    assert CampaignAnalytics.objects(campaign_id='c1').count() == 4
+    assert not _has_unique_key(collection)
+
+def test_dedupe_keeps_the_latest_write_and_builds_the_index(collection):
+    result = AnalyticsService().dedupe_campaign_analytics()
+    
+    assert result['periods'] == 1 and result['removed'] == 2
+    assert sorted(row['impressions'] for row in collection.find()) == [50, 300]
+    assert _has_unique_key(collection)
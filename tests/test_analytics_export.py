@@ -0,0 +1,48 @@
+"""
+Tests for streaming analytics export
+"""
+
+import gzip
+import json
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.analytics_export import (
+    EXPORT_COLUMNS, chunked, csv_lines, gzip_chunks, ndjson_lines, to_export_row
+)
+
+DOCUMENTS = [
+    {'date': datetime(2024, 1, 1), 'campaign_id': 'c1', 'platform': 'tiktok',
+     'impressions': 1000, 'clicks': 50, 'conversions': 5, 'spent': 100.0, 'revenue': 400.0},
+    {'date': datetime(2024, 1, 2), 'campaign_id': 'c1', 'platform': 'tiktok'}
+]
+
+def test_export_rows_carry_derived_metrics():
+    row = to_export_row(DOCUMENTS[0])
+    
+    assert tuple(row) == EXPORT_COLUMNS
+    assert row['period'] == '2024-01-01'
+    assert row['spend'] == 100.0 and row['cpc'] == 2.0 and row['roas'] == 4.0
+    assert to_export_row(DOCUMENTS[1])['ctr'] == 0.0
+
+def test_ndjson_and_csv_lines():
+    rows = [to_export_row(document) for document in DOCUMENTS]
+    
+    lines = list(ndjson_lines(rows))
+    assert len(lines) == 2 and all(line.endswith('\n') for line in lines)
+    assert json.loads(lines[0])['campaign_id'] == 'c1'
+    
+    csv_text = ''.join(csv_lines(rows)).splitlines()
+    assert csv_text[0] == ','.join(EXPORT_COLUMNS)
+    assert csv_text[1].startswith('2024-01-01,c1,tiktok,1000,50,5,100.0,400.0')
+    assert ''.join(csv_lines([])).splitlines() == [','.join(EXPORT_COLUMNS)]
+
+def test_chunked_gzip_stream_round_trips():
+    lines = (f'{index}\n' for index in range(10000))
+    chunks = list(gzip_chunks(chunked(lines, size=1024)))
+    
+    assert len(chunks) > 1
+    assert gzip.decompress(b''.join(chunks)).decode('utf-8').splitlines()[-1] == '9999'
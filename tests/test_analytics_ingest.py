@@ -0,0 +1,145 @@
+"""
+Tests for daily analytics ingestion
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.analytics_service import AnalyticsService
+
+@pytest.fixture
+def store():
+    mongomock = pytest.importorskip('mongomock')
+    from mongoengine import connect, disconnect
+    from mongoengine.connection import get_db
+    
+    from app.models.campaign import Campaign
+    from app.models.user import User
+    
+    disconnect()
+    connect('adgenius_ai_ingest_test', host='mongodb://localhost', mongo_client_class=mongomock.MongoClient)
+    get_db().client.drop_database('adgenius_ai_ingest_test')
+    
+    user = User(email='owner@example.com', password='secret', name='Owner').save()
+    campaign = Campaign(user=user, name='Launch', platform='tiktok', objective='conversion').save()
+    
+    try:
+        yield AnalyticsService(), user, campaign
+    finally:
+        disconnect()
+
+def _days(*impressions):
+    return {'daily_metrics': [
+        {'date': date, 'impressions': value, 'clicks': 1, 'spend': 2.0}
+        for date, value in impressions
+    ]}
+
+def test_reingest_with_duplicate_days_keeps_indexes_exact(store):
+    from app.models.analytics import AnalyticsRollup, CampaignAnalytics
+    
+    service, user, campaign = store
+    service.ingest_campaign_analytics(user, 'tiktok', [(campaign, _days(('2024-03-01', 10), ('2024-03-02', 20)))])
+    
+    # Refetch the range; the payload repeats 2024-03-02 and the last copy wins
+    analytics_list = service.ingest_campaign_analytics(user, 'tiktok', [
+        (campaign, _days(('2024-03-01', 15), ('2024-03-02', 5), ('2024-03-02', 7))),
+        (campaign, _days(('2024-03-01', 12)))
+    ])
+    
+    assert [analytics.impressions for analytics in analytics_list] == [12, 7]
+    assert CampaignAnalytics.objects(campaign_id=str(campaign.id)).sum('impressions') == 19
+    
+    for period_type in ('daily', 'weekly', 'monthly'):
+        assert AnalyticsRollup.objects(period_type=period_type).sum('impressions') == 19
+    
+    totals = service.prefix_index.range_totals(str(user.id), datetime(2024, 3, 1), datetime(2024, 3, 31))
+    assert totals['impressions'] == 19
+    assert totals['clicks'] == 2
+    assert service.prefix_index.range_totals(str(user.id), datetime(2024, 3, 2), datetime(2024, 3, 2))['impressions'] == 7
+
+def test_consistency_check_repairs_rollup_drift(store):
+    from app.models.analytics import AnalyticsRollup
+    
+    service, user, campaign = store
+    service.ingest_campaign_analytics(user, 'tiktok', [(campaign, _days(('2024-03-01', 10), ('2024-03-02', 20)))])
+    
+    # A lost increment leaves the monthly bucket behind, and a stale bucket has no days at all
+    AnalyticsRollup.objects(period_type='monthly').update(inc__impressions=-20)
+    AnalyticsRollup(user_id=str(user.id), campaign_id=str(campaign.id), platform='tiktok', period_type='daily',
+                    bucket_start=datetime(2024, 4, 1), impressions=3, updated_at=datetime(2024, 4, 1)).save()
+    
+    # Buckets with days written inside the settle window are left alone
+    assert service.check_analytics_indexes(str(user.id), repair=False) == {
+        'rollup_buckets': 1, 'prefix_index_years': 0, 'repaired': False
+    }
+    assert service.check_analytics_indexes(str(user.id), settle_seconds=0) == {
+        'rollup_buckets': 2, 'prefix_index_years': 0, 'repaired': True
+    }
+    assert service.check_analytics_indexes(str(user.id), settle_seconds=0)['rollup_buckets'] == 0
+    
+    for period_type in ('daily', 'weekly', 'monthly'):
+        assert AnalyticsRollup.objects(period_type=period_type).sum('impressions') == 30
+
+def test_consistency_check_repairs_prefix_index_drift(store):
+    from app.models.analytics import AnalyticsPrefixIndex
+    
+    service, user, campaign = store
+    service.ingest_campaign_analytics(user, 'tiktok', [(campaign, _days(('2024-03-01', 10), ('2024-03-02', 20)))])
+    
+    # A lost increment for 2024-03-02 leaves every running total from that day on short
+    index = AnalyticsPrefixIndex.objects.get(campaign_id=str(campaign.id), year=2024)
+    index.impressions = [total - 20 if position >= 61 else total for position, total in enumerate(index.impressions)]
+    index.updated_at = datetime(2024, 3, 2)
+    index.save()
+    
+    assert service.check_analytics_indexes(str(user.id), settle_seconds=0) == {
+        'rollup_buckets': 0, 'prefix_index_years': 1, 'repaired': True
+    }
+    assert service.check_analytics_indexes(str(user.id), settle_seconds=0)['prefix_index_years'] == 0
+    
+    totals = service.prefix_index.range_totals(str(user.id), datetime(2024, 3, 2), datetime(2024, 12, 31))
+    assert totals['impressions'] == 20
+
+def test_platform_fetch_passes_the_tiktok_advertiser(store):
+    from app.models.user import PlatformAccount
+    from app.platform_connectors.tiktok_connector import TikTokConnector
+    
+    service, user, campaign = store
+    requests = []
+    
+    def make_request(method, endpoint, params=None, data=None):
+        requests.append(data)
+        
+        if data.get('dimensions') == ['stat_time_day']:
+            rows = [{'stat_time_day': '2024-03-01', 'impressions': '100', 'clicks': '5', 'cost': '1000'}]
+        else:
+            rows = [{'ad_name': 'Ad', 'impressions': '100', 'clicks': '5', 'conversion': '1', 'cost': '1000'}]
+        
+        return {'list': rows}
+    
+    connector = TikTokConnector()
+    connector.initialize('token')
+    connector._make_request = make_request
+    service.tiktok_connector = connector
+    
+    campaign.platform_campaign_id = 'tt-1'
+    campaign.save()
+    
+    # Without a connected advertiser there is nothing to fetch for
+    assert service.get_platform_analytics(str(user.id), 'tiktok', '2024-03-01', '2024-03-07') == {
+        'error': 'No tiktok account connected'
+    }
+    
+    user.platform_accounts.append(PlatformAccount(platform='tiktok', account_id='adv-1', account_name='Gym'))
+    user.save()
+    
+    result = service.get_platform_analytics(str(user.id), 'tiktok', '2024-03-01', '2024-03-07')
+    
+    assert 'failed_campaigns' not in result
+    assert result['total_impressions'] == 100
+    assert {(data['advertiser_id'], tuple(data['campaign_ids'])) for data in requests} == {('adv-1', ('tt-1',))}
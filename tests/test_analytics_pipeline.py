@@ -0,0 +1,140 @@
+"""
+Tests for the dashboard aggregation pipeline
+"""
+
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.analytics_pipeline import DashboardPipeline, resolve_sections
+
+def test_build_matches_daily_rows_in_range():
+    pipeline = DashboardPipeline(
+        user_id='u1',
+        start_date=datetime(2024, 1, 1, 15, 30),
+        end_date=datetime(2024, 1, 3, 12, 0),
+        campaign_ids=['c1', 'c2'],
+        platform='tiktok'
+    ).build()
+    
+    match = pipeline[0]['$match']
+    assert match['user_id'] == 'u1'
+    assert match['period_type'] == 'daily'
+    assert match['date'] == {'$gte': datetime(2024, 1, 1), '$lt': datetime(2024, 1, 4)}
+    assert match['campaign_id'] == {'$in': ['c1', 'c2']}
+    assert match['platform'] == 'tiktok'
+    assert set(pipeline[-1]['$facet']) == {'totals', 'daily', 'platforms', 'campaigns', 'recommendations'}
+
+def test_to_dashboard_shapes_facets():
+    engine = DashboardPipeline(user_id='u1', start_date=datetime(2024, 1, 1), end_date=datetime(2024, 1, 3))
+    row = {'impressions': 1000, 'clicks': 50, 'conversions': 5, 'spend': 100.0, 'revenue': 400.0}
+    facets = {
+        'totals': [dict(row, _id=None)],
+        'daily': [dict(row, _id='2024-01-02')],
+        'platforms': [dict(row, _id='facebook')],
+        'campaigns': [dict(row, _id='c1')],
+        'recommendations': [{'_id': 'Raise budget', 'campaign_id': 'c1', 'date': datetime(2024, 1, 2)}]
+    }
+    
+    dashboard = engine.to_dashboard(facets, {'c1': 'Muay Thai Fitness'})
+    
+    assert dashboard['summary']['total_impressions'] == 1000
+    assert dashboard['summary']['average_ctr'] == 5.0
+    assert dashboard['summary']['roas'] == 4.0
+    assert [day['date'] for day in dashboard['daily_metrics']] == ['2024-01-01', '2024-01-02', '2024-01-03']
+    assert dashboard['daily_metrics'][0]['clicks'] == 0
+    assert dashboard['daily_metrics'][1]['cpc'] == 2.0
+    assert dashboard['platform_breakdown']['facebook']['cpm'] == 100.0
+    assert dashboard['campaign_breakdown'][0]['campaign_name'] == 'Muay Thai Fitness'
+    assert dashboard['recommendations'][0]['description'] == 'Raise budget'
+
+def test_to_dashboard_handles_empty_result():
+    engine = DashboardPipeline(user_id='u1', start_date=datetime(2024, 1, 1), end_date=datetime(2024, 1, 1))
+    
+    dashboard = engine.to_dashboard({})
+    
+    assert dashboard['summary']['total_spend'] == 0.0
+    assert dashboard['summary']['average_cpc'] == 0.0
+    assert len(dashboard['daily_metrics']) == 1
+    assert dashboard['campaign_breakdown'] == []
+
+class _Store:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+    
+    def aggregate(self, match, stages):
+        self.calls.append(stages)
+        return iter(self.rows)
+
+def test_resolve_sections_keeps_known_sections_in_order():
+    assert resolve_sections('recommendations, summary,unknown') == ['summary', 'recommendations']
+    assert resolve_sections(['unknown']) == resolve_sections(None)
+    assert len(resolve_sections([])) == 5
+
+def test_build_only_requests_selected_facets():
+    pipeline = DashboardPipeline(
+        user_id='u1',
+        start_date=datetime(2024, 1, 1),
+        end_date=datetime(2024, 1, 3),
+        include_totals=False,
+        sections=['summary', 'platform_breakdown']
+    )
+    
+    assert set(pipeline.build()[-1]['$facet']) == {'platforms'}
+    assert set(pipeline.section_tasks()) == {'platform_breakdown'}
+    assert set(pipeline.to_dashboard({})) == {'summary', 'platform_breakdown'}
+
+def test_section_task_runs_its_own_aggregation():
+    store = _Store([{'_id': 'tiktok', 'impressions': 100, 'clicks': 4, 'spend': 2.0}])
+    pipeline = DashboardPipeline(
+        user_id='u1',
+        start_date=datetime(2024, 1, 1),
+        end_date=datetime(2024, 1, 3),
+        store=store,
+        sections=['platform_breakdown']
+    )
+    
+    breakdown = pipeline.section_tasks()['platform_breakdown']()
+    
+    assert breakdown['tiktok']['ctr'] == 4.0
+    assert '$facet' not in store.calls[0][-1]
+    assert store.calls[0][-1]['$group']['_id'] == '$platform'
+
+def test_run_computes_requested_sections_in_one_round_trip():
+    store = _Store([{
+        'platforms': [{'_id': 'tiktok', 'impressions': 100, 'clicks': 4, 'spend': 2.0}],
+        'daily': [{'_id': '2024-01-02', 'impressions': 100, 'clicks': 4, 'spend': 2.0}]
+    }])
+    pipeline = DashboardPipeline(
+        user_id='u1',
+        start_date=datetime(2024, 1, 1),
+        end_date=datetime(2024, 1, 3),
+        include_totals=False,
+        store=store,
+        sections=['summary', 'daily_metrics', 'platform_breakdown']
+    )
+    
+    dashboard = pipeline.run()
+    
+    assert len(store.calls) == 1
+    assert set(store.calls[0][-1]['$facet']) == {'daily', 'platforms'}
+    assert list(dashboard) == ['daily_metrics', 'platform_breakdown']
+    assert dashboard['daily_metrics'][1]['impressions'] == 100
+    assert dashboard['platform_breakdown']['tiktok']['ctr'] == 4.0
+
+def test_run_skips_the_aggregation_without_breakdowns():
+    store = _Store([])
+    pipeline = DashboardPipeline(
+        user_id='u1',
+        start_date=datetime(2024, 1, 1),
+        end_date=datetime(2024, 1, 3),
+        include_totals=False,
+        store=store,
+        sections=['summary']
+    )
+    
+    assert pipeline.run() == {}
+    assert store.calls == []
@@ -0,0 +1,73 @@
+"""
+Tests for the analytics prefix-sum index
+"""
+
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.analytics import AnalyticsPrefixIndex
+from app.services.analytics_prefix_index import DAYS_PER_YEAR, PrefixSumIndex, day_index
+
+class _Collection:
+    def __init__(self):
+        self.operations = []
+    
+    def bulk_write(self, operations, ordered=True):
+        self.operations.extend(operations)
+    
+    def aggregate(self, pipeline):
+        self.operations.append(pipeline)
+        return iter([{'_id': None, 'impressions_0': 70, 'spent_0': 7, 'impressions_1': 35}])
+
+def test_day_index_counts_from_january_first():
+    assert day_index(datetime(2024, 1, 1)) == 0
+    assert day_index(datetime(2024, 12, 31)) == DAYS_PER_YEAR - 1
+    assert day_index(datetime(2023, 12, 31)) == DAYS_PER_YEAR - 2
+
+def test_record_shifts_running_totals_per_campaign_year(monkeypatch):
+    collection = _Collection()
+    monkeypatch.setattr(AnalyticsPrefixIndex, '_get_collection', classmethod(lambda cls: collection))
+    
+    touched = PrefixSumIndex().record('u1', 'c1', 'tiktok', [
+        {'date': datetime(2023, 12, 31), 'impressions': 10, 'clicks': 0, 'conversions': 0, 'spent': 0.0, 'revenue': 0.0},
+        {'date': datetime(2024, 1, 2), 'impressions': 5, 'clicks': 1, 'conversions': 0, 'spent': 2.5, 'revenue': 0.0},
+        {'date': datetime(2024, 1, 4), 'impressions': 3, 'clicks': 0, 'conversions': 0, 'spent': 0.0, 'revenue': 0.0}
+    ])
+    
+    assert touched == 2
+    increments = {
+        operation._filter['year']: operation._doc['$inc']
+        for operation in collection.operations
+        if '$inc' in operation._doc
+    }
+    assert increments[2023] == {'impressions.364': 10, 'impressions.365': 10}
+    assert 'impressions.0' not in increments[2024]
+    assert increments[2024]['impressions.1'] == 5
+    assert increments[2024]['impressions.3'] == 8
+    assert increments[2024]['impressions.365'] == 8
+    assert increments[2024]['spent.365'] == 2.5
+
+def test_range_totals_many_reads_every_window_in_one_query(monkeypatch):
+    collection = _Collection()
+    monkeypatch.setattr(AnalyticsPrefixIndex, '_get_collection', classmethod(lambda cls: collection))
+    
+    current, previous, empty = PrefixSumIndex().range_totals_many('u1', [
+        (datetime(2024, 1, 1), datetime(2024, 1, 7)),
+        (datetime(2023, 12, 25), datetime(2023, 12, 31)),
+        (datetime(2024, 1, 2), datetime(2024, 1, 1))
+    ])
+    
+    assert len(collection.operations) == 1
+    pipeline = collection.operations[0]
+    assert pipeline[0]['$match']['year'] == {'$gte': 2023, '$lte': 2024}
+    assert set(pipeline[1]['$group']) == {'_id'} | {
+        f'{metric}_{position}'
+        for metric in ('impressions', 'clicks', 'conversions', 'spent', 'revenue')
+        for position in (0, 1)
+    }
+    assert current['impressions'] == 70 and current['spend'] == 7.0
+    assert previous['impressions'] == 35 and previous['clicks'] == 0
+    assert empty == {'impressions': 0, 'clicks': 0, 'conversions': 0, 'spend': 0.0, 'revenue': 0.0}
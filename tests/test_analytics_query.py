@@ -0,0 +1,138 @@
+"""
+Tests for the analytics date-range query layer
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.analytics_query import AnalyticsQuery, is_requested
+
+def test_filter_leads_with_indexed_fields_and_covers_whole_days():
+    query = AnalyticsQuery(
+        user_id='u1',
+        start_date=datetime(2024, 1, 1, 15, 30),
+        end_date=datetime(2024, 1, 31, 8, 0),
+        platform='tiktok'
+    ).filter()
+    
+    assert list(query)[:2] == ['user_id', 'date']
+    assert query['date'] == {'$gte': datetime(2024, 1, 1), '$lt': datetime(2024, 2, 1)}
+    assert query['period_type'] == 'daily'
+    assert query['platform'] == 'tiktok'
+    assert 'end_date' not in query and 'start_date' not in query
+
+def test_filter_by_campaigns():
+    assert AnalyticsQuery(campaign_ids=['c1']).filter() == {'campaign_id': 'c1', 'period_type': 'daily'}
+    assert AnalyticsQuery(user_id='u1', campaign_ids=['c1', 'c2']).filter()['campaign_id'] == {'$in': ['c1', 'c2']}
+    assert AnalyticsQuery(user_id='u1', campaign_ids=[]).filter()['campaign_id'] == {'$in': []}
+
+def test_is_requested_matches_summary_keys_by_metric_name():
+    assert is_requested('daily_metrics')
+    assert is_requested('total_spend', ['spend', 'clicks'])
+    assert is_requested('average_ctr', ['ctr'])
+    assert not is_requested('total_revenue', ['spend'])
+    assert not is_requested('audience_insights', ['spend'])
+
+def _winning_stages(plan):
+    stages = [plan.get('stage')]
+    
+    for key in ('inputStage', 'queryPlan'):
+        if key in plan:
+            stages.extend(_winning_stages(plan[key]))
+    
+    for child in plan.get('inputStages', []):
+        stages.extend(_winning_stages(child))
+    
+    return stages
+
+def _index_names(plan):
+    names = [plan['indexName']] if 'indexName' in plan else []
+    
+    for key in ('inputStage', 'queryPlan'):
+        if key in plan:
+            names.extend(_index_names(plan[key]))
+    
+    return names
+
+def test_range_queries_use_compound_index_scans():
+    pymongo = pytest.importorskip('pymongo')
+    from mongoengine import connect, disconnect
+    
+    from app.models.analytics import CampaignAnalytics
+    
+    uri = os.getenv('TEST_MONGODB_URI', 'mongodb://localhost:27017/adgenius_ai_test')
+    
+    try:
+        pymongo.MongoClient(uri, serverSelectionTimeoutMS=500).admin.command('ping')
+    except pymongo.errors.PyMongoError:
+        pytest.skip('MongoDB is not available for explain-plan checks')
+    
+    disconnect()
+    connect(host=uri)
+    
+    try:
+        CampaignAnalytics.ensure_indexes()
+        collection = CampaignAnalytics._get_collection()
+        
+        by_user = AnalyticsQuery(user_id='u1', start_date=datetime(2024, 1, 1), end_date=datetime(2024, 1, 31))
+        by_campaign = AnalyticsQuery(campaign_ids=['c1'], start_date=datetime(2024, 1, 1), end_date=datetime(2024, 1, 31))
+        
+        for query, index_name in ((by_user, 'user_id_1_date_1'), (by_campaign, 'campaign_id_1_date_1_period_type_1')):
+            plan = collection.find(query.filter()).explain()['queryPlanner']['winningPlan']
+            
+            assert 'COLLSCAN' not in _winning_stages(plan)
+            assert index_name in _index_names(plan)
+    finally:
+        disconnect()
+
+def test_projected_load_fetches_heavy_fields_once(monkeypatch):
+    mongomock = pytest.importorskip('mongomock')
+    from mongoengine import connect, disconnect
+    from mongoengine.connection import get_db
+    
+    from app.models.analytics import CampaignAnalytics
+    
+    disconnect()
+    connect('adgenius_ai_query_test', host='mongodb://localhost', mongo_client_class=mongomock.MongoClient)
+    get_db().client.drop_database('adgenius_ai_query_test')
+    
+    try:
+        CampaignAnalytics(
+            campaign_id='c1', user_id='u1', platform='tiktok', date=datetime(2024, 1, 1), impressions=100,
+            demographic_data={'age_gender': {'25-34 - FEMALE': {'impressions': 60}}},
+            device_data={'ios': {'impressions': 70}},
+            top_ads=[{'ad_id': 'a1'}]
+        ).save()
+        
+        reloads = []
+        reload = CampaignAnalytics.reload
+        
+        def counting_reload(self, *fields):
+            reloads.append(fields)
+            return reload(self, *fields)
+        
+        monkeypatch.setattr(CampaignAnalytics, 'reload', counting_reload)
+        
+        analytics = list(AnalyticsQuery(user_id='u1').find('campaign_id', 'impressions'))[0]
+        
+        assert analytics._unloaded_fields == set(CampaignAnalytics.HEAVY_FIELDS)
+        assert analytics.load_field('device_data') == {'ios': {'impressions': 70}}
+        assert analytics.load_field('device_data') == {'ios': {'impressions': 70}}
+        assert analytics.load_field('top_ads') == [{'ad_id': 'a1'}]
+        assert analytics.load_field('impressions') == 100
+        assert reloads == [('device_data',), ('top_ads',)]
+        assert analytics._unloaded_fields == {'platform_metrics', 'demographic_data', 'top_keywords'}
+        
+        # Every field serializes, the remaining heavy ones fetched on demand
+        assert analytics.to_dict()['demographic_data'] == {'age_gender': {'25-34 - FEMALE': {'impressions': 60}}}
+        assert len(reloads) == 5
+        
+        # A full load has nothing left to fetch
+        assert CampaignAnalytics.objects.first()._unloaded_fields == set()
+    finally:
+        disconnect()
@@ -0,0 +1,64 @@
+"""
+Tests for analytics rollup bucketing
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.analytics import AnalyticsRollup
+from app.services.analytics_rollup import AnalyticsRollupService, bucket_start, next_bucket_start, bucket_label
+
+class _Collection:
+    def __init__(self):
+        self.calls = []
+    
+    def bulk_write(self, operations, ordered=True):
+        self.calls.append((operations, ordered))
+
+def test_bucket_start_per_period():
+    date = datetime(2024, 2, 29, 18, 45)
+    
+    assert bucket_start(date, 'daily') == datetime(2024, 2, 29)
+    assert bucket_start(date, 'weekly') == datetime(2024, 2, 26)
+    assert bucket_start(date, 'monthly') == datetime(2024, 2, 1)
+
+def test_next_bucket_start_crosses_month_and_year():
+    assert next_bucket_start(datetime(2024, 1, 31), 'daily') == datetime(2024, 2, 1)
+    assert next_bucket_start(datetime(2024, 12, 30), 'weekly') == datetime(2025, 1, 6)
+    assert next_bucket_start(datetime(2024, 1, 1), 'monthly') == datetime(2024, 2, 1)
+    assert next_bucket_start(datetime(2024, 12, 1), 'monthly') == datetime(2025, 1, 1)
+
+def test_bucket_label_matches_dashboard_format():
+    assert bucket_label(datetime(2024, 1, 1), 'weekly') == 'Week of Jan 01, 2024'
+    assert bucket_label(datetime(2024, 1, 1), 'monthly') == 'Jan 2024'
+    assert bucket_label(datetime(2024, 1, 1), 'daily') == '2024-01-01'
+
+def test_record_many_writes_every_campaign_in_one_unordered_bulk(monkeypatch):
+    collection = _Collection()
+    monkeypatch.setattr(AnalyticsRollup, '_get_collection', classmethod(lambda cls: collection))
+    
+    touched = AnalyticsRollupService().record_many([
+        {'user_id': 'u1', 'campaign_id': 'c1', 'platform': 'tiktok', 'daily_deltas': [
+            {'date': datetime(2024, 1, 1), 'impressions': 10},
+            {'date': datetime(2024, 1, 2), 'impressions': 5}
+        ]},
+        {'user_id': 'u1', 'campaign_id': 'c2', 'platform': 'shopee', 'daily_deltas': [
+            {'date': datetime(2024, 1, 1), 'clicks': 0}
+        ]}
+    ])
+    
+    operations, ordered = collection.calls[0]
+    assert len(collection.calls) == 1 and ordered is False
+    assert touched == 4
+    monthly = [operation for operation in operations if operation._filter['period_type'] == 'monthly']
+    assert monthly[0]._filter['campaign_id'] == 'c1'
+    assert monthly[0]._doc['$inc']['impressions'] == 15
+
+def test_period_metrics_reject_unknown_group_by():
+    with pytest.raises(ValueError):
+        AnalyticsRollupService().get_period_metrics('u1', 'fortnight', datetime(2024, 1, 1), datetime(2024, 1, 31))
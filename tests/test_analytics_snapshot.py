@@ -0,0 +1,63 @@
+"""
+Tests for columnar analytics snapshots
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.analytics_snapshot import (
+    HAS_PYARROW, SNAPSHOT_FIELDS, AnalyticsSnapshotExporter, partition_key, partition_path, to_snapshot_row
+)
+
+DOCUMENT = {
+    '_id': 'a1',
+    'campaign_id': 'c1',
+    'user_id': 'u1',
+    'platform': 'tiktok',
+    'date': datetime(2024, 2, 14),
+    'period_type': 'daily',
+    'impressions': 1000,
+    'spent': 100.0,
+    'device_data': {'mobile': 800},
+    'ai_recommendations': ['Raise budget'],
+    'updated_at': datetime(2024, 2, 15, 8, 0)
+}
+
+def test_partitions_by_user_platform_and_month():
+    key = partition_key(DOCUMENT)
+    
+    assert key == ('u1', 'tiktok', '2024-02')
+    assert partition_path('snapshots', key) == os.path.join(
+        'snapshots', 'user_id=u1', 'platform=tiktok', 'month=2024-02'
+    )
+    assert partition_key({'user_id': 'u1'}) == ('u1', 'unknown', 'unknown')
+
+def test_snapshot_rows_follow_model_fields():
+    row = to_snapshot_row(DOCUMENT)
+    
+    assert tuple(row) == tuple(name for name, _ in SNAPSHOT_FIELDS)
+    assert row['id'] == 'a1' and row['spent'] == 100.0
+    assert json.loads(row['device_data']) == {'mobile': 800}
+    assert row['demographic_data'] is None
+    assert row['ai_recommendations'] == ['Raise budget']
+    assert row['top_ads'] is None and row['clicks'] is None
+
+def test_watermark_round_trip(tmp_path):
+    exporter = AnalyticsSnapshotExporter(str(tmp_path))
+    
+    assert exporter.watermark() is None
+    
+    exporter.save_watermark(datetime(2024, 2, 15, 8, 0))
+    
+    assert exporter.watermark() == datetime(2024, 2, 15, 8, 0)
+    assert os.listdir(tmp_path) == ['_watermark.json']
+
+def test_export_requires_pyarrow(tmp_path):
+    if HAS_PYARROW:
+        return
+    
+    assert AnalyticsSnapshotExporter(str(tmp_path)).export() == {'error': 'pyarrow is not installed'}
@@ -0,0 +1,108 @@
+"""
+Tests for analytics metrics storage backends
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.analytics_query import AnalyticsQuery
+from app.services.analytics_store import (
+    FLATTEN_STAGE, DocumentMetricsStore, TimeSeriesMetricsStore, get_metrics_store,
+    to_measurement, to_timeseries_filter
+)
+
+def test_filters_move_reference_fields_under_meta():
+    query = AnalyticsQuery(user_id='u1', start_date=datetime(2024, 1, 1), end_date=datetime(2024, 1, 31),
+                           platform='tiktok', campaign_ids=['c1', 'c2']).filter()
+    
+    translated = to_timeseries_filter(query)
+    
+    assert translated['meta.user_id'] == 'u1'
+    assert translated['meta.campaign_id'] == {'$in': ['c1', 'c2']}
+    assert translated['meta.period_type'] == 'daily'
+    assert translated['meta.platform'] == 'tiktok'
+    assert translated['date'] == {'$gte': datetime(2024, 1, 1), '$lt': datetime(2024, 2, 1)}
+
+def test_measurements_round_trip_through_flatten_stage():
+    document = {'campaign_id': 'c1', 'user_id': 'u1', 'platform': 'tiktok', 'period_type': 'daily',
+                'date': datetime(2024, 1, 2), 'impressions': 1000, 'spent': 10.0, 'ctr': 2.0}
+    
+    measurement = to_measurement(document)
+    
+    assert measurement['meta'] == {'user_id': 'u1', 'campaign_id': 'c1', 'platform': 'tiktok', 'period_type': 'daily'}
+    assert measurement['impressions'] == 1000 and 'ctr' not in measurement
+    assert FLATTEN_STAGE['$project']['campaign_id'] == '$meta.campaign_id'
+    assert FLATTEN_STAGE['$project']['spent'] == 1
+
+def test_timeseries_replacement_is_written_before_the_old_measurements_go():
+    mongomock = pytest.importorskip('mongomock')
+    collection = mongomock.MongoClient().db.measurements
+    collection.insert_one({'date': datetime(2024, 1, 1), 'impressions': 10, 'ai_recommendations': ['Raise budget'],
+                           'meta': {'campaign_id': 'c1', 'user_id': 'u1', 'platform': 'tiktok', 'period_type': 'daily'}})
+    store = TimeSeriesMetricsStore()
+    store._collection = collection
+    inserted = []
+    insert_many = collection.insert_many
+    
+    def record_insert(measurements, **kwargs):
+        # The old measurement is still there when its replacement lands
+        inserted.append(collection.count_documents({}))
+        return insert_many(measurements, **kwargs)
+    
+    collection.insert_many = record_insert
+    store.record_many([{'campaign_id': 'c1', 'user_id': 'u1', 'platform': 'tiktok', 'period_type': 'daily',
+                        'date': datetime(2024, 1, 1), 'impressions': 50}])
+    
+    rows = list(collection.find({}, {'_id': 0, 'impressions': 1, 'ai_recommendations': 1}))
+    assert inserted == [1]
+    assert rows == [{'impressions': 50, 'ai_recommendations': ['Raise budget']}]
+
+def test_backend_selection():
+    assert isinstance(get_metrics_store('timeseries'), TimeSeriesMetricsStore)
+    assert isinstance(get_metrics_store('documents'), DocumentMetricsStore)
+
+def test_timeseries_store_against_mongod():
+    pymongo = pytest.importorskip('pymongo')
+    from mongoengine import connect, disconnect
+    
+    uri = os.getenv('TEST_MONGODB_URI', 'mongodb://localhost:27017/adgenius_ai_test')
+    
+    try:
+        pymongo.MongoClient(uri, serverSelectionTimeoutMS=500).admin.command('ping')
+    except pymongo.errors.PyMongoError:
+        pytest.skip('MongoDB is not available for time-series checks')
+    
+    disconnect()
+    connect(host=uri)
+    
+    store = TimeSeriesMetricsStore(collection_name='analytics_timeseries_test')
+    
+    try:
+        store.collection().drop()
+        store.ensure_collection()
+        
+        documents = [
+            {'campaign_id': 'c1', 'user_id': 'u1', 'platform': 'tiktok', 'period_type': 'daily',
+             'date': datetime(2024, 1, day), 'impressions': 100 * day, 'clicks': day,
+             'ai_recommendations': ['Raise budget'] if day == 3 else None}
+            for day in (1, 2, 3)
+        ]
+        store.record_many(documents)
+        
+        # Re-recording replaces measurements and keeps stored recommendations
+        store.record_many([dict(documents[2], impressions=50, ai_recommendations=None)])
+        
+        query = AnalyticsQuery(user_id='u1', start_date=datetime(2024, 1, 1), end_date=datetime(2024, 1, 3))
+        analytics_list = list(store.find(query, 'campaign_id', 'date', 'impressions', 'ai_recommendations'))
+        
+        assert [analytics.impressions for analytics in analytics_list] == [100, 200, 50]
+        assert analytics_list[2].ai_recommendations == ['Raise budget']
+        assert analytics_list[0].campaign_id == 'c1'
+    finally:
+        store.collection().drop()
+        disconnect()
@@ -0,0 +1,258 @@
+"""
+Tests for the async TikTok and Shopee connectors
+"""
+
+import asyncio
+import os
+import sys
+import threading
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.platform_connectors import shopee_async_connector, tiktok_async_connector
+from app.platform_connectors.shopee_async_connector import AsyncShopeeConnector
+from app.platform_connectors.shopee_connector import ShopeeConnector
+from app.platform_connectors.tiktok_async_connector import AsyncTikTokConnector
+from app.platform_connectors.tiktok_connector import TikTokConnector
+from app.utils.async_http import query_items, run_sync
+
+START = datetime(2024, 3, 1)
+END = datetime(2024, 3, 7)
+
+def _tiktok_body(url, data):
+    if url.endswith('/report/audience/get/'):
+        rows = [{'gender': 'FEMALE', 'age': '25-34', 'impressions': '40', 'clicks': '4', 'conversion': '1', 'cost': '500'}]
+    elif data.get('dimensions') == ['stat_time_day']:
+        rows = [{'stat_time_day': '2024-03-01', 'impressions': '100', 'clicks': '5', 'cost': '1000', 'ctr': '0.05'}]
+    elif data['data_level'] == 'AUCTION_AD':
+        rows = [{'ad_id': 'a1', 'ad_name': 'Ad', 'impressions': '100', 'clicks': '5', 'cost': '1000'}]
+    elif data['data_level'] == 'AUCTION_ADGROUP':
+        rows = [{'adgroup_id': 'g1', 'adgroup_name': 'Group', 'impressions': '100'}]
+    else:
+        rows = [{'impressions': '1000', 'clicks': '50', 'conversion': '5', 'cost': '12345', 'ctr': '0.05', 'cpc': '247'}]
+    
+    return {'code': 0, 'data': {'list': rows}}
+
+def _shopee_body(url, params):
+    if url.endswith('/shop/get_shop_performance'):
+        response = {'shop_views': 200}
+    elif url.endswith('/shop/get_shop_info'):
+        response = {'shop_name': 'Shop', 'rating_star': 4.8}
+    elif url.endswith('/order/get_order_list'):
+        response = {'order_list': [
+            {'total_amount': 300, 'item_list': [{'item_id': 'p1', 'model_quantity_purchased': 2, 'model_original_price': 150}]}
+        ]}
+    elif url.endswith('/product/get_item_list'):
+        response = {'item': [{'item_id': 'p1', 'item_name': 'One'}, {'item_id': 'p2', 'item_name': 'Two'}]}
+    elif url.endswith('/product/get_item_base_info'):
+        item_id = params['item_id_list'][0] if isinstance(params, dict) else params[0][1]
+        response = {'item_list': [{'item_id': item_id, 'item_name': item_id, 'price': 100, 'category_id': 7}]}
+    elif url.endswith('/product/get_category'):
+        response = {'category_list': [{'category_name': 'Shoes'}]}
+    else:
+        response = {'item_promotion_list': [{'view_count': 50, 'sold_count': 1}]}
+    
+    return {'error': None, 'response': response}
+
+class _Response:
+    def __init__(self, body):
+        self.status_code = 200
+        self.headers = {}
+        self.body = body
+    
+    def json(self):
+        return self.body
+
+class _Session:
+    def __init__(self, body):
+        self.body = body
+        self.calls = []
+    
+    def get(self, url, params=None, **kwargs):
+        self.calls.append(('GET', url, params, kwargs))
+        return _Response(self.body(url, params))
+    
+    def post(self, url, json=None, **kwargs):
+        self.calls.append(('POST', url, json, kwargs))
+        return _Response(self.body(url, json))
+
+class _BarrierSession(_Session):
+    def __init__(self, body, parties):
+        super().__init__(body)
+        self.barrier = threading.Barrier(parties, timeout=5)
+    
+    def post(self, url, json=None, **kwargs):
+        # Every report must be in flight before any of them returns
+        self.barrier.wait()
+        return super().post(url, json=json, **kwargs)
+
+class _AsyncResponse:
+    def __init__(self, body):
+        self.status = 200
+        self.headers = {}
+        self.body = body
+    
+    async def __aenter__(self):
+        await asyncio.sleep(0)
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    async def json(self, content_type='application/json'):
+        return self.body
+
+class _AsyncSession:
+    def __init__(self, body):
+        self.body = body
+        self.calls = []
+    
+    def request(self, method, url, params=None, json=None, headers=None):
+        self.calls.append((method, url, params if method == 'GET' else json, headers))
+        return _AsyncResponse(self.body(url, json if json is not None else params))
+
+def _fixed_clock(monkeypatch):
+    monkeypatch.setenv('CONNECTOR_RATE_LIMIT', '1000')
+    monkeypatch.setenv('CONNECTOR_RATE_BURST', '1000')
+    monkeypatch.setattr('app.platform_connectors.tiktok_connector.time.time', lambda: 1700000000)
+    monkeypatch.setattr('app.platform_connectors.shopee_connector.time.time', lambda: 1700000000)
+
+def _connectors(connector_class, async_class, *args):
+    connectors = []
+    
+    for cls in (connector_class, async_class):
+        connector = cls()
+        connector.initialize(*args)
+        connectors.append(connector)
+    
+    return connectors
+
+def _without_ids(analytics):
+    # Recommendation IDs are random per call
+    for recommendation in analytics.get('recommendations', []):
+        recommendation.pop('id', None)
+    
+    return analytics
+
+def test_query_items_encode_lists_as_repeated_keys():
+    assert query_items({'item_id_list': ['1', '2'], 'offset': 0, 'cursor': None}) == [
+        ('item_id_list', '1'), ('item_id_list', '2'), ('offset', '0')
+    ]
+
+def test_run_sync_inside_a_running_loop():
+    async def answer():
+        return 42
+    
+    async def caller():
+        return run_sync(answer())
+    
+    assert run_sync(answer()) == 42
+    assert asyncio.run(caller()) == 42
+
+def test_tiktok_async_matches_sync_signature_and_normalization(monkeypatch):
+    monkeypatch.setenv('TIKTOK_APP_ID', 'app')
+    monkeypatch.setenv('TIKTOK_APP_SECRET', 'secret')
+    _fixed_clock(monkeypatch)
+    sync_connector, async_connector = _connectors(TikTokConnector, AsyncTikTokConnector, 'token')
+    sync_connector.session = _Session(_tiktok_body)
+    session = _AsyncSession(_tiktok_body)
+    
+    expected = sync_connector.get_campaign_analytics('adv', 'c1', START, END)
+    result = asyncio.run(async_connector.get_campaign_analytics_async('adv', 'c1', START, END, session))
+    
+    assert _without_ids(result) == _without_ids(expected)
+    assert result['total_spend'] == 123.45 and result['daily_metrics'][0]['spend'] == 10.0
+    assert len(session.calls) == 5
+    assert [call[3] for call in session.calls] == [call[3]['headers'] for call in sync_connector.session.calls]
+
+def test_tiktok_gathers_campaigns_on_one_session(monkeypatch):
+    monkeypatch.setenv('TIKTOK_APP_SECRET', 'secret')
+    _fixed_clock(monkeypatch)
+    connector = AsyncTikTokConnector()
+    connector.initialize('token')
+    session = _AsyncSession(_tiktok_body)
+    arguments = {
+        campaign_id: {'advertiser_id': 'adv', 'campaign_id': campaign_id, 'start_date': START, 'end_date': END}
+        for campaign_id in ('c1', 'c2')
+    }
+    
+    results, errors = asyncio.run(connector.get_campaigns_analytics_async(arguments, 2, session=session))
+    
+    assert errors == {}
+    assert [results[key]['total_spend'] for key in ('c1', 'c2')] == [123.45, 123.45]
+    assert len(session.calls) == 10
+
+def test_tiktok_sync_reports_run_concurrently(monkeypatch):
+    monkeypatch.setenv('TIKTOK_APP_SECRET', 'secret')
+    _fixed_clock(monkeypatch)
+    connector = TikTokConnector()
+    connector.initialize('token')
+    connector.session = _BarrierSession(_tiktok_body, 5)
+    
+    result = connector.get_campaign_analytics('adv', 'c1', START, END)
+    
+    assert result['total_impressions'] == 1000
+    assert result['audience_insights']['age_gender']['25-34 - FEMALE']['spend'] == 5.0
+    assert len(connector.session.calls) == 5
+
+def test_tiktok_sync_report_errors_keep_the_campaign_totals(monkeypatch):
+    monkeypatch.setenv('TIKTOK_APP_SECRET', 'secret')
+    _fixed_clock(monkeypatch)
+    connector = TikTokConnector()
+    connector.initialize('token')
+    connector.session = _Session(_tiktok_body)
+    
+    def report(method, endpoint, params=None, data=None):
+        if data['data_level'] == 'AUCTION_AD':
+            raise RuntimeError('connection reset')
+        
+        return TikTokConnector._make_request(connector, method, endpoint, params, data)
+    
+    monkeypatch.setattr(connector, '_make_request', report)
+    result = connector.get_campaign_analytics('adv', 'c1', START, END)
+    
+    assert result['total_spend'] == 123.45
+    assert result['creative_performance'] == []
+
+def test_tiktok_async_reports_missing_campaign_totals(monkeypatch):
+    monkeypatch.setenv('TIKTOK_APP_SECRET', 'secret')
+    connector = AsyncTikTokConnector()
+    connector.initialize('token')
+    session = _AsyncSession(lambda url, data: {'code': 40001, 'message': 'Invalid token'})
+    
+    assert asyncio.run(connector.get_campaign_analytics_async('adv', 'c1', START, END, session)) == {
+        'error': 'TikTok API error: Invalid token'
+    }
+
+def test_shopee_async_matches_sync_and_shares_the_order_list(monkeypatch):
+    monkeypatch.setenv('SHOPEE_PARTNER_KEY', 'key')
+    _fixed_clock(monkeypatch)
+    sync_connector, async_connector = _connectors(ShopeeConnector, AsyncShopeeConnector, 'token', 'shop')
+    sync_connector.session = _Session(_shopee_body)
+    session = _AsyncSession(_shopee_body)
+    
+    expected = sync_connector.get_campaign_analytics(START, END)
+    result = asyncio.run(async_connector.get_campaign_analytics_async(START, END, session))
+    
+    assert _without_ids(result) == _without_ids(expected)
+    assert result['product_performance'][0]['total_sales'] == 3
+    
+    orders = [call for call in session.calls if call[1].endswith('/order/get_order_list')]
+    assert len(orders) == 1
+    assert len(session.calls) < len(sync_connector.session.calls)
+    
+    performance = [call for call in session.calls if call[1].endswith('/shop/get_shop_performance')]
+    assert ('sign', sync_connector.session.calls[0][2]['sign']) in performance[0][2]
+
+def test_facades_fall_back_to_sync_without_aiohttp(monkeypatch):
+    monkeypatch.setenv('TIKTOK_APP_SECRET', 'secret')
+    _fixed_clock(monkeypatch)
+    monkeypatch.setattr(tiktok_async_connector, 'HAS_AIOHTTP', False)
+    monkeypatch.setattr(shopee_async_connector, 'HAS_AIOHTTP', False)
+    connector = AsyncTikTokConnector()
+    connector.initialize('token')
+    connector.session = _Session(_tiktok_body)
+    
+    assert connector.get_campaign_analytics('adv', 'c1', START, END)['total_impressions'] == 1000
+    assert len(connector.session.calls) == 5
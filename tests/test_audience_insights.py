@@ -0,0 +1,47 @@
+"""
+Tests for the audience insight merge engine
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import audience_insights
+from app.services.audience_insights import InsightMerger
+
+def test_merges_flat_and_nested_leaves():
+    merged = InsightMerger().merge([
+        {'age_gender': {'18-24 - male': 3}, 'locations': {'TH': 2}},
+        {'age_gender': {'18-24 - male': {'impressions': 100, 'spend': 1.5}, 'AGE_25_34 - FEMALE': {'impressions': 40}}},
+        {'age_gender': {'18-24 - male': {'impressions': 50, 'spend': 0.5}}, 'locations': {'TH': 1, 'MY': 4}}
+    ]).result()
+    
+    assert merged['age_gender']['18-24 - male'] == {'count': 3, 'impressions': 150, 'spend': 2.0}
+    assert merged['age_gender']['AGE_25_34 - FEMALE'] == {'impressions': 40}
+    assert merged['locations'] == {'TH': 3, 'MY': 4}
+    assert merged['devices'] == {}
+
+def test_top_n_keeps_highest_ranked_entries():
+    merger = InsightMerger().merge([
+        {'interests': {'Boxing': 5, 'Yoga': 1, 'Muay Thai': 9}},
+        {'age_gender': {'a': {'impressions': 10}, 'b': {'impressions': 30}, 'c': {'clicks': 20}}}
+    ])
+    
+    merged = merger.result({'interests': 2, 'age_gender': 1})
+    
+    assert list(merged['interests']) == ['Muay Thai', 'Boxing']
+    assert merged['age_gender'] == {'b': {'impressions': 30}}
+    assert len(merger.result(1)['interests']) == 1
+
+def test_dense_dimensions_fill_every_slot(monkeypatch):
+    rows = [{'day_of_week': {'Monday': 2, 'sunday': 1}}, {'day_of_week': {'monday': 3, 'holiday': 1}}]
+    
+    merged = InsightMerger().merge(rows).result()['day_of_week']
+    assert list(merged)[:7] == ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+    assert merged['monday'] == 5 and merged['tuesday'] == 0 and merged['sunday'] == 1
+    assert merged['holiday'] == 1
+    
+    monkeypatch.setattr(audience_insights, 'HAS_NUMPY', False)
+    fallback = InsightMerger().merge(rows).result()['day_of_week']
+    assert fallback == {'monday': 5, 'sunday': 1, 'holiday': 1}
@@ -0,0 +1,86 @@
+"""
+Tests for the calendar bucketing engine
+"""
+
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.analytics import AnalyticsRollup
+from app.services.analytics_rollup import AnalyticsRollupService
+from app.utils.calendar_buckets import (
+    CalendarBuckets, get_calendar_buckets, period_key, period_start, previous_period
+)
+
+class _Collection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.pipelines = []
+    
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return iter(self.rows)
+
+def test_period_start_per_granularity():
+    date = datetime(2024, 8, 15, 18, 45)
+    
+    assert period_start(date, 'day') == datetime(2024, 8, 15)
+    assert period_start(date, 'week') == datetime(2024, 8, 12)
+    assert period_start(date, 'month') == datetime(2024, 8, 1)
+    assert period_start(date, 'quarter') == datetime(2024, 7, 1)
+    assert period_start(date, 'year') == datetime(2024, 1, 1)
+
+def test_previous_period_has_the_same_length():
+    assert previous_period(datetime(2024, 3, 4, 15), datetime(2024, 3, 10)) == (
+        datetime(2024, 2, 26), datetime(2024, 3, 3)
+    )
+    assert previous_period(datetime(2024, 3, 1), datetime(2024, 3, 1)) == (
+        datetime(2024, 2, 29), datetime(2024, 2, 29)
+    )
+
+def test_iso_week_keys_cross_the_year():
+    buckets = CalendarBuckets(datetime(2024, 12, 28), datetime(2025, 1, 6), 'week')
+    
+    assert buckets.keys() == ['2024-W52', '2025-W01', '2025-W02']
+    assert period_key(datetime(2024, 10, 1), 'quarter') == '2024-Q4'
+
+def test_assign_dates_to_quarters():
+    buckets = CalendarBuckets(datetime(2024, 2, 10), datetime(2024, 11, 3), 'quarter')
+    
+    assert buckets.labels() == ['Q1 2024', 'Q2 2024', 'Q3 2024', 'Q4 2024']
+    assert buckets.assign([
+        datetime(2024, 2, 10),
+        datetime(2024, 3, 31, 23),
+        datetime(2024, 4, 1),
+        datetime(2024, 12, 31),
+        datetime(2025, 1, 1),
+        datetime(2023, 12, 31)
+    ]) == [0, 0, 1, 3, -1, -1]
+
+def test_buckets_are_reused_per_range():
+    first = get_calendar_buckets(datetime(2024, 1, 1), datetime(2024, 12, 31), 'month')
+    
+    assert get_calendar_buckets(datetime(2024, 1, 1), datetime(2024, 12, 31), 'month') is first
+    assert len(first) == 12
+
+def test_quarterly_metrics_read_whole_months_from_monthly_rollups(monkeypatch):
+    collection = _Collection([
+        {'_id': datetime(2024, 2, 1), 'impressions': 100, 'clicks': 10, 'spent': 5.0},
+        {'_id': datetime(2024, 1, 20), 'impressions': 50, 'clicks': 5, 'spent': 5.0},
+        {'_id': datetime(2024, 4, 2), 'impressions': 10, 'clicks': 1, 'spent': 1.0}
+    ])
+    monkeypatch.setattr(AnalyticsRollup, '_get_collection', classmethod(lambda cls: collection))
+    
+    metrics = AnalyticsRollupService().get_period_metrics('u1', 'quarter', datetime(2024, 1, 20), datetime(2024, 4, 2))
+    
+    clauses = collection.pipelines[0][0]['$match']['$or']
+    assert clauses[0] == {
+        'period_type': 'monthly',
+        'bucket_start': {'$gte': datetime(2024, 2, 1), '$lt': datetime(2024, 4, 1)}
+    }
+    assert [bucket['key'] for bucket in metrics] == ['2024-Q1', '2024-Q2']
+    assert metrics[0]['impressions'] == 150 and metrics[0]['spend'] == 10.0
+    assert metrics[0]['ctr'] == 10.0
+    assert metrics[1]['clicks'] == 1
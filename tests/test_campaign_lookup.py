@@ -0,0 +1,61 @@
+"""
+Tests for batched campaign lookups
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from app.services import campaign_lookup
+from app.services.campaign_lookup import LOOKUP_FIELDS, CampaignIdentityMap, get_identity_map
+
+class _Campaign:
+    def __init__(self, campaign_id, name):
+        self.id = campaign_id
+        self.name = name
+
+class _QuerySet(list):
+    def only(self, *fields):
+        assert fields == LOOKUP_FIELDS
+        return self
+
+class _Campaigns:
+    stored = {'c1': 'Muay Thai Fitness', 'c2': 'Kids Class'}
+    calls = []
+    
+    @classmethod
+    def objects(cls, id__in):
+        cls.calls.append(sorted(id__in))
+        return _QuerySet(_Campaign(campaign_id, cls.stored[campaign_id]) for campaign_id in id__in
+                         if campaign_id in cls.stored)
+
+def test_identity_map_batches_and_remembers_lookups(monkeypatch):
+    monkeypatch.setattr(campaign_lookup, 'Campaign', _Campaigns)
+    _Campaigns.calls = []
+    identity_map = CampaignIdentityMap()
+    identity_map.add([_Campaign('c0', 'Seeded')])
+    
+    names = identity_map.names(['c0', 'c1', 'c2', 'missing', None])
+    
+    assert names == {'c0': 'Seeded', 'c1': 'Muay Thai Fitness', 'c2': 'Kids Class'}
+    assert _Campaigns.calls == [['c1', 'c2', 'missing']]
+    
+    # Known and known-missing campaigns are served without another query
+    first = identity_map.get('c1')
+    assert identity_map.get('c1') is first
+    assert identity_map.get('missing') is None
+    assert identity_map.queries == 1
+
+def test_identity_map_is_shared_within_a_request():
+    app = Flask(__name__)
+    
+    with app.test_request_context():
+        assert get_identity_map() is get_identity_map()
+    
+    with app.test_request_context():
+        other = get_identity_map()
+    
+    assert get_identity_map() is not other
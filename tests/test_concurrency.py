@@ -0,0 +1,48 @@
+"""
+Tests for bounded concurrency utilities
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.concurrency import run_bounded
+
+def test_run_bounded_limits_parallelism_and_collects_errors():
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0}
+    
+    def task(value):
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        time.sleep(0.02)
+        with lock:
+            state['running'] -= 1
+        if value == 3:
+            raise ValueError('bad campaign')
+        return value * 2
+    
+    results, errors = run_bounded({value: (lambda value=value: task(value)) for value in range(8)}, max_workers=2)
+    
+    assert state['peak'] <= 2
+    assert results == {0: 0, 1: 2, 2: 4, 4: 8, 5: 10, 6: 12, 7: 14}
+    assert errors == {3: 'bad campaign'}
+
+def test_run_bounded_returns_partial_results_at_deadline():
+    release = threading.Event()
+    
+    started = time.monotonic()
+    results, errors = run_bounded(
+        {'fast': lambda: 'ok', 'slow': lambda: release.wait(5)},
+        max_workers=2,
+        timeout=0.1
+    )
+    release.set()
+    
+    assert time.monotonic() - started < 1
+    assert results == {'fast': 'ok'}
+    assert errors == {'slow': 'Deadline exceeded'}
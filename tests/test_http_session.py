@@ -0,0 +1,60 @@
+"""
+Tests for pooled connector HTTP sessions
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.platform_connectors.tiktok_connector import TikTokConnector
+from app.utils import http_session
+from app.utils.http_session import build_session, get_session, get_timeout
+
+class _Response:
+    status_code = 200
+    headers = {}
+    
+    def json(self):
+        return {'code': 0, 'data': {'list': []}}
+
+class _Session:
+    def __init__(self):
+        self.calls = []
+    
+    def get(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        return _Response()
+
+def test_build_session_caps_connections_per_host():
+    adapter = build_session(max_connections_per_host=7).get_adapter('https://business-api.tiktok.com')
+    
+    assert adapter._pool_maxsize == 7
+    assert adapter._pool_block is True
+
+def test_sessions_are_shared_per_platform(monkeypatch):
+    monkeypatch.setattr(http_session, '_sessions', {})
+    monkeypatch.setenv('SHOPEE_HTTP_MAX_CONNECTIONS', '3')
+    
+    assert get_session('tiktok') is get_session('tiktok')
+    assert get_session('tiktok') is not get_session('shopee')
+    assert get_session('shopee').get_adapter('https://partner.shopeemobile.com')._pool_maxsize == 3
+
+def test_timeouts_fall_back_to_connector_defaults(monkeypatch):
+    monkeypatch.setenv('CONNECTOR_HTTP_READ_TIMEOUT', '12')
+    monkeypatch.setenv('TIKTOK_HTTP_CONNECT_TIMEOUT', '1.5')
+    
+    assert get_timeout('tiktok') == (1.5, 12.0)
+
+def test_make_request_uses_pooled_session_with_timeout(monkeypatch):
+    monkeypatch.setenv('TIKTOK_APP_SECRET', 'secret')
+    connector = TikTokConnector()
+    connector.session = _Session()
+    connector.initialize('token')
+    
+    assert connector._make_request('GET', '/campaign/get/', params={'advertiser_id': '1'}) == {'list': []}
+    
+    url, kwargs = connector.session.calls[0]
+    assert url.endswith('/campaign/get/')
+    assert kwargs['timeout'] == connector.timeout
+    assert kwargs['headers']['Timestamp'] and kwargs['headers']['Signature']
@@ -0,0 +1,80 @@
+"""
+Tests for the performance metrics kernel
+"""
+
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import metrics
+from app.utils.metrics import (
+    apply_derived_metrics, apply_roi_metrics, compare_summaries, derive_metrics, derive_row,
+    hourly_metrics_by_day
+)
+
+def test_derive_metrics_handles_zero_denominators():
+    columns = derive_metrics(
+        impressions=[1000, 0],
+        clicks=[50, 0],
+        conversions=[5, 0],
+        spend=[100.0, 0.0],
+        revenue=[400.0, 10.0]
+    )
+    
+    assert columns['ctr'] == [5.0, 0.0]
+    assert columns['cpc'] == [2.0, 0.0]
+    assert columns['cpm'] == [100.0, 0.0]
+    assert columns['conversion_rate'] == [10.0, 0.0]
+    assert columns['cost_per_conversion'] == [20.0, 0.0]
+    assert columns['roas'] == [4.0, 0.0]
+
+def test_vectorized_and_fallback_paths_agree(monkeypatch):
+    rows = [
+        {'impressions': i * 100, 'clicks': i * 3, 'conversions': i % 4, 'spend': i * 1.5, 'revenue': i * 2.25}
+        for i in range(50)
+    ]
+    expected = [dict(row, **derive_row(**row)) for row in rows]
+    
+    monkeypatch.setattr(metrics, 'HAS_NUMPY', False)
+    fallback = apply_derived_metrics([dict(row) for row in rows])
+    monkeypatch.undo()
+    vectorized = apply_derived_metrics([dict(row) for row in rows])
+    
+    for row, fallback_row, vectorized_row in zip(expected, fallback, vectorized):
+        for metric in metrics.DERIVED_METRICS:
+            assert abs(row[metric] - fallback_row[metric]) < 1e-9
+            assert abs(row[metric] - vectorized_row[metric]) < 1e-9
+
+def test_apply_roi_metrics():
+    rows = apply_roi_metrics([{'spend': 100.0, 'revenue': 150.0}, {'spend': 0.0, 'revenue': 20.0}])
+    
+    assert rows[0]['roi'] == 50.0
+    assert rows[0]['roas'] == 1.5
+    assert rows[1]['roi'] == 0.0
+    assert rows[1]['roas'] == 0.0
+
+def test_hourly_metrics_by_day_groups_and_sums():
+    grouped = hourly_metrics_by_day([
+        {'date': '2024-01-01T13:00:00', 'impressions': 100, 'clicks': 5, 'spend': 2.0},
+        {'date': datetime(2024, 1, 1, 13), 'impressions': 50, 'conversions': 1},
+        {'date': '2024-01-02T00:00:00', 'clicks': 1}
+    ])
+    
+    assert set(grouped) == {'2024-01-01', '2024-01-02'}
+    assert grouped['2024-01-01']['13'] == {
+        'impressions': 150, 'clicks': 5, 'conversions': 1, 'spend': 2.0, 'revenue': 0
+    }
+    assert grouped['2024-01-02']['0']['clicks'] == 1
+
+def test_compare_summaries_reports_deltas_and_changes():
+    comparison = compare_summaries(
+        {'total_clicks': 150, 'average_ctr': 2.0, 'total_revenue': 10.0},
+        {'total_clicks': 100, 'average_ctr': 4.0, 'total_revenue': 0.0}
+    )
+    
+    assert comparison['delta'] == {'total_clicks': 50, 'average_ctr': -2.0, 'total_revenue': 10.0}
+    assert comparison['change']['total_clicks'] == 50.0
+    assert comparison['change']['average_ctr'] == -50.0
+    assert comparison['change']['total_revenue'] is None
@@ -0,0 +1,129 @@
+"""
+Tests for the connector rate limiter
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.platform_connectors.shopee_connector import ShopeeConnector
+from app.utils import rate_limiter
+from app.utils.rate_limiter import LocalTokenBuckets, RateLimiter, parse_rate_limit_headers, rate_factor
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+    
+    def monotonic(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+class _BrokenBackend:
+    def take(self, key, rate, capacity, tokens=1):
+        raise ConnectionError('redis is down')
+
+class _ThreadBackend:
+    def __init__(self):
+        self.threads = []
+    
+    def take(self, key, rate, capacity, tokens=1):
+        self.threads.append(threading.current_thread())
+        return 0.0
+
+class _Response:
+    status_code = 429
+    headers = {'Retry-After': '5'}
+    
+    def json(self):
+        return {'error': 'error_rate_limit', 'message': 'Too many requests'}
+
+class _Session:
+    def get(self, url, **kwargs):
+        return _Response()
+
+def test_parse_business_use_case_usage():
+    headers = {'X-Business-Use-Case-Usage': json.dumps({
+        '1234': [{'type': 'ads_insights', 'call_count': 80, 'total_cputime': 20, 'total_time': 40,
+                  'estimated_time_to_regain_access': 2}]
+    })}
+    
+    assert parse_rate_limit_headers(headers) == (80.0, 120.0)
+
+def test_parse_generic_headers():
+    assert parse_rate_limit_headers({'X-RateLimit-Limit': '100', 'X-RateLimit-Remaining': '10', 'Retry-After': '3'}) == (90.0, 3.0)
+    assert parse_rate_limit_headers({'Content-Type': 'application/json'}) == (None, 0.0)
+    assert rate_factor(50) == 1.0 and rate_factor(90) == 0.4 and rate_factor(120) == 0.1
+
+def test_local_bucket_bursts_then_refills(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(rate_limiter, 'time', clock)
+    buckets = LocalTokenBuckets()
+    
+    assert [buckets.take('tiktok:app:adv', 2, 3) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert buckets.take('tiktok:app:adv', 2, 3) == 0.5
+    
+    clock.now += 0.5
+    assert buckets.take('tiktok:app:adv', 2, 3) == 0.0
+    assert buckets.take('tiktok:app:other', 2, 3) == 0.0
+
+def test_throttle_scales_rate_and_pauses(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(rate_limiter, 'time', clock)
+    buckets = LocalTokenBuckets()
+    buckets.take('key', 2, 1)
+    buckets.throttle('key', 0.5, pause=3)
+    
+    assert buckets.take('key', 2, 1) == 3.0
+    
+    clock.now += 3
+    assert buckets.take('key', 2, 1) == 0.0
+    assert buckets.take('key', 2, 1) == 1.0
+
+def test_acquire_waits_for_budget(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(rate_limiter, 'time', clock)
+    monkeypatch.setenv('SHOPEE_RATE_LIMIT', '4')
+    monkeypatch.setenv('SHOPEE_RATE_BURST', '1')
+    limiter = RateLimiter(max_wait=1)
+    
+    assert limiter.acquire('shopee', 'partner', 'shop') is True
+    assert limiter.acquire('shopee', 'partner', 'shop') is True
+    assert clock.sleeps == [0.25]
+    
+    limiter.observe('shopee', 'partner', 'shop', {'Retry-After': '30'})
+    assert limiter.acquire('shopee', 'partner', 'shop') is False
+    assert limiter.stats()['by_platform']['shopee'] == {'acquired': 2, 'waited': 1, 'throttled': 1, 'timeouts': 1}
+
+def test_backend_errors_fall_back_to_local_buckets():
+    limiter = RateLimiter()
+    limiter.backend = _BrokenBackend()
+    
+    assert limiter.try_acquire('tiktok', 'app', 'adv') == 0.0
+    assert limiter.stats()['by_platform']['tiktok'] == {'errors': 1}
+
+def test_acquire_async_keeps_redis_calls_off_the_loop():
+    limiter = RateLimiter()
+    limiter.backend = _ThreadBackend()
+    
+    assert asyncio.run(limiter.acquire_async('tiktok', 'app', 'adv')) is True
+    assert limiter.backend.threads and threading.main_thread() not in limiter.backend.threads
+
+def test_connector_pauses_account_after_429(monkeypatch):
+    monkeypatch.setenv('SHOPEE_PARTNER_KEY', 'key')
+    monkeypatch.setenv('SHOPEE_RETRY_ATTEMPTS', '1')
+    connector = ShopeeConnector()
+    connector.initialize('token', 'shop-429')
+    connector.session = _Session()
+    connector.rate_limiter = RateLimiter()
+    
+    assert connector._make_request('GET', '/shop/get_shop_info') == {'error': 'Shopee API error: Too many requests'}
+    assert 4 < connector.rate_limiter.try_acquire('shopee', connector.partner_id, 'shop-429') <= 5
+    assert connector.rate_limiter.try_acquire('shopee', connector.partner_id, 'other-shop') == 0.0
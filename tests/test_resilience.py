@@ -0,0 +1,172 @@
+"""
+Tests for connector retries and circuit breakers
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.platform_connectors.facebook_connector import graph_endpoint
+from app.platform_connectors.tiktok_connector import TikTokConnector
+from app.utils import resilience
+from app.utils.resilience import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, RetryPolicy, breaker_metrics,
+    call_with_retry, call_with_retry_async
+)
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+    
+    def monotonic(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+class _Response:
+    headers = {}
+    
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+    
+    def json(self):
+        return self.body
+
+class _FlakySession:
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+    
+    def _next(self):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        
+        if isinstance(outcome, Exception):
+            raise outcome
+        
+        return outcome
+    
+    def get(self, url, **kwargs):
+        return self._next()
+    
+    def post(self, url, **kwargs):
+        return self._next()
+
+def _sender(outcomes):
+    outcomes = list(outcomes)
+    
+    def send():
+        outcome = outcomes.pop(0)
+        
+        if isinstance(outcome, Exception):
+            raise outcome
+        
+        return outcome, f'status {outcome}'
+    
+    return send
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(resilience, 'time', clock)
+    monkeypatch.setattr(resilience.random, 'uniform', lambda low, high: high)
+    return clock
+
+def test_backoff_is_capped_and_jittered(monkeypatch):
+    policy = RetryPolicy(max_attempts=5, base_delay=0.5, max_delay=3)
+    
+    assert all(0 <= policy.delay(1) <= 0.5 for _ in range(20))
+    
+    monkeypatch.setattr(resilience.random, 'uniform', lambda low, high: high)
+    assert [policy.delay(retry) for retry in range(1, 5)] == [0.5, 1.0, 2.0, 3]
+
+def test_retries_transient_failures_until_success(clock):
+    breaker = CircuitBreaker('test:retry')
+    
+    assert call_with_retry(_sender([503, TimeoutError(), 200]), breaker, RetryPolicy(max_attempts=3)) == 'status 200'
+    assert clock.sleeps == [0.5, 1.0]
+    assert breaker.metrics()['state'] == CLOSED and breaker.metrics()['failures'] == 2
+
+def test_client_errors_and_writes_are_not_retried(clock):
+    breaker = CircuitBreaker('test:no-retry')
+    
+    assert call_with_retry(_sender([400, 200]), breaker, RetryPolicy()) == 'status 400'
+    assert call_with_retry(_sender([503, 200]), breaker, RetryPolicy(), idempotent=False) == 'status 503'
+    assert clock.sleeps == []
+
+def test_last_error_is_raised(clock):
+    with pytest.raises(TimeoutError):
+        call_with_retry(_sender([TimeoutError(), TimeoutError()]), CircuitBreaker('test:raise'), RetryPolicy(max_attempts=2))
+
+def test_breaker_opens_fails_fast_and_probes(clock):
+    breaker = CircuitBreaker('test:breaker', failure_threshold=2, reset_timeout=30)
+    policy = RetryPolicy(max_attempts=1)
+    
+    call_with_retry(_sender([500]), breaker, policy)
+    call_with_retry(_sender([502]), breaker, policy)
+    assert breaker.metrics()['state'] == OPEN
+    
+    with pytest.raises(CircuitOpenError):
+        call_with_retry(_sender([200]), breaker, policy)
+    
+    clock.now += 30
+    assert breaker.allow() is True
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is False
+    
+    breaker.record_success()
+    assert breaker.metrics() == {
+        'successes': 1, 'failures': 2, 'rejected': 2, 'opened': 1, 'state': CLOSED, 'consecutive_failures': 0
+    }
+
+def test_async_retry(clock, monkeypatch):
+    async def no_sleep(seconds):
+        clock.sleeps.append(seconds)
+    
+    monkeypatch.setattr(resilience.asyncio, 'sleep', no_sleep)
+    outcomes = iter([(500, 'down'), (200, 'up')])
+    
+    async def send():
+        return next(outcomes)
+    
+    assert asyncio.run(call_with_retry_async(send, CircuitBreaker('test:async'), RetryPolicy())) == 'up'
+    assert clock.sleeps == [0.5]
+
+def test_tiktok_report_reads_are_retried_and_reported(clock, monkeypatch):
+    monkeypatch.setenv('TIKTOK_APP_SECRET', 'secret')
+    monkeypatch.setenv('CONNECTOR_RATE_LIMIT', '1000')
+    connector = TikTokConnector()
+    connector.initialize('token')
+    connector.session = _FlakySession([
+        _Response(502, {'message': 'Bad gateway'}),
+        _Response(200, {'code': 0, 'data': {'list': [{'campaign_id': 'c1'}]}})
+    ])
+    
+    response = connector._make_request('POST', '/report/flaky/get/', data={'advertiser_id': 'adv'})
+    
+    assert response == {'list': [{'campaign_id': 'c1'}]}
+    assert connector.session.calls == 2
+    assert breaker_metrics()['tiktok:/report/flaky/get/']['failures'] == 1
+
+def test_tiktok_writes_are_sent_once(clock, monkeypatch):
+    monkeypatch.setenv('TIKTOK_APP_SECRET', 'secret')
+    connector = TikTokConnector()
+    connector.initialize('token')
+    connector.session = _FlakySession([_Response(503, {'message': 'Unavailable'})])
+    
+    assert connector._make_request('POST', '/campaign/flaky/create/', data={'advertiser_id': 'adv'}) == {
+        'error': 'TikTok API error: Unavailable'
+    }
+    assert connector.session.calls == 1
+
+def test_graph_endpoint_strips_ids():
+    assert graph_endpoint(('act_123', 'insights')) == '/{id}/insights'
+    assert graph_endpoint('https://graph.facebook.com/v16.0/2384_55/ads?after=abc') == '/{id}/ads'
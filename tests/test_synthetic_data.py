@@ -0,0 +1,36 @@
+"""
+Tests for the seeded synthetic analytics generator
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import SyntheticAnalyticsGenerator
+
+def _generate(seed):
+    generator = SyntheticAnalyticsGenerator(campaigns=3, days=10, users=2, seed=seed)
+    campaigns = generator.campaign_documents(generator.user_documents())
+    
+    return campaigns, [list(generator.analytics_documents(campaign)) for campaign in campaigns]
+
+def test_same_seed_generates_the_same_data():
+    campaigns, analytics = _generate(7)
+    other_campaigns, other_analytics = _generate(7)
+    
+    assert campaigns == other_campaigns
+    assert analytics == other_analytics
+    assert _generate(8)[1] != analytics
+
+def test_generated_analytics_cover_every_day_with_consistent_metrics():
+    campaigns, analytics = _generate(7)
+    
+    assert campaigns[0]['user'] != campaigns[1]['user']
+    assert all(len(days) == 10 for days in analytics)
+    
+    days = analytics[0]
+    assert days[0]['date'].isoformat() == '2024-12-22T00:00:00'
+    assert days[-1]['date'].isoformat() == '2024-12-31T00:00:00'
+    assert all(day['clicks'] <= day['impressions'] and day['conversions'] <= day['clicks'] for day in days)
+    assert 'device_data' in days[-1] and 'device_data' not in days[0]